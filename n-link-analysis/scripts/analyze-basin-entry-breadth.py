@@ -18,11 +18,26 @@ Statistical mechanics framework predicts:
 
 This script isolates and measures the Entry_Breadth component.
 
+Modes
+-----
+- Named cycles (default): one reverse BFS per cycle per N over the DuckDB edges table.
+- --all-cycles: every cycle at each N in one pass over the whole-graph
+  decomposition (nlink_lib/decomposition.py). Basin mass, entry breadth and
+  max depth are bincounts of the per-node (cycle_id, depth) arrays, so the
+  correlation analysis covers every basin instead of a hand-picked list.
+  Labels are the cycle members' titles, starting from the smallest page_id.
+
 Outputs
 -------
 - entry_breadth_n={N}_{tag}.tsv: Per-basin entry breadth metrics
+  (entry_breadth_{rule}_{tag}.tsv with --rule, e.g. entry_breadth_mod=7_analysis.tsv)
 - entry_breadth_summary_{tag}.tsv: Cross-N comparison
 - entry_breadth_correlation_{tag}.tsv: Correlation analysis
+- entry_breadth_log_correlation_{tag}.tsv: Log-log Pearson r of entry breadth
+  vs basin mass per N
+The per-N table also goes to the results store (nlink_lib/results_store.py)
+as metric ``entry_breadth`` keyed by N and --tag; the cross-N tables are one
+query over it.
 
 Usage
 -----
@@ -32,6 +47,12 @@ Usage
     # Cross-N batch analysis
     python analyze-basin-entry-breadth.py --n-range 3 7 --cycles-file basin_cycles.tsv
 
+    # Every basin at every N (single pass per N)
+    python analyze-basin-entry-breadth.py --n-range 3 7 --all-cycles [--min-basin-mass 100]
+
+    # Any traversal rule from nlink_lib/rules.py instead of a fixed N
+    python analyze-basin-entry-breadth.py --rule mod=7 --all-cycles
+
 """
 
 from __future__ import annotations
@@ -42,8 +63,15 @@ import time
 from pathlib import Path
 
 import duckdb
+import numpy as np
 import pyarrow as pa
-import pyarrow.parquet as pq
+
+from nlink_lib.decomposition import Decomposition, get_decomposition
+from nlink_lib.edges_db import connect_edges_db, edges_db_path
+from nlink_lib.link_store import get_link_store
+from nlink_lib.results_store import write_tsv_result
+from nlink_lib.rules import Rule, parse_rule
+from nlink_lib.title_index import resolve_ids_to_titles, resolve_titles_to_ids
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 PROCESSED_DIR = REPO_ROOT / "data" / "wikipedia" / "processed"
@@ -52,107 +80,6 @@ PAGES_PATH = PROCESSED_DIR / "pages.parquet"
 ANALYSIS_DIR = PROCESSED_DIR / "analysis"
 
 
-def _resolve_titles_to_ids(
-    titles: list[str],
-    *,
-    namespace: int,
-    allow_redirects: bool,
-) -> dict[str, int]:
-    """Resolve article titles to page_ids."""
-    if not titles:
-        return {}
-    if not PAGES_PATH.exists():
-        raise FileNotFoundError(f"Missing: {PAGES_PATH}")
-
-    title_tbl = pa.table({"title": pa.array(titles, type=pa.string())})
-
-    con = duckdb.connect()
-    con.register("wanted_titles", title_tbl)
-
-    redirect_clause = "" if allow_redirects else "AND p.is_redirect = FALSE"
-    rows = con.execute(
-        f"""
-        SELECT w.title, min(p.page_id) AS page_id
-        FROM wanted_titles w
-        JOIN read_parquet('{PAGES_PATH.as_posix()}') p
-          ON p.title = w.title
-        WHERE p.namespace = {int(namespace)}
-          {redirect_clause}
-        GROUP BY w.title
-        """.strip()
-    ).fetchall()
-    con.close()
-
-    return {str(t): int(pid) for t, pid in rows}
-
-
-def _resolve_ids_to_titles(page_ids: list[int]) -> dict[int, str]:
-    """Resolve page_ids to titles."""
-    if not page_ids:
-        return {}
-    if not PAGES_PATH.exists():
-        return {}
-
-    unique_ids = sorted(set(int(x) for x in page_ids))
-    id_tbl = pa.table({"page_id": pa.array(unique_ids, type=pa.int64())})
-
-    con = duckdb.connect()
-    con.register("wanted_ids", id_tbl)
-
-    rows = con.execute(
-        f"""
-        SELECT p.page_id, p.title
-        FROM read_parquet('{PAGES_PATH.as_posix()}') p
-        JOIN wanted_ids w USING (page_id)
-        """.strip()
-    ).fetchall()
-    con.close()
-
-    return {int(pid): str(title) for pid, title in rows}
-
-
-def _ensure_edges_table(con: duckdb.DuckDBPyConnection, *, n: int) -> None:
-    """Ensure edges table exists in the DuckDB connection."""
-    exists_row = con.execute(
-        """
-        SELECT COUNT(*)
-        FROM information_schema.tables
-        WHERE table_schema = 'main' AND table_name = 'edges'
-        """.strip()
-    ).fetchone()
-    exists = int(exists_row[0]) if exists_row is not None else 0
-
-    if exists:
-        return
-
-    if not NLINK_PATH.exists():
-        raise FileNotFoundError(f"Missing: {NLINK_PATH}")
-
-    print(f"Materializing edges table for N={n} (one-time cost)...")
-    t0 = time.time()
-
-    con.execute(
-        f"""
-        CREATE TABLE edges AS
-        SELECT
-            page_id::BIGINT AS src_page_id,
-            list_extract(link_sequence, {int(n)})::BIGINT AS dst_page_id
-        FROM read_parquet('{NLINK_PATH.as_posix()}')
-        WHERE list_extract(link_sequence, {int(n)}) IS NOT NULL
-        """.strip()
-    )
-
-    try:
-        con.execute("CREATE INDEX edges_dst_idx ON edges(dst_page_id)")
-    except Exception:
-        pass
-
-    dt = time.time() - t0
-    n_edges_row = con.execute("SELECT COUNT(*) FROM edges").fetchone()
-    n_edges = int(n_edges_row[0]) if n_edges_row is not None else 0
-    print(f"Edges table ready: {n_edges:,} edges in {dt:.1f}s")
-
-
 def compute_entry_breadth(
     con: duckdb.DuckDBPyConnection,
     cycle_ids: list[int],
@@ -243,7 +170,7 @@ def compute_entry_breadth(
 
 
 def analyze_single_n(
-    n: int,
+    n: int | Rule,
     cycles: list[dict],
     *,
     tag: str,
@@ -253,7 +180,7 @@ def analyze_single_n(
     Analyze entry breadth for all cycles at a given N.
 
     Args:
-        n: N-link rule index
+        n: N-link rule index (or any traversal rule)
         cycles: List of cycle dicts with 'titles' or 'page_ids' keys
         tag: Output file tag
         max_depth: Maximum BFS depth (0 = unlimited)
@@ -261,14 +188,14 @@ def analyze_single_n(
     Returns:
         List of result dicts with entry breadth metrics
     """
-    db_path = ANALYSIS_DIR / f"edges_n={n}.duckdb"
+    rule = parse_rule(n)
+    db_path = edges_db_path()
     print(f"\n{'='*60}")
-    print(f"Analyzing N={n}")
-    print(f"Database: {db_path}")
+    print(f"Analyzing {rule.label}")
+    print(f"Database: {db_path if rule.n is not None else '(in-memory, from the link store)'}")
     print(f"{'='*60}")
 
-    con = duckdb.connect(str(db_path))
-    _ensure_edges_table(con, n=n)
+    con = connect_edges_db(rule)
 
     results = []
 
@@ -279,7 +206,7 @@ def analyze_single_n(
             cycle_label = f"Cycle_{i}"
         elif "titles" in cycle_spec:
             titles = cycle_spec["titles"]
-            title_to_id = _resolve_titles_to_ids(
+            title_to_id = resolve_titles_to_ids(
                 titles,
                 namespace=cycle_spec.get("namespace", 0),
                 allow_redirects=cycle_spec.get("allow_redirects", False),
@@ -308,7 +235,7 @@ def analyze_single_n(
         print(f"  Time: {dt:.1f}s")
 
         results.append({
-            "n": n,
+            "n": _rule_column(rule),
             "cycle_label": cycle_label,
             "cycle_size": len(cycle_ids),
             **metrics,
@@ -316,8 +243,106 @@ def analyze_single_n(
 
     con.close()
 
-    # Write results
-    out_path = ANALYSIS_DIR / f"entry_breadth_n={n}_{tag}.tsv"
+    _write_per_n_tsv(rule, results, tag=tag)
+    return results
+
+
+def entry_breadth_all_cycles(decomp: Decomposition, *, max_depth: int = 0) -> dict[str, np.ndarray]:
+    """
+    Entry breadth metrics for every cycle of one N at once.
+
+    Returns arrays aligned to ``decomp.cycle_ids()`` (cycle, cycle_size,
+    basin_mass, entry_breadth, max_depth). Same definitions as
+    ``compute_entry_breadth``: cycle nodes count towards the mass at depth 0,
+    and ``max_depth`` > 0 truncates the basin at that depth.
+    """
+    cycle_id = np.asarray(decomp.cycle_id)
+    depth = np.asarray(decomp.depth)
+    num_nodes = len(decomp)
+
+    in_basin = cycle_id >= 0
+    if max_depth:
+        in_basin &= depth <= int(max_depth)
+    basin_cycle = cycle_id[in_basin]
+    basin_depth = depth[in_basin]
+
+    cycles = decomp.cycle_ids()
+    cycle_size = np.bincount(cycle_id[np.asarray(decomp.on_cycle)], minlength=num_nodes)
+    mass = np.bincount(basin_cycle, minlength=num_nodes)
+    entry = np.bincount(basin_cycle[basin_depth == 1], minlength=num_nodes)
+    deepest = np.zeros(num_nodes, dtype=np.int64)
+    np.maximum.at(deepest, basin_cycle, basin_depth)
+
+    return {
+        "cycle": cycles,
+        "cycle_size": cycle_size[cycles],
+        "basin_mass": mass[cycles],
+        "entry_breadth": entry[cycles],
+        "max_depth": deepest[cycles],
+    }
+
+
+def analyze_all_cycles(
+    n: int | Rule,
+    *,
+    tag: str,
+    max_depth: int = 0,
+    min_basin_mass: int = 0,
+) -> list[dict]:
+    """Entry breadth for every cycle at N (or under any rule) from the whole-graph decomposition."""
+    rule = parse_rule(n)
+    print(f"\n{'='*60}")
+    print(f"Analyzing {rule.label} (all cycles, whole-graph decomposition)")
+    print(f"{'='*60}")
+
+    t0 = time.time()
+    decomp = get_decomposition(rule)
+    metrics = entry_breadth_all_cycles(decomp, max_depth=max_depth)
+
+    keep = metrics["basin_mass"] >= int(min_basin_mass)
+    order = np.nonzero(keep)[0]
+    order = order[np.argsort(-metrics["basin_mass"][order], kind="stable")]
+
+    # Decomposition arrays are indexed by link-store dense id.
+    page_ids = np.asarray(get_link_store().page_ids)
+    members = {int(c): page_ids[decomp.cycle_members(int(c))] for c in metrics["cycle"][order]}
+    titles = resolve_ids_to_titles(sorted({int(pid) for ids in members.values() for pid in ids}))
+
+    results = []
+    for i in order:
+        mass = int(metrics["basin_mass"][i])
+        entry = int(metrics["entry_breadth"][i])
+        ids = members[int(metrics["cycle"][i])]
+        results.append({
+            "n": _rule_column(rule),
+            "cycle_label": " ↔ ".join(titles.get(int(pid), str(int(pid))) for pid in ids),
+            "cycle_size": int(metrics["cycle_size"][i]),
+            "basin_mass": mass,
+            "entry_breadth": entry,
+            "entry_ratio": entry / mass if mass > 0 else 0.0,
+            "max_depth": int(metrics["max_depth"][i]),
+        })
+    dt = time.time() - t0
+
+    print(f"  Cycles: {len(metrics['cycle']):,} ({len(results):,} with basin mass >= {int(min_basin_mass)})")
+    print(f"  Time: {dt:.1f}s")
+    for r in results[:10]:
+        print(
+            f"  {r['basin_mass']:>12,}  breadth={r['entry_breadth']:<10,} "
+            f"ratio={r['entry_ratio']:.6f}  depth={r['max_depth']:<5} {r['cycle_label']}"
+        )
+
+    _write_per_n_tsv(rule, results, tag=tag)
+    return results
+
+
+def _rule_column(rule: Rule) -> int | str:
+    """Value of the ``n`` column: N for fixed-N runs, the rule key otherwise."""
+    return rule.n if rule.n is not None else rule.key
+
+
+def _write_per_n_tsv(rule: Rule, results: list[dict], *, tag: str) -> None:
+    out_path = ANALYSIS_DIR / f"entry_breadth_{rule.key}_{tag}.tsv"
     with open(out_path, "w") as f:
         f.write("n\tcycle_label\tcycle_size\tbasin_mass\tentry_breadth\tentry_ratio\tmax_depth\n")
         for r in results:
@@ -327,8 +352,21 @@ def analyze_single_n(
                 f"{r['max_depth']}\n"
             )
     print(f"\nWrote: {out_path}")
+    write_tsv_result("entry_breadth", out_path, n=rule, tag=tag)
 
-    return results
+
+def _log_pearson(x: list[int], y: list[int]) -> float:
+    """Pearson r of log10(x) vs log10(y) over pairs with both > 0 (nan if < 3 pairs)."""
+    xa = np.asarray(x, dtype=np.float64)
+    ya = np.asarray(y, dtype=np.float64)
+    ok = (xa > 0) & (ya > 0)
+    if int(ok.sum()) < 3:
+        return float("nan")
+    lx = np.log10(xa[ok])
+    ly = np.log10(ya[ok])
+    if lx.std() == 0 or ly.std() == 0:
+        return float("nan")
+    return float(np.corrcoef(lx, ly)[0, 1])
 
 
 def cross_n_summary(all_results: list[dict], *, tag: str) -> None:
@@ -376,6 +414,17 @@ def cross_n_summary(all_results: list[dict], *, tag: str) -> None:
 
     print(f"Wrote correlation: {out_corr}")
 
+    # Log-log Pearson r per N, in its own file so the correlation TSV keeps its columns
+    out_log_corr = ANALYSIS_DIR / f"entry_breadth_log_correlation_{tag}.tsv"
+    with open(out_log_corr, "w") as f:
+        f.write("n\ttotal_basins\tlog_pearson_breadth_mass\n")
+        for n in sorted(by_n.keys()):
+            results = by_n[n]
+            corr = _log_pearson([r["entry_breadth"] for r in results], [r["basin_mass"] for r in results])
+            f.write(f"{n}\t{len(results)}\t{corr:.4f}\n")
+
+    print(f"Wrote log correlation: {out_log_corr}")
+
     # Print key comparisons
     print("\n" + "="*60)
     print("KEY COMPARISONS")
@@ -408,6 +457,11 @@ def main() -> None:
         metavar=("START", "END"),
         help="Analyze N from START to END (inclusive)",
     )
+    parser.add_argument(
+        "--rule",
+        type=str,
+        help="Single traversal rule instead of --n: n=5, mod=7, last=1, frac=0.5, avoid=5 (see nlink_lib/rules.py)",
+    )
     parser.add_argument(
         "--cycles-file",
         type=str,
@@ -420,6 +474,17 @@ def main() -> None:
         default=[],
         help="Individual cycle title (repeatable, forms one cycle)",
     )
+    parser.add_argument(
+        "--all-cycles",
+        action="store_true",
+        help="Analyze every cycle at each N from the whole-graph decomposition (no cycle list needed)",
+    )
+    parser.add_argument(
+        "--min-basin-mass",
+        type=int,
+        default=0,
+        help="With --all-cycles: skip basins smaller than this (default: 0 = all)",
+    )
     parser.add_argument(
         "--max-depth",
         type=int,
@@ -446,13 +511,19 @@ def main() -> None:
 
     args = parser.parse_args()
 
-    # Determine N values to analyze
-    if args.n is not None:
+    # Determine N values (rules) to analyze
+    if args.rule is not None:
+        try:
+            n_values = [parse_rule(args.rule)]
+        except ValueError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+    elif args.n is not None:
         n_values = [args.n]
     elif args.n_range is not None:
         n_values = list(range(args.n_range[0], args.n_range[1] + 1))
     else:
-        print("ERROR: Must specify either --n or --n-range")
+        print("ERROR: Must specify --n, --n-range or --rule")
         sys.exit(1)
 
     # Load cycle specifications
@@ -485,26 +556,37 @@ def main() -> None:
             "allow_redirects": args.allow_redirects,
         })
 
-    if not cycles:
-        print("ERROR: No cycles specified. Use --cycles-file or --cycle-title")
+    if args.all_cycles and cycles:
+        print("ERROR: --all-cycles cannot be combined with --cycles-file / --cycle-title")
+        sys.exit(1)
+    if not cycles and not args.all_cycles:
+        print("ERROR: No cycles specified. Use --cycles-file, --cycle-title or --all-cycles")
         sys.exit(1)
 
     ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
 
     print(f"Entry Breadth Analysis")
-    print(f"N values: {n_values}")
-    print(f"Cycles: {len(cycles)}")
+    print(f"N values: {[str(n) for n in n_values]}")
+    print(f"Cycles: {'all (whole-graph decomposition)' if args.all_cycles else len(cycles)}")
     print(f"Tag: {args.tag}")
 
     # Analyze each N
     all_results = []
     for n in n_values:
-        results = analyze_single_n(
-            n,
-            cycles,
-            tag=args.tag,
-            max_depth=args.max_depth,
-        )
+        if args.all_cycles:
+            results = analyze_all_cycles(
+                n,
+                tag=args.tag,
+                max_depth=args.max_depth,
+                min_basin_mass=args.min_basin_mass,
+            )
+        else:
+            results = analyze_single_n(
+                n,
+                cycles,
+                tag=args.tag,
+                max_depth=args.max_depth,
+            )
         all_results.extend(results)
 
     # Cross-N summary
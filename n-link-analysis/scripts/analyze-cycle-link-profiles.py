@@ -32,6 +32,8 @@ from pathlib import Path
 
 import duckdb
 
+from nlink_lib.title_index import get_title_index, resolve_ids_to_titles
+
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 PROCESSED_DIR = REPO_ROOT / "data" / "wikipedia" / "processed"
@@ -41,22 +43,11 @@ ANALYSIS_DIR = PROCESSED_DIR / "analysis"
 
 
 def get_page_id(title: str) -> int | None:
-    """Look up page_id for a given title."""
+    """Look up page_id for a given title (namespace 0, following redirects)."""
     if not PAGES_PATH.exists():
         return None
 
-    con = duckdb.connect()
-    result = con.execute(
-        f"""
-        SELECT page_id
-        FROM read_parquet('{PAGES_PATH.as_posix()}')
-        WHERE title = ?
-        """,
-        [title],
-    ).fetchone()
-    con.close()
-
-    return int(result[0]) if result else None
+    return get_title_index().lookup(title, namespace=0, follow_redirects=True)
 
 
 def get_link_sequence(page_id: int, max_n: int = 10) -> tuple[list[int], list[str]]:
@@ -82,26 +73,13 @@ def get_link_sequence(page_id: int, max_n: int = 10) -> tuple[list[int], list[st
 
     link_ids = list(link_seq_result[0][:max_n])
 
+    con.close()
+
     # Resolve titles
     if not PAGES_PATH.exists():
-        con.close()
         return link_ids, [str(lid) for lid in link_ids]
 
-    # Batch lookup
-    placeholders = ",".join("?" * len(link_ids))
-    title_results = con.execute(
-        f"""
-        SELECT page_id, title
-        FROM read_parquet('{PAGES_PATH.as_posix()}')
-        WHERE page_id IN ({placeholders})
-        """,
-        link_ids,
-    ).fetchall()
-
-    con.close()
-
-    # Map page_id → title
-    id_to_title = {int(pid): str(title) for pid, title in title_results}
+    id_to_title = resolve_ids_to_titles(link_ids)
     titles = [id_to_title.get(lid, f"[{lid}]") for lid in link_ids]
 
     return link_ids, titles
@@ -6,6 +6,10 @@ Computes comprehensive depth statistics (mean, median, percentiles, variance)
 and tests which depth metric best predicts basin mass.
 
 This extends the max-depth-only analysis by examining full distributions.
+
+Inputs come from the results store (nlink_lib/results_store.py):
+path_characteristics_depth_distributions (analyze-path-characteristics.py) and
+entry_breadth (analyze-basin-entry-breadth.py), each selected by N and tag.
 """
 
 import argparse
@@ -17,29 +21,34 @@ import matplotlib.pyplot as plt
 from scipy import stats
 import seaborn as sns
 
+from nlink_lib.results_store import read_result
+
+PATHS_TAG = "mechanism"
+BREADTH_TAG = "full_analysis_2025_12_31"
+
 # Configure visualization
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (12, 8)
 plt.rcParams['font.size'] = 10
 
 
-def load_depth_distribution(n: int, data_dir: Path) -> pd.DataFrame:
+def load_depth_distribution(n: int, data_dir: Path, tag: str = PATHS_TAG) -> pd.DataFrame:
     """
-    Load depth distribution from path characteristics file.
+    Load depth distribution from the path characteristics results.
 
     Args:
         n: N-link rule value
-        data_dir: Directory containing analysis files
+        data_dir: Directory containing analysis files (results store in results/)
+        tag: Tag of the analyze-path-characteristics.py run
 
     Returns:
         DataFrame with depth, convergence_count, halt_count columns
     """
-    filepath = data_dir / f"path_characteristics_n={n}_mechanism_depth_distributions.tsv"
+    df = read_result("path_characteristics_depth_distributions", n=n, tag=tag, root=data_dir / "results")
 
-    if not filepath.exists():
-        raise FileNotFoundError(f"Depth distribution file not found: {filepath}")
+    if df is None:
+        raise FileNotFoundError(f"No path_characteristics_depth_distributions result for N={n}, tag={tag}")
 
-    df = pd.read_csv(filepath, sep='\t')
     return df
 
 
@@ -100,27 +109,27 @@ def compute_depth_statistics(depth_dist: pd.DataFrame) -> Dict[str, float]:
     }
 
 
-def load_basin_data(n: int, data_dir: Path) -> pd.DataFrame:
+def load_basin_data(n: int, data_dir: Path, tag: str = BREADTH_TAG) -> pd.DataFrame:
     """
     Load basin mass and entry breadth data for correlation analysis.
 
     Args:
         n: N-link rule value
-        data_dir: Directory containing analysis files
+        data_dir: Directory containing analysis files (results store in results/)
+        tag: Tag of the analyze-basin-entry-breadth.py run
 
     Returns:
         DataFrame with cycle_label, basin_mass, entry_breadth, max_depth
     """
-    filepath = data_dir / f"entry_breadth_n={n}_full_analysis_2025_12_31.tsv"
+    df = read_result("entry_breadth", n=n, tag=tag, root=data_dir / "results")
 
-    if not filepath.exists():
-        raise FileNotFoundError(f"Basin data file not found: {filepath}")
+    if df is None:
+        raise FileNotFoundError(f"No entry_breadth result for N={n}, tag={tag}")
 
-    df = pd.read_csv(filepath, sep='\t')
     return df[['cycle_label', 'basin_mass', 'entry_breadth', 'max_depth']]
 
 
-def analyze_across_n_values(n_values: List[int], data_dir: Path, output_dir: Path) -> pd.DataFrame:
+def analyze_across_n_values(n_values: List[int], data_dir: Path, output_dir: Path, paths_tag: str = PATHS_TAG) -> pd.DataFrame:
     """
     Analyze depth distributions across N values.
 
@@ -128,6 +137,7 @@ def analyze_across_n_values(n_values: List[int], data_dir: Path, output_dir: Pat
         n_values: List of N values to analyze
         data_dir: Directory containing analysis files
         output_dir: Directory for output files
+        paths_tag: Tag of the path characteristics results
 
     Returns:
         DataFrame with depth statistics per N
@@ -138,7 +148,7 @@ def analyze_across_n_values(n_values: List[int], data_dir: Path, output_dir: Pat
         print(f"\nAnalyzing N={n}...")
 
         try:
-            depth_dist = load_depth_distribution(n, data_dir)
+            depth_dist = load_depth_distribution(n, data_dir, paths_tag)
             stats_dict = compute_depth_statistics(depth_dist)
             stats_dict['n'] = n
             results.append(stats_dict)
@@ -170,7 +180,9 @@ def analyze_across_n_values(n_values: List[int], data_dir: Path, output_dir: Pat
     return df
 
 
-def test_depth_predictors(n_values: List[int], data_dir: Path, output_dir: Path) -> pd.DataFrame:
+def test_depth_predictors(
+    n_values: List[int], data_dir: Path, output_dir: Path, paths_tag: str = PATHS_TAG, breadth_tag: str = BREADTH_TAG
+) -> pd.DataFrame:
     """
     Test which depth metric best predicts basin mass.
 
@@ -180,6 +192,8 @@ def test_depth_predictors(n_values: List[int], data_dir: Path, output_dir: Path)
         n_values: List of N values to analyze
         data_dir: Directory containing analysis files
         output_dir: Directory for output files
+        paths_tag: Tag of the path characteristics results
+        breadth_tag: Tag of the entry breadth results
 
     Returns:
         DataFrame with correlation results
@@ -189,11 +203,11 @@ def test_depth_predictors(n_values: List[int], data_dir: Path, output_dir: Path)
     for n in n_values:
         try:
             # Load depth distribution
-            depth_dist = load_depth_distribution(n, data_dir)
+            depth_dist = load_depth_distribution(n, data_dir, paths_tag)
             depth_stats = compute_depth_statistics(depth_dist)
 
             # Load basin data
-            basin_data = load_basin_data(n, data_dir)
+            basin_data = load_basin_data(n, data_dir, breadth_tag)
 
             # Note: We only have aggregate depth stats, not per-cycle
             # So we'll use the summary statistics for this N value
@@ -306,7 +320,7 @@ def visualize_depth_statistics(stats_df: pd.DataFrame, output_dir: Path):
     plt.close()
 
 
-def visualize_depth_distributions(n_values: List[int], data_dir: Path, output_dir: Path):
+def visualize_depth_distributions(n_values: List[int], data_dir: Path, output_dir: Path, paths_tag: str = PATHS_TAG):
     """
     Create histogram visualization of depth distributions across N values.
 
@@ -314,6 +328,7 @@ def visualize_depth_distributions(n_values: List[int], data_dir: Path, output_di
         n_values: List of N values to visualize
         data_dir: Directory containing analysis files
         output_dir: Directory for output visualizations
+        paths_tag: Tag of the path characteristics results
     """
     fig, axes = plt.subplots(len(n_values), 1, figsize=(14, 4 * len(n_values)))
 
@@ -322,7 +337,7 @@ def visualize_depth_distributions(n_values: List[int], data_dir: Path, output_di
 
     for idx, n in enumerate(n_values):
         try:
-            depth_dist = load_depth_distribution(n, data_dir)
+            depth_dist = load_depth_distribution(n, data_dir, paths_tag)
 
             ax = axes[idx]
 
@@ -402,6 +417,18 @@ Examples:
         help='Directory containing analysis files'
     )
 
+    parser.add_argument(
+        '--paths-tag',
+        default=PATHS_TAG,
+        help=f'Tag of the analyze-path-characteristics.py results (default: {PATHS_TAG})'
+    )
+
+    parser.add_argument(
+        '--breadth-tag',
+        default=BREADTH_TAG,
+        help=f'Tag of the analyze-basin-entry-breadth.py results (default: {BREADTH_TAG})'
+    )
+
     parser.add_argument(
         '--output-dir',
         type=Path,
@@ -425,20 +452,20 @@ Examples:
     print("\n" + "=" * 80)
     print("COMPUTING DEPTH STATISTICS")
     print("=" * 80)
-    stats_df = analyze_across_n_values(args.n_values, args.data_dir, args.output_dir)
+    stats_df = analyze_across_n_values(args.n_values, args.data_dir, args.output_dir, args.paths_tag)
 
     # Create visualizations
     print("\n" + "=" * 80)
     print("CREATING VISUALIZATIONS")
     print("=" * 80)
     visualize_depth_statistics(stats_df, args.output_dir)
-    visualize_depth_distributions(args.n_values, args.data_dir, args.output_dir)
+    visualize_depth_distributions(args.n_values, args.data_dir, args.output_dir, args.paths_tag)
 
     # Test depth predictors
     print("\n" + "=" * 80)
     print("TESTING DEPTH PREDICTORS")
     print("=" * 80)
-    test_data = test_depth_predictors(args.n_values, args.data_dir, args.output_dir)
+    test_data = test_depth_predictors(args.n_values, args.data_dir, args.output_dir, args.paths_tag, args.breadth_tag)
 
     print("\n" + "=" * 80)
     print("ANALYSIS COMPLETE")
@@ -20,6 +20,25 @@ Writes multiple analysis files:
 1. path_characteristics_n={N}.tsv - Per-sample detailed metrics
 2. path_summary_n={N}.tsv - Aggregate statistics
 3. depth_distribution_n={N}.tsv - Histogram of depths to cycle/HALT
+With ``--rule`` (any traversal rule from nlink_lib/rules.py, e.g. mod=7) the
+rule key replaces ``n={N}`` in the names; rules other than the fixed N run over
+the link store, whose pages also include link targets without a row in
+nlink_sequences (out-degree 0, HALT); starts need a successor, so they are
+never sampled. Each table also goes to the
+results store (nlink_lib/results_store.py) as metric
+``path_characteristics_{details,summary,depth_distributions,ci}``, keyed by N
+and --tag.
+
+Exact mode
+----------
+``--exact`` replaces sampling with the whole population of eligible start pages
+(every page a sample could have started from), computed from the whole-graph
+decomposition (nlink_lib/decomposition.py): depth-to-terminal comes straight
+from the decomposition, and path mean/min out-degree and bottleneck depth are
+reduced layer by layer (each page's path is itself + its successor's path).
+Summary and depth-distribution TSVs have the same columns, with zero sampling
+error; the per-page details TSV is only written with ``--write-details``.
+Paths are followed to their terminal, so ``--max-steps`` does not apply.
 
 Theory Connection
 -----------------
@@ -46,6 +65,13 @@ from typing import Literal
 import duckdb
 import numpy as np
 
+from nlink_lib.adaptive_sampling import AdaptiveConfig, format_estimates_tsv, sample_until_precise
+from nlink_lib.batch_trace import CYCLE, HALT, TERMINAL_NAMES, BatchTrace, trace_batch
+from nlink_lib.decomposition import Decomposition, get_decomposition
+from nlink_lib.link_store import get_link_store, load_successor_arrays
+from nlink_lib.results_store import write_tsv_result
+from nlink_lib.rules import Rule, add_rule_argument, rule_from_args
+
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 PROCESSED_DIR = REPO_ROOT / "data" / "wikipedia" / "processed"
@@ -248,44 +274,148 @@ def trace_with_characteristics(
     )
 
 
+def compute_exact_path_arrays(decomp: Decomposition, out_degree: np.ndarray) -> dict[str, np.ndarray]:
+    """Per-node path metrics for every node at once (same definitions as trace_with_characteristics).
+
+    A node's path is itself followed by its successor's path, ending either at a
+    HALT node or after one full lap of its cycle. Out-degrees are recorded for
+    nodes that have a link sequence (out_degree > 0), exactly like the sampled
+    trace, so the reductions are:
+
+      sum[v] = w[v] + sum[succ v],  cnt[v] = 1 + cnt[succ v]
+      (min, bottleneck)[v] = (w[v], 0) if w[v] <= min[succ v] else (min[succ v], bottleneck[succ v] + 1)
+
+    evaluated layer by layer outward from the terminals (depth 0).
+    """
+
+    succ = np.asarray(decomp.succ).astype(np.int64)
+    on_cycle = np.asarray(decomp.on_cycle)
+    cycle_id = np.asarray(decomp.cycle_id).astype(np.int64)
+    depth = np.asarray(decomp.depth).astype(np.int64)
+    w = np.asarray(out_degree).astype(np.int64)
+    counted = w > 0
+    num_nodes = len(succ)
+    big = np.iinfo(np.int64).max
+
+    deg_sum = np.zeros(num_nodes, dtype=np.int64)
+    deg_cnt = np.zeros(num_nodes, dtype=np.int64)
+    deg_min = np.full(num_nodes, big, dtype=np.int64)
+    bottleneck = np.zeros(num_nodes, dtype=np.int64)
+    cycle_len = np.zeros(num_nodes, dtype=np.int64)
+
+    # Cycle nodes: the path is one full lap starting at the node.
+    cyc_nodes = np.nonzero(on_cycle)[0]
+    if len(cyc_nodes):
+        lab = cycle_id[cyc_nodes]
+        lap_len = np.bincount(lab, minlength=num_nodes)
+        lap_sum = np.bincount(lab, weights=w[cyc_nodes], minlength=num_nodes).astype(np.int64)
+        lap_min = np.full(num_nodes, big, dtype=np.int64)
+        np.minimum.at(lap_min, lab, w[cyc_nodes])
+
+        cycle_len[cyc_nodes] = lap_len[lab]
+        deg_sum[cyc_nodes] = lap_sum[lab]
+        deg_cnt[cyc_nodes] = lap_len[lab]
+        deg_min[cyc_nodes] = lap_min[lab]
+
+        # Steps from each cycle node to the first node (going forward) holding the lap minimum.
+        is_min = w[cyc_nodes] == lap_min[lab]
+        pos_of = np.full(num_nodes, -1, dtype=np.int64)
+        pos_of[cyc_nodes] = np.arange(len(cyc_nodes))
+        nxt = pos_of[succ[cyc_nodes]]
+        dist = np.where(is_min, 0, len(cyc_nodes) + 1)
+        while True:
+            new_dist = np.where(is_min, 0, np.minimum(dist, dist[nxt] + 1))
+            if np.array_equal(new_dist, dist):
+                break
+            dist = new_dist
+        bottleneck[cyc_nodes] = dist
+
+    # HALT nodes: the path ends here.
+    halt_nodes = np.nonzero((succ < 0) & ~on_cycle)[0]
+    deg_sum[halt_nodes] = np.where(counted[halt_nodes], w[halt_nodes], 0)
+    deg_cnt[halt_nodes] = counted[halt_nodes].astype(np.int64)
+    deg_min[halt_nodes] = np.where(counted[halt_nodes], w[halt_nodes], big)
+
+    for _d, nodes in decomp.layers(start=1):
+        nxt = succ[nodes]
+        wv = w[nodes]
+        deg_sum[nodes] = wv + deg_sum[nxt]
+        deg_cnt[nodes] = 1 + deg_cnt[nxt]
+        take_self = wv <= deg_min[nxt]
+        deg_min[nodes] = np.where(take_self, wv, deg_min[nxt])
+        bottleneck[nodes] = np.where(take_self, 0, bottleneck[nxt] + 1)
+
+    is_halt_basin = cycle_id < 0
+    path_len = np.where(is_halt_basin, depth + 1, depth + cycle_len[np.maximum(cycle_id, 0)])
+    mean_outdegree = np.where(deg_cnt > 0, deg_sum / np.maximum(deg_cnt, 1), 0.0)
+    min_outdegree = np.where(deg_min == big, 0, deg_min)
+
+    return {
+        "is_halt": is_halt_basin,
+        "depth": depth,
+        "path_len": path_len,
+        "cycle_len": np.where(is_halt_basin, 0, cycle_len[np.maximum(cycle_id, 0)]),
+        "mean_outdegree": mean_outdegree,
+        "min_outdegree": min_outdegree,
+        "bottleneck_depth": bottleneck,
+    }
+
+
 def compute_summary_statistics(characteristics: list[PathCharacteristics]) -> dict[str, float | int]:
     """Compute aggregate statistics from path characteristics."""
 
     if not characteristics:
         return {}
 
-    # Terminal type counts
-    terminal_counts = Counter(c.terminal_type for c in characteristics)
-    total = len(characteristics)
-
-    # Path length statistics
-    path_lens = [c.path_len for c in characteristics]
+    return compute_summary_statistics_from_arrays(
+        terminal_types=np.array([c.terminal_type for c in characteristics]),
+        path_lens=np.array([c.path_len for c in characteristics]),
+        convergence_depths=np.array([c.convergence_depth for c in characteristics if c.convergence_depth is not None]),
+        halt_depths=np.array([c.halt_depth for c in characteristics if c.halt_depth is not None]),
+        mean_outdegrees=np.array([c.mean_outdegree for c in characteristics]),
+        min_outdegrees=np.array([c.min_outdegree for c in characteristics]),
+        bottleneck_depths=np.array([c.bottleneck_depth for c in characteristics]),
+        early_halt_count=sum(1 for c in characteristics if c.early_halt),
+        rapid_convergence_count=sum(1 for c in characteristics if c.rapid_convergence),
+    )
 
-    # Convergence depth statistics (cycles only)
-    convergence_depths = [c.convergence_depth for c in characteristics if c.convergence_depth is not None]
 
-    # HALT depth statistics (halts only)
-    halt_depths = [c.halt_depth for c in characteristics if c.halt_depth is not None]
+def compute_summary_statistics_from_arrays(
+    *,
+    terminal_types: np.ndarray,
+    path_lens: np.ndarray,
+    convergence_depths: np.ndarray,
+    halt_depths: np.ndarray,
+    mean_outdegrees: np.ndarray,
+    min_outdegrees: np.ndarray,
+    bottleneck_depths: np.ndarray,
+    early_halt_count: int,
+    rapid_convergence_count: int,
+) -> dict[str, float | int]:
+    """Aggregate statistics over per-path arrays (sampled or whole-population)."""
+
+    total = int(len(path_lens))
+    if total == 0:
+        return {}
 
-    # Branching statistics
-    mean_outdegrees = [c.mean_outdegree for c in characteristics]
-    min_outdegrees = [c.min_outdegree for c in characteristics]
-    bottleneck_depths = [c.bottleneck_depth for c in characteristics]
+    # Terminal type counts
+    halt_count = int(np.count_nonzero(terminal_types == "HALT"))
+    cycle_count = int(np.count_nonzero(terminal_types == "CYCLE"))
+    max_steps_count = int(np.count_nonzero(terminal_types == "MAX_STEPS"))
 
-    # Fragmentation indicators
-    early_halt_count = sum(1 for c in characteristics if c.early_halt)
-    rapid_convergence_count = sum(1 for c in characteristics if c.rapid_convergence)
+    has_conv = len(convergence_depths) > 0
+    has_halt = len(halt_depths) > 0
 
     return {
         # Sample size
         "total_samples": total,
 
         # Terminal type distribution
-        "halt_count": terminal_counts.get("HALT", 0),
-        "cycle_count": terminal_counts.get("CYCLE", 0),
-        "max_steps_count": terminal_counts.get("MAX_STEPS", 0),
-        "halt_pct": 100.0 * terminal_counts.get("HALT", 0) / total,
-        "cycle_pct": 100.0 * terminal_counts.get("CYCLE", 0) / total,
+        "halt_count": halt_count,
+        "cycle_count": cycle_count,
+        "max_steps_count": max_steps_count,
+        "halt_pct": 100.0 * halt_count / total,
+        "cycle_pct": 100.0 * cycle_count / total,
 
         # Path length statistics
         "mean_path_len": float(np.mean(path_lens)),
@@ -295,16 +425,16 @@ def compute_summary_statistics(characteristics: list[PathCharacteristics]) -> di
         "max_path_len": int(np.max(path_lens)),
 
         # Convergence depth (cycles only)
-        "mean_convergence_depth": float(np.mean(convergence_depths)) if convergence_depths else 0.0,
-        "median_convergence_depth": float(np.median(convergence_depths)) if convergence_depths else 0.0,
-        "p25_convergence_depth": float(np.percentile(convergence_depths, 25)) if convergence_depths else 0.0,
-        "p75_convergence_depth": float(np.percentile(convergence_depths, 75)) if convergence_depths else 0.0,
+        "mean_convergence_depth": float(np.mean(convergence_depths)) if has_conv else 0.0,
+        "median_convergence_depth": float(np.median(convergence_depths)) if has_conv else 0.0,
+        "p25_convergence_depth": float(np.percentile(convergence_depths, 25)) if has_conv else 0.0,
+        "p75_convergence_depth": float(np.percentile(convergence_depths, 75)) if has_conv else 0.0,
 
         # HALT depth (halts only)
-        "mean_halt_depth": float(np.mean(halt_depths)) if halt_depths else 0.0,
-        "median_halt_depth": float(np.median(halt_depths)) if halt_depths else 0.0,
-        "p25_halt_depth": float(np.percentile(halt_depths, 25)) if halt_depths else 0.0,
-        "p75_halt_depth": float(np.percentile(halt_depths, 75)) if halt_depths else 0.0,
+        "mean_halt_depth": float(np.mean(halt_depths)) if has_halt else 0.0,
+        "median_halt_depth": float(np.median(halt_depths)) if has_halt else 0.0,
+        "p25_halt_depth": float(np.percentile(halt_depths, 25)) if has_halt else 0.0,
+        "p75_halt_depth": float(np.percentile(halt_depths, 75)) if has_halt else 0.0,
 
         # Branching statistics
         "mean_mean_outdegree": float(np.mean(mean_outdegrees)),
@@ -312,9 +442,9 @@ def compute_summary_statistics(characteristics: list[PathCharacteristics]) -> di
         "mean_bottleneck_depth": float(np.mean(bottleneck_depths)),
 
         # Fragmentation indicators
-        "early_halt_count": early_halt_count,
+        "early_halt_count": int(early_halt_count),
         "early_halt_pct": 100.0 * early_halt_count / total,
-        "rapid_convergence_count": rapid_convergence_count,
+        "rapid_convergence_count": int(rapid_convergence_count),
         "rapid_convergence_pct": 100.0 * rapid_convergence_count / total,
     }
 
@@ -336,45 +466,23 @@ def compute_depth_distributions(
     return dict(convergence_hist), dict(halt_hist)
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(
-        description="Analyze path characteristics to understand fragmentation vs concentration mechanisms."
-    )
-    parser.add_argument("--n", type=int, required=True, help="N for fixed N-link rule")
-    parser.add_argument("--num", type=int, default=1000, help="Number of samples to draw (default: 1000)")
-    parser.add_argument("--seed0", type=int, default=0, help="First RNG seed (default: 0)")
-    parser.add_argument(
-        "--min-outdegree",
-        type=int,
-        default=50,
-        help="When choosing start page, require out_degree >= this (default: 50)",
-    )
-    parser.add_argument("--max-steps", type=int, default=5000, help="Stop after this many steps (default: 5000)")
-    parser.add_argument(
-        "--tag",
-        type=str,
-        default="",
-        help="Optional tag for output filename (e.g., 'mechanism_test')",
-    )
-
-    args = parser.parse_args()
+DETAIL_COLUMNS = [
+    "seed", "start_page_id", "terminal_type", "path_len", "steps",
+    "transient_len", "cycle_len", "convergence_depth", "halt_depth",
+    "mean_outdegree", "min_outdegree", "bottleneck_depth",
+    "early_halt", "rapid_convergence"
+]
 
-    if args.n <= 0:
-        raise SystemExit("--n must be >= 1")
-    if args.num <= 0:
-        raise SystemExit("--num must be >= 1")
 
-    print(f"=== Path Characteristics Analysis for N={args.n} ===")
-    print(f"Samples: {args.num}")
-    print(f"Min outdegree: {args.min_outdegree}")
-    print(f"Max steps: {args.max_steps}")
-    print()
+def _sample_characteristics(args: argparse.Namespace, rule: Rule) -> list[PathCharacteristics]:
+    """Sampled mode: walk ``--num`` random start pages in Python."""
 
-    # Load data
     print(f"Using nlink data: {NLINK_PATH}")
-    page_ids, next_ids, out_degree = _load_successor_arrays(args.n)
+    if rule.n is not None:
+        page_ids, next_ids, out_degree = _load_successor_arrays(rule.n)
+    else:
+        page_ids, next_ids, out_degree = load_successor_arrays(rule)
 
-    # Sample traces
     characteristics: list[PathCharacteristics] = []
 
     t0 = time.time()
@@ -422,29 +530,11 @@ def main() -> None:
             rate = (i + 1) / max(dt, 1e-9)
             print(f"Sampled {i+1}/{args.num} traces ({rate:.1f} traces/sec)")
 
-    # Compute summary statistics
-    print()
-    print("Computing summary statistics...")
-    summary = compute_summary_statistics(characteristics)
+    return characteristics
 
-    # Compute depth distributions
-    convergence_hist, halt_hist = compute_depth_distributions(characteristics)
 
-    # Save outputs
-    ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
-
-    tag_suffix = f"_{args.tag}" if args.tag else ""
-    base_name = f"path_characteristics_n={args.n}{tag_suffix}"
-
-    # 1. Per-sample detailed metrics
-    details_path = ANALYSIS_DIR / f"{base_name}_details.tsv"
-    header = "\t".join([
-        "seed", "start_page_id", "terminal_type", "path_len", "steps",
-        "transient_len", "cycle_len", "convergence_depth", "halt_depth",
-        "mean_outdegree", "min_outdegree", "bottleneck_depth",
-        "early_halt", "rapid_convergence"
-    ])
-    lines = [header]
+def _detail_lines_from_characteristics(characteristics: list[PathCharacteristics]) -> list[str]:
+    lines = ["\t".join(DETAIL_COLUMNS)]
     for c in characteristics:
         lines.append("\t".join([
             str(c.seed),
@@ -462,8 +552,320 @@ def main() -> None:
             "1" if c.early_halt else "0",
             "1" if c.rapid_convergence else "0",
         ]))
-    details_path.write_text("\n".join(lines), encoding="utf-8")
-    print(f"Saved detailed metrics: {details_path}")
+    return lines
+
+
+def _detail_lines_from_arrays(
+    *,
+    seeds: np.ndarray | None,
+    start_page_ids: np.ndarray,
+    terminal_types: np.ndarray,
+    path_lens: np.ndarray,
+    transient_lens: np.ndarray,
+    cycle_lens: np.ndarray,
+    halt_depths: np.ndarray,
+    mean_outdegrees: np.ndarray,
+    min_outdegrees: np.ndarray,
+    bottleneck_depths: np.ndarray,
+) -> list[str]:
+    """Details TSV lines from per-path arrays (-1 = not applicable; seeds None = blank)."""
+
+    def opt(v: int) -> str:
+        return "" if v < 0 else str(v)
+
+    lines = ["\t".join(DETAIL_COLUMNS)]
+    for i in range(len(start_page_ids)):
+        terminal = str(terminal_types[i])
+        transient = int(transient_lens[i])
+        halt_depth = int(halt_depths[i])
+        lines.append("\t".join([
+            "" if seeds is None else str(int(seeds[i])),
+            str(int(start_page_ids[i])),
+            terminal,
+            str(int(path_lens[i])),
+            str(int(path_lens[i]) - 1),
+            opt(transient),
+            opt(int(cycle_lens[i])),
+            opt(transient),
+            opt(halt_depth),
+            f"{float(mean_outdegrees[i]):.2f}",
+            str(int(min_outdegrees[i])),
+            str(int(bottleneck_depths[i])),
+            "1" if terminal == "HALT" and halt_depth < 10 else "0",
+            "1" if terminal == "CYCLE" and transient < 50 else "0",
+        ]))
+    return lines
+
+
+def _exact_population(
+    args: argparse.Namespace, rule: Rule
+) -> tuple[dict[str, float | int], dict[int, int], dict[int, int], list[str] | None]:
+    """Exact mode: every eligible start page, from the whole-graph decomposition."""
+
+    t0 = time.time()
+    store = get_link_store()
+    decomp = get_decomposition(rule)
+    out_degree = store.out_degree
+    succ = np.asarray(decomp.succ)
+
+    # Same eligibility as _choose_start_page (uniform over these candidates).
+    population = np.nonzero((succ >= 0) & (out_degree >= int(args.min_outdegree)))[0]
+    if len(population) == 0:
+        population = np.nonzero(succ >= 0)[0]
+    if len(population) == 0:
+        raise RuntimeError("No candidate pages found with a defined Nth link.")
+
+    arrays = compute_exact_path_arrays(decomp, out_degree)
+    is_halt = arrays["is_halt"][population]
+    depth = arrays["depth"][population]
+    path_len = arrays["path_len"][population]
+
+    conv_depths = depth[~is_halt]
+    halt_depths = depth[is_halt]
+    early_halt_count = int(np.count_nonzero(halt_depths < 10))
+    rapid_convergence_count = int(np.count_nonzero(conv_depths < 50))
+
+    summary = compute_summary_statistics_from_arrays(
+        terminal_types=np.where(is_halt, "HALT", "CYCLE"),
+        path_lens=path_len,
+        convergence_depths=conv_depths,
+        halt_depths=halt_depths,
+        mean_outdegrees=arrays["mean_outdegree"][population],
+        min_outdegrees=arrays["min_outdegree"][population],
+        bottleneck_depths=arrays["bottleneck_depth"][population],
+        early_halt_count=early_halt_count,
+        rapid_convergence_count=rapid_convergence_count,
+    )
+
+    conv_counts = np.bincount(conv_depths) if len(conv_depths) else np.zeros(0, dtype=np.int64)
+    halt_counts = np.bincount(halt_depths) if len(halt_depths) else np.zeros(0, dtype=np.int64)
+    convergence_hist = {int(d): int(c) for d, c in enumerate(conv_counts) if c}
+    halt_hist = {int(d): int(c) for d, c in enumerate(halt_counts) if c}
+
+    dt = time.time() - t0
+    rate = len(population) / max(dt, 1e-9)
+    print(f"Exact: {len(population):,} start pages in {dt:.1f}s ({rate:,.0f} pages/sec)")
+
+    if not args.write_details:
+        return summary, convergence_hist, halt_hist, None
+
+    lines = _detail_lines_from_arrays(
+        seeds=None,
+        start_page_ids=np.asarray(store.page_ids)[population],
+        terminal_types=np.where(is_halt, "HALT", "CYCLE"),
+        path_lens=path_len,
+        transient_lens=np.where(is_halt, -1, depth),
+        cycle_lens=np.where(is_halt, -1, arrays["cycle_len"][population]),
+        halt_depths=np.where(is_halt, depth, -1),
+        mean_outdegrees=arrays["mean_outdegree"][population],
+        min_outdegrees=arrays["min_outdegree"][population],
+        bottleneck_depths=arrays["bottleneck_depth"][population],
+    )
+    return summary, convergence_hist, halt_hist, lines
+
+
+def _adaptive_sample(
+    args: argparse.Namespace, rule: Rule
+) -> tuple[dict[str, float | int], dict[int, int], dict[int, int], list[str], str]:
+    """Adaptive mode: vectorized batches until tracked rates meet --ci-halfwidth."""
+
+    store = get_link_store()
+    succ = rule.successors(store)
+    out_degree = store.out_degree
+
+    candidates = np.nonzero((succ >= 0) & (out_degree >= int(args.min_outdegree)))[0]
+    if len(candidates) == 0:
+        candidates = np.nonzero(succ >= 0)[0]
+    if len(candidates) == 0:
+        raise RuntimeError("No candidate pages found with a defined Nth link.")
+
+    config = AdaptiveConfig(
+        halfwidth=float(args.ci_halfwidth) / 100.0,
+        confidence=float(args.confidence),
+        method=args.ci_method,
+        batch_size=int(args.batch_size),
+        max_samples=int(args.max_num),
+        seed0=int(args.seed0),
+    )
+
+    batches: list[BatchTrace] = []
+    counts = {"halt": 0, "early_halt": 0, "rapid_convergence": 0, "total": 0}
+    key_counts: Counter[int] = Counter()
+
+    def draw_batch(rng: np.random.Generator, size: int, _first_index: int) -> None:
+        starts = candidates[rng.integers(0, len(candidates), size=size)]
+        bt = trace_batch(succ, starts, max_steps=int(args.max_steps), out_degree=out_degree)
+        batches.append(bt)
+        halt = bt.terminal == HALT
+        cyc = bt.terminal == CYCLE
+        counts["halt"] += int(halt.sum())
+        counts["early_halt"] += int((halt & (bt.path_len - 1 < 10)).sum())
+        counts["rapid_convergence"] += int((cyc & (bt.transient_len < 50)).sum())
+        counts["total"] += size
+        key_counts.update(bt.cycle_key[cyc].tolist())
+
+    def tracked_counts() -> tuple[dict[str, int], int]:
+        tracked = {
+            "P_HALT": counts["halt"],
+            "early_halt_rate": counts["early_halt"],
+            "rapid_convergence_rate": counts["rapid_convergence"],
+        }
+        for key, cnt in key_counts.most_common(int(args.ci_top_k)):
+            tracked[f"cycle_share[{int(store.page_ids[key])}]"] = int(cnt)
+        return tracked, counts["total"]
+
+    result = sample_until_precise(config, draw_batch=draw_batch, tracked_counts=tracked_counts)
+    status = "converged" if result.converged else "hit --max-num before converging"
+    print(f"Adaptive sampling {status} after {result.samples:,} samples")
+
+    terminal = np.concatenate([b.terminal for b in batches])
+    names = TERMINAL_NAMES[terminal]
+    path_len = np.concatenate([b.path_len for b in batches])
+    transient = np.concatenate([b.transient_len for b in batches])
+    cycle_len = np.concatenate([b.cycle_len for b in batches])
+    mean_outdeg = np.concatenate([b.mean_outdegree for b in batches])
+    min_outdeg = np.concatenate([b.min_outdegree for b in batches])
+    bottleneck = np.concatenate([b.bottleneck_depth for b in batches])
+    starts = np.concatenate([b.starts for b in batches])
+
+    is_halt = terminal == HALT
+    is_cycle = terminal == CYCLE
+    conv_depths = transient[is_cycle]
+    halt_depths = path_len[is_halt] - 1
+
+    summary = compute_summary_statistics_from_arrays(
+        terminal_types=names,
+        path_lens=path_len,
+        convergence_depths=conv_depths,
+        halt_depths=halt_depths,
+        mean_outdegrees=mean_outdeg,
+        min_outdegrees=min_outdeg,
+        bottleneck_depths=bottleneck,
+        early_halt_count=int(np.count_nonzero(halt_depths < 10)),
+        rapid_convergence_count=int(np.count_nonzero(conv_depths < 50)),
+    )
+    conv_counts = np.bincount(conv_depths) if len(conv_depths) else np.zeros(0, dtype=np.int64)
+    halt_counts = np.bincount(halt_depths) if len(halt_depths) else np.zeros(0, dtype=np.int64)
+    convergence_hist = {int(d): int(c) for d, c in enumerate(conv_counts) if c}
+    halt_hist = {int(d): int(c) for d, c in enumerate(halt_counts) if c}
+
+    lines = _detail_lines_from_arrays(
+        seeds=int(args.seed0) + np.arange(len(terminal)),
+        start_page_ids=np.asarray(store.page_ids)[starts],
+        terminal_types=names,
+        path_lens=path_len,
+        transient_lens=transient,
+        cycle_lens=cycle_len,
+        halt_depths=np.where(is_halt, path_len - 1, -1),
+        mean_outdegrees=mean_outdeg,
+        min_outdegrees=min_outdeg,
+        bottleneck_depths=bottleneck,
+    )
+    return summary, convergence_hist, halt_hist, lines, format_estimates_tsv(result, config)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Analyze path characteristics to understand fragmentation vs concentration mechanisms."
+    )
+    parser.add_argument("--n", type=int, default=None, help="N for fixed N-link rule (or --rule)")
+    add_rule_argument(parser)
+    parser.add_argument("--num", type=int, default=1000, help="Number of samples to draw (default: 1000)")
+    parser.add_argument("--seed0", type=int, default=0, help="First RNG seed (default: 0)")
+    parser.add_argument(
+        "--min-outdegree",
+        type=int,
+        default=50,
+        help="When choosing start page, require out_degree >= this (default: 50)",
+    )
+    parser.add_argument("--max-steps", type=int, default=5000, help="Stop after this many steps (default: 5000)")
+    parser.add_argument(
+        "--tag",
+        type=str,
+        default="",
+        help="Optional tag for output filename (e.g., 'mechanism_test'; default 'exact' with --exact)",
+    )
+    parser.add_argument(
+        "--exact",
+        action="store_true",
+        help="Compute over every eligible start page from the whole-graph decomposition (no sampling)",
+    )
+    parser.add_argument(
+        "--ci-halfwidth",
+        type=float,
+        default=None,
+        help="Adaptive mode: stop once P_HALT, early-HALT / rapid-convergence rates and top-k cycle shares "
+        "are within ±this many percentage points",
+    )
+    parser.add_argument("--confidence", type=float, default=0.95, help="Adaptive mode: interval confidence (default: 0.95)")
+    parser.add_argument(
+        "--ci-method",
+        choices=["wilson", "bootstrap"],
+        default="wilson",
+        help="Adaptive mode: interval method (default: wilson)",
+    )
+    parser.add_argument("--ci-top-k", type=int, default=5, help="Adaptive mode: cycle shares tracked (default: 5)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Adaptive mode: samples per batch (default: 1000)")
+    parser.add_argument("--max-num", type=int, default=100_000, help="Adaptive mode: sample cap (default: 100000)")
+    parser.add_argument(
+        "--write-details",
+        action="store_true",
+        help="With --exact, also write the per-page details TSV (one row per eligible page; large)",
+    )
+
+    args = parser.parse_args()
+
+    if args.n is not None and args.n <= 0:
+        raise SystemExit("--n must be >= 1")
+    rule = rule_from_args(args)
+    if args.num <= 0:
+        raise SystemExit("--num must be >= 1")
+    if args.ci_halfwidth is not None and args.ci_halfwidth <= 0:
+        raise SystemExit("--ci-halfwidth must be > 0")
+    if args.exact and args.ci_halfwidth is not None:
+        raise SystemExit("--exact and --ci-halfwidth are mutually exclusive")
+
+    print(f"=== Path Characteristics Analysis for {rule.label} ===")
+    if args.exact:
+        print("Mode: exact (whole population)")
+    elif args.ci_halfwidth is not None:
+        print(f"Mode: adaptive (±{args.ci_halfwidth}% at {args.confidence:.0%} confidence, {args.ci_method})")
+    else:
+        print(f"Samples: {args.num}")
+    print(f"Min outdegree: {args.min_outdegree}")
+    if not args.exact:
+        print(f"Max steps: {args.max_steps}")
+    print()
+
+    ci_tsv: str | None = None
+    if args.exact:
+        summary, convergence_hist, halt_hist, detail_lines = _exact_population(args, rule)
+    elif args.ci_halfwidth is not None:
+        summary, convergence_hist, halt_hist, detail_lines, ci_tsv = _adaptive_sample(args, rule)
+    else:
+        characteristics = _sample_characteristics(args, rule)
+
+        # Compute summary statistics
+        print()
+        print("Computing summary statistics...")
+        summary = compute_summary_statistics(characteristics)
+
+        # Compute depth distributions
+        convergence_hist, halt_hist = compute_depth_distributions(characteristics)
+        detail_lines = _detail_lines_from_characteristics(characteristics)
+
+    # Save outputs
+    ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
+
+    tag = args.tag or ("exact" if args.exact else "")
+    tag_suffix = f"_{tag}" if tag else ""
+    base_name = f"path_characteristics_{rule.key}{tag_suffix}"
+
+    # 1. Per-sample detailed metrics
+    if detail_lines is not None:
+        details_path = ANALYSIS_DIR / f"{base_name}_details.tsv"
+        details_path.write_text("\n".join(detail_lines), encoding="utf-8")
+        print(f"Saved detailed metrics: {details_path}")
 
     # 2. Summary statistics
     summary_path = ANALYSIS_DIR / f"{base_name}_summary.tsv"
@@ -485,6 +887,22 @@ def main() -> None:
     depth_dist_path.write_text("\n".join(depth_lines), encoding="utf-8")
     print(f"Saved depth distributions: {depth_dist_path}")
 
+    # 4. Confidence intervals (adaptive mode)
+    if ci_tsv is not None:
+        ci_path = ANALYSIS_DIR / f"{base_name}_ci.tsv"
+        ci_path.write_text(ci_tsv, encoding="utf-8")
+        print(f"Saved confidence intervals: {ci_path}")
+
+    # Same tables in the results store (metric path_characteristics_{part}).
+    stored = {"summary": summary_path, "depth_distributions": depth_dist_path}
+    if detail_lines is not None:
+        stored["details"] = details_path
+    if ci_tsv is not None:
+        stored["ci"] = ci_path
+    for part, path in stored.items():
+        write_tsv_result(f"path_characteristics_{part}", path, n=rule, tag=tag or None)
+    print(f"Stored in results store: path_characteristics_{{{','.join(stored)}}}")
+
     # Print summary
     print()
     print("=== Summary Statistics ===")
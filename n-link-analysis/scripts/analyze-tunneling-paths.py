@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""Multi-rule tunneling over the (page, N) multiplex.
+
+Context
+-------
+Fixed-N basins are 1D slices of a multiplex over (page, N). Switching the
+rule at a page moves it from its basin under one N into its basin under
+another; pages where that changes the terminal cycle are *tunnel nodes*
+(unified-inference-theory.md §3.3, NEXT-STEPS 2.2).
+
+Modes
+-----
+Summary (default): from the whole-graph decompositions for every N in
+--n-values (nlink_lib/multiplex.py), find every tunnel node in one
+vectorized pass over the (N, page) terminal matrix and count tunnel nodes
+per basin pair ((N_a, cycle A) -> (N_b, cycle B), A != B). Cycles are
+identified across N by their min rotation, so the same cycle at N=4 and N=5
+is one attractor.
+
+Query (--start-title/--start-page-id with --target-title/--target-page-id):
+minimum number of rule switches taking the start page into the target
+cycle, with the path. The target is the cycle the target page lies on (or
+drains into) at --target-n.
+
+Outputs
+-------
+Summary:
+- tunnel_nodes_{tag}.parquet: page_id, distinct_terminals, terminal_n={N}
+  (cycle page_id = smallest page on the cycle; -1 = HALT) per N
+- tunnel_edges_{tag}.parquet: every basin pair with its tunnel-node count
+- tunnel_edges_top_{tag}.tsv: top-K basin pairs with cycle titles
+Query:
+- tunneling_path_{tag}.tsv: step, page_id, title, n, switch
+
+Usage
+-----
+    python analyze-tunneling-paths.py --n-values 3 4 5 6 7 [--include-halt] [--top-k 25]
+
+    python analyze-tunneling-paths.py --n-values 3 4 5 6 7 \\
+        --start-title "Massachusetts" --target-title "Philosophy" --target-n 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from nlink_lib.link_store import get_link_store
+from nlink_lib.multiplex import Multiplex, get_multiplex
+from nlink_lib.paths import ANALYSIS_DIR
+from nlink_lib.title_index import resolve_ids_to_titles, resolve_titles_to_ids
+from nlink_lib.title_search import describe_missing_titles
+
+
+def _cycle_page_ids(mux: Multiplex, cycles: np.ndarray, page_ids: np.ndarray) -> np.ndarray:
+    """Smallest page_id on each canonical cycle (-1 for HALT)."""
+
+    cycles = np.asarray(cycles, dtype=np.int64)
+    out = np.full(len(cycles), -1, dtype=np.int64)
+    on_cycle = cycles >= 0
+    out[on_cycle] = page_ids[mux.catalog.heads[cycles[on_cycle]]]
+    return out
+
+
+def _cycle_names(mux: Multiplex, cycles: list[int], page_ids: np.ndarray) -> dict[int, str]:
+    members = {int(c): page_ids[mux.catalog.cycle_members(int(c))] for c in cycles if c >= 0}
+    titles = resolve_ids_to_titles(sorted({int(pid) for ids in members.values() for pid in ids}))
+    names = {c: " ↔ ".join(titles.get(int(pid), str(int(pid))) for pid in ids) for c, ids in members.items()}
+    names[-1] = "HALT"
+    return names
+
+
+def run_summary(mux: Multiplex, *, include_halt: bool, top_k: int, tag: str) -> None:
+    print(f"\n{'='*60}")
+    print(f"Tunnel nodes over N={list(mux.n_values)}{' (HALT counted as a terminal)' if include_halt else ''}")
+    print(f"{'='*60}")
+
+    t0 = time.time()
+    page_ids = np.asarray(get_link_store().page_ids)
+    distinct = mux.distinct_terminals(include_halt=include_halt)
+    nodes = np.nonzero(distinct >= 2)[0]
+    edges = mux.tunnel_edges(include_halt=include_halt, nodes=nodes)
+    print(f"  Pages: {len(mux):,}  cycles (canonical): {len(mux.catalog):,}")
+    print(f"  Tunnel nodes: {len(nodes):,} ({len(nodes) / max(len(mux), 1):.2%})  basin pairs: {len(edges['nodes']):,}")
+    print(f"  Time: {time.time() - t0:.1f}s")
+
+    out_nodes = ANALYSIS_DIR / f"tunnel_nodes_{tag}.parquet"
+    columns = {"page_id": page_ids[nodes], "distinct_terminals": distinct[nodes]}
+    for k, n in enumerate(mux.n_values):
+        columns[f"terminal_n={n}"] = _cycle_page_ids(mux, mux.terminal_matrix[k, nodes], page_ids)
+    pq.write_table(pa.table(columns), out_nodes)
+    print(f"  Wrote: {out_nodes}")
+
+    n_values = np.asarray(mux.n_values, dtype=np.int64)
+    out_edges = ANALYSIS_DIR / f"tunnel_edges_{tag}.parquet"
+    pq.write_table(
+        pa.table(
+            {
+                "n_a": n_values[edges["layer_a"]],
+                "cycle_a_page_id": _cycle_page_ids(mux, edges["cycle_a"], page_ids),
+                "n_b": n_values[edges["layer_b"]],
+                "cycle_b_page_id": _cycle_page_ids(mux, edges["cycle_b"], page_ids),
+                "tunnel_nodes": edges["nodes"],
+            }
+        ),
+        out_edges,
+    )
+    print(f"  Wrote: {out_edges}")
+
+    top = np.argsort(-edges["nodes"], kind="stable")[: int(top_k)]
+    names = _cycle_names(mux, sorted({int(c) for c in np.concatenate([edges["cycle_a"][top], edges["cycle_b"][top]])}), page_ids)
+    out_top = ANALYSIS_DIR / f"tunnel_edges_top_{tag}.tsv"
+    lines = ["n_a\tcycle_a\tn_b\tcycle_b\ttunnel_nodes"]
+    for i in top:
+        lines.append(
+            f"{n_values[edges['layer_a'][i]]}\t{names[int(edges['cycle_a'][i])]}\t"
+            f"{n_values[edges['layer_b'][i]]}\t{names[int(edges['cycle_b'][i])]}\t{int(edges['nodes'][i])}"
+        )
+    out_top.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    print(f"  Wrote: {out_top}")
+    for line in lines[1:11]:
+        a_n, a, b_n, b, count = line.split("\t")
+        print(f"  {int(count):>12,}  N={a_n} {a} -> N={b_n} {b}")
+
+
+def _resolve_one(page_id: int | None, title: str | None, *, namespace: int, allow_redirects: bool) -> int:
+    if page_id is not None:
+        return int(page_id)
+    resolved = resolve_titles_to_ids([title], namespace=namespace, allow_redirects=allow_redirects)
+    if title not in resolved:
+        raise SystemExit(describe_missing_titles([title], namespace=namespace))
+    return int(resolved[title])
+
+
+def run_query(mux: Multiplex, args: argparse.Namespace) -> None:
+    store = get_link_store()
+    page_ids = np.asarray(store.page_ids)
+    opts = {"namespace": int(args.namespace), "allow_redirects": bool(args.allow_redirects)}
+    start_pid = _resolve_one(args.start_page_id, args.start_title, **opts)
+    target_pid = _resolve_one(args.target_page_id, args.target_title, **opts)
+    start, target_node = (int(x) for x in store.dense_ids([start_pid, target_pid]))
+    if start < 0 or target_node < 0:
+        raise SystemExit("Start or target page has no link sequence (not in the link store)")
+
+    # Target cycle: the one the target page lies on / drains into at --target-n
+    # (default: the first N where it reaches a cycle).
+    layers = [mux.layer_of(args.target_n)] if args.target_n is not None else range(mux.num_layers)
+    target = next((int(t) for k in layers if (t := mux.terminals(k, [target_node])[0]) >= 0), -1)
+    if target < 0:
+        raise SystemExit(f"page_id={target_pid} drains into HALT at every requested N; no target cycle")
+
+    names = _cycle_names(mux, [target], page_ids)
+    print(f"\nMinimum rule switches: page_id={start_pid} -> cycle {names[target]} over N={list(mux.n_values)}")
+    t0 = time.time()
+    path = mux.min_switches(start, target, start_n=args.start_n, max_switches=args.max_switches)
+    print(f"  Search time: {(time.time() - t0) * 1000:.1f} ms")
+    if path is None:
+        print("  Not reachable within the switch limit.")
+        return
+
+    titles = resolve_ids_to_titles(sorted({int(page_ids[v]) for v in path.nodes}))
+    print(f"  Switches: {path.switches}  steps: {len(path.nodes) - 1}")
+    lines = ["step\tpage_id\ttitle\tn\tswitch"]
+    for step, (v, n) in enumerate(zip(path.nodes, path.n)):
+        switched = step > 0 and int(n) != int(path.n[step - 1])
+        pid = int(page_ids[v])
+        lines.append(f"{step}\t{pid}\t{titles.get(pid, '')}\t{int(n)}\t{int(switched)}")
+        print(f"  {step:>4}  N={int(n):<3}{'*' if switched else ' '} {titles.get(pid, pid)}")
+
+    out_path = Path(args.out) if args.out else ANALYSIS_DIR / f"tunneling_path_{args.tag}.tsv"
+    out_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    print(f"  Wrote: {out_path}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Tunnel nodes and minimum rule switches over the (page, N) multiplex.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("--n-values", type=int, nargs="+", default=[3, 4, 5, 6, 7], help="Rules (N) in the multiplex")
+    parser.add_argument("--include-halt", action="store_true", help="Count HALT as a terminal when detecting tunnel nodes")
+    parser.add_argument("--top-k", type=int, default=25, help="Basin pairs in the titled TSV (default: 25)")
+    parser.add_argument("--tag", type=str, default="analysis", help="Output file tag (default: analysis)")
+    parser.add_argument("--start-page-id", type=int, default=None, help="Query: start page_id")
+    parser.add_argument("--start-title", type=str, default=None, help="Query: start title")
+    parser.add_argument("--start-n", type=int, default=None, help="Query: fix the first rule (default: free choice)")
+    parser.add_argument("--target-page-id", type=int, default=None, help="Query: page on (or draining into) the target cycle")
+    parser.add_argument("--target-title", type=str, default=None, help="Query: title on (or draining into) the target cycle")
+    parser.add_argument("--target-n", type=int, default=None, help="Query: N at which the target page's cycle is taken")
+    parser.add_argument("--max-switches", type=int, default=None, help="Query: give up after this many switches (default: #N)")
+    parser.add_argument("--namespace", type=int, default=0, help="Namespace for title resolution (default: 0)")
+    parser.add_argument("--allow-redirects", action="store_true", help="Allow redirect pages when resolving titles")
+    parser.add_argument("--out", type=str, default=None, help="Query: output TSV path")
+    args = parser.parse_args()
+
+    n_values = tuple(dict.fromkeys(args.n_values))
+    if any(n <= 0 for n in n_values):
+        raise SystemExit("--n-values must be >= 1")
+    has_start = args.start_page_id is not None or args.start_title is not None
+    has_target = args.target_page_id is not None or args.target_title is not None
+    if has_start != has_target:
+        raise SystemExit("A query needs both a start (--start-*) and a target (--target-*)")
+    for flag in ("start_n", "target_n"):
+        value = getattr(args, flag)
+        if value is not None and value not in n_values:
+            raise SystemExit(f"--{flag.replace('_', '-')} {value} is not in --n-values")
+
+    ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
+    mux = get_multiplex(n_values)
+    if has_start:
+        run_query(mux, args)
+    else:
+        run_summary(mux, include_halt=bool(args.include_halt), top_k=int(args.top_k), tag=args.tag)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,11 @@ Then record:
 - hops executed
 
 This is intended for comparing many basins quickly (stop at collapse).
+
+Seeds come from a trunkiness dashboard: --dashboard TSV, or by default the
+``branch_trunkiness_dashboard`` result stored for N and --tag. The summary is
+written as a TSV and as results store metric ``dominance_collapse_dashboard``
+(nlink_lib/results_store.py).
 """
 
 from __future__ import annotations
@@ -23,7 +28,11 @@ from pathlib import Path
 
 import duckdb
 import pandas as pd
-import pyarrow as pa
+
+from nlink_lib.edges_db import connect_edges_db
+from nlink_lib.results_store import read_result, write_result
+from nlink_lib.rules import add_rule_argument, rule_from_args
+from nlink_lib.title_index import resolve_ids_to_titles, resolve_titles_to_ids
 
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
@@ -39,54 +48,6 @@ def _slug(s: str) -> str:
     return s[:120] if len(s) > 120 else s
 
 
-def _resolve_titles_to_ids(titles: list[str], *, namespace: int, allow_redirects: bool) -> dict[str, int]:
-    if not titles:
-        return {}
-    if not PAGES_PATH.exists():
-        raise FileNotFoundError(f"Missing: {PAGES_PATH}")
-
-    title_tbl = pa.table({"title": pa.array(titles, type=pa.string())})
-    con = duckdb.connect()
-    con.register("wanted_titles", title_tbl)
-
-    redirect_clause = "" if allow_redirects else "AND p.is_redirect = FALSE"
-    rows = con.execute(
-        f"""
-        SELECT w.title, min(p.page_id) AS page_id
-        FROM wanted_titles w
-        JOIN read_parquet('{PAGES_PATH.as_posix()}') p
-          ON p.title = w.title
-        WHERE p.namespace = {int(namespace)}
-          {redirect_clause}
-        GROUP BY w.title
-        """.strip()
-    ).fetchall()
-    con.close()
-    return {str(t): int(pid) for t, pid in rows}
-
-
-def _resolve_ids_to_titles(page_ids: list[int]) -> dict[int, str]:
-    if not page_ids:
-        return {}
-    if not PAGES_PATH.exists():
-        return {}
-
-    unique_ids = sorted(set(int(x) for x in page_ids))
-    id_tbl = pa.table({"page_id": pa.array(unique_ids, type=pa.int64())})
-
-    con = duckdb.connect()
-    con.register("wanted_ids", id_tbl)
-    rows = con.execute(
-        f"""
-        SELECT p.page_id, p.title
-        FROM read_parquet('{PAGES_PATH.as_posix()}') p
-        JOIN wanted_ids w USING (page_id)
-        """.strip()
-    ).fetchall()
-    con.close()
-    return {int(pid): str(title) for pid, title in rows}
-
-
 def _dominant_entry_for_seed(
     con: duckdb.DuckDBPyConnection,
     *,
@@ -170,7 +131,13 @@ def _dominant_entry_for_seed(
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument("--n", type=int, default=5)
-    parser.add_argument("--dashboard", type=str, required=True, help="Input trunkiness dashboard TSV")
+    add_rule_argument(parser)
+    parser.add_argument(
+        "--dashboard",
+        type=str,
+        default=None,
+        help="Input trunkiness dashboard TSV (default: the dashboard stored for N and --tag)",
+    )
     parser.add_argument(
         "--seed-from",
         choices=["dominant_enters_cycle_title", "cycle_first", "cycle_second"],
@@ -192,10 +159,19 @@ def main() -> int:
 
     if args.n <= 0:
         raise SystemExit("--n must be >= 1")
+    rule = rule_from_args(args)
     if args.max_hops <= 0:
         raise SystemExit("--max-hops must be >= 1")
 
-    dashboard = pd.read_csv(args.dashboard, sep="\t")
+    if args.dashboard:
+        dashboard = pd.read_csv(args.dashboard, sep="\t")
+    else:
+        dashboard = read_result("branch_trunkiness_dashboard", n=rule, tag=args.tag)
+        if dashboard is None:
+            raise SystemExit(
+                f"No branch_trunkiness_dashboard result for {rule.label}, tag={args.tag} "
+                "(run compute-trunkiness-dashboard.py or pass --dashboard)"
+            )
 
     seeds: list[str] = []
     for _, r in dashboard.iterrows():
@@ -209,14 +185,13 @@ def main() -> int:
                 seeds.append(parts[1] if len(parts) > 1 else parts[0])
 
     # Resolve all seed titles first.
-    seed_map = _resolve_titles_to_ids(
+    seed_map = resolve_titles_to_ids(
         seeds,
         namespace=int(args.namespace),
         allow_redirects=bool(args.allow_redirects),
     )
 
-    db_path = ANALYSIS_DIR / f"edges_n={int(args.n)}.duckdb"
-    con = duckdb.connect(str(db_path))
+    con = connect_edges_db(rule)
 
     rows: list[dict[str, object]] = []
 
@@ -255,7 +230,7 @@ def main() -> int:
                 break
 
             current_id = int(dom_id)
-            titles = _resolve_ids_to_titles([current_id])
+            titles = resolve_ids_to_titles([current_id])
             current_title = titles.get(current_id, current_title)
 
         if stop_reason is None:
@@ -274,8 +249,12 @@ def main() -> int:
         )
 
     out_df = pd.DataFrame(rows)
-    out_path = ANALYSIS_DIR / f"dominance_collapse_dashboard_n={int(args.n)}_{args.tag}.tsv"
+    out_path = ANALYSIS_DIR / f"dominance_collapse_dashboard_{rule.key}_{args.tag}.tsv"
     out_df.to_csv(out_path, sep="\t", index=False)
+    stored = out_df.copy()
+    if "first_below_threshold_hop" in stored.columns:
+        stored["first_below_threshold_hop"] = pd.to_numeric(stored["first_below_threshold_hop"], errors="coerce").astype("Int64")
+    write_result("dominance_collapse_dashboard", stored, n=rule, tag=args.tag, source=out_path.name)
 
     print(f"Wrote: {out_path}")
     print(out_df.sort_values(["resolved", "min_share"], ascending=[False, True]).to_string(index=False))
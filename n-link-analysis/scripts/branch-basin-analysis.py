@@ -16,14 +16,22 @@ This script makes the "river/tributary" intuition measurable by defining:
 
 Outputs
 -------
-- Writes a TSV of branch sizes and metadata (titles, which cycle node it enters).
+- Writes a TSV of branch sizes and metadata (titles, which cycle node it enters),
+  and the same tables to the results store (metrics ``branches_all`` and
+  ``branches_topk``, keyed by N, --tag and the cycle; see nlink_lib/results_store.py).
+  Without --tag, a custom --out-prefix is the tag.
 - Optionally writes membership for the top-K branches (as Parquet: page_id, entry_id, depth).
 
 Notes
 -----
-- Uses the pre-materialized edges DB: data/wikipedia/processed/analysis/edges_n={N}.duckdb
-  produced by map-basin-from-cycle.py (or materializes it if absent).
-- Uses a reverse BFS with label propagation:
+- Default engine (when the given pages are whole cycles of f_N): Euler-tour
+  intervals over the in-forest (nlink_lib/euler_tour.py). A branch is the
+  subtree at its entry node, so its size is one lookup, its max depth a
+  reduction over a contiguous preorder slice, and its membership that slice.
+- Fallback engine (``--engine duckdb``, or seeds that are not whole cycles):
+  reverse BFS over the shared multi-N edges store
+  data/wikipedia/processed/analysis/edges_store/ (see nlink_lib/edges_db.py;
+  built on first use if absent), with label propagation:
     depth 0: cycle nodes
     depth 1: entry_id := src_page_id
     depth >1: entry_id := parent's entry_id
@@ -35,190 +43,40 @@ from __future__ import annotations
 import argparse
 import time
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import duckdb
+import numpy as np
 import pyarrow as pa
-
-
-REPO_ROOT = Path(__file__).resolve().parents[2]
-PROCESSED_DIR = REPO_ROOT / "data" / "wikipedia" / "processed"
-NLINK_PATH = PROCESSED_DIR / "nlink_sequences.parquet"
-PAGES_PATH = PROCESSED_DIR / "pages.parquet"
-ANALYSIS_DIR = PROCESSED_DIR / "analysis"
-
-
-def _resolve_titles_to_ids(
-    titles: list[str],
+import pyarrow.parquet as pq
+
+from nlink_lib.cycle_registry import cycle_key_of_pages
+from nlink_lib.edges_db import connect_edges_db, edges_db_path
+from nlink_lib.euler_tour import EulerTour, get_euler_tour
+from nlink_lib.link_store import get_link_store
+from nlink_lib.paths import ANALYSIS_DIR
+from nlink_lib.results_store import add_tag_argument, cycle_id_from_titles, prefix_tag, write_result
+from nlink_lib.rules import Rule, add_rule_argument, rule_from_args
+from nlink_lib.title_index import resolve_ids_to_titles, resolve_titles_to_ids
+from nlink_lib.title_search import describe_missing_titles
+
+# Connections come from nlink_lib.edges_db, which imports duckdb when one is opened.
+if TYPE_CHECKING:
+    import duckdb
+
+
+def _duckdb_branches(
+    rule: Rule,
+    cycle_ids: list[int],
     *,
-    namespace: int,
-    allow_redirects: bool,
-) -> dict[str, int]:
-    if not titles:
-        return {}
-    if not PAGES_PATH.exists():
-        raise FileNotFoundError(f"Missing: {PAGES_PATH}")
-
-    title_tbl = pa.table({"title": pa.array(titles, type=pa.string())})
-
-    con = duckdb.connect()
-    con.register("wanted_titles", title_tbl)
-
-    redirect_clause = "" if allow_redirects else "AND p.is_redirect = FALSE"
-    rows = con.execute(
-        f"""
-        SELECT w.title, min(p.page_id) AS page_id
-        FROM wanted_titles w
-        JOIN read_parquet('{PAGES_PATH.as_posix()}') p
-          ON p.title = w.title
-        WHERE p.namespace = {int(namespace)}
-          {redirect_clause}
-        GROUP BY w.title
-        """.strip()
-    ).fetchall()
-    con.close()
-
-    return {str(t): int(pid) for t, pid in rows}
-
-
-def _resolve_ids_to_titles(page_ids: list[int]) -> dict[int, str]:
-    if not page_ids:
-        return {}
-    if not PAGES_PATH.exists():
-        return {}
-
-    unique_ids = sorted(set(int(x) for x in page_ids))
-    id_tbl = pa.table({"page_id": pa.array(unique_ids, type=pa.int64())})
-
-    con = duckdb.connect()
-    con.register("wanted_ids", id_tbl)
-
-    rows = con.execute(
-        f"""
-        SELECT p.page_id, p.title
-        FROM read_parquet('{PAGES_PATH.as_posix()}') p
-        JOIN wanted_ids w USING (page_id)
-        """.strip()
-    ).fetchall()
-    con.close()
-
-    return {int(pid): str(title) for pid, title in rows}
-
-
-def _ensure_edges_table(con: duckdb.DuckDBPyConnection, *, n: int) -> None:
-    exists_row = con.execute(
-        """
-        SELECT COUNT(*)
-        FROM information_schema.tables
-        WHERE table_schema = 'main' AND table_name = 'edges'
-        """.strip()
-    ).fetchone()
-    exists = int(exists_row[0]) if exists_row is not None else 0
-
-    if exists:
-        return
-
-    if not NLINK_PATH.exists():
-        raise FileNotFoundError(f"Missing: {NLINK_PATH}")
-
-    print(f"Materializing edges table for N={n} (one-time cost)...")
-    t0 = time.time()
-
-    con.execute(
-        f"""
-        CREATE TABLE edges AS
-        SELECT
-            page_id::BIGINT AS src_page_id,
-            list_extract(link_sequence, {int(n)})::BIGINT AS dst_page_id
-        FROM read_parquet('{NLINK_PATH.as_posix()}')
-        WHERE list_extract(link_sequence, {int(n)}) IS NOT NULL
-        """.strip()
-    )
-
-    try:
-        con.execute("CREATE INDEX edges_dst_idx ON edges(dst_page_id)")
-    except Exception:
-        pass
-
-    dt = time.time() - t0
-    n_edges_row = con.execute("SELECT COUNT(*) FROM edges").fetchone()
-    n_edges = int(n_edges_row[0]) if n_edges_row is not None else 0
-    print(f"Edges table ready: {n_edges:,} edges in {dt:.1f}s")
-
-
-def main() -> None:
-    parser = argparse.ArgumentParser(
-        description="Quantify branch (entry-subtree) sizes feeding a given cycle under f_N.",
-    )
-    parser.add_argument("--n", type=int, default=5, help="N for fixed N-link rule (default: 5)")
-    parser.add_argument("--cycle-page-id", type=int, action="append", default=[], help="Cycle node page_id (repeatable)")
-    parser.add_argument("--cycle-title", type=str, action="append", default=[], help="Cycle node title (exact match; repeatable)")
-    parser.add_argument("--namespace", type=int, default=0, help="Namespace for resolving --cycle-title (default: 0)")
-    parser.add_argument(
-        "--allow-redirects",
-        action="store_true",
-        help="Allow resolving --cycle-title to redirects (default: false)",
-    )
-    parser.add_argument(
-        "--max-depth",
-        type=int,
-        default=0,
-        help="Stop after this many reverse layers (default: 0 = no limit)",
-    )
-    parser.add_argument(
-        "--log-every",
-        type=int,
-        default=10,
-        help="Print progress every N layers (default: 10)",
-    )
-    parser.add_argument(
-        "--top-k",
-        type=int,
-        default=25,
-        help="Report the top-K branches by size (default: 25)",
-    )
-    parser.add_argument(
-        "--write-membership-top-k",
-        type=int,
-        default=0,
-        help="Write membership parquet for the top-K branches (default: 0 = none)",
-    )
-    parser.add_argument(
-        "--out-prefix",
-        type=str,
-        default=None,
-        help="Output prefix under analysis/. Default: branches_from_cycle_n=...",
-    )
-
-    args = parser.parse_args()
-
-    if args.n <= 0:
-        raise SystemExit("--n must be >= 1")
-
-    title_to_id = _resolve_titles_to_ids(
-        list(args.cycle_title),
-        namespace=int(args.namespace),
-        allow_redirects=bool(args.allow_redirects),
-    )
-    missing_titles = [t for t in args.cycle_title if t not in title_to_id]
-    if missing_titles:
-        raise SystemExit(f"Could not resolve titles to page_id (exact match failed): {missing_titles}")
-
-    cycle_ids = list(dict.fromkeys([*map(int, args.cycle_page_id), *title_to_id.values()]))
-    if not cycle_ids:
-        raise SystemExit("Provide at least one --cycle-page-id or --cycle-title")
-
-    ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
-
-    out_prefix = args.out_prefix or f"branches_from_cycle_n={int(args.n)}"
-    out_branches_all = ANALYSIS_DIR / f"{out_prefix}_branches_all.tsv"
-    out_branches_topk = ANALYSIS_DIR / f"{out_prefix}_branches_topk.tsv"
-    out_assignments = ANALYSIS_DIR / f"{out_prefix}_assignments.parquet"
+    max_depth: int,
+    log_every: int,
+) -> tuple[duckdb.DuckDBPyConnection, list[tuple]]:
+    """Reverse BFS with entry-label propagation; returns the connection (``seen`` kept) and branch rows."""
 
-    db_path = ANALYSIS_DIR / f"edges_n={int(args.n)}.duckdb"
+    db_path = edges_db_path()
     print(f"Using edges DB: {db_path}")
 
-    con = duckdb.connect(str(db_path))
-    _ensure_edges_table(con, n=int(args.n))
+    con = connect_edges_db(rule)
 
     # Seed tables.
     con.execute("CREATE TEMP TABLE seen(page_id BIGINT PRIMARY KEY, entry_id BIGINT, depth INTEGER)")
@@ -231,8 +89,7 @@ def main() -> None:
     con.execute("INSERT INTO seen SELECT page_id, NULL::BIGINT AS entry_id, 0 AS depth FROM cycle_tbl")
     con.execute("INSERT INTO frontier SELECT page_id, NULL::BIGINT AS entry_id, 0 AS depth FROM cycle_tbl")
 
-    max_depth = int(args.max_depth)
-    log_every = max(1, int(args.log_every))
+    log_every = max(1, int(log_every))
 
     depth = 0
     t0 = time.time()
@@ -302,10 +159,6 @@ def main() -> None:
         """.strip()
     )
 
-    n_branches_row = con.execute("SELECT COUNT(*) FROM branch_sizes").fetchone()
-    n_branches = int(n_branches_row[0]) if n_branches_row is not None else 0
-    print(f"Entry branches (depth-1 predecessors): {n_branches:,}")
-
     # Identify which cycle node each entry flows into (successor of the entry).
     con.execute("DROP TABLE IF EXISTS branch_meta")
     con.execute(
@@ -322,15 +175,209 @@ def main() -> None:
         """.strip()
     )
 
-    # Write full (all branches) TSV for downstream analysis.
     all_rows = con.execute(
         """
         SELECT entry_id, basin_size, max_depth, enters_cycle_page_id
         FROM branch_meta
-        ORDER BY basin_size DESC
+        ORDER BY basin_size DESC, entry_id
         """.strip()
     ).fetchall()
+    return con, all_rows
+
+
+def _write_duckdb_membership(con: duckdb.DuckDBPyConnection, entry_ids: list[int], out_path: Path) -> None:
+    con.register(
+        "top_entries",
+        pa.table({"entry_id": pa.array(entry_ids, type=pa.int64())}),
+    )
+
+    # Write (page_id, entry_id, depth) for nodes assigned to top entries.
+    con.execute(
+        f"""
+        COPY (
+            SELECT page_id, entry_id, depth
+            FROM seen
+            WHERE entry_id IN (SELECT entry_id FROM top_entries)
+        ) TO '{out_path.as_posix()}' (FORMAT PARQUET)
+        """.strip()
+    )
+
+
+def _whole_cycle_nodes(tour: EulerTour, cycle_ids: list[int]) -> np.ndarray | None:
+    """Dense ids of the seeds if they are exactly a union of f_N cycles, else None."""
+
+    dense = get_link_store().dense_ids(np.asarray(cycle_ids, dtype=np.int64))
+    if (dense < 0).any() or not np.asarray(tour.decomp.on_cycle)[dense].all():
+        return None
+    members = np.concatenate([tour.decomp.cycle_members(int(c)) for c in np.unique(np.asarray(tour.decomp.cycle_id)[dense])])
+    if set(members.tolist()) != set(dense.tolist()):
+        return None
+    return dense
+
+
+def _interval_branches(tour: EulerTour, seeds: np.ndarray, *, max_depth: int) -> list[tuple]:
+    """Branch rows (entry_id, basin_size, max_depth, enters_cycle_page_id) from Euler-tour intervals."""
+
+    decomp = tour.decomp
+    page_ids = np.asarray(get_link_store().page_ids)
+    succ = np.asarray(decomp.succ)
+    depth = np.asarray(decomp.depth)
+
+    # Entries: off-cycle direct predecessors of the seed cycles.
+    cycle_set = np.unique(np.asarray(decomp.cycle_id)[seeds])
+    entries = np.nonzero((depth == 1) & np.isin(np.asarray(decomp.cycle_id), cycle_set))[0]
+
+    starts, ends = tour.slice_bounds(entries)
+    pre_depth = depth[np.asarray(tour.order)]
+    if max_depth:
+        within = pre_depth <= int(max_depth)
+        counts = np.concatenate([[0], np.cumsum(within)])
+        sizes = counts[ends] - counts[starts]
+        pre_depth = np.where(within, pre_depth, 0)
+    else:
+        sizes = ends - starts
+    # max over each [start, end) slice; the sentinel keeps ``end`` a valid reduceat index.
+    bounds = np.column_stack([starts, ends]).ravel()
+    max_depths = np.maximum.reduceat(np.append(pre_depth, 0), bounds)[::2] if len(entries) else np.zeros(0, dtype=np.int64)
+
+    entry_pids = page_ids[entries]
+    order = np.lexsort((entry_pids, -sizes))
+    enters = page_ids[succ[entries]]
+    print(f"Total basin nodes (including cycle): {int(sizes.sum()) + len(seeds):,}")
+    return [
+        (int(entry_pids[i]), int(sizes[i]), int(max_depths[i]), int(enters[i]))
+        for i in order.tolist()
+    ]
+
+
+def _write_interval_membership(tour: EulerTour, entry_ids: list[int], out_path: Path, *, max_depth: int) -> None:
+    """(page_id, entry_id, depth) for the given branches: concatenated preorder slices."""
+
+    page_ids = np.asarray(get_link_store().page_ids)
+    entries = get_link_store().dense_ids(np.asarray(entry_ids, dtype=np.int64))
+    starts, ends = tour.slice_bounds(entries)
+    members = np.concatenate([np.asarray(tour.order[int(a) : int(b)]) for a, b in zip(starts, ends)])
+    entry_col = np.repeat(np.asarray(entry_ids, dtype=np.int64), ends - starts)
+    depth = np.asarray(tour.decomp.depth)[members]
+    if max_depth:
+        keep = depth <= int(max_depth)
+        members, entry_col, depth = members[keep], entry_col[keep], depth[keep]
+    pq.write_table(
+        pa.table(
+            {
+                "page_id": pa.array(page_ids[members], type=pa.int64()),
+                "entry_id": pa.array(entry_col, type=pa.int64()),
+                "depth": pa.array(depth, type=pa.int32()),
+            }
+        ),
+        out_path,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Quantify branch (entry-subtree) sizes feeding a given cycle under f_N.",
+    )
+    parser.add_argument("--n", type=int, default=5, help="N for fixed N-link rule (default: 5)")
+    add_rule_argument(parser)
+    parser.add_argument("--cycle-page-id", type=int, action="append", default=[], help="Cycle node page_id (repeatable)")
+    parser.add_argument("--cycle-title", type=str, action="append", default=[], help="Cycle node title (exact match; repeatable)")
+    parser.add_argument("--namespace", type=int, default=0, help="Namespace for resolving --cycle-title (default: 0)")
+    parser.add_argument(
+        "--allow-redirects",
+        action="store_true",
+        help="Allow resolving --cycle-title to redirects (default: false)",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=0,
+        help="Stop after this many reverse layers (default: 0 = no limit)",
+    )
+    parser.add_argument(
+        "--log-every",
+        type=int,
+        default=10,
+        help="Print progress every N layers (default: 10)",
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=25,
+        help="Report the top-K branches by size (default: 25)",
+    )
+    parser.add_argument(
+        "--write-membership-top-k",
+        type=int,
+        default=0,
+        help="Write membership parquet for the top-K branches (default: 0 = none)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["auto", "intervals", "duckdb"],
+        default="auto",
+        help="auto: Euler-tour intervals when the seeds are whole cycles, else DuckDB reverse BFS (default: auto)",
+    )
+    parser.add_argument(
+        "--out-prefix",
+        type=str,
+        default=None,
+        help="Output prefix under analysis/. Default: branches_from_cycle_n=...",
+    )
+    add_tag_argument(parser)
+
+    args = parser.parse_args()
+
+    if args.n <= 0:
+        raise SystemExit("--n must be >= 1")
+    rule = rule_from_args(args)
 
+    title_to_id = resolve_titles_to_ids(
+        list(args.cycle_title),
+        namespace=int(args.namespace),
+        allow_redirects=bool(args.allow_redirects),
+    )
+    missing_titles = [t for t in args.cycle_title if t not in title_to_id]
+    if missing_titles:
+        raise SystemExit(describe_missing_titles(missing_titles, namespace=int(args.namespace)))
+
+    cycle_ids = list(dict.fromkeys([*map(int, args.cycle_page_id), *title_to_id.values()]))
+    if not cycle_ids:
+        raise SystemExit("Provide at least one --cycle-page-id or --cycle-title")
+
+    ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
+
+    out_prefix = args.out_prefix or f"branches_from_cycle_{rule.key}"
+    tag = prefix_tag(args.tag, args.out_prefix)
+    out_branches_all = ANALYSIS_DIR / f"{out_prefix}_branches_all.tsv"
+    out_branches_topk = ANALYSIS_DIR / f"{out_prefix}_branches_topk.tsv"
+    out_assignments = ANALYSIS_DIR / f"{out_prefix}_assignments.parquet"
+
+    tour: EulerTour | None = None
+    seeds: np.ndarray | None = None
+    if args.engine != "duckdb":
+        tour = get_euler_tour(rule)
+        seeds = _whole_cycle_nodes(tour, cycle_ids)
+        if seeds is None:
+            if args.engine == "intervals":
+                raise SystemExit("--engine intervals needs --cycle-page-id/--cycle-title to cover whole f_N cycles")
+            print("Seeds are not whole f_N cycles; falling back to DuckDB reverse BFS.")
+            tour = None
+
+    con: duckdb.DuckDBPyConnection | None = None
+    if tour is not None and seeds is not None:
+        print(f"Using Euler-tour intervals for {rule.label}")
+        all_rows = _interval_branches(tour, seeds, max_depth=int(args.max_depth))
+    else:
+        con, all_rows = _duckdb_branches(
+            rule,
+            cycle_ids,
+            max_depth=int(args.max_depth),
+            log_every=int(args.log_every),
+        )
+    print(f"Entry branches (depth-1 predecessors): {len(all_rows):,}")
+
+    # Write full (all branches) TSV for downstream analysis.
     out_lines_all = ["rank\tentry_id\tbasin_size\tmax_depth\tenters_cycle_page_id"]
     for i, (entry_id, basin_size, max_d, enters_cycle) in enumerate(all_rows, start=1):
         enters_i = int(enters_cycle) if enters_cycle is not None else -1
@@ -347,6 +394,18 @@ def main() -> None:
         )
     out_branches_all.write_text("\n".join(out_lines_all), encoding="utf-8")
     print(f"Wrote all-branches table: {out_branches_all}")
+    cycle_id = cycle_id_from_titles(args.cycle_title or map(str, cycle_ids))
+    cycle_key = cycle_key_of_pages(cycle_ids, rule)
+    branches_all = pa.table(
+        {
+            "rank": pa.array(np.arange(1, len(all_rows) + 1), type=pa.int64()),
+            "entry_id": pa.array([int(r[0]) for r in all_rows], type=pa.int64()),
+            "basin_size": pa.array([int(r[1]) for r in all_rows], type=pa.int64()),
+            "max_depth": pa.array([int(r[2]) for r in all_rows], type=pa.int64()),
+            "enters_cycle_page_id": pa.array([int(r[3]) if r[3] is not None else -1 for r in all_rows], type=pa.int64()),
+        }
+    )
+    write_result("branches_all", branches_all, n=rule, tag=tag, cycle_id=cycle_id, cycle_key=cycle_key, source=out_branches_all.name)
 
     # Also write a human-friendly titled top-K table.
     top_k = max(1, int(args.top_k))
@@ -356,54 +415,45 @@ def main() -> None:
     ids_to_resolve.extend(int(x) for x in cycle_ids)
     ids_to_resolve.extend(int(r[0]) for r in top_rows)
     ids_to_resolve.extend(int(r[3]) for r in top_rows if r[3] is not None)
-    titles = _resolve_ids_to_titles(ids_to_resolve)
+    titles = resolve_ids_to_titles(ids_to_resolve)
 
-    out_lines_topk = [
-        "rank\tentry_id\tentry_title\tbasin_size\tmax_depth\tenters_cycle_page_id\tenters_cycle_title",
-    ]
+    topk_columns = ["rank", "entry_id", "entry_title", "basin_size", "max_depth", "enters_cycle_page_id", "enters_cycle_title"]
+    topk_records = []
     for i, (entry_id, basin_size, max_d, enters_cycle) in enumerate(top_rows, start=1):
         entry_id_i = int(entry_id)
         enters_i = int(enters_cycle) if enters_cycle is not None else -1
-        out_lines_topk.append(
-            "\t".join(
-                [
-                    str(i),
-                    str(entry_id_i),
-                    titles.get(entry_id_i, "<unknown>"),
-                    str(int(basin_size)),
-                    str(int(max_d)),
-                    str(enters_i),
-                    titles.get(enters_i, "<unknown>") if enters_i != -1 else "<unknown>",
-                ]
+        topk_records.append(
+            (
+                i,
+                entry_id_i,
+                titles.get(entry_id_i, "<unknown>"),
+                int(basin_size),
+                int(max_d),
+                enters_i,
+                titles.get(enters_i, "<unknown>") if enters_i != -1 else "<unknown>",
             )
         )
+    out_lines_topk = ["\t".join(topk_columns), *("\t".join(map(str, rec)) for rec in topk_records)]
 
     out_branches_topk.write_text("\n".join(out_lines_topk), encoding="utf-8")
     print(f"Wrote top-{top_k} titled branch table: {out_branches_topk}")
+    topk_table = pa.table({name: [rec[i] for rec in topk_records] for i, name in enumerate(topk_columns)})
+    stored = write_result("branches_topk", topk_table, n=rule, tag=tag, cycle_id=cycle_id, cycle_key=cycle_key, source=out_branches_topk.name)
+    print(f"Wrote results store partitions: {stored.parent.parent} (branches_all, branches_topk)")
 
     # Optionally write membership for top-K branches.
     write_k = int(args.write_membership_top_k)
     if write_k > 0:
         k = min(write_k, len(top_rows))
         top_entry_ids = [int(r[0]) for r in top_rows[:k]]
-        con.register(
-            "top_entries",
-            pa.table({"entry_id": pa.array(top_entry_ids, type=pa.int64())}),
-        )
-
-        # Write (page_id, entry_id, depth) for nodes assigned to top entries.
-        con.execute(
-            f"""
-            COPY (
-                SELECT page_id, entry_id, depth
-                FROM seen
-                WHERE entry_id IN (SELECT entry_id FROM top_entries)
-            ) TO '{out_assignments.as_posix()}' (FORMAT PARQUET)
-            """.strip()
-        )
+        if tour is not None:
+            _write_interval_membership(tour, top_entry_ids, out_assignments, max_depth=int(args.max_depth))
+        else:
+            _write_duckdb_membership(con, top_entry_ids, out_assignments)
         print(f"Wrote membership assignments for top-{k} branches: {out_assignments}")
 
-    con.close()
+    if con is not None:
+        con.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Build (or refresh) the compressed basin-membership bitmaps for one or more N (or rules).
+
+Every cycle basin at N is stored as a roaring bitmap over dense node ids
+(see nlink_lib/roaring.py). They are built lazily by ``get_basin_bitmaps``;
+running this pays the cost up front and reports the on-disk footprint.
+
+Outputs
+-------
+data/wikipedia/processed/analysis/basin_bitmaps/n={N}/ (or {rule}/, e.g. mod=7/)
+
+Usage
+-----
+  python n-link-analysis/scripts/build-basin-bitmaps.py --n 3 --n 5 [--force]
+  python n-link-analysis/scripts/build-basin-bitmaps.py --rule mod=7 --rule last=1
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+
+from nlink_lib.decomposition import get_decomposition
+from nlink_lib.roaring import basin_bitmaps_dir_for, build_basin_bitmaps, is_basin_bitmaps_fresh
+from nlink_lib.rules import parse_rule
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Persist every cycle basin at N as a roaring bitmap.")
+    parser.add_argument("--n", type=int, action="append", default=[], help="N to build (repeatable; default: 5)")
+    parser.add_argument(
+        "--rule",
+        type=str,
+        action="append",
+        default=[],
+        help="Traversal rule to build (repeatable): n=5, mod=7, last=1, frac=0.5, avoid=5",
+    )
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the bitmaps are up to date")
+    args = parser.parse_args()
+
+    if any(n <= 0 for n in args.n):
+        raise SystemExit("--n must be >= 1")
+    try:
+        rules = list(dict.fromkeys(parse_rule(spec) for spec in [*args.n, *args.rule] or [5]))
+    except ValueError as e:
+        raise SystemExit(str(e)) from None
+
+    total_bytes = 0
+    for rule in rules:
+        if args.force or not is_basin_bitmaps_fresh(rule):
+            build_basin_bitmaps(get_decomposition(rule))
+        else:
+            print(f"Basin bitmaps {rule.label} are up to date: {basin_bitmaps_dir_for(rule)}")
+        manifest = json.loads((basin_bitmaps_dir_for(rule) / "manifest.json").read_text(encoding="utf-8"))
+        total_bytes += int(manifest["bytes"])
+        print(
+            f"{rule.label}\tbasins={manifest['cycles']:,}\tcontainers={manifest['containers']:,}"
+            f"\tbitmap_containers={manifest['bitmap_containers']:,}\tbytes={manifest['bytes']:,}"
+        )
+    print(f"Total: {total_bytes / 1024**2:,.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
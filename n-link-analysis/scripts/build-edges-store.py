@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Build (or refresh) the shared multi-N DuckDB edges store.
+
+The reverse-BFS scripts (map-basin-from-cycle, branch-basin-analysis,
+chase-dominant-upstream, ...) build it lazily on first use with N=1..10;
+running this pays the one-time cost up front, or covers a larger N range in
+the same single scan of nlink_sequences.parquet.
+
+Outputs
+-------
+data/wikipedia/processed/analysis/edges_store/ (see nlink_lib/edges_db.py)
+
+Usage
+-----
+  python n-link-analysis/scripts/build-edges-store.py [--max-n 10] [--force]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+
+from nlink_lib.edges_db import DEFAULT_MAX_N, EDGES_STORE_DIR, build_edges_store, is_edges_store_fresh
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Materialize f_N edges for N=1..K from nlink_sequences.parquet in one scan.")
+    parser.add_argument("--max-n", type=int, default=DEFAULT_MAX_N, help=f"Largest N to include (default: {DEFAULT_MAX_N})")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the store is up to date")
+    args = parser.parse_args()
+
+    if args.max_n <= 0:
+        raise SystemExit("--max-n must be >= 1")
+
+    if args.force or not is_edges_store_fresh(int(args.max_n)):
+        build_edges_store(int(args.max_n))
+    else:
+        print(f"Edges store is up to date: {EDGES_STORE_DIR}")
+
+    manifest = json.loads((EDGES_STORE_DIR / "manifest.json").read_text(encoding="utf-8"))
+    for n, count in manifest["edges_per_n"].items():
+        print(f"N={n}\tedges={count:,}")
+
+
+if __name__ == "__main__":
+    main()
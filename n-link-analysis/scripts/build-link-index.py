@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Build (or refresh) the CSR link store and the full-position reverse link index.
+
+Scripts that use these build them lazily on first use, so running this is
+optional; it pays the one-time cost up front (e.g. before a harness run) and
+can print a quick preimage/position profile for sanity checks.
+
+Outputs
+-------
+data/wikipedia/processed/analysis/link_store/    (see nlink_lib/link_store.py)
+data/wikipedia/processed/analysis/reverse_links/ (see nlink_lib/reverse_index.py)
+
+Usage
+-----
+  python n-link-analysis/scripts/build-link-index.py [--force]
+  python n-link-analysis/scripts/build-link-index.py --page-id 1645518 --n 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from nlink_lib.link_store import STORE_DIR, build_link_store, get_link_store, is_link_store_fresh
+from nlink_lib.reverse_index import REVERSE_DIR, build_reverse_index, get_reverse_index, is_reverse_index_fresh
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the CSR link store and reverse link index from nlink_sequences.parquet.")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the indexes are up to date")
+    parser.add_argument("--page-id", type=int, action="append", default=[], help="page_id to profile (repeatable)")
+    parser.add_argument("--n", type=int, default=5, help="N used for the --page-id preimage count (default: 5)")
+    args = parser.parse_args()
+
+    if args.force or not is_link_store_fresh():
+        build_link_store()
+    else:
+        print(f"Link store is up to date: {STORE_DIR}")
+    get_link_store.cache_clear()
+    store = get_link_store()
+
+    if args.force or not is_reverse_index_fresh():
+        build_reverse_index(store)
+    else:
+        print(f"Reverse link index is up to date: {REVERSE_DIR}")
+
+    if not args.page_id:
+        return
+
+    rev = get_reverse_index()
+    t0 = time.perf_counter()
+    for pid, node in zip(args.page_id, store.dense_ids(args.page_id)):
+        if node < 0:
+            print(f"page_id={pid}\t<not in link store>")
+            continue
+        hist = rev.position_histogram(int(node))
+        top = sorted(hist.items(), key=lambda kv: (-kv[1], kv[0]))[:10]
+        print(
+            f"page_id={pid}\tout_degree={int(store.out_degree[node])}\tin_links={int(rev.in_degree[node])}"
+            f"\tpreimages@N={int(args.n)}={len(rev.preimages(int(node), int(args.n)))}"
+            f"\ttop_positions={top}"
+        )
+    dt = time.perf_counter() - t0
+    print(f"Queries took {dt * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
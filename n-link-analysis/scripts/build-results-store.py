@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""Import filename-keyed analysis TSVs into the partitioned results store.
+
+Context
+-------
+Before the results store (nlink_lib/results_store.py) every analysis script
+encoded its keys in the output name, e.g.
+
+  basin_n=5_cycle=Massachusetts__Gulf_of_Maine_reproduction_2025-12-31_layers.tsv
+
+and each consumer split such names again with its own glob / regex. The
+scripts now write the store themselves; this script brings TSVs written
+before that into it, so the store-backed readers see the full history. It is
+the only place left that parses those file names.
+
+Method
+------
+1. Match every TSV in the analysis directory against the known families
+   (basin layers, branch tables, dominant-upstream chains, trunkiness and
+   collapse dashboards, path characteristics, entry breadth) and read the
+   rule key (``n=5``, ``mod=7``, ...) from the name.
+2. Split ``{cycle}_{tag}`` / ``{seed}_{tag}``, where both sides may contain
+   underscores. Titles decide first: the longest prefix whose
+   ``__``-separated parts are all titles, checked against the file's own
+   titles (a chain's seed_title, the cycle titles a top-K branch table
+   enters) and the title index. Without a match, a known tag suffix decides:
+   tags given with --tag plus the tags learned from the title-checked files.
+   Files that stay ambiguous are reported and skipped (pass their tag with
+   --tag).
+3. Write each table as its (metric, n, tag, cycle_id) partition, with the
+   cycle registry key (nlink_lib/cycle_registry.py) of a cycle-keyed file
+   whose titles form a whole cycle at its N. Importing is idempotent: a
+   partition is replaced, never duplicated.
+
+Outputs
+-------
+- analysis/results/metric=*/n=*/tag=*/cycle_id=*/part-0.parquet
+- analysis/results/_catalog.parquet
+
+Usage
+-----
+    python build-results-store.py [--dry-run] [--tag reproduction_2025-12-31 ...]
+    python build-results-store.py --rebuild-catalog
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable
+
+from nlink_lib.cycle_registry import cycle_key_of_pages
+from nlink_lib.link_store import get_link_store
+from nlink_lib.paths import ANALYSIS_DIR
+from nlink_lib.results_store import cycle_id_from_titles, read_tsv, rebuild_catalog, write_result
+from nlink_lib.rules import FAMILIES, parse_rule
+from nlink_lib.title_index import get_title_index, resolve_titles_to_ids
+
+
+RULE_KEY = rf"(?:{'|'.join(FAMILIES)})=[0-9.]+"
+PATH_PARTS = ("details", "summary", "depth_distributions", "ci")
+
+# metric, file name pattern, how the rest of the name splits:
+#   cycle  {cycle}_{tag}   seed  {seed}_{tag}   tag  the tag group as is
+FILE_FAMILIES: tuple[tuple[str, re.Pattern, str], ...] = (
+    ("branches_topk", re.compile(rf"^branches_(?P<rule>{RULE_KEY})_cycle=(?P<rest>.+)_branches_topk\.tsv$"), "cycle"),
+    ("branches_all", re.compile(rf"^branches_(?P<rule>{RULE_KEY})_cycle=(?P<rest>.+)_branches_all\.tsv$"), "cycle"),
+    ("basin_layers", re.compile(rf"^basin_(?P<rule>{RULE_KEY})_cycle=(?P<rest>.+)_layers\.tsv$"), "cycle"),
+    ("dominant_upstream_chain", re.compile(rf"^dominant_upstream_chain_(?P<rule>{RULE_KEY})_from=(?P<rest>.+)\.tsv$"), "seed"),
+    ("branch_trunkiness_dashboard", re.compile(rf"^branch_trunkiness_dashboard_(?P<rule>{RULE_KEY})_(?P<tag>.+)\.tsv$"), "tag"),
+    ("dominance_collapse_dashboard", re.compile(rf"^dominance_collapse_dashboard_(?P<rule>{RULE_KEY})_(?P<tag>.+)\.tsv$"), "tag"),
+    ("entry_breadth", re.compile(rf"^entry_breadth_(?P<rule>{RULE_KEY})_(?P<tag>.+)\.tsv$"), "tag"),
+    (
+        "path_characteristics",
+        re.compile(rf"^path_characteristics_(?P<rule>{RULE_KEY})(?:_(?P<tag>.+?))?_(?P<part>{'|'.join(PATH_PARTS)})\.tsv$"),
+        "tag",
+    ),
+)
+
+
+@dataclass
+class Found:
+    path: Path
+    metric: str
+    rule: str
+    kind: str
+    rest: str | None = None
+    tag: str | None = None
+    cycle_id: str | None = None
+
+
+def _slug(s: str) -> str:
+    """chase-dominant-upstream.py's file-name slug of a seed title."""
+    s = re.sub(r"\s+", "_", s.strip())
+    s = re.sub(r"[^A-Za-z0-9_\-()]+", "", s)
+    return s[:120]
+
+
+def _title_lookup() -> Callable[[str], bool] | None:
+    """Whether a (underscored) title is a page, from the title index; None without one."""
+    try:
+        index = get_title_index()
+    except (FileNotFoundError, OSError) as e:
+        print(f"Title index unavailable ({e}); splitting on known tags and file contents only")
+        return None
+
+    @lru_cache(maxsize=None)
+    def is_title(title: str) -> bool:
+        return index.lookup(title, namespace=0, allow_redirects=True) is not None
+
+    return is_title
+
+
+def split_cycle(rest: str, known_tags: set[str], is_title: Callable[[str], bool] | None) -> tuple[str, str | None] | None:
+    """``{cycle}_{tag}`` -> (cycle, tag or None), or None if it stays ambiguous."""
+    if is_title is not None:
+        ends = [len(rest)] + [i for i in range(len(rest) - 1, 0, -1) if rest[i] == "_" and rest[i - 1] != "_"]
+        for end in ends:
+            parts = rest[:end].split("__")
+            if all(parts) and all(is_title(p) for p in parts):
+                return rest[:end], rest[end + 1 :] or None
+    for tag in sorted(known_tags, key=len, reverse=True):
+        if rest.endswith(f"_{tag}") and len(rest) > len(tag) + 1:
+            return rest[: -len(tag) - 1], tag
+    return None
+
+
+def _registry_keys() -> Callable[[Found], int | None]:
+    """Registry cycle_key of a cycle-keyed file, from its titles (None when they are not one cycle)."""
+
+    @lru_cache(maxsize=None)
+    def successors(rule: str):
+        return parse_rule(rule).successors(get_link_store())
+
+    def key(f: Found) -> int | None:
+        if f.kind != "cycle" or not f.cycle_id:
+            return None
+        titles = f.cycle_id.split("__")
+        try:
+            ids = resolve_titles_to_ids(titles, namespace=0, allow_redirects=True)
+            if len(ids) != len(titles):
+                return None
+            return cycle_key_of_pages(ids.values(), f.rule, succ=successors(f.rule))
+        except (FileNotFoundError, OSError):
+            return None
+
+    return key
+
+
+def scan(analysis_dir: Path) -> tuple[list[Found], int]:
+    found: list[Found] = []
+    tsvs = sorted(analysis_dir.glob("*.tsv"))
+    for path in tsvs:
+        for metric, pattern, kind in FILE_FAMILIES:
+            m = pattern.match(path.name)
+            if m is None:
+                continue
+            groups = m.groupdict()
+            if metric == "path_characteristics":
+                metric = f"path_characteristics_{groups['part']}"
+            found.append(Found(path, metric, groups["rule"], kind, rest=groups.get("rest"), tag=groups.get("tag")))
+            break
+    return found, len(tsvs)
+
+
+def resolve_keys(found: list[Found], known_tags: set[str], is_title: Callable[[str], bool] | None) -> list[Found]:
+    """Fill in tag / cycle_id; returns the files that stayed ambiguous."""
+
+    # Files whose own contents name the seed / cycle titles go first: the tags
+    # they reveal then split basin and branches_all names without any titles.
+    ambiguous: list[Found] = []
+    splits: dict[tuple[str, str], tuple[str, str | None]] = {}
+    for f in found:
+        if f.kind == "seed":
+            df = read_tsv(f.path)
+            seed = str(df["seed_title"].iloc[0]) if "seed_title" in df.columns and len(df) else None
+            slug = _slug(seed) if seed else None
+            if slug and (f.rest == slug or f.rest.startswith(f"{slug}_")):
+                f.cycle_id, f.tag = cycle_id_from_titles([seed]), f.rest[len(slug) + 1 :] or None
+            else:
+                split = split_cycle(f.rest, known_tags, is_title)
+                if split is None:
+                    ambiguous.append(f)
+                    continue
+                f.cycle_id, f.tag = split
+        elif f.metric == "branches_topk":
+            df = read_tsv(f.path)
+            titles = {cycle_id_from_titles([t]) for t in df.get("enters_cycle_title", []) if isinstance(t, str)}
+            split = split_cycle(f.rest, known_tags, lambda t: t in titles or (is_title is not None and is_title(t)))
+            if split is None:
+                ambiguous.append(f)
+                continue
+            f.cycle_id, f.tag = split
+            splits[(f.rule, f.rest)] = split
+        else:
+            continue
+        if f.tag:
+            known_tags.add(f.tag)
+
+    for f in found:
+        if f.kind != "cycle" or f.metric == "branches_topk":
+            continue
+        split = splits.get((f.rule, f.rest)) or split_cycle(f.rest, known_tags, is_title)
+        if split is None:
+            ambiguous.append(f)
+            continue
+        f.cycle_id, f.tag = split
+    return ambiguous
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Import filename-keyed analysis TSVs into the partitioned results store.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("--analysis-dir", type=Path, default=ANALYSIS_DIR, help="Directory with the TSVs (store: its results/)")
+    parser.add_argument("--tag", action="append", default=[], help="Known run tag, used first to split names (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="Only show how the files would be keyed")
+    parser.add_argument("--rebuild-catalog", action="store_true", help="Only recreate _catalog.parquet from the partitions")
+    args = parser.parse_args()
+
+    analysis_dir = Path(args.analysis_dir)
+    root = analysis_dir / "results"
+    if args.rebuild_catalog:
+        df = rebuild_catalog(root=root)
+        print(f"Wrote: {root / '_catalog.parquet'} ({len(df):,} partitions)")
+        return
+    if not analysis_dir.exists():
+        raise SystemExit(f"Missing analysis directory: {analysis_dir}")
+
+    t0 = time.time()
+    found, total = scan(analysis_dir)
+    print(f"TSVs in {analysis_dir}: {total:,}; in known families: {len(found):,}")
+    ambiguous = resolve_keys(found, set(args.tag), _title_lookup())
+    skipped = {id(f) for f in ambiguous}
+
+    print(f"\n{'='*60}")
+    counts: Counter[str] = Counter()
+    registry_key = _registry_keys()
+    for f in found:
+        if id(f) in skipped:
+            continue
+        key = f"metric={f.metric} {f.rule} tag={f.tag or '-'} cycle_id={f.cycle_id or '-'}"
+        if args.dry_run:
+            print(f"{f.path.name}\n    -> {key}")
+        else:
+            write_result(
+                f.metric,
+                read_tsv(f.path),
+                n=f.rule,
+                tag=f.tag,
+                cycle_id=f.cycle_id,
+                cycle_key=registry_key(f),
+                source=f.path.name,
+                root=root,
+            )
+        counts[f.metric] += 1
+
+    for metric, count in sorted(counts.items()):
+        print(f"  {metric:<40} {count:>6,}")
+    if ambiguous:
+        print(f"\nSkipped {len(ambiguous):,} file(s) whose cycle / tag split is ambiguous (pass the tag with --tag):")
+        for f in ambiguous:
+            print(f"  {f.path.name}")
+    verb = "Would import" if args.dry_run else "Imported"
+    print(f"\n{verb} {sum(counts.values()):,} TSVs into {root} ({time.time() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Build (or refresh) the persistent title <-> page_id index.
+
+Every script that resolves titles builds the index lazily on first use, so
+running this is optional; it is useful to pay the one-time cost up front
+(e.g. before a harness run) or to sanity-check lookups.
+
+Outputs
+-------
+data/wikipedia/processed/analysis/title_index/ (see nlink_lib/title_index.py)
+
+Usage
+-----
+  python n-link-analysis/scripts/build-title-index.py [--force]
+  python n-link-analysis/scripts/build-title-index.py --title Massachusetts --page-id 1645518
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from nlink_lib.title_index import INDEX_DIR, build_title_index, get_title_index, is_index_fresh
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the persistent title <-> page_id index from pages.parquet.")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the index is up to date")
+    parser.add_argument("--title", type=str, action="append", default=[], help="Title to look up (repeatable)")
+    parser.add_argument("--page-id", type=int, action="append", default=[], help="page_id to look up (repeatable)")
+    parser.add_argument("--namespace", type=int, default=0, help="Namespace for --title lookups (default: 0)")
+    parser.add_argument(
+        "--follow-redirects",
+        action="store_true",
+        help="Resolve --title through redirects to the target article",
+    )
+    args = parser.parse_args()
+
+    if args.force or not is_index_fresh():
+        build_title_index()
+    else:
+        print(f"Title index is up to date: {INDEX_DIR}")
+
+    if not (args.title or args.page_id):
+        return
+
+    index = get_title_index()
+    t0 = time.perf_counter()
+    for title in args.title:
+        pid = index.lookup(
+            title,
+            namespace=int(args.namespace),
+            allow_redirects=True,
+            follow_redirects=bool(args.follow_redirects),
+        )
+        print(f"title={title!r}\tpage_id={pid}")
+    for pid, title in sorted(index.ids_to_titles(args.page_id).items()):
+        print(f"page_id={pid}\ttitle={title!r}")
+    dt = time.perf_counter() - t0
+    print(f"Lookups took {dt * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,7 +22,9 @@ Stop conditions:
 
 Outputs
 -------
-Writes a TSV report under data/wikipedia/processed/analysis/ with one row per hop.
+Writes a TSV report under data/wikipedia/processed/analysis/ with one row per hop,
+and the same table to the results store (metric ``dominant_upstream_chain``,
+keyed by N, --tag and the seed title; see nlink_lib/results_store.py).
 
 Notes
 -----
@@ -37,10 +39,20 @@ import argparse
 import re
 import time
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import duckdb
 import pyarrow as pa
 
+from nlink_lib.edges_db import connect_edges_db, edges_db_path
+from nlink_lib.results_store import add_tag_argument, cycle_id_from_titles, write_result
+from nlink_lib.rules import add_rule_argument, rule_from_args
+from nlink_lib.title_index import resolve_ids_to_titles, resolve_titles_to_ids
+from nlink_lib.title_search import describe_missing_titles
+
+# Connections come from nlink_lib.edges_db, which imports duckdb when one is opened.
+if TYPE_CHECKING:
+    import duckdb
+
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 PROCESSED_DIR = REPO_ROOT / "data" / "wikipedia" / "processed"
@@ -56,94 +68,6 @@ def _slug(s: str) -> str:
     return s[:120] if len(s) > 120 else s
 
 
-def _resolve_titles_to_ids(titles: list[str], *, namespace: int, allow_redirects: bool) -> dict[str, int]:
-    if not titles:
-        return {}
-    if not PAGES_PATH.exists():
-        raise FileNotFoundError(f"Missing: {PAGES_PATH}")
-
-    title_tbl = pa.table({"title": pa.array(titles, type=pa.string())})
-    con = duckdb.connect()
-    con.register("wanted_titles", title_tbl)
-
-    redirect_clause = "" if allow_redirects else "AND p.is_redirect = FALSE"
-    rows = con.execute(
-        f"""
-        SELECT w.title, min(p.page_id) AS page_id
-        FROM wanted_titles w
-        JOIN read_parquet('{PAGES_PATH.as_posix()}') p
-          ON p.title = w.title
-        WHERE p.namespace = {int(namespace)}
-          {redirect_clause}
-        GROUP BY w.title
-        """.strip()
-    ).fetchall()
-    con.close()
-    return {str(t): int(pid) for t, pid in rows}
-
-
-def _resolve_ids_to_titles(page_ids: list[int]) -> dict[int, str]:
-    if not page_ids:
-        return {}
-    if not PAGES_PATH.exists():
-        return {}
-
-    unique_ids = sorted(set(int(x) for x in page_ids))
-    id_tbl = pa.table({"page_id": pa.array(unique_ids, type=pa.int64())})
-
-    con = duckdb.connect()
-    con.register("wanted_ids", id_tbl)
-    rows = con.execute(
-        f"""
-        SELECT p.page_id, p.title
-        FROM read_parquet('{PAGES_PATH.as_posix()}') p
-        JOIN wanted_ids w USING (page_id)
-        """.strip()
-    ).fetchall()
-    con.close()
-    return {int(pid): str(title) for pid, title in rows}
-
-
-def _ensure_edges_table(con: duckdb.DuckDBPyConnection, *, n: int) -> None:
-    exists_row = con.execute(
-        """
-        SELECT COUNT(*)
-        FROM information_schema.tables
-        WHERE table_schema = 'main' AND table_name = 'edges'
-        """.strip()
-    ).fetchone()
-    exists = int(exists_row[0]) if exists_row is not None else 0
-    if exists:
-        return
-
-    if not NLINK_PATH.exists():
-        raise FileNotFoundError(f"Missing: {NLINK_PATH}")
-
-    print(f"Materializing edges table for N={n} (one-time cost)...")
-    t0 = time.time()
-
-    con.execute(
-        f"""
-        CREATE TABLE edges AS
-        SELECT
-            page_id::BIGINT AS src_page_id,
-            list_extract(link_sequence, {int(n)})::BIGINT AS dst_page_id
-        FROM read_parquet('{NLINK_PATH.as_posix()}')
-        WHERE list_extract(link_sequence, {int(n)}) IS NOT NULL
-        """.strip()
-    )
-
-    try:
-        con.execute("CREATE INDEX edges_dst_idx ON edges(dst_page_id)")
-    except Exception:
-        pass
-
-    dt = time.time() - t0
-    n_edges_row = con.execute("SELECT COUNT(*) FROM edges").fetchone()
-    n_edges = int(n_edges_row[0]) if n_edges_row is not None else 0
-    print(f"Edges table ready: {n_edges:,} edges in {dt:.1f}s")
-
-
 def _dominant_entry_for_seed(
     con: duckdb.DuckDBPyConnection,
     *,
@@ -246,6 +170,7 @@ def _dominant_entry_for_seed(
 def main() -> None:
     parser = argparse.ArgumentParser(description="Chase the dominant upstream entry branch repeatedly under f_N.")
     parser.add_argument("--n", type=int, default=5, help="N for fixed N-link rule (default: 5)")
+    add_rule_argument(parser)
     parser.add_argument("--seed-title", type=str, required=True, help="Start title (exact match)")
     parser.add_argument("--namespace", type=int, default=0, help="Namespace for resolving titles (default: 0)")
     parser.add_argument("--allow-redirects", action="store_true", help="Allow resolving seed title to redirects")
@@ -259,32 +184,33 @@ def main() -> None:
         help="Stop if dominant share falls below this (default: 0 = disabled)",
     )
     parser.add_argument("--out", type=str, default=None, help="Optional output TSV path")
+    add_tag_argument(parser)
 
     args = parser.parse_args()
     if args.n <= 0:
         raise SystemExit("--n must be >= 1")
+    rule = rule_from_args(args)
     if args.max_hops <= 0:
         raise SystemExit("--max-hops must be >= 1")
 
-    seed_map = _resolve_titles_to_ids(
+    seed_map = resolve_titles_to_ids(
         [str(args.seed_title)],
         namespace=int(args.namespace),
         allow_redirects=bool(args.allow_redirects),
     )
     if args.seed_title not in seed_map:
-        raise SystemExit(f"Could not resolve seed title to page_id (exact match failed): {args.seed_title}")
+        raise SystemExit(describe_missing_titles([str(args.seed_title)], namespace=int(args.namespace)))
 
     seed_id = int(seed_map[args.seed_title])
 
     ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
     out_path = Path(args.out) if args.out else (
-        ANALYSIS_DIR / f"dominant_upstream_chain_n={int(args.n)}_from={_slug(args.seed_title)}.tsv"
+        ANALYSIS_DIR / f"dominant_upstream_chain_{rule.key}_from={_slug(args.seed_title)}.tsv"
     )
 
-    db_path = ANALYSIS_DIR / f"edges_n={int(args.n)}.duckdb"
+    db_path = edges_db_path()
     print(f"Using edges DB: {db_path}")
-    con = duckdb.connect(str(db_path))
-    _ensure_edges_table(con, n=int(args.n))
+    con = connect_edges_db(rule)
 
     visited: dict[int, int] = {}
     rows: list[dict[str, object]] = []
@@ -308,7 +234,7 @@ def main() -> None:
         )
 
         # Resolve titles for the dominant entry, if any.
-        titles = _resolve_ids_to_titles([current_id, dom_id] if dom_id is not None else [current_id])
+        titles = resolve_ids_to_titles([current_id, dom_id] if dom_id is not None else [current_id])
         dom_title = titles.get(dom_id, "<unknown>") if dom_id is not None else "<none>"
 
         print(f"Total basin nodes (including seed): {total_seen:,}")
@@ -354,6 +280,19 @@ def main() -> None:
         lines.append("\t".join(str(r[h]) for h in header))
     out_path.write_text("\n".join(lines), encoding="utf-8")
     print(f"\nWrote chain TSV: {out_path}")
+    columns = {h: [r[h] for r in rows] for h in header}
+    # A missing dominant entry is "" in the TSV and null in the store.
+    columns["dominant_entry_page_id"] = [v if v != "" else None for v in columns["dominant_entry_page_id"]]
+    chain = pa.table(columns)
+    stored = write_result(
+        "dominant_upstream_chain",
+        chain,
+        n=rule,
+        tag=args.tag,
+        cycle_id=cycle_id_from_titles([args.seed_title]),
+        source=out_path.name,
+    )
+    print(f"Wrote results store partition: {stored}")
 
     con.close()
 
@@ -18,6 +18,8 @@ from pathlib import Path
 import matplotlib.pyplot as plt
 import pandas as pd
 
+from nlink_lib.results_store import query
+
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 ANALYSIS_DIR = REPO_ROOT / "data" / "wikipedia" / "processed" / "analysis"
@@ -26,25 +28,17 @@ ASSETS_DIR = REPORT_DIR / "assets"
 
 
 def load_dashboards(n_values: list[int], tag: str) -> tuple[pd.DataFrame, pd.DataFrame]:
-    """Load trunkiness and collapse dashboards for multiple N values."""
-    trunk_dfs = []
-    collapse_dfs = []
-
-    for n in n_values:
-        trunk_path = ANALYSIS_DIR / f"branch_trunkiness_dashboard_n={n}_{tag}.tsv"
-        if trunk_path.exists():
-            df = pd.read_csv(trunk_path, sep="\t")
-            df["n"] = n
-            trunk_dfs.append(df)
-
-        collapse_path = ANALYSIS_DIR / f"dominance_collapse_dashboard_n={n}_{tag}_seed=dominant_enters_cycle_title_thr=0.5.tsv"
-        if collapse_path.exists():
-            df = pd.read_csv(collapse_path, sep="\t")
-            df["n"] = n
-            collapse_dfs.append(df)
-
-    trunk_all = pd.concat(trunk_dfs, ignore_index=True) if trunk_dfs else None
-    collapse_all = pd.concat(collapse_dfs, ignore_index=True) if collapse_dfs else None
+    """Load trunkiness and collapse dashboards for multiple N values (one store query each)."""
+
+    def load(metric: str, metric_tag: str) -> pd.DataFrame | None:
+        df = query(metric, n=n_values, tag=metric_tag).to_pandas()
+        if df.empty:
+            return None
+        df["n"] = df["n"].astype(int)
+        return df.drop(columns=["tag", "cycle_id"])
+
+    trunk_all = load("branch_trunkiness_dashboard", tag)
+    collapse_all = load("dominance_collapse_dashboard", f"{tag}_seed=dominant_enters_cycle_title_thr=0.5")
 
     return trunk_all, collapse_all
 
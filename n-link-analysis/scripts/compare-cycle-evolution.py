@@ -11,6 +11,13 @@ This script answers:
 2. What structural properties change across N?
 3. Which cycles are "universal" (appear at all N)?
 
+Inputs
+------
+The ``basin_layers`` results map-basin-from-cycle.py writes to the results
+store (nlink_lib/results_store.py), one query for all requested N. Cycles are
+matched across N by their cycle registry key where the store recorded one
+(named by the cycle_id of their latest partition), else by cycle_id.
+
 Outputs
 -------
 1. cycle_evolution_summary.tsv - Basin metrics for each cycle × N combination
@@ -40,6 +47,9 @@ from typing import Optional
 import matplotlib.pyplot as plt
 import matplotlib.gridspec as gridspec
 import numpy as np
+import pandas as pd
+
+from nlink_lib.results_store import catalog, n_key, query
 
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
@@ -47,68 +57,31 @@ ANALYSIS_DIR = REPO_ROOT / "data" / "wikipedia" / "processed" / "analysis"
 REPORT_DIR = REPO_ROOT / "n-link-analysis" / "report" / "assets"
 
 
-def parse_cycle_name(filename: str) -> Optional[str]:
-    """Extract canonical cycle name from basin filename.
+def latest_basin_partitions(n_values: list[int], tag: Optional[str]) -> pd.DataFrame:
+    """Catalog rows of the ``basin_layers`` results to compare: one per (N, cycle).
 
-    Example: 'basin_n=5_cycle=Massachusetts__Gulf_of_Maine_reproduction_2025-12-31_layers.tsv'
-    Returns: 'Massachusetts__Gulf_of_Maine'
+    With ``tag`` only that run's partitions; otherwise, where a cycle was mapped
+    by several runs at the same N, the most recently written one. ``cycle`` is
+    the name the cycle is compared under: one per registry key (the cycle_id
+    of its latest partition), else the cycle_id.
     """
-    if not filename.startswith("basin_n="):
-        return None
-
-    parts = filename.split("_cycle=")
-    if len(parts) < 2:
-        return None
-
-    cycle_part = parts[1].split("_reproduction_")[0]
-    return cycle_part
-
-
-def load_basin_size(filepath: Path) -> int:
-    """Load total basin size from layers TSV."""
-    if not filepath.exists():
-        return 0
-
-    lines = filepath.read_text(encoding="utf-8").strip().split("\n")
-    if len(lines) < 2:
-        return 0
-
-    # Last line has total_seen
-    last_line = lines[-1]
-    parts = last_line.split("\t")
-    if len(parts) < 3:
-        return 0
-
-    try:
-        return int(parts[2])
-    except ValueError:
-        return 0
-
-
-def load_depth_stats(filepath: Path) -> dict[str, float]:
-    """Load depth distribution statistics from layers TSV."""
-    if not filepath.exists():
-        return {}
-
-    lines = filepath.read_text(encoding="utf-8").strip().split("\n")
-    if len(lines) < 2:
-        return {}
-
-    depths = []
-    new_nodes = []
-
-    for line in lines[1:]:  # Skip header
-        parts = line.split("\t")
-        if len(parts) < 2:
-            continue
-        try:
-            depth = int(parts[0])
-            nodes = int(parts[1])
-            depths.append(depth)
-            new_nodes.append(nodes)
-        except ValueError:
-            continue
-
+    cat = catalog()
+    cat = cat[(cat["metric"] == "basin_layers") & cat["n"].isin([n_key(n) for n in n_values])]
+    cat = cat.sort_values("written_at", kind="stable")
+    # Partitions stored without a key take the key of a keyed one with the same titles.
+    keyed = cat.dropna(subset=["cycle_key"])
+    key_of_titles = {frozenset(c.split("__")): k for c, k in zip(keyed["cycle_id"], keyed["cycle_key"])}
+    inherited = cat["cycle_id"].map(lambda c: key_of_titles.get(frozenset(c.split("__")))).astype("Int64")
+    cat = cat.assign(cycle_key=cat["cycle_key"].fillna(inherited))
+    latest_name = cat.dropna(subset=["cycle_key"]).groupby("cycle_key")["cycle_id"].last()
+    cat = cat.assign(cycle=cat["cycle_key"].map(latest_name).fillna(cat["cycle_id"]).astype(str))
+    if tag is not None:
+        return cat[cat["tag"] == tag]
+    return cat.drop_duplicates(["n", "cycle"], keep="last")
+
+
+def load_depth_stats(depths: list[int], new_nodes: list[int]) -> dict[str, float]:
+    """Depth distribution statistics from a basin's layer sizes."""
     if not new_nodes:
         return {}
 
@@ -154,6 +127,12 @@ def main() -> None:
         default="3,4,5,6,7",
         help="Comma-separated N values to analyze (default: 3,4,5,6,7)",
     )
+    parser.add_argument(
+        "--tag",
+        type=str,
+        default=None,
+        help="Compare only basins stored under this tag (default: the latest run per cycle and N)",
+    )
 
     args = parser.parse_args()
     n_values = [int(n.strip()) for n in args.n_values.split(",")]
@@ -165,22 +144,28 @@ def main() -> None:
     # Discover all cycles
     cycle_data: dict[str, dict[int, dict]] = defaultdict(lambda: defaultdict(dict))
 
-    for n in n_values:
-        pattern = f"basin_n={n}_cycle=*_layers.tsv"
-        basin_files = list(ANALYSIS_DIR.glob(pattern))
-
-        print(f"N={n}: Found {len(basin_files)} basin files")
-
-        for filepath in basin_files:
-            cycle_name = parse_cycle_name(filepath.name)
-            if not cycle_name:
-                continue
+    partitions = latest_basin_partitions(n_values, args.tag)
+    layers = query(
+        "basin_layers",
+        n=n_values,
+        tag=sorted(set(partitions["tag"])),
+        cycle_id=sorted(set(partitions["cycle_id"])),
+    ).to_pandas()
+    cycle_of = {(n, t, c): name for n, t, c, name in partitions[["n", "tag", "cycle_id", "cycle"]].itertuples(index=False)}
+    basins = {
+        (key[0], key[1], cycle_of[key]): g.sort_values("depth")
+        for key, g in layers.groupby(["n", "tag", "cycle_id"], sort=False)
+        if key in cycle_of
+    }
 
-            size = load_basin_size(filepath)
-            depth_stats = load_depth_stats(filepath)
+    for n in n_values:
+        n_basins = {cycle_name: g for (n_str, _, cycle_name), g in basins.items() if n_str == n_key(n)}
+        print(f"N={n}: Found {len(n_basins)} basins")
 
+        for cycle_name, g in n_basins.items():
+            depth_stats = load_depth_stats(g["depth"].astype(int).tolist(), g["new_nodes"].astype(int).tolist())
             cycle_data[cycle_name][n] = {
-                "size": size,
+                "size": int(g["total_seen"].iloc[-1]) if len(g) else 0,
                 **depth_stats,
             }
 
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""Compare per-stage timings and resource use across harness / reproduction runs.
+
+Context
+-------
+Every stage run by nlink_lib/pipeline.py (run-analysis-harness.py,
+reproduce-main-findings.py) appends a record to
+analysis/logs/pipeline_runs.jsonl: wall and CPU time, peak RSS, bytes read /
+written, rows in / out. This report reads that history so regressions and
+optimization targets come from measurements.
+
+Method
+------
+1. Group records by run_id (optionally only one --pipeline / --tag-filter),
+   keep the last --runs runs; the newest (or --run-id) is the run under test.
+2. Per stage of that run: its measurements next to a baseline wall time from
+   the earlier runs in the window where the stage also ran successfully
+   (median, or the most recent with --baseline previous).
+3. Flag stages at least --threshold times slower (or faster) than baseline,
+   ignoring stages under --min-seconds in both.
+4. Total stage time per script, as the share of the run it accounts for.
+
+Outputs
+-------
+- analysis/pipeline_profile_report_{tag}.tsv: one row per stage of the run
+  under test (stage, script, status, wall_s, cpu_s, cpu_util, peak_rss_mb,
+  read_mb, written_mb, rows_in, rows_out, baseline_wall_s, baseline_runs,
+  wall_ratio, change)
+
+Usage
+-----
+    python compare-pipeline-runs.py
+    python compare-pipeline-runs.py --pipeline run-analysis-harness --runs 5 --threshold 1.2
+    python compare-pipeline-runs.py --run-id 20261018T021500-4242 --baseline previous
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+from nlink_lib.profiling import RUN_LOG_PATH, load_records
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+PROCESSED_DIR = REPO_ROOT / "data" / "wikipedia" / "processed"
+ANALYSIS_DIR = PROCESSED_DIR / "analysis"
+
+MB = 1024**2
+
+
+def _runs_table(df: pd.DataFrame) -> pd.DataFrame:
+    runs = df.groupby("run_id", sort=False).agg(
+        finished_at=("finished_at", "max"),
+        pipeline=("pipeline", "first"),
+        tag=("tag", "first"),
+        n=("n", "first"),
+        jobs=("jobs", "first"),
+        ran=("status", lambda s: int((s == "ok").sum())),
+        cached=("status", lambda s: int((s == "cached").sum())),
+        failed=("status", lambda s: int(s.isin(["failed", "blocked"]).sum())),
+        stage_wall_s=("wall_s", "sum"),
+    )
+    return runs.sort_values("finished_at")
+
+
+def _stage_report(
+    df: pd.DataFrame, run_id: str, previous: list[str], *, baseline: str, threshold: float, min_seconds: float
+) -> pd.DataFrame:
+    current = df[(df["run_id"] == run_id) & df["wall_s"].notna()].copy()
+    history = df[df["run_id"].isin(previous) & (df["status"] == "ok") & df["wall_s"].notna()]
+
+    if baseline == "previous":
+        order = {rid: i for i, rid in enumerate(previous)}
+        latest = history.assign(_order=history["run_id"].map(order)).sort_values("_order").groupby("stage").tail(1)
+        base = latest.set_index("stage")["wall_s"]
+    else:
+        base = history.groupby("stage")["wall_s"].median()
+    base_runs = history.groupby("stage")["run_id"].nunique()
+
+    current["cpu_util"] = current["cpu_s"] / current["wall_s"].where(current["wall_s"] > 0)
+    current["peak_rss_mb"] = current["peak_rss_bytes"] / MB
+    for col in ("bytes_read", "bytes_written", "rows_in", "rows_out"):
+        if col not in current:
+            current[col] = float("nan")
+    current["read_mb"] = current["bytes_read"] / MB
+    current["written_mb"] = current["bytes_written"] / MB
+    current["baseline_wall_s"] = current["stage"].map(base)
+    current["baseline_runs"] = current["stage"].map(base_runs).fillna(0).astype(int)
+    current["wall_ratio"] = current["wall_s"] / current["baseline_wall_s"].where(current["baseline_wall_s"] > 0)
+
+    def change(row: pd.Series) -> str:
+        if pd.isna(row["baseline_wall_s"]):
+            return "new"
+        if max(row["wall_s"], row["baseline_wall_s"]) < min_seconds or pd.isna(row["wall_ratio"]):
+            return ""
+        if row["wall_ratio"] >= threshold:
+            return "slower"
+        if row["wall_ratio"] <= 1 / threshold:
+            return "faster"
+        return ""
+
+    current["change"] = current.apply(change, axis=1)
+    columns = [
+        "stage", "script", "status", "wall_s", "cpu_s", "cpu_util", "peak_rss_mb", "read_mb", "written_mb",
+        "rows_in", "rows_out", "baseline_wall_s", "baseline_runs", "wall_ratio", "change",
+    ]
+    return current[columns].sort_values("wall_s", ascending=False).reset_index(drop=True)
+
+
+def _fmt(value: object, spec: str = ".2f") -> str:
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    if isinstance(value, float):
+        return format(value, spec)
+    return str(value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare per-stage timings and resource use across pipeline runs.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("--run-log", type=Path, default=RUN_LOG_PATH, help=f"JSON-lines run log (default: {RUN_LOG_PATH})")
+    parser.add_argument("--pipeline", type=str, default=None, help="Only runs of this pipeline (e.g. run-analysis-harness)")
+    parser.add_argument("--tag-filter", type=str, default=None, help="Only runs with this harness tag")
+    parser.add_argument("--runs", type=int, default=10, help="Runs in the comparison window (default: 10)")
+    parser.add_argument("--run-id", type=str, default=None, help="Run under test (default: the newest in the window)")
+    parser.add_argument("--baseline", choices=("median", "previous"), default="median", help="Baseline over earlier runs (default: median)")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Wall-time ratio flagged as slower / faster (default: 1.25)")
+    parser.add_argument("--min-seconds", type=float, default=1.0, help="Ignore changes of stages shorter than this (default: 1.0)")
+    parser.add_argument("--top", type=int, default=15, help="Slowest stages to print (default: 15)")
+    parser.add_argument("--tag", type=str, default="latest", help="Output file tag (default: latest)")
+    args = parser.parse_args()
+
+    if args.threshold <= 1.0:
+        raise SystemExit("--threshold must be > 1")
+    records = load_records(args.run_log)
+    if not records:
+        raise SystemExit(f"No run records in {args.run_log}; run the harness first")
+
+    df = pd.DataFrame.from_records(records)
+    for col in ("pipeline", "tag", "n", "jobs", "wall_s", "cpu_s", "peak_rss_bytes"):
+        if col not in df:
+            df[col] = None
+    if args.pipeline:
+        df = df[df["pipeline"] == args.pipeline]
+    if args.tag_filter:
+        df = df[df["tag"] == args.tag_filter]
+    if df.empty:
+        raise SystemExit("No runs match the filters")
+
+    runs = _runs_table(df)
+    if args.run_id:
+        if args.run_id not in runs.index:
+            raise SystemExit(f"Unknown run id {args.run_id!r}")
+        runs = runs.loc[: args.run_id]
+    runs = runs.tail(max(1, args.runs))
+    run_id = runs.index[-1]
+    previous = list(runs.index[:-1])
+
+    print(f"\n{'='*60}")
+    print(f"Pipeline runs: {len(runs)} in window, under test: {run_id}")
+    print(f"{'='*60}")
+    for rid, run in runs.iterrows():
+        marker = "*" if rid == run_id else " "
+        print(
+            f" {marker} {rid}  {run['pipeline'] or '-':<24} tag={run['tag'] or '-':<28} N={run['n'] or '-':<6} "
+            f"jobs={_fmt(run['jobs'], '.0f') or '-':<3} ran={run['ran']:<3} cached={run['cached']:<3} "
+            f"failed={run['failed']:<3} stage time={run['stage_wall_s']:.1f}s"
+        )
+
+    report = _stage_report(
+        df, run_id, previous, baseline=args.baseline, threshold=args.threshold, min_seconds=args.min_seconds
+    )
+    if report.empty:
+        raise SystemExit(f"Run {run_id} has no measured stages (everything cached?)")
+
+    ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
+    out_tsv = ANALYSIS_DIR / f"pipeline_profile_report_{args.tag}.tsv"
+    lines = ["\t".join(report.columns)]
+    for row in report.itertuples(index=False):
+        lines.append("\t".join(_fmt(v, ".3f") for v in row))
+    out_tsv.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    print(f"\nSlowest stages ({args.baseline} baseline over {len(previous)} earlier run(s)):")
+    print(f"  {'stage':<52} {'wall':>8} {'cpu':>8} {'util':>5} {'rss MB':>8} {'read MB':>9} {'rows out':>10} {'base':>8} {'ratio':>6}")
+    for row in report.head(args.top).itertuples(index=False):
+        print(
+            f"  {row.stage[:52]:<52} {row.wall_s:>7.1f}s {_fmt(row.cpu_s, '.1f'):>7}s {_fmt(row.cpu_util, '.1f'):>5} "
+            f"{_fmt(row.peak_rss_mb, ',.0f'):>8} {_fmt(row.read_mb, ',.1f'):>9} {_fmt(row.rows_out, ',.0f'):>10} "
+            f"{_fmt(row.baseline_wall_s, '.1f'):>8} {_fmt(row.wall_ratio, '.2f'):>6} {row.change}"
+        )
+
+    for label in ("slower", "faster"):
+        changed = report[report["change"] == label]
+        if len(changed):
+            print(f"\n{label.capitalize()} than baseline (x{args.threshold:g}):")
+            for row in changed.itertuples(index=False):
+                print(f"  {row.stage}: {row.baseline_wall_s:.1f}s -> {row.wall_s:.1f}s (x{row.wall_ratio:.2f})")
+
+    by_script = report.groupby("script")["wall_s"].agg(["count", "sum"]).sort_values("sum", ascending=False)
+    total = float(by_script["sum"].sum()) or 1.0
+    print("\nStage time by script (optimization targets):")
+    for script, row in by_script.head(args.top).iterrows():
+        print(f"  {script:<44} {int(row['count']):>3} stage(s) {row['sum']:>8.1f}s {row['sum'] / total:>6.1%}")
+
+    print(f"\nWrote: {out_tsv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""Cross-N basin overlap: contingency (flow) matrix between terminal labels.
+
+Purpose
+-------
+compare-cycle-evolution.py compares basin *sizes* across N. This script
+compares basin *membership*: for every page, its terminal at N=a and at N=b,
+so that for each pair of basins we know how many pages in basin A at N=a land
+in basin B at N=b.
+
+Method
+------
+Every page gets a terminal label per N from the whole-graph decomposition
+(nlink_lib/decomposition.py): its cycle id, or HALT (all HALT basins pooled
+into one label). Labels are shifted to 0 = HALT, cycle id + 1 otherwise, so
+one ``np.unique`` over the int64 keys label_a * (nodes + 1) + label_b gives
+the full sparse contingency matrix with counts. Basin sizes are bincounts of
+the same labels, so per cell:
+
+  flow_fraction  = pages / |A|            (share of A that goes to B)
+  back_fraction  = pages / |B|            (share of B that came from A)
+  jaccard        = pages / (|A| + |B| - pages)
+
+Consecutive N values in --n-values are compared pairwise (a -> b).
+
+Outputs
+-------
+analysis/basin_flow_n={a}_to_n={b}_{tag}.parquet
+    Every non-empty cell: from/to cycle page_id (-1 = HALT), pages, sizes,
+    flow_fraction, back_fraction, jaccard.
+analysis/basin_flow_top_n={a}_to_n={b}_{tag}.tsv
+    Cells between the top-k basins on each side, with cycle titles.
+analysis/basin_overlap_summary_{tag}.tsv
+    Per top-k source basin: best-matching basin at the next N (max Jaccard),
+    share retained, share sent to HALT.
+
+Usage
+-----
+    python n-link-analysis/scripts/compute-basin-flow-matrix.py --n-values 3 4 5 6 7 [--top-k 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from nlink_lib.decomposition import Decomposition, get_decomposition
+from nlink_lib.link_store import get_link_store
+from nlink_lib.paths import ANALYSIS_DIR
+from nlink_lib.title_index import resolve_ids_to_titles
+
+
+HALT_LABEL = "HALT"
+
+
+def terminal_labels(decomp: Decomposition) -> np.ndarray:
+    """Per-node label: 0 = HALT, cycle id + 1 otherwise (int64)."""
+
+    return np.asarray(decomp.cycle_id).astype(np.int64) + 1
+
+
+def flow_matrix(labels_a: np.ndarray, labels_b: np.ndarray) -> dict[str, np.ndarray]:
+    """Sparse contingency matrix of two label arrays over the same nodes."""
+
+    base = int(len(labels_a)) + 1
+    keys, pages = np.unique(labels_a * base + labels_b, return_counts=True)
+    from_label, to_label = keys // base, keys % base
+    size_a = np.bincount(labels_a, minlength=base)
+    size_b = np.bincount(labels_b, minlength=base)
+    pages = pages.astype(np.int64)
+    from_size, to_size = size_a[from_label], size_b[to_label]
+    return {
+        "from_label": from_label,
+        "to_label": to_label,
+        "pages": pages,
+        "from_size": from_size,
+        "to_size": to_size,
+        "flow_fraction": pages / from_size,
+        "back_fraction": pages / to_size,
+        "jaccard": pages / (from_size + to_size - pages),
+    }
+
+
+def _top_labels(labels: np.ndarray, k: int) -> np.ndarray:
+    """The k largest cycle basins' labels (HALT excluded), largest first."""
+
+    sizes = np.bincount(labels)
+    sizes[0] = 0
+    order = np.argsort(-sizes, kind="stable")
+    return order[: int(k)][sizes[order[: int(k)]] > 0]
+
+
+def _cycle_label_names(decomps: dict[int, Decomposition], labels: dict[int, np.ndarray]) -> dict[tuple[int, int], str]:
+    """(n, label) -> "Title_A ↔ Title_B" for the given cycle labels."""
+
+    page_ids = np.asarray(get_link_store().page_ids)
+    members = {
+        (n, int(lab)): page_ids[decomps[n].cycle_members(int(lab) - 1)] for n, labs in labels.items() for lab in labs if lab > 0
+    }
+    titles = resolve_ids_to_titles(sorted({int(pid) for ids in members.values() for pid in ids}))
+    names = {key: " ↔ ".join(titles.get(int(pid), str(int(pid))) for pid in ids) for key, ids in members.items()}
+    for n in labels:
+        names[(n, 0)] = HALT_LABEL
+    return names
+
+
+def _label_page_ids(labels: np.ndarray, page_ids: np.ndarray) -> np.ndarray:
+    """Cycle page_id (smallest on the cycle) per label; -1 for HALT."""
+
+    return np.where(labels > 0, page_ids[np.maximum(labels - 1, 0)], -1)
+
+
+def compare_pair(
+    n_a: int,
+    n_b: int,
+    decomps: dict[int, Decomposition],
+    *,
+    top_k: int,
+    tag: str,
+) -> list[dict]:
+    print(f"\n{'='*60}")
+    print(f"Basin flow N={n_a} -> N={n_b}")
+    print(f"{'='*60}")
+
+    t0 = time.time()
+    labels_a = terminal_labels(decomps[n_a])
+    labels_b = terminal_labels(decomps[n_b])
+    cells = flow_matrix(labels_a, labels_b)
+    print(f"  {len(cells['pages']):,} non-empty cells over {len(labels_a):,} pages ({time.time() - t0:.1f}s)")
+
+    page_ids = np.asarray(get_link_store().page_ids)
+    out_cells = ANALYSIS_DIR / f"basin_flow_n={n_a}_to_n={n_b}_{tag}.parquet"
+    table = pa.table(
+        {
+            "from_cycle_page_id": _label_page_ids(cells["from_label"], page_ids),
+            "to_cycle_page_id": _label_page_ids(cells["to_label"], page_ids),
+            **{k: cells[k] for k in ("pages", "from_size", "to_size", "flow_fraction", "back_fraction", "jaccard")},
+        }
+    )
+    pq.write_table(table, out_cells)
+    print(f"  Wrote: {out_cells}")
+
+    top_a = _top_labels(labels_a, top_k)
+    top_b = _top_labels(labels_b, top_k)
+
+    # Best match per top source basin: max Jaccard among cycle targets.
+    best: dict[int, int | None] = {}
+    for lab in top_a:
+        rows = np.nonzero((cells["from_label"] == lab) & (cells["to_label"] > 0))[0]
+        best[int(lab)] = int(rows[np.argmax(cells["jaccard"][rows])]) if len(rows) else None
+    best_targets = [int(cells["to_label"][i]) for i in best.values() if i is not None]
+    names = _cycle_label_names(decomps, {n_a: top_a, n_b: np.union1d(top_b, best_targets)})
+
+    # Top-k x top-k (plus HALT on both sides) in long form.
+    in_a = np.isin(cells["from_label"], np.append(top_a, 0))
+    in_b = np.isin(cells["to_label"], np.append(top_b, 0))
+    sel = np.nonzero(in_a & in_b)[0]
+    sel = sel[np.lexsort((-cells["pages"][sel], cells["from_label"][sel]))]
+    out_top = ANALYSIS_DIR / f"basin_flow_top_n={n_a}_to_n={n_b}_{tag}.tsv"
+    lines = ["n_from\tn_to\tfrom_cycle\tto_cycle\tpages\tfrom_size\tto_size\tflow_fraction\tback_fraction\tjaccard"]
+    for i in sel:
+        lines.append(
+            f"{n_a}\t{n_b}\t{names[(n_a, int(cells['from_label'][i]))]}\t{names[(n_b, int(cells['to_label'][i]))]}\t"
+            f"{int(cells['pages'][i])}\t{int(cells['from_size'][i])}\t{int(cells['to_size'][i])}\t"
+            f"{cells['flow_fraction'][i]:.6f}\t{cells['back_fraction'][i]:.6f}\t{cells['jaccard'][i]:.6f}"
+        )
+    out_top.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    print(f"  Wrote: {out_top}")
+
+    summary = []
+    for lab in top_a:
+        rows = np.nonzero(cells["from_label"] == lab)[0]
+        i = best[int(lab)]
+        summary.append({
+            "n_from": n_a,
+            "n_to": n_b,
+            "cycle": names[(n_a, int(lab))],
+            "basin_size": int(cells["from_size"][rows[0]]),
+            "best_match": names[(n_b, int(cells["to_label"][i]))] if i is not None else "",
+            "best_jaccard": float(cells["jaccard"][i]) if i is not None else 0.0,
+            "best_flow_fraction": float(cells["flow_fraction"][i]) if i is not None else 0.0,
+            "halt_fraction": float(cells["flow_fraction"][rows[cells["to_label"][rows] == 0]].sum()),
+            "targets": int(np.count_nonzero(cells["to_label"][rows] > 0)),
+        })
+
+    for r in summary[:10]:
+        print(
+            f"  {r['basin_size']:>12,}  J={r['best_jaccard']:.3f}  flow={r['best_flow_fraction']:.3f}  "
+            f"halt={r['halt_fraction']:.3f}  {r['cycle']} -> {r['best_match'] or '-'}"
+        )
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cross-N basin contingency matrix, Jaccard and flow fractions.")
+    parser.add_argument("--n-values", type=int, nargs="+", default=[3, 4, 5, 6, 7], help="N values; consecutive pairs are compared")
+    parser.add_argument("--top-k", type=int, default=20, help="Basins per N in the labelled outputs (default: 20)")
+    parser.add_argument("--tag", type=str, default="analysis", help="Output file tag (default: analysis)")
+    args = parser.parse_args()
+
+    n_values = list(dict.fromkeys(args.n_values))
+    if len(n_values) < 2:
+        raise SystemExit("--n-values needs at least two distinct N")
+    if any(n <= 0 for n in n_values):
+        raise SystemExit("--n-values must be >= 1")
+
+    ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
+    decomps = {n: get_decomposition(n) for n in n_values}
+
+    summary = []
+    for n_a, n_b in zip(n_values, n_values[1:]):
+        summary.extend(compare_pair(n_a, n_b, decomps, top_k=int(args.top_k), tag=args.tag))
+
+    out_summary = ANALYSIS_DIR / f"basin_overlap_summary_{args.tag}.tsv"
+    cols = ["n_from", "n_to", "cycle", "basin_size", "best_match", "best_jaccard", "best_flow_fraction", "halt_fraction", "targets"]
+    lines = ["\t".join(cols)]
+    for r in summary:
+        lines.append("\t".join(f"{r[c]:.6f}" if isinstance(r[c], float) else str(r[c]) for c in cols))
+    out_summary.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    print(f"\nWrote: {out_summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,253 @@
 #!/usr/bin/env python3
-"""Compute summary "trunkiness" metrics from branch-basin-analysis outputs.
+"""Compute summary "trunkiness" metrics of entry-branch sizes for every basin.
 
-Reads files like:
-  data/wikipedia/processed/analysis/branches_n=5_cycle=..._branches_all.tsv
-  data/wikipedia/processed/analysis/branches_n=5_cycle=..._branches_topk.tsv
+A basin's entry branches are the subtrees at its depth-1 nodes. By default
+their sizes come from the Euler-tour intervals (nlink_lib/euler_tour.py), so
+every cycle basin of N is measured at once: branch sizes are sorted per basin
+with one lexsort, and Gini, HH index, entropy and top-k shares are segment
+sums (``np.add.reduceat``) over that one array.
+
+The per-cycle dashboard is a filtered view of that table: the basins that
+branch-basin-analysis.py stored ``branches_all`` tables for under the branches
+tag (results store, nlink_lib/results_store.py), keyed by those tables' cycle
+ids. Stored seeds that are not whole cycles of the decomposition (e.g. a
+fixed cycle pair taken at another N) are measured from their stored tables
+instead and merged in; with --from-branch-tables every row is (for branch
+runs with --max-depth). The same kernel applies either way.
 
 Writes:
+  results store metric ``branch_trunkiness_all``: one row per cycle basin
   data/wikipedia/processed/analysis/branch_trunkiness_dashboard_n=5_<tag>.tsv
+  and the same view as results store metric ``branch_trunkiness_dashboard``
+
+With --rule (nlink_lib/rules.py) the rule key replaces ``n=5`` in the output
+name (e.g. branch_trunkiness_dashboard_mod=7_<tag>.tsv).
 """
 
 from __future__ import annotations
 
 import argparse
-import math
-import re
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
+from nlink_lib.euler_tour import get_euler_tour
+from nlink_lib.link_store import get_link_store
+from nlink_lib.results_store import catalog, cycle_id_from_titles, n_key, query, write_result
+from nlink_lib.rules import Rule, add_rule_argument, rule_from_args
+from nlink_lib.title_index import resolve_ids_to_titles
+
+
+METRIC_COLUMNS = [
+    "total_basin_nodes",
+    "n_branches",
+    "top1_branch_size",
+    "top1_share_total",
+    "top5_share_total",
+    "top10_share_total",
+    "effective_branches",
+    "gini_branch_sizes",
+    "entropy_norm",
+]
+DASHBOARD_COLUMNS = [
+    "cycle_key",
+    "cycle_len",
+    *METRIC_COLUMNS,
+    "dominant_entry_title",
+    "dominant_enters_cycle_title",
+    "dominant_max_depth",
+    "branches_all_path",
+    "branches_tag",
+]
+
+
+def segment_starts(segment: np.ndarray, num_segments: int) -> np.ndarray:
+    """Start offset of each segment id in a segment-sorted array (empty segments included)."""
+
+    return np.searchsorted(segment, np.arange(num_segments)).astype(np.int64)
+
+
+def concentration_metrics(sizes: np.ndarray, starts: np.ndarray, cycle_len: np.ndarray) -> dict[str, np.ndarray]:
+    """Concentration of branch sizes per segment (one segment per basin).
+
+    ``sizes`` holds every basin's branch sizes, each segment sorted descending
+    and starting at ``starts``; ``cycle_len`` counts the cycle nodes, which
+    belong to the basin but to no branch.
+    """
+
+    sizes = np.asarray(sizes, dtype=np.float64)
+    starts = np.asarray(starts, dtype=np.int64)
+    counts = np.diff(np.append(starts, len(sizes)))
+    segment = np.repeat(np.arange(len(starts)), counts)
+    rank = np.arange(len(sizes)) - starts[segment]
+    nonempty = counts > 0
+
+    def segment_sum(values: np.ndarray) -> np.ndarray:
+        out = np.zeros(len(starts))
+        if nonempty.any():
+            # Empty segments share their start with the next one, so only non-empty starts are reduced.
+            out[nonempty] = np.add.reduceat(values, starts[nonempty])
+        return out
+
+    total = segment_sum(sizes)
+    share = np.divide(sizes, total[segment], out=np.zeros_like(sizes), where=total[segment] > 0)
+    hh = segment_sum(share * share)
+    entropy_nats = segment_sum(-share * np.log(share, out=np.zeros_like(share), where=share > 0))
+    # With x sorted descending, ascending rank i = n - rank: sum(i * x) = n * total - sum(rank * x).
+    ranked = segment_sum(rank * sizes)
+    top1 = np.zeros(len(starts))
+    top1[nonempty] = sizes[starts[nonempty]]
+    top5 = segment_sum(np.where(rank < 5, sizes, 0.0))
+    top10 = segment_sum(np.where(rank < 10, sizes, 0.0))
+
+    n = counts.astype(np.float64)
+    basin = total + np.asarray(cycle_len, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # G = (2 * sum(i * x_i)) / (n * sum x_i) - (n + 1) / n
+        gini = np.where(total > 0, (n - 1) / n - 2 * ranked / (n * total), 0.0)
+        return {
+            "total_basin_nodes": basin.astype(np.int64),
+            "n_branches": counts,
+            "top1_branch_size": top1.astype(np.int64),
+            "top1_share_total": np.where(basin > 0, top1 / basin, np.nan),
+            "top5_share_total": np.where(basin > 0, top5 / basin, np.nan),
+            "top10_share_total": np.where(basin > 0, top10 / basin, np.nan),
+            "effective_branches": np.where(hh > 0, 1.0 / hh, np.inf),
+            "gini_branch_sizes": np.where(nonempty, gini, np.nan),
+            "entropy_norm": np.where(counts > 1, entropy_nats / np.log(n), 0.0),
+        }
+
+
+def all_basins_table(rule: Rule) -> pd.DataFrame:
+    """Concentration metrics of every cycle basin of the rule, from the Euler-tour intervals."""
+
+    tour = get_euler_tour(rule)
+    decomp = tour.decomp
+    page_ids = np.asarray(get_link_store().page_ids)
+    cycle_id = np.asarray(decomp.cycle_id)
+    depth = np.asarray(decomp.depth)
+    succ = np.asarray(decomp.succ)
+
+    cycles = decomp.cycle_ids()
+    cycle_len = np.bincount(cycle_id[np.asarray(decomp.on_cycle)], minlength=len(decomp))[cycles]
+
+    # Entries: off-cycle direct predecessors of a cycle; a branch is the subtree at its entry.
+    entries = np.nonzero((depth == 1) & (cycle_id >= 0))[0]
+    segment = np.searchsorted(cycles, cycle_id[entries])
+    sizes = np.asarray(tour.size)[entries].astype(np.int64)
+    # Largest branch first within each basin, ties by page_id (as branch-basin-analysis.py ranks them).
+    order = np.lexsort((page_ids[entries], -sizes, segment))
+    entries, sizes, segment = entries[order], sizes[order], segment[order]
+    starts = segment_starts(segment, len(cycles))
+
+    metrics = concentration_metrics(sizes, starts, cycle_len)
+
+    has_branch = metrics["n_branches"] > 0
+    dominant = entries[starts[has_branch]]
+    dom_starts, dom_ends = tour.slice_bounds(dominant)
+    pre_depth = depth[np.asarray(tour.order)]
+    # max over each [start, end) slice; the sentinel keeps ``end`` a valid reduceat index.
+    bounds = np.column_stack([dom_starts, dom_ends]).ravel()
+    dominant_depth = np.maximum.reduceat(np.append(pre_depth, 0), bounds)[::2] if len(dominant) else np.zeros(0, dtype=np.int64)
+
+    members = [page_ids[decomp.cycle_members(int(c))] for c in cycles]
+    titles = resolve_ids_to_titles(
+        {int(pid) for ids in members for pid in ids} | set(page_ids[dominant].tolist()) | set(page_ids[succ[dominant]].tolist())
+    )
+
+    def title(pid: int) -> str:
+        return titles.get(int(pid), str(int(pid)))
+
+    entry_title = np.full(len(cycles), None, dtype=object)
+    enters_title = np.full(len(cycles), None, dtype=object)
+    max_depth = np.full(len(cycles), pd.NA, dtype=object)
+    entry_title[has_branch] = [title(pid) for pid in page_ids[dominant]]
+    enters_title[has_branch] = [title(pid) for pid in page_ids[succ[dominant]]]
+    max_depth[has_branch] = dominant_depth.tolist()
+
+    table = pd.DataFrame({
+        "cycle_key": [cycle_id_from_titles(title(pid) for pid in ids) for ids in members],
+        "cycle_len": cycle_len,
+        **metrics,
+        "dominant_entry_title": entry_title,
+        "dominant_enters_cycle_title": enters_title,
+        "dominant_max_depth": pd.array(max_depth, dtype="Int64"),
+    })
+    return table.sort_values(["total_basin_nodes", "cycle_key"], ascending=[False, True], ignore_index=True)
+
+
+def stored_branch_cycles(rule: Rule, tag: str | None, store_dir: Path) -> pd.DataFrame:
+    """(tag, cycle_id) of the branches_all tables stored for the rule (all tags when tag is None)."""
+
+    df = catalog(root=store_dir)
+    df = df[(df["metric"] == "branches_all") & (df["n"] == n_key(rule))]
+    if tag is not None:
+        df = df[df["tag"] == tag]
+    return df[["tag", "cycle_id"]].drop_duplicates().sort_values(["tag", "cycle_id"], ignore_index=True)
+
+
+def branches_all_paths(rule: Rule, view: pd.DataFrame, store_dir: Path, analysis_dir: Path) -> list[str | None]:
+    """The branches_all TSV behind each dashboard row, from the catalog's source (None if unrecorded)."""
+
+    df = catalog(root=store_dir)
+    df = df[(df["metric"] == "branches_all") & (df["n"] == n_key(rule))]
+    source = {(tag, cycle): name for tag, cycle, name in zip(df["tag"], df["cycle_id"], df["source"])}
+    names = [source.get((tag, cycle)) for tag, cycle in zip(view["branches_tag"], view["cycle_key"])]
+    return [(analysis_dir / name).as_posix() if name else None for name in names]
+
 
-def gini_coefficient(values: list[int]) -> float:
-    values = [v for v in values if v >= 0]
-    n = len(values)
-    if n == 0:
-        return float("nan")
-    total = sum(values)
-    if total == 0:
-        return 0.0
+def dashboard_view(basins: pd.DataFrame, stored: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Rows of the all-basins table for the stored cycles, keyed by the stored cycle ids.
 
-    values_sorted = sorted(values)
-    cum = 0
-    for i, x in enumerate(values_sorted, start=1):
-        cum += i * x
+    Stored ids list the cycle titles in the order the run gave them, so they
+    are matched to basins as title sets. Returns the view and the stored
+    (tag, cycle_id) pairs that are not whole cycles of the decomposition.
+    """
 
-    # G = (2 * sum(i * x_i)) / (n * sum x_i) - (n + 1) / n
-    return (2 * cum) / (n * total) - (n + 1) / n
+    by_titles = {frozenset(key.split("__")): i for i, key in enumerate(basins["cycle_key"])}
+    rows = [by_titles.get(frozenset(cycle.split("__")), -1) for cycle in stored["cycle_id"]]
+    found = np.asarray(rows, dtype=np.int64) >= 0
+    view = basins.iloc[np.asarray(rows, dtype=np.int64)[found]].reset_index(drop=True)
+    view["cycle_key"] = stored.loc[found, "cycle_id"].to_numpy()
+    view["branches_tag"] = stored.loc[found, "tag"].to_numpy()
+    return view, stored.loc[~found].reset_index(drop=True)
+
+
+def branch_tables_view(rule: Rule, tag: str | None, store_dir: Path, only: pd.DataFrame | None = None) -> pd.DataFrame:
+    """Dashboard rows computed from the stored branch tables themselves.
+
+    ``only`` limits them to the given (tag, cycle_id) pairs.
+    """
+
+    cycle_ids = None if only is None else sorted(set(only["cycle_id"]))
+    branches_all = query("branches_all", n=rule, tag=tag, cycle_id=cycle_ids, columns=["basin_size"], root=store_dir).to_pandas()
+    if only is not None:
+        branches_all = branches_all.merge(only[["tag", "cycle_id"]], on=["tag", "cycle_id"])
+    if branches_all.empty:
+        return pd.DataFrame(columns=DASHBOARD_COLUMNS)
+    grouped = branches_all.groupby(["tag", "cycle_id"], sort=True)
+    segment = grouped.ngroup().to_numpy()
+    keys = grouped.size().reset_index()[["tag", "cycle_id"]]
+    sizes = branches_all["basin_size"].astype("int64").to_numpy()
+    order = np.lexsort((-sizes, segment))
+    cycle_len = keys["cycle_id"].str.count("__").to_numpy() + 1
+    metrics = concentration_metrics(sizes[order], segment_starts(segment[order], len(keys)), cycle_len)
+
+    view = pd.DataFrame({"cycle_key": keys["cycle_id"], "cycle_len": cycle_len, **metrics, "branches_tag": keys["tag"]})
+    topk = query("branches_topk", n=rule, tag=tag, root=store_dir).to_pandas()
+    if topk.empty:
+        return view.assign(dominant_entry_title=None, dominant_enters_cycle_title=None, dominant_max_depth=pd.NA)
+    dominant = topk.sort_values("rank").drop_duplicates(["tag", "cycle_id"])
+    dominant = dominant.rename(columns={
+        "tag": "branches_tag",
+        "cycle_id": "cycle_key",
+        "entry_title": "dominant_entry_title",
+        "enters_cycle_title": "dominant_enters_cycle_title",
+        "max_depth": "dominant_max_depth",
+    })
+    columns = ["branches_tag", "cycle_key", "dominant_entry_title", "dominant_enters_cycle_title", "dominant_max_depth"]
+    return view.merge(dominant[[c for c in columns if c in dominant.columns]], on=["branches_tag", "cycle_key"], how="left")
 
 
 def main() -> int:
@@ -42,12 +255,22 @@ def main() -> int:
     parser.add_argument(
         "--analysis-dir",
         default="data/wikipedia/processed/analysis",
-        help="Directory containing branches_* outputs.",
+        help="Analysis directory (dashboard TSV; the results store is its results/ subdirectory).",
     )
     parser.add_argument(
         "--tag",
         default="bootstrap_2025-12-30",
-        help="Tag used in the output filename.",
+        help="Tag used in the output filename and results store partition.",
+    )
+    parser.add_argument(
+        "--branches-tag",
+        default=None,
+        help="Results store tag of the branch tables that select the dashboard cycles (default: --tag; 'all' = every tag)",
+    )
+    parser.add_argument(
+        "--from-branch-tables",
+        action="store_true",
+        help="Compute from the stored branch tables instead of every basin's Euler-tour intervals",
     )
     parser.add_argument(
         "--n",
@@ -55,84 +278,41 @@ def main() -> int:
         default=5,
         help="N value for N-link rule (default: 5)",
     )
+    add_rule_argument(parser)
     args = parser.parse_args()
+    rule = rule_from_args(args)
 
     analysis_dir = Path(args.analysis_dir)
-    branch_all_paths = sorted(analysis_dir.glob(f"branches_n={args.n}_cycle=*branches_all.tsv"))
-
-    if not branch_all_paths:
-        raise SystemExit(f"No branches_all TSVs found in: {analysis_dir}")
-
-    rows: list[dict[str, object]] = []
-
-    for all_path in branch_all_paths:
-        m = re.match(rf"^branches_n={args.n}_cycle=(.*)_branches_all\.tsv$", all_path.name)
-        cycle_key = m.group(1) if m else all_path.stem
-        cycle_len = len(cycle_key.split("__"))
-
-        df = pd.read_csv(all_path, sep="\t")
-        if "basin_size" not in df.columns:
-            raise SystemExit(f"Unexpected columns in {all_path}: {list(df.columns)}")
-
-        branch_sizes = df["basin_size"].astype("int64").tolist()
-        sum_branches = int(sum(branch_sizes))
-        total_basin_nodes = sum_branches + cycle_len
-
-        top_sorted = sorted(branch_sizes, reverse=True)
-        top1 = int(top_sorted[0]) if top_sorted else 0
-        top5 = int(sum(top_sorted[:5]))
-        top10 = int(sum(top_sorted[:10]))
-
-        p = [s / sum_branches for s in branch_sizes] if sum_branches else []
-        hh = sum(pi * pi for pi in p) if p else 0.0
-        effective_branches = (1.0 / hh) if hh > 0 else float("inf")
-
-        entropy_nats = -sum(pi * math.log(pi) for pi in p if pi > 0)
-        n_branches = len(branch_sizes)
-        entropy_norm = entropy_nats / math.log(n_branches) if n_branches > 1 else 0.0
-
-        gini = gini_coefficient(branch_sizes)
-
-        topk_path = all_path.with_name(all_path.name.replace("_branches_all.tsv", "_branches_topk.tsv"))
-        dominant_entry_title = None
-        dominant_enters_cycle_title = None
-        dominant_max_depth = None
-        if topk_path.exists():
-            topk_df = pd.read_csv(topk_path, sep="\t")
-            if not topk_df.empty:
-                dominant_entry_title = str(topk_df.loc[0].get("entry_title", "")) or None
-                dominant_enters_cycle_title = str(topk_df.loc[0].get("enters_cycle_title", "")) or None
-                if "max_depth" in topk_df.columns:
-                    md = topk_df.iloc[0]["max_depth"]
-                    if md == md:  # NaN check
-                        dominant_max_depth = int(md)
-
-        rows.append(
-            {
-                "cycle_key": cycle_key,
-                "cycle_len": cycle_len,
-                "total_basin_nodes": total_basin_nodes,
-                "n_branches": n_branches,
-                "top1_branch_size": top1,
-                "top1_share_total": top1 / total_basin_nodes if total_basin_nodes else float("nan"),
-                "top5_share_total": top5 / total_basin_nodes if total_basin_nodes else float("nan"),
-                "top10_share_total": top10 / total_basin_nodes if total_basin_nodes else float("nan"),
-                "effective_branches": effective_branches,
-                "gini_branch_sizes": gini,
-                "entropy_norm": entropy_norm,
-                "dominant_entry_title": dominant_entry_title,
-                "dominant_enters_cycle_title": dominant_enters_cycle_title,
-                "dominant_max_depth": dominant_max_depth,
-                "branches_all_path": all_path.as_posix(),
-            }
+    store_dir = analysis_dir / "results"
+    branches_tag = args.branches_tag or args.tag
+    tag_filter = None if branches_tag == "all" else branches_tag
+
+    if args.from_branch_tables:
+        view = branch_tables_view(rule, tag_filter, store_dir)
+    else:
+        basins = all_basins_table(rule)
+        all_path = write_result("branch_trunkiness_all", basins, n=rule, tag=args.tag, root=store_dir)
+        print(f"Wrote: {all_path} ({len(basins):,} basins)")
+        view, partial = dashboard_view(basins, stored_branch_cycles(rule, tag_filter, store_dir))
+        if not partial.empty:
+            print(f"Not whole cycles of the decomposition (measured from their branch tables): {', '.join(partial['cycle_id'])}")
+            view = pd.concat([view, branch_tables_view(rule, tag_filter, store_dir, only=partial)], ignore_index=True)
+    if view.empty:
+        print(
+            f"No branches_all results for {rule.label}, tag={branches_tag} in {store_dir}; writing an empty dashboard "
+            "(run branch-basin-analysis.py --tag, or build-results-store.py to import TSVs)"
         )
+    view["branches_all_path"] = branches_all_paths(rule, view, store_dir, analysis_dir)
+    if tag_filter is None:
+        # Across several tags the tag disambiguates the cycle, as the old file names did.
+        view["cycle_key"] = view["cycle_key"] + "_" + view["branches_tag"]
 
-    out_df = pd.DataFrame(rows).sort_values(
-        ["top1_share_total", "total_basin_nodes"], ascending=[False, False]
-    )
+    out_df = view[DASHBOARD_COLUMNS]
+    out_df = out_df.sort_values(["top1_share_total", "total_basin_nodes"], ascending=[False, False])
 
-    out_path = analysis_dir / f"branch_trunkiness_dashboard_n={args.n}_{args.tag}.tsv"
+    out_path = analysis_dir / f"branch_trunkiness_dashboard_{rule.key}_{args.tag}.tsv"
     out_df.to_csv(out_path, sep="\t", index=False)
+    write_result("branch_trunkiness_dashboard", out_df, n=rule, tag=args.tag, source=out_path.name, root=store_dir)
 
     # Print a small preview.
     preview_cols = [
@@ -1,19 +1,165 @@
 #!/usr/bin/env python3
-"""Aggregate terminals across N to identify universal attractors.
+"""Aggregate terminal cycles across N to identify universal attractors.
 
-Status: Placeholder (intentionally no implementation yet).
+Context
+-------
+The "same 6 cycles across N=3..7" finding was assembled by hand from sampled
+traces. This script reads every cycle at every N from the whole-graph
+decompositions instead, so each attractor's presence, basin size and rank
+are exact at every N.
 
-Planned:
-- Read per-N terminal outputs (from compute-basin-stats.py)
-- Compute terminal frequency across N and rank
-- Optionally join to pages.parquet for titles
+Method
+------
+1. Stack the decompositions for N in --n-range into the (page, N) multiplex
+   (nlink_lib/multiplex.py); its CycleCatalog identifies a cycle across N by
+   its min rotation (members in successor order from the smallest page_id).
+2. Give each cycle a stable 64-bit cycle_key hashed from that rotation
+   (nlink_lib/cycle_registry.py), so results join on an integer instead of
+   labels such as ``Massachusetts__Gulf_of_Maine`` parsed from filenames.
+3. Per N: basin size of every cycle (bincount of per-page terminals), rank by
+   size (1 = largest) and share of all pages.
+4. Upsert cycles and per-(dump, N) basin rows into the persistent registry;
+   write a per-cycle summary (first/last N seen, N count, per-N size and rank).
 
-See: ../implementation.md
+Outputs
+-------
+- analysis/cycle_registry/{cycles,basins}.parquet (see nlink_lib/cycle_registry.py)
+- analysis/universal_attractors.parquet: cycle_key, label, length, n_count,
+  first_n, last_n, total_basin_size, basin_size_n={N}, rank_n={N}
+  (cycles seen at >= --min-n-count N values)
+- analysis/universal_attractors.tsv: the same, top --top-k rows with titles
+
+Usage
+-----
+    python compute-universal-attractors.py --n-range 3 7 [--min-n-count 2] [--dump enwiki-20251220]
 """
 
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from nlink_lib.cycle_registry import CYCLE_REGISTRY_DIR, cycle_keys, update_registry
+from nlink_lib.link_store import get_link_store
+from nlink_lib.multiplex import get_multiplex
+from nlink_lib.paths import ANALYSIS_DIR
+from nlink_lib.title_index import resolve_ids_to_titles
+
 
 def main() -> None:
-    raise NotImplementedError("Placeholder script; implement universal attractor aggregation.")
+    parser = argparse.ArgumentParser(description="Canonical cycle registry and universal attractors across N.")
+    parser.add_argument("--n-range", type=int, nargs=2, metavar=("START", "END"), default=[3, 7], help="N range (inclusive, default: 3 7)")
+    parser.add_argument("--min-n-count", type=int, default=2, help="Summary: keep cycles seen at >= this many N (default: 2)")
+    parser.add_argument("--dump", type=str, default="current", help="Dump label for the registry rows (e.g. enwiki-20251220)")
+    parser.add_argument("--top-k", type=int, default=50, help="Rows in the TSV summary (default: 50)")
+    parser.add_argument("--out", type=str, default=None, help="Summary Parquet path (default: analysis/universal_attractors.parquet)")
+    args = parser.parse_args()
+
+    start, end = int(args.n_range[0]), int(args.n_range[1])
+    if start <= 0 or end < start:
+        raise SystemExit("--n-range must be 1 <= START <= END")
+    n_values = tuple(range(start, end + 1))
+
+    t0 = time.time()
+    mux = get_multiplex(n_values)
+    catalog = mux.catalog
+    page_ids = np.asarray(get_link_store().page_ids)
+    num_cycles = len(catalog)
+    print(f"Cycles over N={start}..{end}: {num_cycles:,} distinct ({time.time() - t0:.1f}s)")
+
+    member_pids = page_ids[catalog.members]
+    keys = cycle_keys(catalog.offsets, member_pids)
+    if len(np.unique(keys)) != num_cycles:
+        raise SystemExit("cycle_key collision between distinct cycles; cannot build the registry")
+
+    # Per-N basin size and rank of every cycle present at that N.
+    sizes = np.zeros((len(n_values), num_cycles), dtype=np.int64)
+    ranks = np.zeros((len(n_values), num_cycles), dtype=np.int32)
+    present = np.zeros((len(n_values), num_cycles), dtype=bool)
+    basin_parts = []
+    for k, n in enumerate(n_values):
+        terminal = mux.terminals(k)
+        sizes[k] = np.bincount(terminal[terminal >= 0], minlength=num_cycles)
+        here = catalog.layer_canonical[k]
+        present[k, here] = True
+        order = here[np.lexsort((keys[here], -sizes[k, here]))]
+        ranks[k, order] = np.arange(1, len(order) + 1, dtype=np.int32)
+        basin_parts.append(
+            pa.table(
+                {
+                    "dump": pa.array([args.dump] * len(order), type=pa.string()),
+                    "n": np.full(len(order), n, dtype=np.int32),
+                    "cycle_key": keys[order],
+                    "basin_size": sizes[k, order],
+                    "rank": ranks[k, order],
+                    "share": sizes[k, order] / max(len(mux), 1),
+                }
+            )
+        )
+        print(f"  N={n}: {len(order):,} cycles, largest basin {int(sizes[k].max(initial=0)):,}")
+
+    titles = resolve_ids_to_titles(np.unique(member_pids).tolist())
+    member_titles = [titles.get(int(pid), str(int(pid))) for pid in member_pids]
+    title_lists = [member_titles[catalog.offsets[i] : catalog.offsets[i + 1]] for i in range(num_cycles)]
+    labels = [" ↔ ".join(t) for t in title_lists]
+    lengths = catalog.cycle_lengths().astype(np.int32)
+    cycles_table = pa.table(
+        {
+            "cycle_key": keys,
+            "length": lengths,
+            "member_page_ids": [member_pids[catalog.offsets[i] : catalog.offsets[i + 1]].tolist() for i in range(num_cycles)],
+            "member_titles": title_lists,
+            "label": labels,
+        }
+    )
+    update_registry(cycles_table, pa.concat_tables(basin_parts))
+    print(f"Updated cycle registry: {CYCLE_REGISTRY_DIR} (dump={args.dump})")
+
+    # Per-cycle summary across N.
+    n_arr = np.asarray(n_values, dtype=np.int32)
+    n_count = present.sum(axis=0)
+    first_n = n_arr[np.argmax(present, axis=0)]
+    last_n = n_arr[len(n_values) - 1 - np.argmax(present[::-1], axis=0)]
+    total = sizes.sum(axis=0)
+    keep = np.nonzero(n_count >= int(args.min_n_count))[0]
+    keep = keep[np.lexsort((-total[keep], -n_count[keep]))]
+
+    columns = {
+        "cycle_key": keys[keep],
+        "label": [labels[i] for i in keep],
+        "length": lengths[keep],
+        "n_count": n_count[keep].astype(np.int32),
+        "first_n": first_n[keep],
+        "last_n": last_n[keep],
+        "total_basin_size": total[keep],
+    }
+    for k, n in enumerate(n_values):
+        columns[f"basin_size_n={n}"] = sizes[k, keep]
+        columns[f"rank_n={n}"] = ranks[k, keep]
+    summary = pa.table(columns)
+
+    out_path = Path(args.out) if args.out else ANALYSIS_DIR / "universal_attractors.parquet"
+    pq.write_table(summary, out_path)
+    print(f"Wrote: {out_path} ({summary.num_rows:,} cycles seen at >= {int(args.min_n_count)} N values)")
+
+    out_tsv = out_path.with_suffix(".tsv")
+    header = [name for name in columns if name != "label"] + ["label"]
+    lines = ["\t".join(header)]
+    for row in summary.slice(0, int(args.top_k)).to_pylist():
+        lines.append("\t".join(str(row[name]) for name in header))
+    out_tsv.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    print(f"Wrote: {out_tsv}")
+
+    for row in summary.slice(0, 10).to_pylist():
+        print(
+            f"  N={row['first_n']}..{row['last_n']} ({row['n_count']}x)  "
+            f"total={row['total_basin_size']:>12,}  {row['label']}"
+        )
 
 
 if __name__ == "__main__":
@@ -11,7 +11,8 @@ I.e. it returns the preimage set:
   f_N^{-1}(target) = { p : f_N(p) = target }
 
 This is the computationally parsimonious way to work *from a cycle*:
-- Counting / listing inbound edges is a single scan.
+- Counting / listing inbound edges is a slice of the full-position reverse
+  link index (nlink_lib/reverse_index.py), for any N or set of N.
 - Building the full basin that feeds a cycle can be done by reverse BFS over
   preimages without enumerating paths.
 
@@ -22,52 +23,23 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 
-import duckdb
-import pyarrow as pa
-
-
-REPO_ROOT = Path(__file__).resolve().parents[2]
-PROCESSED_DIR = REPO_ROOT / "data" / "wikipedia" / "processed"
-NLINK_PATH = PROCESSED_DIR / "nlink_sequences.parquet"
-PAGES_PATH = PROCESSED_DIR / "pages.parquet"
-ANALYSIS_DIR = PROCESSED_DIR / "analysis"
-
-
-def _resolve_titles_to_ids(
-    titles: list[str],
-    *,
-    namespace: int,
-    allow_redirects: bool,
-) -> dict[str, int]:
-    if not titles:
-        return {}
-    if not PAGES_PATH.exists():
-        raise FileNotFoundError(f"Missing: {PAGES_PATH}")
-
-    title_tbl = pa.table({"title": pa.array(titles, type=pa.string())})
-
-    con = duckdb.connect()
-    con.register("wanted_titles", title_tbl)
-    redirect_clause = "" if allow_redirects else "AND p.is_redirect = FALSE"
-    rows = con.execute(
-        f"""
-        SELECT w.title, min(p.page_id) AS page_id
-        FROM wanted_titles w
-        JOIN read_parquet('{PAGES_PATH.as_posix()}') p
-          ON p.title = w.title
-        WHERE p.namespace = {int(namespace)}
-          {redirect_clause}
-        GROUP BY w.title
-        """.strip()
-    ).fetchall()
-    con.close()
-
-    return {str(t): int(pid) for t, pid in rows}
+import numpy as np
+
+from nlink_lib.paths import ANALYSIS_DIR, NLINK_PATH
+from nlink_lib.reverse_index import get_reverse_index
+from nlink_lib.title_index import resolve_ids_to_titles, resolve_titles_to_ids
+from nlink_lib.title_search import describe_missing_titles
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Find pages whose Nth link points to a target page (preimages under f_N).")
     parser.add_argument("--n", type=int, default=5, help="N for the fixed N-link rule (default: 5)")
+    parser.add_argument(
+        "--n-values",
+        type=str,
+        default=None,
+        help="Comma-separated set of N values (e.g. 3,5,7); overrides --n and adds an 'n' output column",
+    )
     parser.add_argument(
         "--target-page-id",
         type=int,
@@ -113,118 +85,88 @@ def main() -> None:
 
     args = parser.parse_args()
 
-    if args.n <= 0:
+    n_values = sorted({int(x) for x in args.n_values.split(",")}) if args.n_values else [int(args.n)]
+    if any(n <= 0 for n in n_values):
         raise SystemExit("--n must be >= 1")
     if not NLINK_PATH.exists():
         raise FileNotFoundError(f"Missing: {NLINK_PATH}")
 
-    title_to_id = _resolve_titles_to_ids(
+    title_to_id = resolve_titles_to_ids(
         args.target_title,
         namespace=int(args.namespace),
         allow_redirects=bool(args.allow_redirects),
     )
     missing_titles = [t for t in args.target_title if t not in title_to_id]
     if missing_titles:
-        raise SystemExit(f"Could not resolve titles to page_id (exact match failed): {missing_titles}")
+        raise SystemExit(describe_missing_titles(missing_titles, namespace=int(args.namespace)))
 
     target_ids = list(dict.fromkeys([*map(int, args.target_page_id), *title_to_id.values()]))
     if not target_ids:
         raise SystemExit("Provide at least one --target-page-id or --target-title")
 
-    targets_tbl = pa.table({"target_id": pa.array(target_ids, type=pa.int64())})
-
-    con = duckdb.connect()
-    con.register("targets", targets_tbl)
-
-    # Compute true preimage counts (no LIMIT).
-    counts_rows = con.execute(
-        f"""
-        WITH edges AS (
-            SELECT
-                page_id::BIGINT AS src_page_id,
-                list_extract(link_sequence, {int(args.n)})::BIGINT AS dst_page_id
-            FROM read_parquet('{NLINK_PATH.as_posix()}')
-        )
-        SELECT
-            t.target_id AS target_page_id,
-            COUNT(*)::BIGINT AS preimage_count
-        FROM edges e
-        JOIN targets t
-          ON e.dst_page_id = t.target_id
-        GROUP BY t.target_id
-        """.strip()
-    ).fetchall()
-    counts: dict[int, int] = {tid: 0 for tid in target_ids}
-    for tid, cnt in counts_rows:
-        counts[int(tid)] = int(cnt)
-
-    # Fetch (optionally limited) source rows for output.
+    rev = get_reverse_index()
+    store = rev.store
+    sorted_targets = sorted(target_ids)
+    dense_targets = store.dense_ids(sorted_targets)
+    known = dense_targets >= 0
+
+    t_dense, n_col, s_dense = rev.preimages_batch(dense_targets[known], n_values)
+
+    # True preimage counts (no limit), per (target, N).
+    counts: dict[tuple[int, int], int] = {(tid, n): 0 for tid in target_ids for n in n_values}
+    for n in n_values:
+        for tid, cnt in zip(np.asarray(sorted_targets)[known], rev.preimage_count(dense_targets[known], n)):
+            counts[(int(tid), n)] = int(cnt)
+
+    # (Optionally limited) source rows for output: rank within each (target, N) run.
     limit_n = int(args.limit) if args.limit and int(args.limit) > 0 else 0
-    rows = con.execute(
-        f"""
-        WITH edges AS (
-            SELECT
-                page_id::BIGINT AS src_page_id,
-                list_extract(link_sequence, {int(args.n)})::BIGINT AS dst_page_id
-            FROM read_parquet('{NLINK_PATH.as_posix()}')
-        ), matched AS (
-            SELECT
-                t.target_id AS target_page_id,
-                e.src_page_id AS src_page_id,
-                row_number() OVER (PARTITION BY t.target_id ORDER BY e.src_page_id) AS rn
-            FROM edges e
-            JOIN targets t
-              ON e.dst_page_id = t.target_id
-        )
-        SELECT target_page_id, src_page_id
-        FROM matched
-        {f"WHERE rn <= {limit_n}" if limit_n else ""}
-        ORDER BY target_page_id, src_page_id
-        """.strip()
-    ).fetchall()
-
-    src_ids = [int(src) for _t, src in rows]
+    if limit_n and len(s_dense):
+        run_start = np.r_[True, (t_dense[1:] != t_dense[:-1]) | (n_col[1:] != n_col[:-1])]
+        run_id = np.cumsum(run_start) - 1
+        first_row = np.nonzero(run_start)[0]
+        keep = (np.arange(len(s_dense)) - first_row[run_id]) < limit_n
+        t_dense, n_col, s_dense = t_dense[keep], n_col[keep], s_dense[keep]
+
+    page_ids = np.asarray(store.page_ids)
+    rows = list(zip(page_ids[t_dense].tolist(), n_col.tolist(), page_ids[s_dense].tolist()))
+
+    src_ids = [int(src) for _t, _n, src in rows]
 
     src_titles: dict[int, str] = {}
-    if args.resolve_source_titles and src_ids and PAGES_PATH.exists():
-        src_tbl = pa.table({"page_id": pa.array(sorted(set(src_ids)), type=pa.int64())})
-        con.register("src_ids", src_tbl)
-        title_rows = con.execute(
-            f"""
-            SELECT p.page_id, p.title
-            FROM read_parquet('{PAGES_PATH.as_posix()}') p
-            JOIN src_ids s USING (page_id)
-            """.strip()
-        ).fetchall()
-        src_titles = {int(pid): str(title) for pid, title in title_rows}
-
-    con.close()
+    if args.resolve_source_titles and src_ids:
+        src_titles = resolve_ids_to_titles(src_ids)
 
     # Write output.
     ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
-    out_path = Path(args.out) if args.out else (ANALYSIS_DIR / f"preimages_n={int(args.n)}.tsv")
+    n_tag = ",".join(str(n) for n in n_values)
+    out_path = Path(args.out) if args.out else (ANALYSIS_DIR / f"preimages_n={n_tag}.tsv")
 
-    header_cols = ["target_page_id", "src_page_id"]
+    multi_n = len(n_values) > 1
+    header_cols = ["target_page_id", "n", "src_page_id"] if multi_n else ["target_page_id", "src_page_id"]
     if args.resolve_source_titles:
         header_cols.append("src_title")
 
     lines = ["\t".join(header_cols)]
-    for t, src in rows:
+    for t, n, src in rows:
+        cols = [str(int(t)), str(int(n)), str(int(src))] if multi_n else [str(int(t)), str(int(src))]
         if args.resolve_source_titles:
-            lines.append(f"{int(t)}\t{int(src)}\t{src_titles.get(int(src), '<unknown>')}")
-        else:
-            lines.append(f"{int(t)}\t{int(src)}")
+            cols.append(src_titles.get(int(src), "<unknown>"))
+        lines.append("\t".join(cols))
 
     out_path.write_text("\n".join(lines), encoding="utf-8")
 
     print("=== Preimages under f_N ===")
-    print(f"N={int(args.n)}")
+    print(f"N={n_tag}")
     print(f"Targets: {target_ids}")
     if title_to_id:
         print(f"Resolved titles: {title_to_id}")
     print("Counts (in-degree under f_N):")
     for tid in target_ids:
-        print(f"  {tid}: {counts.get(tid, 0)}")
+        if multi_n:
+            per_n = ", ".join(f"N={n}: {counts[(tid, n)]}" for n in n_values)
+            print(f"  {tid}: {per_n}")
+        else:
+            print(f"  {tid}: {counts[(tid, n_values[0])]}")
     if limit_n:
         print(f"Returned rows per target were limited to {limit_n} (counts above are still full counts).")
     print(f"Saved TSV: {out_path}")
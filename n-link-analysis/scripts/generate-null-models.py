@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Generate an ensemble of degree-preserving null graphs and compare basin statistics.
+
+Context
+-------
+future.md: "Percolation model development (predict basin mass from degree
+distribution + N)". To tell structure from chance, every basin statistic of
+the real graph needs a randomized baseline with the same degree sequence.
+
+Method
+------
+1. For each --model and each seed in seed0 .. seed0 + --ensemble - 1, redraw
+   the link targets of the CSR link store with the exact out-degree sequence
+   kept (nlink_lib/null_models.py: uniform, in_degree, shuffle) and write the
+   graph in link-store format under analysis/null_models/{model}_seed={seed}/.
+2. Decompose each null graph at every N in --n-values (or --rule) into the
+   same directory (analysis-directory layout, so ``NLINK_ANALYSIS_DIR=<dir>``
+   runs the library-backed tools on it unchanged).
+3. Per (model, rule): mean / std of each basin statistic over the ensemble and
+   the z-score of the real graph's value.
+
+Ensemble members run in parallel worker processes (--jobs, default from
+cores and available memory).
+
+Outputs
+-------
+- analysis/null_models/{model}_seed={seed}/ (link_store/, decomposition/n={N}/,
+  nlink_sequences.parquet with --write-parquet)
+- analysis/null_model_ensemble_{tag}.parquet: model, seed, rule, one column per
+  statistic (model "observed", seed -1 for the real graph)
+- analysis/null_model_comparison_{tag}.tsv: model, rule, metric, observed,
+  null_mean, null_std, z
+
+Usage
+-----
+    python generate-null-models.py --model in_degree --model shuffle --ensemble 20 --n-values 3 4 5 6 7
+    NLINK_ANALYSIS_DIR=data/wikipedia/processed/analysis/null_models/in_degree_seed=0 \\
+        python compute-basin-flow-matrix.py --n-values 3 5 --tag null_in_degree_0
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from nlink_lib.cycle_pool import available_memory_bytes
+from nlink_lib.decomposition import get_decomposition
+from nlink_lib.link_store import get_link_store
+from nlink_lib.null_models import MODELS, basin_summary, decompose_null_model, generate_null_model, null_model_dir
+from nlink_lib.rules import Rule, parse_rule
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+PROCESSED_DIR = REPO_ROOT / "data" / "wikipedia" / "processed"
+ANALYSIS_DIR = PROCESSED_DIR / "analysis"
+
+# Per-worker memory: new targets (int32) + shuffle/swap temporaries per link,
+# decomposition arrays and BFS temporaries per node.
+BYTES_PER_LINK = 12
+BYTES_PER_NODE = 64
+
+
+def _default_jobs(members: int) -> int:
+    store = get_link_store()
+    cpus = os.cpu_count() or 1
+    mem = available_memory_bytes()
+    per_job = BYTES_PER_LINK * store.num_edges + BYTES_PER_NODE * len(store)
+    by_mem = cpus if mem is None else int(mem // max(per_job, 1))
+    return max(1, min(cpus, members, by_mem))
+
+
+def _run_member(model: str, seed: int, rules: list[Rule], write_parquet: bool, force: bool) -> list[dict]:
+    t0 = time.time()
+    out_dir = null_model_dir(model, seed)
+    if force or not (out_dir / "link_store" / "manifest.json").exists():
+        generate_null_model(get_link_store(), model, seed, out_dir=out_dir, write_parquet=write_parquet)
+    rows = []
+    for rule in rules:
+        stats = basin_summary(decompose_null_model(out_dir, rule))
+        rows.append({"model": model, "seed": int(seed), "rule": rule.key, **stats})
+    for row in rows:
+        row["seconds"] = time.time() - t0
+    return rows
+
+
+def _comparison_lines(table: pa.Table, metrics: list[str]) -> list[str]:
+    df = table.to_pandas()
+    lines = ["model\trule\tmetric\tobserved\tnull_mean\tnull_std\tz"]
+    observed = df[df["model"] == "observed"].set_index("rule")
+    for (model, rule), group in df[df["model"] != "observed"].groupby(["model", "rule"], sort=True):
+        for metric in metrics:
+            values = group[metric].to_numpy(dtype=float)
+            obs = float(observed.loc[rule, metric])
+            mean = float(values.mean())
+            std = float(values.std(ddof=1)) if len(values) > 1 else 0.0
+            z = (obs - mean) / std if std > 0 else float("nan")
+            lines.append(f"{model}\t{rule}\t{metric}\t{obs:.6g}\t{mean:.6g}\t{std:.6g}\t{z:.3f}")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Degree-preserving null-model ensemble and basin-statistic comparison.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("--model", choices=MODELS, action="append", default=[], help="Null model (repeatable; default: in_degree)")
+    parser.add_argument("--ensemble", type=int, default=20, help="Graphs per model (default: 20)")
+    parser.add_argument("--seed0", type=int, default=0, help="First seed (default: 0)")
+    parser.add_argument("--n-values", type=int, nargs="+", default=[5], help="N values to decompose (default: 5)")
+    parser.add_argument("--rule", type=str, action="append", default=[], help="Traversal rule to decompose (repeatable, adds to --n-values)")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: from cores and available memory)")
+    parser.add_argument("--write-parquet", action="store_true", help="Also write each null graph as nlink_sequences.parquet")
+    parser.add_argument("--force", action="store_true", help="Regenerate graphs that already exist")
+    parser.add_argument("--tag", type=str, default="null", help="Output file tag (default: null)")
+    args = parser.parse_args()
+
+    models = list(dict.fromkeys(args.model or ["in_degree"]))
+    if args.ensemble <= 0:
+        raise SystemExit("--ensemble must be >= 1")
+    if any(n <= 0 for n in args.n_values):
+        raise SystemExit("--n-values must be >= 1")
+    try:
+        rules = list(dict.fromkeys(parse_rule(spec) for spec in [*args.n_values, *args.rule]))
+    except ValueError as e:
+        raise SystemExit(str(e)) from None
+
+    members = [(model, int(args.seed0) + i) for model in models for i in range(int(args.ensemble))]
+    jobs = int(args.jobs or _default_jobs(len(members)))
+    store = get_link_store()
+
+    print(f"\n{'='*60}")
+    print(f"Null models: {', '.join(models)} x {args.ensemble} seeds, rules {[r.key for r in rules]}")
+    print(f"Graph: {len(store):,} nodes, {store.num_edges:,} links; workers: {jobs}")
+    print(f"{'='*60}")
+
+    t0 = time.time()
+    rows = []
+    for rule in rules:
+        rows.append({"model": "observed", "seed": -1, "rule": rule.key, **basin_summary(get_decomposition(rule)), "seconds": 0.0})
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(_run_member, model, seed, rules, bool(args.write_parquet), bool(args.force)): (model, seed)
+            for model, seed in members
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            model, seed = futures[future]
+            member_rows = future.result()
+            rows.extend(member_rows)
+            largest = ", ".join(f"{r['rule']}: {r['largest_basin_share']:.2%}" for r in member_rows)
+            print(f"  [{done}/{len(members)}] {model} seed={seed} largest basin {largest} ({member_rows[-1]['seconds']:.1f}s)")
+    print(f"Ensemble done in {time.time() - t0:.1f}s")
+
+    metrics = [k for k in rows[0] if k not in ("model", "seed", "rule", "seconds")]
+    table = pa.Table.from_pylist(rows).sort_by([("model", "ascending"), ("rule", "ascending"), ("seed", "ascending")])
+    ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
+    out_parquet = ANALYSIS_DIR / f"null_model_ensemble_{args.tag}.parquet"
+    pq.write_table(table, out_parquet)
+    print(f"Wrote: {out_parquet}")
+
+    lines = _comparison_lines(table, metrics)
+    out_tsv = ANALYSIS_DIR / f"null_model_comparison_{args.tag}.tsv"
+    out_tsv.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    print(f"Wrote: {out_tsv}")
+
+    for line in lines[1:]:
+        model, rule, metric, obs, mean, std, z = line.split("\t")
+        if metric in ("largest_basin_share", "cycles", "halt_share"):
+            print(f"  {model:<10} {rule:<8} {metric:<20} observed={obs:<10} null={mean} ± {std}  z={z}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Generate a synthetic Wikipedia-like dataset for benchmarking without the dump.
+
+Context
+-------
+Every script here reads the processed enwiki files, which take the full dump
+and hours of parsing to build. Performance work (and anyone without the dump)
+needs inputs of controlled size whose answers are known in advance.
+
+Method
+------
+nlink_lib/synthetic_wiki.py builds --pages content pages plus redirects,
+double redirects, disambiguation pages and other-namespace pages, with
+power-law out-degrees (--mean-links, --out-exponent) and power-law link
+target weights (--in-exponent). --cycles cycles are planted at --plant-n with
+basins of known size (--basin-share of the content pages for the largest,
+x --basin-decay for each further one); the first nine 2-cycles carry the
+titles of the harness's known cycles. Link sequences are generated in blocks
+from seeded RNG streams, so the same --seed gives the same files at any size.
+
+With --dumps the page / redirect / page_props SQL dumps and a
+pages-articles XML dump (--xml-parts files) are written as well; running the
+data pipeline on them reproduces nlink_sequences.parquet exactly.
+
+With --verify the planted basins are recomputed from the written
+nlink_sequences.parquet (reverse BFS at --plant-n) and checked against the
+truth file.
+
+Outputs
+-------
+Under --out-dir (default: data/synthetic/pages={P}_seed={S}/):
+- processed/pages.parquet, redirects.parquet, disambig_pages.parquet,
+  nlink_sequences.parquet (the data pipeline's schemas)
+- processed/synthetic_truth.json: parameters, counts, planted cycles
+  (titles, page_ids, n, basin_size)
+- processed/synthetic_planted_basins.parquet: page_id, cycle
+- raw/enwiki-20251220-{page,redirect,page_props}.sql and
+  raw/enwiki-20251220-pages-articles-multistream{k}.xml (with --dumps)
+
+The layout mirrors data/wikipedia/, so ``--out-dir data/wikipedia`` (on a
+machine without the real data) lets every tool run on the synthetic graph.
+
+Usage
+-----
+    python generate-synthetic-wiki.py --pages 100000 --verify
+    python generate-synthetic-wiki.py --pages 10000000 --seed 1 --mean-links 30
+    python generate-synthetic-wiki.py --pages 20000 --dumps --xml-parts 2 --out-dir /tmp/synth
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from nlink_lib.synthetic_wiki import (
+    DUMP_DATE,
+    SyntheticSpec,
+    build_wiki,
+    dataset_dir,
+    measure_planted_basins,
+    write_processed,
+    write_sql_dumps,
+    write_xml_dump,
+)
+
+PROCESSED_FILES = (
+    "pages.parquet",
+    "redirects.parquet",
+    "disambig_pages.parquet",
+    "nlink_sequences.parquet",
+    "synthetic_truth.json",
+    "synthetic_planted_basins.parquet",
+)
+
+
+def _planted_cycles(processed_dir: Path) -> list[dict]:
+    return json.loads((processed_dir / "synthetic_truth.json").read_text(encoding="utf-8"))["planted_cycles"]
+
+
+def main() -> None:
+    defaults = SyntheticSpec()
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic Wikipedia-like dataset with planted N-link cycles.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("--pages", type=int, default=defaults.pages, help=f"Content pages (default: {defaults.pages:,})")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help=f"Random seed (default: {defaults.seed})")
+    parser.add_argument("--mean-links", type=float, default=defaults.mean_links, help=f"Mean links per content page (default: {defaults.mean_links:g})")
+    parser.add_argument("--out-exponent", type=float, default=defaults.out_exponent, help=f"Out-degree power-law exponent (default: {defaults.out_exponent:g})")
+    parser.add_argument("--in-exponent", type=float, default=defaults.in_exponent, help=f"Link-target weight exponent (default: {defaults.in_exponent:g})")
+    parser.add_argument("--max-links", type=int, default=defaults.max_links, help=f"Out-degree cap (default: {defaults.max_links})")
+    parser.add_argument("--redirect-ratio", type=float, default=defaults.redirect_ratio, help=f"Redirects per content page (default: {defaults.redirect_ratio:g})")
+    parser.add_argument("--chain-fraction", type=float, default=defaults.chain_fraction, help=f"Share of double redirects (default: {defaults.chain_fraction:g})")
+    parser.add_argument("--disambig-fraction", type=float, default=defaults.disambig_fraction, help=f"Share of disambiguation pages (default: {defaults.disambig_fraction:g})")
+    parser.add_argument("--cycles", type=int, default=defaults.cycles, help=f"Planted cycles (default: {defaults.cycles})")
+    parser.add_argument("--cycle-length", type=int, default=defaults.cycle_length, help=f"Pages per planted cycle (default: {defaults.cycle_length})")
+    parser.add_argument("--plant-n", type=int, default=defaults.plant_n, help=f"N the cycles are planted at (default: {defaults.plant_n})")
+    parser.add_argument("--basin-share", type=float, default=defaults.basin_share, help=f"Largest planted basin as a share of content pages (default: {defaults.basin_share:g})")
+    parser.add_argument("--basin-decay", type=float, default=defaults.basin_decay, help=f"Size ratio between consecutive planted basins (default: {defaults.basin_decay:g})")
+    parser.add_argument("--out-dir", type=Path, default=None, help="Dataset root with raw/ and processed/ (default: data/synthetic/pages={P}_seed={S})")
+    parser.add_argument("--dumps", action="store_true", help="Also write the SQL and XML dumps the data pipeline parses")
+    parser.add_argument("--xml-parts", type=int, default=1, help="XML dump files with --dumps (default: 1)")
+    parser.add_argument("--verify", action="store_true", help="Recompute the planted basins from the written files")
+    parser.add_argument("--force", action="store_true", help="Overwrite existing files")
+    args = parser.parse_args()
+
+    spec = SyntheticSpec(
+        pages=args.pages,
+        seed=args.seed,
+        mean_links=args.mean_links,
+        out_exponent=args.out_exponent,
+        in_exponent=args.in_exponent,
+        max_links=args.max_links,
+        redirect_ratio=args.redirect_ratio,
+        chain_fraction=args.chain_fraction,
+        disambig_fraction=args.disambig_fraction,
+        cycles=args.cycles,
+        cycle_length=args.cycle_length,
+        plant_n=args.plant_n,
+        basin_share=args.basin_share,
+        basin_decay=args.basin_decay,
+    )
+    try:
+        spec.validate()
+    except ValueError as e:
+        raise SystemExit(str(e)) from None
+    if args.xml_parts <= 0:
+        raise SystemExit("--xml-parts must be >= 1")
+
+    out_dir = (args.out_dir or dataset_dir(spec)).resolve()
+    processed_dir = out_dir / "processed"
+    raw_dir = out_dir / "raw"
+    existing = [processed_dir / name for name in PROCESSED_FILES if (processed_dir / name).exists()]
+    if args.dumps:
+        existing += sorted(raw_dir.glob(f"enwiki-{DUMP_DATE}-*"))
+    if existing and not args.force:
+        raise SystemExit(f"{existing[0]} exists (and {len(existing) - 1} more); use --force to overwrite")
+
+    print(f"\n{'='*60}")
+    print(f"Synthetic wiki: {spec.pages:,} content pages, seed {spec.seed}, {spec.cycles} cycles planted at N={spec.plant_n}")
+    print(f"Output: {out_dir}")
+    print(f"{'='*60}")
+
+    t0 = time.time()
+    try:
+        wiki = build_wiki(spec)
+    except ValueError as e:
+        raise SystemExit(str(e)) from None
+    counts = write_processed(wiki, processed_dir)
+    for key, value in counts.items():
+        print(f"  {key:<16} {value:>14,}")
+
+    if args.dumps:
+        t1 = time.time()
+        paths = write_sql_dumps(wiki, raw_dir) + write_xml_dump(wiki, raw_dir, parts=args.xml_parts)
+        size = sum(p.stat().st_size for p in paths)
+        print(f"Wrote {len(paths)} dump files to {raw_dir} ({size / 1024**2:,.1f} MB) in {time.time() - t1:.1f}s")
+
+    print("\nPlanted cycles:")
+    for cycle in _planted_cycles(processed_dir):
+        print(f"  {' -> '.join(cycle['titles']):<50} N={cycle['n']} basin={cycle['basin_size']:,}")
+
+    if args.verify:
+        t1 = time.time()
+        measured = measure_planted_basins(processed_dir)
+        expected = [c["basin_size"] for c in _planted_cycles(processed_dir)]
+        bad = [(i, e, m) for i, (e, m) in enumerate(zip(expected, measured)) if e != m]
+        print(f"\nVerify ({time.time() - t1:.1f}s): {len(expected) - len(bad)}/{len(expected)} planted basins match")
+        if bad:
+            for i, e, m in bad:
+                print(f"  cycle {i}: expected {e:,}, measured {m:,}")
+            raise SystemExit(1)
+
+    print(f"\nDone in {time.time() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
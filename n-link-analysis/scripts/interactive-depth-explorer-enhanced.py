@@ -19,22 +19,20 @@ import dash
 from dash import dcc, html, Input, Output, State, dash_table
 import dash_bootstrap_components as dbc
 
+from nlink_lib.results_store import query
+
 # ============================================================================
 # Data Loading
 # ============================================================================
 
 ANALYSIS_DIR = Path("data/wikipedia/processed/analysis")
+RESULTS_DIR = ANALYSIS_DIR / "results"
+N_VALUES = [3, 4, 5, 6, 7]
 
 def load_all_data():
-    """Load all entry breadth data files with max_depth."""
-    all_data = []
-    for n in [3, 4, 5, 6, 7]:
-        file_path = ANALYSIS_DIR / f"entry_breadth_n={n}_full_analysis_2025_12_31.tsv"
-        if file_path.exists():
-            df = pd.read_csv(file_path, sep="\t")
-            all_data.append(df)
-
-    data = pd.concat(all_data, ignore_index=True)
+    """Load entry breadth results (with max_depth) for all N values in one query."""
+    data = query("entry_breadth", n=N_VALUES, tag="full_analysis_2025_12_31", root=RESULTS_DIR).to_pandas()
+    data["n"] = data["n"].astype(int)
 
     # Add computed columns
     data['log_depth'] = np.log10(data['max_depth'])
@@ -45,12 +43,11 @@ def load_all_data():
 
 def load_depth_distributions():
     """Load depth distribution data for all N values."""
-    distributions = {}
-    for n in [3, 4, 5, 6, 7]:
-        file_path = ANALYSIS_DIR / f"path_characteristics_n={n}_mechanism_depth_distributions.tsv"
-        if file_path.exists():
-            distributions[n] = pd.read_csv(file_path, sep="\t")
-    return distributions
+    table = query("path_characteristics_depth_distributions", n=N_VALUES, tag="mechanism", root=RESULTS_DIR).to_pandas()
+    return {
+        int(n): df.drop(columns=["n", "tag", "cycle_id"]).sort_values("depth").reset_index(drop=True)
+        for n, df in table.groupby("n")
+    }
 
 def load_depth_statistics():
     """Load precomputed depth statistics."""
@@ -59,13 +56,20 @@ def load_depth_statistics():
         return pd.read_csv(file_path, sep="\t")
     return None
 
-# Load data
-print("Loading data...")
-data = load_all_data()
-distributions = load_depth_distributions()
-stats = load_depth_statistics()
-print(f"Loaded {len(data)} data points from {data['cycle_label'].nunique()} cycles")
-print(f"Loaded distributions for N={list(distributions.keys())}")
+# Filled in by load_data() when the app starts, not at import time
+data = None
+distributions = None
+stats = None
+
+def load_data():
+    """Load the explorer's data into the module globals the callbacks read."""
+    global data, distributions, stats
+    print("Loading data...")
+    data = load_all_data()
+    distributions = load_depth_distributions()
+    stats = load_depth_statistics()
+    print(f"Loaded {len(data)} data points from {data['cycle_label'].nunique()} cycles")
+    print(f"Loaded distributions for N={list(distributions.keys())}")
 
 # ============================================================================
 # Dash App Setup
@@ -173,64 +177,68 @@ def create_statistics_table():
 # Layout
 # ============================================================================
 
-app.layout = dbc.Container([
-    create_header(),
+def serve_layout():
+    """Page layout; built per page load, after load_data()."""
+    return dbc.Container([
+        create_header(),
 
-    dbc.Row([
-        # Left column: Controls
-        dbc.Col([
-            create_controls(),
+        dbc.Row([
+            # Left column: Controls
+            dbc.Col([
+                create_controls(),
 
-            # Statistics summary card
-            dbc.Card([
-                dbc.CardHeader(html.H5("Quick Stats")),
-                dbc.CardBody([
-                    html.Div(id='quick-stats')
+                # Statistics summary card
+                dbc.Card([
+                    dbc.CardHeader(html.H5("Quick Stats")),
+                    dbc.CardBody([
+                        html.Div(id='quick-stats')
+                    ])
                 ])
-            ])
-        ], width=3),
-
-        # Right column: Visualizations
-        dbc.Col([
-            # Tab interface
-            dbc.Tabs([
-                # Tab 1: Depth Distributions
-                dbc.Tab([
-                    dcc.Graph(id='distribution-plot', style={'height': '600px'})
-                ], label="Depth Distributions", tab_id="tab-dist"),
-
-                # Tab 2: Basin Mass vs Depth
-                dbc.Tab([
-                    dcc.Graph(id='basin-mass-plot', style={'height': '600px'})
-                ], label="Basin Mass Analysis", tab_id="tab-mass"),
-
-                # Tab 3: Variance & Skewness
-                dbc.Tab([
-                    dcc.Graph(id='variance-skewness-plot', style={'height': '600px'})
-                ], label="Variance & Skewness", tab_id="tab-variance"),
-
-                # Tab 4: Statistics Table
-                dbc.Tab([
-                    html.Div([
-                        html.H5("Depth Statistics by N", className="mt-3 mb-3"),
-                        create_statistics_table(),
+            ], width=3),
+
+            # Right column: Visualizations
+            dbc.Col([
+                # Tab interface
+                dbc.Tabs([
+                    # Tab 1: Depth Distributions
+                    dbc.Tab([
+                        dcc.Graph(id='distribution-plot', style={'height': '600px'})
+                    ], label="Depth Distributions", tab_id="tab-dist"),
+
+                    # Tab 2: Basin Mass vs Depth
+                    dbc.Tab([
+                        dcc.Graph(id='basin-mass-plot', style={'height': '600px'})
+                    ], label="Basin Mass Analysis", tab_id="tab-mass"),
+
+                    # Tab 3: Variance & Skewness
+                    dbc.Tab([
+                        dcc.Graph(id='variance-skewness-plot', style={'height': '600px'})
+                    ], label="Variance & Skewness", tab_id="tab-variance"),
+
+                    # Tab 4: Statistics Table
+                    dbc.Tab([
                         html.Div([
-                            html.Hr(),
-                            html.H6("Key Insights:", className="mt-3"),
-                            html.Ul([
-                                html.Li("N=5 has highest variance (σ²=473) and skewness (1.88)"),
-                                html.Li("N=5 mean depth is 1.43× deeper than N=4"),
-                                html.Li("N=5 p90/median ratio is 5.3× (strongest tail)"),
-                                html.Li("N=7 has highest mean depth (24.7) but lower basin mass"),
+                            html.H5("Depth Statistics by N", className="mt-3 mb-3"),
+                            create_statistics_table(),
+                            html.Div([
+                                html.Hr(),
+                                html.H6("Key Insights:", className="mt-3"),
+                                html.Ul([
+                                    html.Li("N=5 has highest variance (σ²=473) and skewness (1.88)"),
+                                    html.Li("N=5 mean depth is 1.43× deeper than N=4"),
+                                    html.Li("N=5 p90/median ratio is 5.3× (strongest tail)"),
+                                    html.Li("N=7 has highest mean depth (24.7) but lower basin mass"),
+                                ])
                             ])
                         ])
-                    ])
-                ], label="Statistics Table", tab_id="tab-table"),
-            ], id='tabs', active_tab='tab-dist')
-        ], width=9)
-    ]),
+                    ], label="Statistics Table", tab_id="tab-table"),
+                ], id='tabs', active_tab='tab-dist')
+            ], width=9)
+        ]),
+
+    ], fluid=True)
 
-], fluid=True)
+app.layout = serve_layout
 
 # ============================================================================
 # Callbacks
@@ -616,4 +624,5 @@ if __name__ == '__main__':
     print("\nPress Ctrl+C to stop the server")
     print("="*80 + "\n")
 
+    load_data()
     app.run(debug=True, host='127.0.0.1', port=8051)
@@ -24,6 +24,8 @@ import dash
 from dash import dcc, html, Input, Output, State
 import dash_bootstrap_components as dbc
 
+from nlink_lib.results_store import query
+
 # ============================================================================
 # Data Loading
 # ============================================================================
@@ -31,14 +33,11 @@ import dash_bootstrap_components as dbc
 ANALYSIS_DIR = Path("data/wikipedia/processed/analysis")
 
 def load_all_data():
-    """Load all entry breadth data files with max_depth."""
-    all_data = []
-    for n in [3, 4, 5, 6, 7]:
-        file_path = ANALYSIS_DIR / f"entry_breadth_n={n}_full_analysis_2025_12_31.tsv"
-        df = pd.read_csv(file_path, sep="\t")
-        all_data.append(df)
-
-    data = pd.concat(all_data, ignore_index=True)
+    """Load entry breadth results (with max_depth) for all N values in one query."""
+    data = query(
+        "entry_breadth", n=[3, 4, 5, 6, 7], tag="full_analysis_2025_12_31", root=ANALYSIS_DIR / "results"
+    ).to_pandas()
+    data["n"] = data["n"].astype(int)
 
     # Add computed columns
     data['log_depth'] = np.log10(data['max_depth'])
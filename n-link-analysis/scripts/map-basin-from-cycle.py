@@ -20,8 +20,11 @@ Implementation strategy (parsimonious)
 Outputs
 -------
 - Prints layer-by-layer growth and totals.
-- Writes a TSV with layer sizes.
-- Optionally writes the full membership set (as Parquet) which may be large.
+- Writes a TSV with layer sizes, and the same table to the results store
+  (metric ``basin_layers``, keyed by N, --tag and the cycle; see
+  nlink_lib/results_store.py). Without --tag, a custom --out-prefix is the tag.
+- Optionally writes the full membership set, as a Parquet page_id column
+  and/or a compressed roaring bitmap over dense node ids (nlink_lib.roaring).
 
 """
 
@@ -30,10 +33,24 @@ from __future__ import annotations
 import argparse
 import time
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import duckdb
+import numpy as np
 import pyarrow as pa
 
+from nlink_lib.cycle_registry import cycle_key_of_pages
+from nlink_lib.edges_db import connect_edges_db, edges_db_path
+from nlink_lib.link_store import get_link_store
+from nlink_lib.results_store import add_tag_argument, cycle_id_from_titles, prefix_tag, write_result
+from nlink_lib.roaring import RoaringBitmap
+from nlink_lib.rules import add_rule_argument, rule_from_args
+from nlink_lib.title_index import resolve_titles_to_ids
+from nlink_lib.title_search import describe_missing_titles
+
+# Connections come from nlink_lib.edges_db, which imports duckdb when one is opened.
+if TYPE_CHECKING:
+    import duckdb
+
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 PROCESSED_DIR = REPO_ROOT / "data" / "wikipedia" / "processed"
@@ -42,83 +59,6 @@ PAGES_PATH = PROCESSED_DIR / "pages.parquet"
 ANALYSIS_DIR = PROCESSED_DIR / "analysis"
 
 
-def _resolve_titles_to_ids(
-    titles: list[str],
-    *,
-    namespace: int,
-    allow_redirects: bool,
-) -> dict[str, int]:
-    if not titles:
-        return {}
-    if not PAGES_PATH.exists():
-        raise FileNotFoundError(f"Missing: {PAGES_PATH}")
-
-    title_tbl = pa.table({"title": pa.array(titles, type=pa.string())})
-
-    con = duckdb.connect()
-    con.register("wanted_titles", title_tbl)
-
-    redirect_clause = "" if allow_redirects else "AND p.is_redirect = FALSE"
-    rows = con.execute(
-        f"""
-        SELECT w.title, min(p.page_id) AS page_id
-        FROM wanted_titles w
-        JOIN read_parquet('{PAGES_PATH.as_posix()}') p
-          ON p.title = w.title
-        WHERE p.namespace = {int(namespace)}
-          {redirect_clause}
-        GROUP BY w.title
-        """.strip()
-    ).fetchall()
-    con.close()
-
-    return {str(t): int(pid) for t, pid in rows}
-
-
-def _ensure_edges_table(con: duckdb.DuckDBPyConnection, *, n: int) -> None:
-    exists_row = con.execute(
-        """
-        SELECT COUNT(*)
-        FROM information_schema.tables
-        WHERE table_schema = 'main' AND table_name = 'edges'
-        """.strip()
-    ).fetchone()
-    exists = int(exists_row[0]) if exists_row is not None else 0
-
-    if exists:
-        return
-
-    if not NLINK_PATH.exists():
-        raise FileNotFoundError(f"Missing: {NLINK_PATH}")
-
-    print(f"Materializing edges table for N={n} (one-time cost)...")
-    t0 = time.time()
-
-    # Keep only defined Nth links (dst_page_id IS NOT NULL).
-    con.execute(
-        f"""
-        CREATE TABLE edges AS
-        SELECT
-            page_id::BIGINT AS src_page_id,
-            list_extract(link_sequence, {int(n)})::BIGINT AS dst_page_id
-        FROM read_parquet('{NLINK_PATH.as_posix()}')
-        WHERE list_extract(link_sequence, {int(n)}) IS NOT NULL
-        """.strip()
-    )
-
-    # An index on dst accelerates reverse expansions.
-    try:
-        con.execute("CREATE INDEX edges_dst_idx ON edges(dst_page_id)")
-    except Exception:
-        # Index creation can fail on older DuckDB builds; it will still work without it.
-        pass
-
-    dt = time.time() - t0
-    n_edges_row = con.execute("SELECT COUNT(*) FROM edges").fetchone()
-    n_edges = int(n_edges_row[0]) if n_edges_row is not None else 0
-    print(f"Edges table ready: {n_edges:,} edges in {dt:.1f}s")
-
-
 def _get_successor(con: duckdb.DuckDBPyConnection, page_id: int) -> int | None:
     row = con.execute(
         """
@@ -137,6 +77,7 @@ def _get_successor(con: duckdb.DuckDBPyConnection, page_id: int) -> int | None:
 def main() -> None:
     parser = argparse.ArgumentParser(description="Map the reverse basin (ancestor set) feeding a given cycle under f_N.")
     parser.add_argument("--n", type=int, default=5, help="N for fixed N-link rule (default: 5)")
+    add_rule_argument(parser)
     parser.add_argument(
         "--cycle-page-id",
         type=int,
@@ -183,7 +124,13 @@ def main() -> None:
     parser.add_argument(
         "--write-membership",
         action="store_true",
-        help="Write the discovered node set to Parquet (may be large)",
+        help="Write the discovered node set (see --membership-format)",
+    )
+    parser.add_argument(
+        "--membership-format",
+        choices=["parquet", "bitmap", "both"],
+        default="parquet",
+        help="Membership output: page_id Parquet, roaring bitmap (.roaring.npz), or both (default: parquet)",
     )
     parser.add_argument(
         "--out-prefix",
@@ -191,20 +138,22 @@ def main() -> None:
         default=None,
         help="Output prefix under analysis/. Default: basin_from_cycle_n=...",
     )
+    add_tag_argument(parser)
 
     args = parser.parse_args()
 
     if args.n <= 0:
         raise SystemExit("--n must be >= 1")
+    rule = rule_from_args(args)
 
-    title_to_id = _resolve_titles_to_ids(
+    title_to_id = resolve_titles_to_ids(
         args.cycle_title,
         namespace=int(args.namespace),
         allow_redirects=bool(args.allow_redirects),
     )
     missing_titles = [t for t in args.cycle_title if t not in title_to_id]
     if missing_titles:
-        raise SystemExit(f"Could not resolve titles to page_id (exact match failed): {missing_titles}")
+        raise SystemExit(describe_missing_titles(missing_titles, namespace=int(args.namespace)))
 
     cycle_ids = list(dict.fromkeys([*map(int, args.cycle_page_id), *title_to_id.values()]))
     if not cycle_ids:
@@ -212,15 +161,16 @@ def main() -> None:
 
     ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
 
-    out_prefix = args.out_prefix or f"basin_from_cycle_n={int(args.n)}"
+    out_prefix = args.out_prefix or f"basin_from_cycle_{rule.key}"
+    tag = prefix_tag(args.tag, args.out_prefix)
     out_layers = ANALYSIS_DIR / f"{out_prefix}_layers.tsv"
     out_members = ANALYSIS_DIR / f"{out_prefix}_members.parquet"
+    out_bitmap = ANALYSIS_DIR / f"{out_prefix}_members.roaring.npz"
 
-    db_path = ANALYSIS_DIR / f"edges_n={int(args.n)}.duckdb"
+    db_path = edges_db_path()
     print(f"Using edges DB: {db_path}")
 
-    con = duckdb.connect(str(db_path))
-    _ensure_edges_table(con, n=int(args.n))
+    con = connect_edges_db(rule)
 
     # Quick sanity check: print successors of cycle nodes.
     print("Cycle nodes:")
@@ -305,8 +255,16 @@ def main() -> None:
 
     out_layers.write_text("\n".join(layer_lines), encoding="utf-8")
     print(f"Saved layer sizes: {out_layers}")
+    layer_rows = [[int(v) for v in line.split("\t")] for line in layer_lines[1:]]
+    layers = pa.table(
+        {name: pa.array([r[i] for r in layer_rows], type=pa.int64()) for i, name in enumerate(layer_lines[0].split("\t"))}
+    )
+    cycle_id = cycle_id_from_titles(args.cycle_title or map(str, cycle_ids))
+    cycle_key = cycle_key_of_pages(cycle_ids, rule)
+    stored = write_result("basin_layers", layers, n=rule, tag=tag, cycle_id=cycle_id, cycle_key=cycle_key, source=out_layers.name)
+    print(f"Wrote results store partition: {stored}")
 
-    if args.write_membership:
+    if args.write_membership and args.membership_format in ("parquet", "both"):
         print(f"Writing membership set to: {out_members}")
         con.execute(
             f"""
@@ -314,6 +272,13 @@ def main() -> None:
             """.strip()
         )
 
+    if args.write_membership and args.membership_format in ("bitmap", "both"):
+        page_ids = con.execute("SELECT page_id FROM seen").fetchnumpy()["page_id"]
+        dense = get_link_store().dense_ids(np.asarray(page_ids, dtype=np.int64))
+        bitmap = RoaringBitmap.from_ids(dense[dense >= 0])
+        bitmap.save(out_bitmap)
+        print(f"Wrote membership bitmap: {out_bitmap} ({len(bitmap):,} nodes, {bitmap.nbytes / 1024:,.1f} KiB)")
+
     con.close()
 
 
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""One entry point for the N-link analysis scripts.
+
+  python nlink.py <subcommand> [args ...]
+
+Subcommands (trace, sample, basin, branches, chase, preimages, dashboard,
+report, viewer) run the matching script in this interpreter with the given
+arguments; see nlink_lib/cli.py for the table. Heavy dependencies are
+imported only by the subcommands that use them.
+"""
+
+from __future__ import annotations
+
+from nlink_lib.cli import main
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,11 @@
+"""Shared building blocks for the N-link analysis scripts.
+
+The scripts in n-link-analysis/scripts/ are run directly (``python path/to/script.py``),
+so this directory is on ``sys.path`` and the package is importable as ``nlink_lib``.
+Scripts living elsewhere (e.g. n-link-analysis/viz/) add the scripts directory to
+``sys.path`` before importing.
+
+Modules here hold state that would otherwise be rebuilt on every call (persistent
+indexes over pages.parquet / nlink_sequences.parquet) and helpers that used to be
+copy-pasted across scripts.
+"""
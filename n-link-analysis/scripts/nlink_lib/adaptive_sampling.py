@@ -0,0 +1,201 @@
+"""Adaptive sequential sampling with confidence-interval stopping.
+
+Fixed sample sizes (100 / 500 / 5,000 traces) say nothing about whether the
+estimated terminal and cycle frequencies have converged. ``sample_until_precise``
+instead draws fixed-size batches and stops as soon as every tracked proportion
+(e.g. P_HALT and the current top-k cycle shares) has a confidence interval no
+wider than ±``halfwidth``, or when ``max_samples`` is reached.
+
+Reproducibility: batch k always uses ``default_rng(SeedSequence(seed0).spawn(...)[k])``
+(children are spawned in order; child 0 is reserved for bootstrap resampling),
+so a rerun with the same seed0 / batch size draws bit-identical samples and
+stops at the same point.
+
+Intervals:
+  wilson     Wilson score interval (default; well-behaved near 0 and 1)
+  bootstrap  percentile bootstrap; for a proportion this is Binomial(n, p_hat) / n resampling
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Callable, Literal
+
+import numpy as np
+
+
+CIMethod = Literal["wilson", "bootstrap"]
+
+_BOOTSTRAP_RESAMPLES = 2000
+
+
+@dataclass(frozen=True)
+class AdaptiveConfig:
+    halfwidth: float  # absolute, e.g. 0.005 for ±0.5 percentage points
+    confidence: float = 0.95
+    method: CIMethod = "wilson"
+    batch_size: int = 1000
+    min_samples: int = 0
+    max_samples: int = 100_000
+    seed0: int = 0
+
+
+@dataclass(frozen=True)
+class ProportionEstimate:
+    metric: str
+    successes: int
+    total: int
+    estimate: float
+    lo: float
+    hi: float
+
+    @property
+    def halfwidth(self) -> float:
+        return (self.hi - self.lo) / 2.0
+
+
+@dataclass(frozen=True)
+class AdaptiveResult:
+    samples: int
+    batches: int
+    converged: bool
+    estimates: list[ProportionEstimate]
+
+
+def z_for_confidence(confidence: float) -> float:
+    return float(NormalDist().inv_cdf(0.5 + float(confidence) / 2.0))
+
+
+def wilson_interval(successes: np.ndarray, total: int, z: float) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized Wilson score interval for k / n."""
+
+    k = np.asarray(successes, dtype=np.float64)
+    n = float(total)
+    if n <= 0:
+        return np.zeros_like(k), np.ones_like(k)
+    p = k / n
+    z2 = z * z
+    denom = 1.0 + z2 / n
+    center = (p + z2 / (2.0 * n)) / denom
+    half = z * np.sqrt(p * (1.0 - p) / n + z2 / (4.0 * n * n)) / denom
+    return np.clip(center - half, 0.0, 1.0), np.clip(center + half, 0.0, 1.0)
+
+
+def bootstrap_interval(
+    successes: np.ndarray,
+    total: int,
+    confidence: float,
+    rng: np.random.Generator,
+    *,
+    resamples: int = _BOOTSTRAP_RESAMPLES,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Percentile bootstrap interval for each proportion k / n."""
+
+    k = np.asarray(successes, dtype=np.float64)
+    n = int(total)
+    if n <= 0:
+        return np.zeros_like(k), np.ones_like(k)
+    draws = rng.binomial(n, k[:, None] / n, size=(len(k), int(resamples))) / n
+    alpha = (1.0 - float(confidence)) / 2.0
+    return np.quantile(draws, alpha, axis=1), np.quantile(draws, 1.0 - alpha, axis=1)
+
+
+def estimate_proportions(
+    counts: dict[str, int],
+    total: int,
+    *,
+    confidence: float,
+    method: CIMethod,
+    rng: np.random.Generator | None = None,
+) -> list[ProportionEstimate]:
+    names = list(counts)
+    k = np.asarray([counts[m] for m in names], dtype=np.int64)
+    if method == "bootstrap":
+        if rng is None:
+            raise ValueError("bootstrap intervals need an rng")
+        lo, hi = bootstrap_interval(k, total, confidence, rng)
+    else:
+        lo, hi = wilson_interval(k, total, z_for_confidence(confidence))
+    return [
+        ProportionEstimate(
+            metric=name,
+            successes=int(k[i]),
+            total=int(total),
+            estimate=float(k[i]) / total if total else 0.0,
+            lo=float(lo[i]),
+            hi=float(hi[i]),
+        )
+        for i, name in enumerate(names)
+    ]
+
+
+def sample_until_precise(
+    config: AdaptiveConfig,
+    *,
+    draw_batch: Callable[[np.random.Generator, int, int], None],
+    tracked_counts: Callable[[], tuple[dict[str, int], int]],
+) -> AdaptiveResult:
+    """Draw batches until all tracked proportions are within ±halfwidth.
+
+    ``draw_batch(rng, size, first_index)`` draws and records ``size`` samples;
+    ``tracked_counts()`` returns ({metric: successes}, samples_so_far).
+    """
+
+    if config.halfwidth <= 0:
+        raise ValueError("halfwidth must be > 0")
+    if config.batch_size <= 0:
+        raise ValueError("batch_size must be >= 1")
+
+    root = np.random.SeedSequence(int(config.seed0))
+    boot_rng = np.random.default_rng(root.spawn(1)[0])
+    min_samples = max(int(config.min_samples), int(config.batch_size))
+
+    drawn = 0
+    batches = 0
+    estimates: list[ProportionEstimate] = []
+    converged = False
+    t0 = time.time()
+    while drawn < int(config.max_samples):
+        size = min(int(config.batch_size), int(config.max_samples) - drawn)
+        rng = np.random.default_rng(root.spawn(1)[0])
+        draw_batch(rng, size, drawn)
+        drawn += size
+        batches += 1
+
+        counts, total = tracked_counts()
+        estimates = estimate_proportions(
+            counts,
+            total,
+            confidence=config.confidence,
+            method=config.method,
+            rng=boot_rng,
+        )
+        worst = max((e.halfwidth for e in estimates), default=0.0)
+        dt = time.time() - t0
+        rate = drawn / max(dt, 1e-9)
+        print(
+            f"Sampled {drawn:,} traces in {batches} batches ({rate:,.0f} traces/sec); "
+            f"widest ±{100.0 * worst:.2f}% (target ±{100.0 * config.halfwidth:.2f}%)"
+        )
+        if drawn >= min_samples and worst <= config.halfwidth:
+            converged = True
+            break
+
+    return AdaptiveResult(samples=drawn, batches=batches, converged=converged, estimates=estimates)
+
+
+def format_estimates_tsv(result: AdaptiveResult, config: AdaptiveConfig) -> str:
+    """TSV of the final interval per tracked metric (for *_ci.tsv outputs)."""
+
+    lines = [
+        f"# samples={result.samples} batches={result.batches} converged={int(result.converged)} "
+        f"method={config.method} confidence={config.confidence} target_halfwidth={config.halfwidth}",
+        "metric\tsuccesses\ttotal\testimate\tci_lo\tci_hi\thalfwidth",
+    ]
+    for e in result.estimates:
+        lines.append(
+            f"{e.metric}\t{e.successes}\t{e.total}\t{e.estimate:.6f}\t{e.lo:.6f}\t{e.hi:.6f}\t{e.halfwidth:.6f}"
+        )
+    return "\n".join(lines)
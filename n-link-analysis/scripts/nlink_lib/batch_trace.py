@@ -0,0 +1,194 @@
+"""Vectorized lockstep tracing of many f_N walks at once.
+
+The sampling scripts trace one start page at a time with a Python dict for
+cycle detection. ``trace_batch`` advances a whole batch of walkers together over
+a dense successor array (nlink_lib.link_store), using Brent's cycle detection
+per walker so no per-walker visited set is needed:
+
+1. Brent phase: find HALT (successor -1) or the cycle length lambda.
+2. Transient phase: restart from the start page with the hare lambda steps
+   ahead; the meeting point gives the transient length mu and the cycle entry.
+3. Cycle key: one lap from the entry gives the smallest dense id on the cycle.
+4. Optional path reduction: one walk of the path accumulates out-degree sum,
+   count, minimum and bottleneck position.
+
+Results follow ``trace_once`` / ``trace_with_characteristics`` exactly,
+including the ``max_steps`` cut-off (MAX_STEPS rows have path_len max_steps + 1).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+HALT = 0
+CYCLE = 1
+MAX_STEPS = 2
+
+TERMINAL_NAMES = np.array(["HALT", "CYCLE", "MAX_STEPS"])
+
+
+@dataclass(frozen=True)
+class BatchTrace:
+    """Per-walker results (arrays aligned to ``starts``; -1 where not applicable)."""
+
+    starts: np.ndarray
+    terminal: np.ndarray  # int8: HALT / CYCLE / MAX_STEPS
+    path_len: np.ndarray
+    transient_len: np.ndarray
+    cycle_len: np.ndarray
+    cycle_key: np.ndarray  # smallest dense id on the cycle
+    mean_outdegree: np.ndarray | None = None
+    min_outdegree: np.ndarray | None = None
+    bottleneck_depth: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return int(len(self.starts))
+
+    @property
+    def terminal_names(self) -> np.ndarray:
+        return TERMINAL_NAMES[self.terminal]
+
+
+def _advance(succ: np.ndarray, nodes: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    out = nodes.copy()
+    out[mask] = succ[nodes[mask]]
+    return out
+
+
+def trace_batch(
+    succ: np.ndarray,
+    starts: np.ndarray,
+    *,
+    max_steps: int,
+    out_degree: np.ndarray | None = None,
+) -> BatchTrace:
+    """Trace every start under f_N given as a dense successor array (-1 = HALT)."""
+
+    succ = np.asarray(succ).astype(np.int64, copy=False)
+    x0 = np.asarray(starts, dtype=np.int64)
+    num = len(x0)
+    max_nodes = int(max_steps) + 1
+
+    terminal = np.full(num, MAX_STEPS, dtype=np.int8)
+    natural_len = np.full(num, -1, dtype=np.int64)
+    lam = np.ones(num, dtype=np.int64)
+
+    # -- 1. Brent: cycle length or HALT --------------------------------------
+    power = np.ones(num, dtype=np.int64)
+    tort = x0.copy()
+    hare = succ[x0]
+    hare_steps = np.ones(num, dtype=np.int64)
+    running = np.ones(num, dtype=bool)
+
+    halted = hare < 0
+    terminal[halted] = HALT
+    natural_len[halted] = 1
+    running &= ~halted
+
+    # Brent detects a cycle within ~3 * (mu + lambda) hare steps.
+    budget = 3 * (max_nodes + 1)
+    while running.any() and int(hare_steps[running].min()) <= budget:
+        found = running & (hare == tort)
+        terminal[found] = CYCLE
+        running &= ~found
+
+        reset = running & (power == lam)
+        tort[reset] = hare[reset]
+        power[reset] *= 2
+        lam[reset] = 0
+
+        hare = _advance(succ, hare, running)
+        hare_steps[running] += 1
+        lam[running] += 1
+
+        halted = running & (hare < 0)
+        terminal[halted] = HALT
+        natural_len[halted] = hare_steps[halted]
+        running &= ~halted
+
+    is_cycle = terminal == CYCLE
+
+    # -- 2. Transient length mu and cycle entry ------------------------------
+    mu = np.zeros(num, dtype=np.int64)
+    entry = x0.copy()
+    if is_cycle.any():
+        tort = x0.copy()
+        hare = x0.copy()
+        ahead = np.where(is_cycle, lam, 0)
+        for k in range(int(ahead.max())):
+            hare = _advance(succ, hare, ahead > k)
+        moving = is_cycle & (tort != hare)
+        while moving.any():
+            tort = _advance(succ, tort, moving)
+            hare = _advance(succ, hare, moving)
+            mu[moving] += 1
+            moving &= tort != hare
+        entry = tort
+        natural_len[is_cycle] = mu[is_cycle] + lam[is_cycle]
+
+    # -- 3. Cycle key (smallest node on the lap) -----------------------------
+    cycle_key = np.where(is_cycle, entry, -1)
+    if is_cycle.any():
+        node = entry.copy()
+        laps = np.where(is_cycle, lam, 0)
+        for k in range(1, int(laps.max())):
+            step = laps > k
+            node = _advance(succ, node, step)
+            cycle_key = np.where(step, np.minimum(cycle_key, node), cycle_key)
+
+    # -- max_steps cut-off (same as the per-sample loop) ----------------------
+    cut = ((terminal == HALT) & (natural_len > max_nodes)) | ((terminal == CYCLE) & (natural_len > max_nodes - 1))
+    terminal[cut] = MAX_STEPS
+    is_cycle = terminal == CYCLE
+    path_len = np.where(terminal == MAX_STEPS, max_nodes, natural_len)
+
+    transient_len = np.where(is_cycle, mu, -1)
+    cycle_len = np.where(is_cycle, lam, -1)
+    cycle_key = np.where(is_cycle, cycle_key, -1)
+
+    if out_degree is None:
+        return BatchTrace(
+            starts=x0,
+            terminal=terminal,
+            path_len=path_len,
+            transient_len=transient_len,
+            cycle_len=cycle_len,
+            cycle_key=cycle_key,
+        )
+
+    # -- 4. Path out-degree reduction ----------------------------------------
+    # Nodes without a link sequence (out_degree 0) only occur as the final HALT
+    # node and are skipped, as in trace_with_characteristics.
+    w = np.asarray(out_degree).astype(np.int64, copy=False)
+    big = np.iinfo(np.int64).max
+    deg_sum = np.zeros(num, dtype=np.int64)
+    deg_cnt = np.zeros(num, dtype=np.int64)
+    deg_min = np.full(num, big, dtype=np.int64)
+    bottleneck = np.zeros(num, dtype=np.int64)
+
+    node = x0.copy()
+    for k in range(int(path_len.max(initial=0))):
+        active = path_len > k
+        wk = np.where(active, w[np.where(active, node, 0)], 0)
+        counted = active & (wk > 0)
+        better = counted & (wk < deg_min)
+        bottleneck[better] = deg_cnt[better]
+        deg_min[better] = wk[better]
+        deg_sum[counted] += wk[counted]
+        deg_cnt[counted] += 1
+        node = _advance(succ, node, active & (path_len > k + 1))
+
+    return BatchTrace(
+        starts=x0,
+        terminal=terminal,
+        path_len=path_len,
+        transient_len=transient_len,
+        cycle_len=cycle_len,
+        cycle_key=cycle_key,
+        mean_outdegree=np.where(deg_cnt > 0, deg_sum / np.maximum(deg_cnt, 1), 0.0),
+        min_outdegree=np.where(deg_min == big, 0, deg_min),
+        bottleneck_depth=bottleneck,
+    )
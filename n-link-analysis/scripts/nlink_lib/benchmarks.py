@@ -0,0 +1,179 @@
+"""Timing, result files and baseline comparison for run-benchmarks.py.
+
+A benchmark case is a callable timed ``repeat`` times after ``warmup``
+untimed calls, with an optional ``setup`` before every call (cache resets)
+that is not timed. Each result records every timing, the median and the
+minimum, and a work count (``items`` in ``unit``) so results read as
+throughput. Baselines are compared on the minimum: noise from other load on
+the machine only ever adds time, so the fastest repetition is the most
+stable estimate of the code's own cost.
+
+Result files are JSON: an ``environment`` block (Python / library versions,
+CPU count, git commit, host) and one entry per (case, size). A baseline is
+simply an earlier result file; ``compare_results`` flags cases whose minimum
+grew by more than the tolerance, ignoring cases faster than ``min_seconds``
+where timer noise dominates.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from types import ModuleType
+from typing import Callable
+
+from nlink_lib.paths import ANALYSIS_DIR, REPO_ROOT
+
+
+BENCH_DIR = ANALYSIS_DIR / "benchmarks"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+RESULTS_VERSION = 1
+
+
+@dataclass
+class BenchResult:
+    name: str
+    size: int
+    unit: str
+    items: int
+    times_s: list[float] = field(default_factory=list)
+    median_s: float = 0.0
+    min_s: float = 0.0
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@{self.size}"
+
+    @property
+    def rate(self) -> float:
+        return self.items / self.median_s if self.median_s > 0 else 0.0
+
+
+def load_script(path: Path, name: str | None = None) -> ModuleType:
+    """Import a hyphen-named script as a module (its ``main`` is not run)."""
+
+    module_name = name or path.stem.replace("-", "_")
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load {path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def time_case(
+    name: str,
+    fn: Callable[[], object],
+    *,
+    size: int,
+    unit: str,
+    items: int,
+    repeat: int,
+    warmup: int = 1,
+    setup: Callable[[], object] | None = None,
+    quiet: bool = True,
+) -> BenchResult:
+    """Time ``fn``; stdout of the timed code is swallowed unless ``quiet`` is False."""
+
+    sink = contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext()
+    times = []
+    with sink:
+        for i in range(warmup + repeat):
+            if setup is not None:
+                setup()
+            t0 = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - t0
+            if i >= warmup:
+                times.append(elapsed)
+    return BenchResult(
+        name=name,
+        size=int(size),
+        unit=unit,
+        items=int(items),
+        times_s=[round(t, 6) for t in times],
+        median_s=round(statistics.median(times), 6),
+        min_s=round(min(times), 6),
+    )
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "-C", str(REPO_ROOT), "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return out.stdout.strip() or None
+
+
+def environment() -> dict[str, object]:
+    versions = {}
+    for module in ("numpy", "pandas", "pyarrow", "duckdb", "plotly"):
+        mod = sys.modules.get(module)
+        if mod is not None:
+            versions[module] = getattr(mod, "__version__", "?")
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "host": platform.node(),
+        "git_commit": _git_commit(),
+        "versions": versions,
+    }
+
+
+def write_results(path: Path, results: list[BenchResult], *, params: dict) -> None:
+    payload = {
+        "version": RESULTS_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment(),
+        "params": params,
+        "results": [asdict(r) for r in results],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".tmp-{os.getpid()}-{path.name}")
+    tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def load_results(path: Path) -> dict[str, BenchResult]:
+    """Results of a result / baseline file keyed by ``name@size``."""
+
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    known = {f.name for f in fields(BenchResult)}
+    results = [BenchResult(**{k: v for k, v in r.items() if k in known}) for r in payload.get("results", [])]
+    return {r.key: r for r in results}
+
+
+def compare_results(
+    results: list[BenchResult], baseline: dict[str, BenchResult], *, tolerance: float, min_seconds: float
+) -> list[dict[str, object]]:
+    """One row per result: baseline minimum, ratio and status (ok / slower / faster / new)."""
+
+    rows = []
+    for r in results:
+        base = baseline.get(r.key)
+        row: dict[str, object] = {"key": r.key, "min_s": r.min_s, "baseline_s": None, "ratio": None, "status": "new"}
+        if base is not None and base.min_s > 0:
+            ratio = r.min_s / base.min_s
+            row.update(baseline_s=base.min_s, ratio=ratio, status="ok")
+            if max(r.min_s, base.min_s) >= min_seconds:
+                if ratio > 1.0 + tolerance:
+                    row["status"] = "slower"
+                elif ratio < 1.0 / (1.0 + tolerance):
+                    row["status"] = "faster"
+        rows.append(row)
+    return rows
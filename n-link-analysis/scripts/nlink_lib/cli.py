@@ -0,0 +1,99 @@
+"""Subcommands of the ``nlink`` entry point (scripts/nlink.py).
+
+Each subcommand is one of the existing scripts, run in-process by
+``run_script_in_process`` with its own arguments, so the scripts stay
+runnable on their own and keep their argparse help (whose usage line names
+the script). This module imports only the standard library: ``nlink --help``
+and dispatching cost no more than the interpreter, and a subcommand pays
+only for what its script imports. The computational scripts import pandas /
+duckdb / plotting libraries inside the functions that need them (see
+nlink_lib.results_store, nlink_lib.edges_db), so e.g. ``nlink trace --help``
+loads numpy and pyarrow but not pandas or DuckDB.
+
+``run_script_in_process`` is also what nlink_lib.pipeline runs stages with,
+and ``run_subcommand`` is the in-process entry for other callers that
+already have an interpreter::
+
+    from nlink_lib.cli import run_subcommand
+    code = run_subcommand("trace", ["--n", "5", "--seed", "1"])
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import runpy
+import sys
+import traceback
+from pathlib import Path
+from typing import Sequence
+
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1]
+REPO_ROOT = SCRIPTS_DIR.parents[1]
+
+# subcommand -> (script path relative to SCRIPTS_DIR, one-line summary)
+SUBCOMMANDS: dict[str, tuple[str, str]] = {
+    "trace": ("trace-nlink-path.py", "Trace one N-link path to its cycle or terminal"),
+    "sample": ("sample-nlink-traces.py", "Sample random N-link traces and summarize terminals / cycles"),
+    "basin": ("map-basin-from-cycle.py", "Map the basin of a cycle by reverse BFS"),
+    "branches": ("branch-basin-analysis.py", "Split a basin into the branches that enter its cycle"),
+    "chase": ("chase-dominant-upstream.py", "Follow the dominant upstream branch from a seed"),
+    "preimages": ("find-nlink-preimages.py", "List the pages whose N-th link points at a page"),
+    "dashboard": ("compute-trunkiness-dashboard.py", "Branch concentration (trunkiness) per basin"),
+    "report": ("render-human-report.py", "Render the human-facing report and its figures"),
+    "viewer": ("../viz/dash-basin-geometry-viewer.py", "Interactive basin geometry viewer (Dash)"),
+}
+
+
+def run_script_in_process(script: str, args: tuple[str, ...] | list[str]) -> int:
+    """Run a script's ``__main__`` block in this interpreter; returns its exit code.
+
+    The script runs from REPO_ROOT, as it did as a subprocess, so relative
+    defaults such as ``--analysis-dir data/wikipedia/processed/analysis``
+    resolve the same from any working directory.
+    """
+
+    path = SCRIPTS_DIR / script
+    saved_argv = sys.argv
+    saved_cwd = os.getcwd()
+    sys.argv = [str(path), *args]
+    os.chdir(REPO_ROOT)
+    try:
+        runpy.run_path(str(path), run_name="__main__")
+        return 0
+    except SystemExit as e:
+        if e.code is None or e.code == 0:
+            return 0
+        if not isinstance(e.code, int):
+            print(e.code, file=sys.stderr)
+            return 1
+        return int(e.code)
+    except Exception:
+        traceback.print_exc()
+        return 1
+    finally:
+        sys.argv = saved_argv
+        os.chdir(saved_cwd)
+
+
+def run_subcommand(name: str, args: Sequence[str]) -> int:
+    """Run subcommand ``name`` with ``args`` in this interpreter; returns its exit code."""
+
+    if name not in SUBCOMMANDS:
+        raise SystemExit(f"Unknown subcommand: {name} (choose from {', '.join(SUBCOMMANDS)})")
+    script, _ = SUBCOMMANDS[name]
+    return run_script_in_process(script, list(args))
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="nlink",
+        description="N-link analysis tools. Run 'nlink <subcommand> --help' for a subcommand's options.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="subcommands:\n" + "\n".join(f"  {name:<11} {summary}" for name, (_, summary) in SUBCOMMANDS.items()),
+    )
+    parser.add_argument("subcommand", choices=list(SUBCOMMANDS), metavar="subcommand", help="One of the subcommands below")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="Arguments passed on to the subcommand")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    return run_subcommand(args.subcommand, args.args)
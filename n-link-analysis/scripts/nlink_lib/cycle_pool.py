@@ -0,0 +1,69 @@
+"""Worker sizing for the concurrent per-cycle stages.
+
+run-analysis-harness.py and reproduce-main-findings.py run the per-cycle
+scripts (map-basin-from-cycle, branch-basin-analysis, chase-dominant-upstream,
+...) as stages of nlink_lib.pipeline. Those scripts only read the edges table
+and keep their BFS state in TEMP tables, so once the edges store covers N
+(see nlink_lib.edges_db.prepare_edges_db) any number of them can share it
+read-only. This module decides how many may run at once and what each gets.
+
+``default_jobs`` is min(cores, cycles, available RAM / per-job budget
+(``job_memory_budget``)); ``worker_env`` gives every worker an equal share
+of cores and memory through the NLINK_DUCKDB_* environment variables read by
+connect_edges_db.
+"""
+
+from __future__ import annotations
+
+import os
+
+from nlink_lib.edges_db import MEMORY_LIMIT_ENV, THREADS_ENV
+
+
+# Lower bound on the memory one reverse-BFS worker is allowed (DuckDB buffers
+# + TEMP seen/frontier tables for a ~1M-node basin).
+MIN_JOB_BYTES = 2 * 1024**3
+# Worst case a basin holds every f_N edge's source in seen + frontier
+# (3 BIGINT columns each, plus hash-join overhead).
+BYTES_PER_EDGE = 48
+
+
+def available_memory_bytes() -> int | None:
+    """MemAvailable from /proc/meminfo (falls back to free physical pages)."""
+
+    try:
+        with open("/proc/meminfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return int(os.sysconf("SC_AVPHYS_PAGES")) * int(os.sysconf("SC_PAGE_SIZE"))
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def job_memory_budget(edges: int = 0) -> int:
+    """Per-worker memory budget for an f_N with ``edges`` edges (at least MIN_JOB_BYTES)."""
+
+    return max(MIN_JOB_BYTES, BYTES_PER_EDGE * int(edges))
+
+
+def default_jobs(num_cycles: int, *, edges: int = 0) -> int:
+    cpus = os.cpu_count() or 1
+    mem = available_memory_bytes()
+    by_mem = cpus if mem is None else int(mem // job_memory_budget(edges))
+    return max(1, min(cpus, int(num_cycles), by_mem))
+
+
+def worker_env(workers: int) -> dict[str, str]:
+    """Environment for one of ``workers`` concurrent workers (equal share of cores and RAM)."""
+
+    env = dict(os.environ)
+    env[THREADS_ENV] = str(max(1, (os.cpu_count() or 1) // max(1, int(workers))))
+    mem = available_memory_bytes()
+    if mem is not None:
+        share_mb = int(0.75 * mem / max(1, int(workers)) / 1024**2)
+        env[MEMORY_LIMIT_ENV] = f"{max(256, share_mb)}MB"
+    return env
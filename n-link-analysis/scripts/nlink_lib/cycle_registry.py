@@ -0,0 +1,152 @@
+"""Persistent cycle registry: stable integer keys for cycles across N and dumps.
+
+Cross-N results used to be joined on cycle labels such as
+``Massachusetts__Gulf_of_Maine`` parsed back out of filenames. The registry
+instead names every cycle by a 64-bit key hashed from its min rotation over
+page_ids (members in successor order, starting at the smallest page_id), so
+the same cycle gets the same key at every N and in every dump where its
+pages keep their ids, and joins are integer joins.
+
+Layout under analysis/cycle_registry/:
+
+  cycles.parquet   one row per cycle ever seen
+                   cycle_key int64, length, member_page_ids list<int64>,
+                   member_titles list<string>, label
+  basins.parquet   one row per (dump, n, cycle)
+                   dump, n, cycle_key, basin_size, rank, share
+
+``update_registry`` upserts: rows for the (dump, n) pairs being written
+replace any earlier rows for the same pairs, cycles are added by key.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+
+from typing import Iterable
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from nlink_lib.link_store import get_link_store
+from nlink_lib.paths import ANALYSIS_DIR
+from nlink_lib.rules import Rule, parse_rule
+
+
+CYCLE_REGISTRY_DIR = ANALYSIS_DIR / "cycle_registry"
+
+CYCLES_SCHEMA = pa.schema(
+    [
+        ("cycle_key", pa.int64()),
+        ("length", pa.int32()),
+        ("member_page_ids", pa.list_(pa.int64())),
+        ("member_titles", pa.list_(pa.string())),
+        ("label", pa.string()),
+    ]
+)
+BASINS_SCHEMA = pa.schema(
+    [
+        ("dump", pa.string()),
+        ("n", pa.int32()),
+        ("cycle_key", pa.int64()),
+        ("basin_size", pa.int64()),
+        ("rank", pa.int32()),
+        ("share", pa.float64()),
+    ]
+)
+
+
+def min_rotation(page_ids: np.ndarray) -> np.ndarray:
+    """Rotate a cycle (successor order) to start at its smallest page_id."""
+
+    page_ids = np.asarray(page_ids, dtype=np.int64)
+    return np.roll(page_ids, -int(np.argmin(page_ids))) if len(page_ids) else page_ids
+
+
+def cycle_key(page_ids: np.ndarray) -> int:
+    """Signed 64-bit key of a cycle: blake2b-8 over its min rotation (little-endian int64)."""
+
+    data = min_rotation(page_ids).astype("<i8").tobytes()
+    return int(np.frombuffer(hashlib.blake2b(data, digest_size=8).digest(), dtype="<i8")[0])
+
+
+def cycle_keys(offsets: np.ndarray, page_ids: np.ndarray) -> np.ndarray:
+    """``cycle_key`` for every cycle in a CSR (offsets, members) layout."""
+
+    offsets = np.asarray(offsets, dtype=np.int64)
+    return np.array(
+        [cycle_key(page_ids[offsets[i] : offsets[i + 1]]) for i in range(len(offsets) - 1)],
+        dtype=np.int64,
+    )
+
+
+def cycle_key_of_pages(page_ids: Iterable[int], rule: int | str | Rule, *, succ: np.ndarray | None = None) -> int | None:
+    """``cycle_key`` of the rule's cycle through exactly these pages (any order); None if they are not one.
+
+    The per-cycle scripts take their cycle as a set of pages; this orders it
+    along the rule's successor array, so results keyed by it join with the
+    registry (and across N) whatever order or spelling the run used. Pass the
+    rule's dense ``succ`` array when calling this for many cycles.
+    """
+
+    store = get_link_store()
+    dense = store.dense_ids(np.unique(np.asarray(list(page_ids), dtype=np.int64)))
+    if not len(dense) or (dense < 0).any():
+        return None
+    if succ is None:
+        succ = parse_rule(rule).successors(store)
+    members = set(dense.tolist())
+    order = [int(dense[0])]
+    while len(order) < len(members):
+        nxt = int(succ[order[-1]])
+        if nxt not in members or nxt in order:
+            return None
+        order.append(nxt)
+    if int(succ[order[-1]]) != order[0]:
+        return None
+    return cycle_key(np.asarray(store.page_ids)[order])
+
+
+def _read(path: Path, schema: pa.Schema) -> pa.Table:
+    return pq.read_table(path).cast(schema) if path.exists() else schema.empty_table()
+
+
+def _write(table: pa.Table, path: Path) -> None:
+    tmp = path.with_name(path.name + f".tmp-{os.getpid()}")
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+
+
+def load_cycles(registry_dir: Path = CYCLE_REGISTRY_DIR) -> pa.Table:
+    return _read(registry_dir / "cycles.parquet", CYCLES_SCHEMA)
+
+
+def load_basins(registry_dir: Path = CYCLE_REGISTRY_DIR) -> pa.Table:
+    return _read(registry_dir / "basins.parquet", BASINS_SCHEMA)
+
+
+def update_registry(cycles: pa.Table, basins: pa.Table, *, registry_dir: Path = CYCLE_REGISTRY_DIR) -> Path:
+    """Upsert cycles (by key) and basin rows (by (dump, n)) into the registry."""
+
+    import pyarrow.compute as pc  # only the upsert needs it; cycle_key_of_pages callers start faster
+
+    registry_dir.mkdir(parents=True, exist_ok=True)
+    cycles = cycles.cast(CYCLES_SCHEMA)
+    basins = basins.cast(BASINS_SCHEMA)
+
+    old_cycles = load_cycles(registry_dir)
+    known = pc.is_in(old_cycles["cycle_key"], value_set=cycles["cycle_key"])
+    merged_cycles = pa.concat_tables([old_cycles.filter(pc.invert(known)), cycles])
+    _write(merged_cycles.sort_by("cycle_key"), registry_dir / "cycles.parquet")
+
+    old_basins = load_basins(registry_dir)
+    keep = np.ones(old_basins.num_rows, dtype=bool)
+    for dump, n in {(d, int(n)) for d, n in zip(basins["dump"].to_pylist(), basins["n"].to_pylist())}:
+        same = pc.and_(pc.equal(old_basins["dump"], dump), pc.equal(old_basins["n"], n))
+        keep &= ~same.to_numpy(zero_copy_only=False)
+    merged_basins = pa.concat_tables([old_basins.filter(pa.array(keep)), basins])
+    _write(merged_basins.sort_by([("dump", "ascending"), ("n", "ascending"), ("rank", "ascending")]), registry_dir / "basins.parquet")
+    return registry_dir
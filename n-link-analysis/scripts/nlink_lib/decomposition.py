@@ -0,0 +1,319 @@
+"""Whole-graph decomposition of f_N into cycles, basins and depths.
+
+Under a fixed N every page has at most one successor, so the graph is a
+functional graph: each page drains either into exactly one cycle or into a
+HALT page (a page with fewer than N links, or no link sequence at all). The
+same holds for any deterministic traversal rule (nlink_lib/rules.py), so
+everything here takes a rule; a plain N means the fixed N-link rule. This
+module computes, for every node of the CSR link store at once:
+
+  on_cycle   bool   node lies on a cycle
+  cycle_id   int32  dense id of the smallest node on the cycle the node drains into (-1 = HALT basin)
+  halt_node  int32  dense id of the HALT node the node drains into (-1 = cycle basin)
+  depth      int32  steps to the terminal (0 on cycles and at HALT nodes)
+
+Algorithm (all numpy, O(nodes) per phase):
+1. Peel nodes with zero in-degree (Kahn, one frontier per round); what remains
+   is exactly the union of cycles.
+2. Label cycle nodes with the minimum id on their cycle by pointer doubling.
+3. Reverse BFS from all terminals (cycle nodes + HALT nodes) over the inverted
+   successor array, propagating terminal labels and depth layer by layer.
+
+Results are persisted per rule under analysis/decomposition/{rule.key}/
+(``n={N}`` for the fixed rule, ``mod=7`` etc. otherwise) and reused until the
+link store changes.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+from nlink_lib.link_store import STORE_DIR, LinkStore, get_link_store
+from nlink_lib.paths import ANALYSIS_DIR, file_fingerprint
+from nlink_lib.rules import Rule, parse_rule
+
+
+DECOMPOSITION_DIR = ANALYSIS_DIR / "decomposition"
+DECOMPOSITION_VERSION = 1
+
+_ARRAY_NAMES = ("succ", "on_cycle", "cycle_id", "halt_node", "depth")
+
+
+def _expected_sources(store_dir: Path) -> dict[str, object]:
+    return {"link_store": file_fingerprint(store_dir / "manifest.json")}
+
+
+def decomposition_dir_for(rule: int | str | Rule) -> Path:
+    return DECOMPOSITION_DIR / parse_rule(rule).key
+
+
+def is_decomposition_fresh(rule: int | str | Rule, *, store_dir: Path = STORE_DIR) -> bool:
+    out_dir = decomposition_dir_for(rule)
+    manifest_path = out_dir / "manifest.json"
+    if not manifest_path.exists():
+        return False
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return False
+    if manifest.get("version") != DECOMPOSITION_VERSION or manifest.get("sources") != _expected_sources(store_dir):
+        return False
+    return all((out_dir / f"{name}.npy").exists() for name in _ARRAY_NAMES)
+
+
+def find_cycle_nodes(succ: np.ndarray) -> np.ndarray:
+    """Boolean mask of nodes on cycles (Kahn peeling of zero in-degree nodes)."""
+
+    num_nodes = len(succ)
+    has_next = succ >= 0
+    in_degree = np.bincount(succ[has_next], minlength=num_nodes).astype(np.int64)
+    removed = np.zeros(num_nodes, dtype=bool)
+
+    frontier = np.nonzero(in_degree == 0)[0]
+    while len(frontier):
+        removed[frontier] = True
+        nxt = succ[frontier]
+        nxt = nxt[nxt >= 0]
+        if len(nxt) == 0:
+            break
+        touched, dec = np.unique(nxt, return_counts=True)
+        in_degree[touched] -= dec
+        frontier = touched[(in_degree[touched] == 0) & ~removed[touched]]
+
+    # Every non-cycle node is eventually peeled (its chain ends at HALT or on a
+    # cycle), so the survivors are exactly the cycle nodes.
+    return ~removed
+
+
+def label_cycles(succ: np.ndarray, on_cycle: np.ndarray) -> np.ndarray:
+    """Minimum dense id on each node's cycle (-1 off-cycle), by pointer doubling."""
+
+    nodes = np.nonzero(on_cycle)[0]
+    labels = np.full(len(succ), -1, dtype=np.int64)
+    if len(nodes) == 0:
+        return labels
+
+    label = nodes.astype(np.int64)
+    # Position of each cycle node in ``nodes`` so jumps stay in the compact arrays.
+    pos_of = np.full(len(succ), -1, dtype=np.int64)
+    pos_of[nodes] = np.arange(len(nodes))
+    jump = pos_of[succ[nodes]]
+    # After k rounds label[v] = min over the next 2^k nodes. Once a round changes
+    # nothing, every label equals the minimum over its whole cycle.
+    while True:
+        new_label = np.minimum(label, label[jump])
+        if np.array_equal(new_label, label):
+            break
+        label = new_label
+        jump = jump[jump]
+
+    labels[nodes] = label
+    return labels
+
+
+def _inverse_successors(succ: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """CSR (offsets, sources) of f_N^{-1}, sources ascending within each target."""
+
+    num_nodes = len(succ)
+    src = np.nonzero(succ >= 0)[0]
+    dst = succ[src]
+    order = np.argsort(dst, kind="stable")
+    counts = np.bincount(dst, minlength=num_nodes)
+    offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets, src[order].astype(np.int64)
+
+
+def _expand(offsets: np.ndarray, values: np.ndarray, frontier: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Concatenated CSR rows of ``frontier`` plus the frontier index of each element."""
+
+    starts = offsets[frontier]
+    counts = offsets[frontier + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    run_starts = np.cumsum(counts) - counts
+    idx = np.repeat(starts - run_starts, counts) + np.arange(total, dtype=np.int64)
+    return values[idx], np.repeat(np.arange(len(frontier), dtype=np.int64), counts)
+
+
+def decompose(succ: np.ndarray) -> dict[str, np.ndarray]:
+    """Compute the decomposition arrays for a dense successor array (-1 = HALT)."""
+
+    succ = np.asarray(succ)
+    num_nodes = len(succ)
+
+    on_cycle = find_cycle_nodes(succ)
+    cycle_labels = label_cycles(succ, on_cycle)
+
+    cycle_id = np.full(num_nodes, -1, dtype=np.int32)
+    halt_node = np.full(num_nodes, -1, dtype=np.int32)
+    depth = np.full(num_nodes, -1, dtype=np.int32)
+
+    is_halt = succ < 0
+    cycle_id[on_cycle] = cycle_labels[on_cycle]
+    halt_node[is_halt] = np.nonzero(is_halt)[0]
+    depth[on_cycle | is_halt] = 0
+
+    inv_offsets, inv_sources = _inverse_successors(succ)
+    frontier = np.nonzero(on_cycle | is_halt)[0]
+    d = 0
+    while len(frontier):
+        children, parent_idx = _expand(inv_offsets, inv_sources, frontier)
+        keep = ~on_cycle[children]
+        children = children[keep]
+        parents = frontier[parent_idx[keep]]
+        if len(children) == 0:
+            break
+        d += 1
+        depth[children] = d
+        cycle_id[children] = cycle_id[parents]
+        halt_node[children] = halt_node[parents]
+        frontier = children
+
+    return {
+        "succ": succ.astype(np.int32, copy=False),
+        "on_cycle": on_cycle,
+        "cycle_id": cycle_id,
+        "halt_node": halt_node,
+        "depth": depth,
+    }
+
+
+@dataclass(frozen=True)
+class Decomposition:
+    """Per-node terminal/depth arrays for one rule (dense ids of the link store)."""
+
+    rule: Rule
+    succ: np.ndarray
+    on_cycle: np.ndarray
+    cycle_id: np.ndarray
+    halt_node: np.ndarray
+    depth: np.ndarray
+
+    def __len__(self) -> int:
+        return int(len(self.succ))
+
+    @property
+    def n(self) -> int | None:
+        """N of a fixed N-link decomposition (None for other rules)."""
+
+        return self.rule.n
+
+    @functools.cached_property
+    def _depth_order(self) -> tuple[np.ndarray, np.ndarray]:
+        order = np.argsort(np.asarray(self.depth), kind="stable")
+        bounds = np.searchsorted(np.asarray(self.depth)[order], np.arange(int(self.depth.max(initial=0)) + 2))
+        return order, bounds
+
+    @property
+    def max_depth(self) -> int:
+        return int(self.depth.max(initial=0))
+
+    def layer(self, d: int) -> np.ndarray:
+        """All nodes at depth ``d`` (ascending dense id)."""
+
+        order, bounds = self._depth_order
+        if d < 0 or d + 1 >= len(bounds):
+            return np.zeros(0, dtype=np.int64)
+        return order[bounds[d] : bounds[d + 1]]
+
+    def layers(self, *, start: int = 0) -> Iterator[tuple[int, np.ndarray]]:
+        """(depth, nodes) from ``start`` upward; successors of layer d lie in layer d-1 (or on a cycle)."""
+
+        for d in range(int(start), self.max_depth + 1):
+            yield d, self.layer(d)
+
+    def cycle_ids(self) -> np.ndarray:
+        """Distinct cycle ids (smallest dense id on each cycle), ascending."""
+
+        return np.unique(np.asarray(self.cycle_id)[np.asarray(self.on_cycle)])
+
+    def cycle_members(self, cycle: int) -> np.ndarray:
+        """Cycle nodes in successor order starting from ``cycle`` (its smallest member)."""
+
+        members = [int(cycle)]
+        nxt = int(self.succ[int(cycle)])
+        while nxt != int(cycle):
+            members.append(nxt)
+            nxt = int(self.succ[nxt])
+        return np.asarray(members, dtype=np.int64)
+
+    def basin_sizes(self) -> np.ndarray:
+        """Nodes draining into each cycle id (indexed by dense id; 0 for non-cycle-ids)."""
+
+        cid = np.asarray(self.cycle_id)
+        return np.bincount(cid[cid >= 0], minlength=len(self)).astype(np.int64)
+
+
+def build_decomposition(store: LinkStore, rule: int | str | Rule, *, out_dir: Path | None = None) -> Path:
+    rule = parse_rule(rule)
+    out_dir = out_dir or decomposition_dir_for(rule)
+
+    print(f"Decomposing {rule.label} over {len(store):,} nodes...")
+    t0 = time.time()
+    arrays = decompose(rule.successors(store))
+
+    tmp_dir = out_dir.with_name(out_dir.name + f".tmp-{os.getpid()}")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+    for name, arr in arrays.items():
+        np.save(tmp_dir / f"{name}.npy", arr)
+
+    num_cycles = int(len(np.unique(arrays["cycle_id"][arrays["on_cycle"]])))
+    manifest = {
+        "version": DECOMPOSITION_VERSION,
+        "rule": rule.key,
+        "n": rule.n,
+        "nodes": int(len(store)),
+        "cycles": num_cycles,
+        "cycle_nodes": int(arrays["on_cycle"].sum()),
+        "halt_basin_nodes": int((arrays["halt_node"] >= 0).sum()),
+        "max_depth": int(arrays["depth"].max(initial=0)),
+        "sources": _expected_sources(store.store_dir),
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    (tmp_dir / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    out_dir.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(tmp_dir, out_dir)
+
+    dt = time.time() - t0
+    print(
+        f"Decomposition {rule.label} ready: {num_cycles:,} cycles, "
+        f"max depth {manifest['max_depth']} in {dt:.1f}s ({out_dir})"
+    )
+    return out_dir
+
+
+def get_decomposition(rule: int | str | Rule) -> Decomposition:
+    """Decomposition for N (or any rule), (re)built on first use if missing or stale."""
+
+    return _load_decomposition(parse_rule(rule))
+
+
+@functools.lru_cache(maxsize=4)
+def _load_decomposition(rule: Rule) -> Decomposition:
+    store = get_link_store()
+    if not is_decomposition_fresh(rule):
+        build_decomposition(store, rule)
+    return load_decomposition(decomposition_dir_for(rule), rule)
+
+
+def load_decomposition(out_dir: Path, rule: int | str | Rule) -> Decomposition:
+    """Memory-map a decomposition written by ``build_decomposition``."""
+
+    arrays = {name: np.load(out_dir / f"{name}.npy", mmap_mode="r") for name in _ARRAY_NAMES}
+    return Decomposition(rule=parse_rule(rule), **arrays)
@@ -0,0 +1,248 @@
+"""Shared multi-N edges store for the DuckDB reverse-BFS scripts.
+
+Every script used to materialize its own ``edges_n={N}.duckdb`` with a full
+``read_parquet`` of nlink_sequences.parquet per N. Instead, all f_N edges for
+N = 1..max_n now live in one DuckDB file under analysis/edges_store/:
+
+  edges.duckdb   table edges_all(n INTEGER, src_page_id BIGINT, dst_page_id BIGINT),
+                 sorted by (n, dst_page_id)
+  manifest.json  max_n, edge count per N, nlink_sequences.parquet fingerprint
+                 (size, mtime) and sha256
+
+built in a single scan (``UNNEST(list_slice(link_sequence, 1, max_n)) WITH
+ORDINALITY``), so caching ten N values costs one pass over the Parquet file.
+
+Scripts keep querying a table called ``edges(src_page_id, dst_page_id)``:
+``connect_edges_db(n)`` opens the store read-only and defines ``edges`` as a
+TEMP VIEW over the n = N slice. For any other traversal rule
+(nlink_lib/rules.py: mod=K, last=k, ...) it instead returns an in-memory
+connection whose ``edges`` view reads the rule's successor array, gathered
+from the CSR link store, so the same SQL runs unchanged. The same happens for
+every rule when the link store is a null-model graph (nlink_lib/null_models.py),
+whose links are not in nlink_sequences.parquet. The (n, dst_page_id) sort order lets DuckDB's
+zone maps skip row groups of other N and narrow dst lookups, so no ART index
+is built. Read-only connections can be opened from any number of processes
+at once (the harness cycle pool relies on this); all BFS state lives in TEMP
+tables.
+
+Staleness: (size, mtime) is compared first; if it changed, the content hash
+decides, so a touched-but-identical Parquet file does not trigger a rebuild.
+Requesting N > max_n rebuilds once with the larger range.
+
+Per-process DuckDB limits can be set through the environment (the harness
+worker pool does this so N workers don't each claim all cores / 80% of RAM;
+the store build honours them too):
+
+  NLINK_DUCKDB_THREADS       e.g. 4
+  NLINK_DUCKDB_MEMORY_LIMIT  e.g. 6GB
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from nlink_lib.link_store import get_link_store, is_null_model_store
+from nlink_lib.paths import ANALYSIS_DIR, NLINK_PATH, file_fingerprint, file_sha256
+from nlink_lib.rules import Rule, parse_rule
+
+# duckdb / pyarrow are imported where a connection or table is made, so that
+# importing the path and env constants (cycle_pool, the harnesses) stays cheap.
+if TYPE_CHECKING:
+    import duckdb
+    import pyarrow as pa
+
+
+EDGES_STORE_DIR = ANALYSIS_DIR / "edges_store"
+EDGES_STORE_VERSION = 1
+DEFAULT_MAX_N = 10
+
+THREADS_ENV = "NLINK_DUCKDB_THREADS"
+MEMORY_LIMIT_ENV = "NLINK_DUCKDB_MEMORY_LIMIT"
+
+_DB_NAME = "edges.duckdb"
+
+
+def edges_db_path(store_dir: Path = EDGES_STORE_DIR) -> Path:
+    return store_dir / _DB_NAME
+
+
+def _read_manifest(store_dir: Path) -> dict | None:
+    try:
+        return json.loads((store_dir / "manifest.json").read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _write_manifest(store_dir: Path, manifest: dict) -> None:
+    tmp = store_dir / f"manifest.json.tmp-{os.getpid()}"
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp, store_dir / "manifest.json")
+
+
+def is_edges_store_fresh(
+    n: int | None = None,
+    *,
+    store_dir: Path = EDGES_STORE_DIR,
+    nlink_path: Path = NLINK_PATH,
+) -> bool:
+    """True if the store exists, covers N (if given) and matches nlink_sequences.parquet."""
+
+    manifest = _read_manifest(store_dir)
+    if manifest is None or manifest.get("version") != EDGES_STORE_VERSION:
+        return False
+    if not edges_db_path(store_dir).exists():
+        return False
+    if n is not None and int(n) > int(manifest.get("max_n", 0)):
+        return False
+
+    sources = manifest.get("sources", {})
+    fp = file_fingerprint(nlink_path)
+    if fp is None:
+        return False
+    if sources.get("nlink") == fp:
+        return True
+    # Size/mtime changed: only the content hash can say whether the edges did.
+    recorded = sources.get("nlink") or {}
+    if recorded.get("size") != fp["size"] or file_sha256(nlink_path) != sources.get("nlink_sha256"):
+        return False
+    manifest["sources"]["nlink"] = fp
+    _write_manifest(store_dir, manifest)
+    return True
+
+
+def apply_duckdb_limits(con: duckdb.DuckDBPyConnection) -> None:
+    """Apply NLINK_DUCKDB_THREADS / NLINK_DUCKDB_MEMORY_LIMIT (when set) to a connection."""
+
+    threads = os.environ.get(THREADS_ENV)
+    if threads:
+        con.execute(f"SET threads = {int(threads)}")
+    memory_limit = os.environ.get(MEMORY_LIMIT_ENV)
+    if memory_limit:
+        con.execute("SET memory_limit = ?", [memory_limit])
+
+
+def build_edges_store(
+    max_n: int = DEFAULT_MAX_N,
+    *,
+    store_dir: Path = EDGES_STORE_DIR,
+    nlink_path: Path = NLINK_PATH,
+) -> Path:
+    """One scan of nlink_sequences.parquet -> edges_all(n, src_page_id, dst_page_id) for N = 1..max_n."""
+
+    if not nlink_path.exists():
+        raise FileNotFoundError(f"Missing: {nlink_path}")
+    if max_n <= 0:
+        raise ValueError("max_n must be >= 1")
+
+    print(f"Materializing edges for N=1..{int(max_n)} from nlink_sequences.parquet (one-time cost)...")
+    t0 = time.time()
+
+    tmp_dir = store_dir.with_name(store_dir.name + f".tmp-{os.getpid()}")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    import duckdb
+
+    fingerprint = file_fingerprint(nlink_path)
+    con = duckdb.connect(str(edges_db_path(tmp_dir)))
+    try:
+        apply_duckdb_limits(con)
+        # Ordinality = 1-based link position = N. A NULL element at position N
+        # means f_N is undefined there, same as list_extract(...) IS NULL.
+        con.execute(
+            f"""
+            CREATE TABLE edges_all AS
+            SELECT
+                u.n::INTEGER AS n,
+                s.page_id::BIGINT AS src_page_id,
+                u.dst::BIGINT AS dst_page_id
+            FROM read_parquet('{nlink_path.as_posix()}') AS s,
+                 UNNEST(list_slice(s.link_sequence, 1, {int(max_n)})) WITH ORDINALITY AS u(dst, n)
+            WHERE u.dst IS NOT NULL
+            ORDER BY n, dst_page_id
+            """.strip()
+        )
+        counts = con.execute("SELECT n, COUNT(*) FROM edges_all GROUP BY n ORDER BY n").fetchall()
+    finally:
+        con.close()
+
+    print("Hashing nlink_sequences.parquet for the manifest...")
+    manifest = {
+        "version": EDGES_STORE_VERSION,
+        "max_n": int(max_n),
+        "edges_per_n": {str(int(k)): int(v) for k, v in counts},
+        "sources": {"nlink": fingerprint, "nlink_sha256": file_sha256(nlink_path)},
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    _write_manifest(tmp_dir, manifest)
+
+    if store_dir.exists():
+        shutil.rmtree(store_dir)
+    os.replace(tmp_dir, store_dir)
+
+    dt = time.time() - t0
+    total = sum(int(v) for _, v in counts)
+    print(f"Edges store ready: {total:,} edges for N=1..{int(max_n)} in {dt:.1f}s ({store_dir})")
+    return store_dir
+
+
+def prepare_edges_db(n: int, *, store_dir: Path = EDGES_STORE_DIR) -> Path:
+    """Make sure the store covers N (call before starting parallel readers); returns the DB path."""
+
+    if not is_edges_store_fresh(int(n), store_dir=store_dir):
+        manifest = _read_manifest(store_dir) or {}
+        max_n = max(int(n), DEFAULT_MAX_N, int(manifest.get("max_n", 0)))
+        build_edges_store(max_n, store_dir=store_dir)
+    return edges_db_path(store_dir)
+
+
+def edges_count(n: int, *, store_dir: Path = EDGES_STORE_DIR) -> int:
+    """Number of f_N edges according to the manifest (0 if unknown)."""
+
+    manifest = _read_manifest(store_dir) or {}
+    return int(manifest.get("edges_per_n", {}).get(str(int(n)), 0))
+
+
+def _rule_edges(rule: Rule) -> pa.Table:
+    import pyarrow as pa
+
+    store = get_link_store()
+    succ = rule.successors(store)
+    src = np.nonzero(succ >= 0)[0]
+    page_ids = np.asarray(store.page_ids).astype(np.int64)
+    return pa.table({"src_page_id": page_ids[src], "dst_page_id": page_ids[succ[src]]})
+
+
+def connect_edges_db(rule: int | str | Rule) -> duckdb.DuckDBPyConnection:
+    """Connection with ``edges(src_page_id, dst_page_id)`` for N or any rule (store built if needed)."""
+
+    import duckdb
+
+    rule = parse_rule(rule)
+    from_store = rule.n is None or is_null_model_store()
+    if from_store:
+        con = duckdb.connect()
+    else:
+        con = duckdb.connect(str(prepare_edges_db(rule.n)), read_only=True)
+    apply_duckdb_limits(con)
+    if from_store:
+        con.register("rule_edges", _rule_edges(rule))
+        con.execute("CREATE TEMP VIEW edges AS SELECT src_page_id, dst_page_id FROM rule_edges")
+        return con
+    con.execute(
+        f"""
+        CREATE TEMP VIEW edges AS
+        SELECT src_page_id, dst_page_id
+        FROM edges_all
+        WHERE n = {rule.n}
+        """.strip()
+    )
+    return con
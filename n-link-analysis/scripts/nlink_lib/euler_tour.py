@@ -0,0 +1,273 @@
+"""DFS entry/exit intervals over the f_N in-forest.
+
+Reversing f_N turns every basin into a forest: each cycle node (and each HALT
+node) is a root, and every other node hangs below its successor. Numbering the
+nodes in DFS preorder gives each node an interval
+
+  [tin, tin + size)   size = nodes in its subtree (itself included)
+
+so that
+
+  "A drains through B"          tin[B] <= tin[A] < tin[B] + size[B]
+  "members of the subtree at X"  order[tin[X] : tin[X] + size[X]]
+  "subtree size at X"            size[X]
+
+are O(1) comparisons or contiguous slices. Roots are ordered by (terminal,
+dense id) and children by dense id, so the roots of one cycle are adjacent and
+a whole basin is the slice starting at its smallest cycle node. Upstream
+queries against a cycle node compare cycle_id instead (the cycle itself is
+not part of any tree).
+
+The intervals are computed without a recursive DFS: subtree sizes bottom-up
+one depth layer at a time, then preorder starts top-down, where a child's
+start is its parent's start + 1 + the sizes of its earlier siblings (a
+segmented exclusive cumsum). ``tree_intervals`` is the generic form used for
+other tree layouts (e.g. the basin geometry viewer's leaf-span layout).
+
+Results are persisted per rule under analysis/euler_tour/{rule.key}/ (``n={N}``
+for the fixed N-link rule) next to the decomposition and reused until it changes:
+
+  tin.npy    int32  preorder position of each dense node id
+  size.npy   int32  subtree size
+  order.npy  int32  dense ids in preorder (order[tin[v]] == v)
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from nlink_lib.decomposition import Decomposition, decomposition_dir_for, get_decomposition
+from nlink_lib.paths import ANALYSIS_DIR, file_fingerprint
+from nlink_lib.rules import Rule, parse_rule
+
+
+EULER_TOUR_DIR = ANALYSIS_DIR / "euler_tour"
+EULER_TOUR_VERSION = 1
+
+_ARRAY_NAMES = ("tin", "size", "order")
+
+
+def _expected_sources(rule: int | str | Rule) -> dict[str, object]:
+    return {"decomposition": file_fingerprint(decomposition_dir_for(rule) / "manifest.json")}
+
+
+def euler_tour_dir_for(rule: int | str | Rule) -> Path:
+    return EULER_TOUR_DIR / parse_rule(rule).key
+
+
+def is_euler_tour_fresh(rule: int | str | Rule) -> bool:
+    out_dir = euler_tour_dir_for(rule)
+    manifest_path = out_dir / "manifest.json"
+    if not manifest_path.exists():
+        return False
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return False
+    if manifest.get("version") != EULER_TOUR_VERSION or manifest.get("sources") != _expected_sources(rule):
+        return False
+    return all((out_dir / f"{name}.npy").exists() for name in _ARRAY_NAMES)
+
+
+def _layer_bounds(depth: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(depth, kind="stable")
+    bounds = np.searchsorted(depth[order], np.arange(int(depth.max(initial=0)) + 2))
+    return order, bounds
+
+
+def subtree_totals(parent: np.ndarray, depth: np.ndarray, weight: np.ndarray) -> np.ndarray:
+    """Sum of ``weight`` over each node's subtree (parent -1 = root; depth[child] > depth[parent])."""
+
+    parent = np.asarray(parent, dtype=np.int64)
+    depth = np.asarray(depth)
+    total = np.asarray(weight, dtype=np.int64).copy()
+    order, bounds = _layer_bounds(depth)
+    for d in range(len(bounds) - 2, 0, -1):
+        layer = order[bounds[d] : bounds[d + 1]]
+        layer = layer[parent[layer] >= 0]
+        if len(layer):
+            np.add.at(total, parent[layer], total[layer])
+    return total
+
+
+def tree_intervals(
+    parent: np.ndarray,
+    depth: np.ndarray,
+    width: np.ndarray,
+    *,
+    self_width: int,
+    sibling_key: np.ndarray,
+) -> np.ndarray:
+    """Start of each node's interval when children tile their parent's interval.
+
+    Nodes with the same parent (roots share the virtual parent -1, whose
+    interval starts at 0) are laid out in ascending ``sibling_key`` order,
+    each taking ``width`` units after the parent's first ``self_width`` units.
+    ``width`` = subtree size with ``self_width`` = 1 gives DFS preorder.
+    """
+
+    parent = np.asarray(parent, dtype=np.int64)
+    depth = np.asarray(depth)
+    width = np.asarray(width, dtype=np.int64)
+    sibling_key = np.asarray(sibling_key)
+    start = np.zeros(len(parent), dtype=np.int64)
+    order, bounds = _layer_bounds(depth)
+    for d in range(len(bounds) - 1):
+        layer = order[bounds[d] : bounds[d + 1]]
+        if len(layer) == 0:
+            continue
+        par = parent[layer]
+        layer = layer[np.lexsort((sibling_key[layer], par))]
+        par = parent[layer]
+        w = width[layer]
+        # Segmented exclusive cumsum of sibling widths.
+        csum = np.cumsum(w)
+        first = np.ones(len(layer), dtype=bool)
+        first[1:] = par[1:] != par[:-1]
+        group_base = (csum - w)[first]
+        before = csum - w - np.repeat(group_base, np.diff(np.append(np.nonzero(first)[0], len(layer))))
+        base = np.where(par >= 0, start[np.maximum(par, 0)] + int(self_width), 0)
+        start[layer] = base + before
+    return start
+
+
+def compute_euler_tour(decomp: Decomposition) -> dict[str, np.ndarray]:
+    """(tin, size, order) for the in-forest of one decomposition."""
+
+    succ = np.asarray(decomp.succ).astype(np.int64)
+    depth = np.asarray(decomp.depth)
+    num_nodes = len(succ)
+
+    # Roots: cycle nodes and HALT nodes (depth 0); every other node's parent is its successor.
+    parent = np.where(depth > 0, succ, -1)
+    size = subtree_totals(parent, depth, np.ones(num_nodes, dtype=np.int64))
+
+    # Roots sort by terminal (cycle id, or the HALT node itself) so each basin is
+    # one contiguous range; children of a node sort by dense id.
+    cycle_id = np.asarray(decomp.cycle_id).astype(np.int64)
+    terminal = np.where(cycle_id >= 0, cycle_id, np.asarray(decomp.halt_node))
+    ids = np.arange(num_nodes, dtype=np.int64)
+    sibling_key = np.where(depth > 0, ids, terminal * num_nodes + ids)
+
+    tin = tree_intervals(parent, depth, size, self_width=1, sibling_key=sibling_key)
+    order = np.empty(num_nodes, dtype=np.int32)
+    order[tin] = ids
+    return {"tin": tin.astype(np.int32), "size": size.astype(np.int32), "order": order}
+
+
+@dataclass(frozen=True)
+class EulerTour:
+    """Preorder intervals for one rule, alongside the decomposition they index."""
+
+    decomp: Decomposition
+    tin: np.ndarray
+    size: np.ndarray
+    order: np.ndarray
+
+    @property
+    def rule(self) -> Rule:
+        return self.decomp.rule
+
+    @property
+    def n(self) -> int | None:
+        return self.decomp.n
+
+    def __len__(self) -> int:
+        return int(len(self.tin))
+
+    def subtree(self, node: int) -> np.ndarray:
+        """Dense ids of the subtree at ``node`` (node first, preorder)."""
+
+        start = int(self.tin[int(node)])
+        return np.asarray(self.order[start : start + int(self.size[int(node)])])
+
+    def subtree_size(self, node: int) -> int:
+        return int(self.size[int(node)])
+
+    def basin(self, terminal: int) -> np.ndarray:
+        """All nodes draining into a cycle (given its cycle id) or a HALT node, cycle nodes included."""
+
+        terminal = int(terminal)
+        if self.decomp.on_cycle[terminal]:
+            # The cycle's trees are adjacent, from its smallest member onward.
+            members = self.decomp.cycle_members(int(self.decomp.cycle_id[terminal]))
+            starts, ends = self.slice_bounds(members)
+            return np.asarray(self.order[int(starts.min()) : int(ends.max())])
+        return self.subtree(terminal)
+
+    def is_upstream(self, a: np.ndarray | int, b: np.ndarray | int) -> np.ndarray:
+        """True where the f_N path from ``a`` passes through ``b`` (a == b counts)."""
+
+        a = np.asarray(a, dtype=np.int64)
+        b = np.asarray(b, dtype=np.int64)
+        tin_a = np.asarray(self.tin)[a]
+        tin_b = np.asarray(self.tin)[b]
+        in_subtree = (tin_b <= tin_a) & (tin_a < tin_b + np.asarray(self.size)[b])
+        cycle_id = np.asarray(self.decomp.cycle_id)
+        on_cycle = np.asarray(self.decomp.on_cycle)[b]
+        return np.where(on_cycle, cycle_id[a] == cycle_id[b], in_subtree)
+
+    def slice_bounds(self, nodes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """[start, end) preorder ranges of the subtrees at ``nodes``."""
+
+        nodes = np.asarray(nodes, dtype=np.int64)
+        start = np.asarray(self.tin)[nodes].astype(np.int64)
+        return start, start + np.asarray(self.size)[nodes]
+
+
+def build_euler_tour(decomp: Decomposition) -> Path:
+    rule = decomp.rule
+    out_dir = euler_tour_dir_for(rule)
+
+    print(f"Computing Euler-tour intervals for {rule.label} over {len(decomp):,} nodes...")
+    t0 = time.time()
+    arrays = compute_euler_tour(decomp)
+
+    tmp_dir = out_dir.with_name(out_dir.name + f".tmp-{os.getpid()}")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+    for name, arr in arrays.items():
+        np.save(tmp_dir / f"{name}.npy", arr)
+
+    manifest = {
+        "version": EULER_TOUR_VERSION,
+        "rule": rule.key,
+        "n": rule.n,
+        "nodes": int(len(decomp)),
+        "sources": _expected_sources(rule),
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    (tmp_dir / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    out_dir.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(tmp_dir, out_dir)
+
+    print(f"Euler tour {rule.label} ready in {time.time() - t0:.1f}s ({out_dir})")
+    return out_dir
+
+
+def get_euler_tour(rule: int | str | Rule) -> EulerTour:
+    """Euler-tour intervals for N (or any rule), (re)built on first use if missing or stale."""
+
+    return _load_euler_tour(parse_rule(rule))
+
+
+@functools.lru_cache(maxsize=4)
+def _load_euler_tour(rule: Rule) -> EulerTour:
+    decomp = get_decomposition(rule)
+    if not is_euler_tour_fresh(rule):
+        build_euler_tour(decomp)
+    out_dir = euler_tour_dir_for(rule)
+    arrays = {name: np.load(out_dir / f"{name}.npy", mmap_mode="r") for name in _ARRAY_NAMES}
+    return EulerTour(decomp=decomp, **arrays)
@@ -0,0 +1,248 @@
+"""Persistent CSR link store built once from nlink_sequences.parquet.
+
+Scripts that need f_N used to re-read ``nlink_sequences.parquet`` and
+``list_extract`` the Nth link per row on every run. This module streams the
+Parquet file once into compressed-sparse-row arrays under
+data/wikipedia/processed/analysis/link_store/ and memory-maps them:
+
+  page_ids.npy  int64, sorted ascending; dense node id = row in this array.
+                Universe = pages with a link sequence ∪ every link target, so
+                targets without a sequence are present with out-degree 0.
+  offsets.npy   int64, len = nodes + 1; links of node i are targets[offsets[i]:offsets[i+1]]
+  targets.npy   int32 dense node ids, in original link order (position k = offsets[i] + k - 1)
+  manifest.json nlink_sequences.parquet fingerprint (size, mtime) used to detect staleness;
+                null-model stores (nlink_lib/null_models.py) record their generator
+                under "null_model" instead and are never rebuilt from the Parquet file
+
+f_N as a dense successor array is then one gather:
+
+  succ_N[i] = targets[offsets[i] + N - 1] if out_degree[i] >= N else -1 (HALT)
+
+Pages with fewer than N links HALT, as in the per-script
+``_load_successor_arrays`` scans. The node universe differs: those scans
+return only pages with a row in nlink_sequences.parquet, while the store also
+holds link targets without a row (out-degree 0, so they HALT at once). Counts
+over the whole universe (pages, HALT pages) therefore include those
+target-only pages; start pools that require a successor are the same.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from nlink_lib.paths import ANALYSIS_DIR, NLINK_PATH, file_fingerprint
+from nlink_lib.rules import Rule, parse_rule
+
+
+STORE_DIR = ANALYSIS_DIR / "link_store"
+STORE_VERSION = 1
+
+_ARRAY_NAMES = ("page_ids", "offsets", "targets")
+_BATCH_ROWS = 262_144
+
+
+def _expected_sources(nlink_path: Path) -> dict[str, object]:
+    return {"nlink": file_fingerprint(nlink_path)}
+
+
+def is_link_store_fresh(store_dir: Path = STORE_DIR, *, nlink_path: Path = NLINK_PATH) -> bool:
+    manifest_path = store_dir / "manifest.json"
+    if not manifest_path.exists():
+        return False
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return False
+    if manifest.get("version") != STORE_VERSION:
+        return False
+    if manifest.get("null_model") is None and manifest.get("sources") != _expected_sources(nlink_path):
+        return False
+    return all((store_dir / f"{name}.npy").exists() for name in _ARRAY_NAMES)
+
+
+def is_null_model_store(store_dir: Path = STORE_DIR) -> bool:
+    """True if the store at ``store_dir`` is a generated null-model graph."""
+
+    try:
+        manifest = json.loads((store_dir / "manifest.json").read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return False
+    return manifest.get("null_model") is not None
+
+
+def _iter_sequence_batches(nlink_path: Path) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Yield (page_ids, lengths, flat_links) per record batch (null sequences = empty)."""
+
+    # Only building reads the Parquet file; loading the store needs numpy alone.
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    pf = pq.ParquetFile(nlink_path)
+    for batch in pf.iter_batches(batch_size=_BATCH_ROWS, columns=["page_id", "link_sequence"]):
+        page_ids = batch.column(0).to_numpy(zero_copy_only=False).astype(np.int64, copy=False)
+        seqs = batch.column(1)
+        lengths = pc.fill_null(pc.list_value_length(seqs), 0).to_numpy(zero_copy_only=False).astype(np.int64)
+        flat = pc.list_flatten(seqs).to_numpy(zero_copy_only=False).astype(np.int64, copy=False)
+        yield page_ids, lengths, flat
+
+
+def build_link_store(*, store_dir: Path = STORE_DIR, nlink_path: Path = NLINK_PATH) -> Path:
+    """Two streaming passes: (1) node universe + degrees, (2) scatter dense targets."""
+
+    if not nlink_path.exists():
+        raise FileNotFoundError(f"Missing: {nlink_path}")
+
+    print("Building CSR link store from nlink_sequences.parquet (one-time cost)...")
+    t0 = time.time()
+
+    src_chunks: list[np.ndarray] = []
+    len_chunks: list[np.ndarray] = []
+    uniq_chunks: list[np.ndarray] = []
+    for page_ids, lengths, flat in _iter_sequence_batches(nlink_path):
+        src_chunks.append(page_ids)
+        len_chunks.append(lengths)
+        uniq_chunks.append(np.unique(flat))
+
+    src_all = np.concatenate(src_chunks) if src_chunks else np.zeros(0, dtype=np.int64)
+    len_all = np.concatenate(len_chunks) if len_chunks else np.zeros(0, dtype=np.int64)
+    universe = np.union1d(src_all, np.concatenate(uniq_chunks) if uniq_chunks else np.zeros(0, dtype=np.int64))
+    del uniq_chunks
+    if len(universe) >= np.iinfo(np.int32).max:
+        raise ValueError(f"Too many nodes for int32 dense ids: {len(universe):,}")
+
+    src_dense = np.searchsorted(universe, src_all)
+    out_degree = np.zeros(len(universe), dtype=np.int64)
+    np.add.at(out_degree, src_dense, len_all)
+    offsets = np.zeros(len(universe) + 1, dtype=np.int64)
+    np.cumsum(out_degree, out=offsets[1:])
+    num_edges = int(offsets[-1])
+    del src_all, len_all, src_dense
+
+    tmp_dir = store_dir.with_name(store_dir.name + f".tmp-{os.getpid()}")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    targets = np.lib.format.open_memmap(tmp_dir / "targets.npy", mode="w+", dtype=np.int32, shape=(num_edges,))
+    for page_ids, lengths, flat in _iter_sequence_batches(nlink_path):
+        if len(flat) == 0:
+            continue
+        row_starts = offsets[np.searchsorted(universe, page_ids)]
+        local_starts = np.cumsum(lengths) - lengths
+        dest = np.repeat(row_starts - local_starts, lengths) + np.arange(len(flat), dtype=np.int64)
+        targets[dest] = np.searchsorted(universe, flat).astype(np.int32)
+    targets.flush()
+    del targets
+
+    np.save(tmp_dir / "page_ids.npy", universe)
+    np.save(tmp_dir / "offsets.npy", offsets)
+
+    manifest = {
+        "version": STORE_VERSION,
+        "nodes": int(len(universe)),
+        "edges": num_edges,
+        "sources": _expected_sources(nlink_path),
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    (tmp_dir / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    if store_dir.exists():
+        shutil.rmtree(store_dir)
+    os.replace(tmp_dir, store_dir)
+
+    dt = time.time() - t0
+    print(f"Link store ready: {len(universe):,} nodes, {num_edges:,} links in {dt:.1f}s ({store_dir})")
+    return store_dir
+
+
+class LinkStore:
+    """Memory-mapped CSR view of all ordered link sequences (see module docstring)."""
+
+    def __init__(self, store_dir: Path = STORE_DIR) -> None:
+        self.store_dir = Path(store_dir)
+        arrays = {name: np.load(self.store_dir / f"{name}.npy", mmap_mode="r") for name in _ARRAY_NAMES}
+        self.page_ids: np.ndarray = arrays["page_ids"]
+        self.offsets: np.ndarray = arrays["offsets"]
+        self.targets: np.ndarray = arrays["targets"]
+
+    def __len__(self) -> int:
+        return int(len(self.page_ids))
+
+    @property
+    def num_edges(self) -> int:
+        return int(self.offsets[-1])
+
+    @functools.cached_property
+    def manifest(self) -> dict:
+        return json.loads((self.store_dir / "manifest.json").read_text(encoding="utf-8"))
+
+    @property
+    def null_model(self) -> dict | None:
+        """Generator parameters if this is a null-model graph, else None."""
+
+        return self.manifest.get("null_model")
+
+    @functools.cached_property
+    def out_degree(self) -> np.ndarray:
+        return np.diff(np.asarray(self.offsets)).astype(np.int64)
+
+    def dense_ids(self, page_ids: Iterable[int] | np.ndarray) -> np.ndarray:
+        """Dense node id for each page_id (-1 where the page_id is unknown)."""
+
+        ids = np.asarray(list(page_ids) if not isinstance(page_ids, np.ndarray) else page_ids, dtype=np.int64)
+        if len(self.page_ids) == 0:
+            return np.full(ids.shape, -1, dtype=np.int64)
+        pos = np.searchsorted(self.page_ids, ids)
+        pos_c = np.minimum(pos, len(self.page_ids) - 1)
+        return np.where(self.page_ids[pos_c] == ids, pos_c, -1).astype(np.int64)
+
+    def links_of(self, node: int) -> np.ndarray:
+        """Dense targets of one node, in link order."""
+
+        return np.asarray(self.targets[int(self.offsets[node]) : int(self.offsets[node + 1])])
+
+    def successors(self, n: int) -> np.ndarray:
+        """Dense f_N successor per node (int32; -1 = HALT)."""
+
+        if n <= 0:
+            raise ValueError("n must be >= 1")
+        has = self.out_degree >= int(n)
+        succ = np.full(len(self), -1, dtype=np.int32)
+        succ[has] = self.targets[np.asarray(self.offsets[:-1])[has] + (int(n) - 1)]
+        return succ
+
+
+@functools.lru_cache(maxsize=1)
+def get_link_store() -> LinkStore:
+    """Process-wide LinkStore, (re)built on first use if missing or stale."""
+
+    if not NLINK_PATH.exists():
+        raise FileNotFoundError(f"Missing: {NLINK_PATH}")
+    if not is_link_store_fresh():
+        build_link_store()
+    return LinkStore()
+
+
+def load_successor_arrays(rule: int | str | Rule) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(page_ids, next_page_ids, out_degree) over the store's node universe.
+
+    ``next_page_ids`` is -1 for HALT, as from the per-script
+    ``_load_successor_arrays`` helpers, but a gather over the CSR store instead
+    of a DuckDB scan. Unlike them, the arrays also cover link targets without a
+    row in nlink_sequences.parquet (out-degree 0; see the module docstring).
+    ``rule`` is an N or any traversal rule (nlink_lib/rules.py).
+    """
+
+    store = get_link_store()
+    succ = parse_rule(rule).successors(store)
+    page_ids = np.asarray(store.page_ids)
+    next_ids = np.where(succ >= 0, page_ids[np.maximum(succ, 0)], -1).astype(np.int64)
+    return page_ids, next_ids, store.out_degree
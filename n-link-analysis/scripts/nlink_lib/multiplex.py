@@ -0,0 +1,303 @@
+"""The (page, N) multiplex: terminals across rules, tunnel nodes, rule switching.
+
+Each fixed-N basin partition is one layer of a multiplex whose states are
+(page, N). Inside a layer a state moves along f_N; between layers a page can
+switch rule (page, N) -> (page, N'). This module stacks the per-N
+decompositions (nlink_lib/decomposition.py) into that multiplex.
+
+Cycle identity across N
+-----------------------
+A decomposition's cycle_id is only the smallest dense id on the cycle, so two
+different cycles at different N can share it. ``CycleCatalog`` gives every
+distinct cycle one canonical index across all layers, keyed by its min
+rotation (members in successor order starting at the smallest dense id), so
+the same cycle appearing at N=4 and N=5 gets the same index.
+
+Tunnel nodes
+------------
+With T[k, v] the canonical terminal cycle of page v under the k-th rule
+(-1 = HALT), switching rule at v moves it from basin T[k, v] to T[k', v].
+A tunnel node is a page with at least two distinct terminals across the
+layers (HALT optionally counted as a terminal); ``tunnel_edges`` counts tunnel
+nodes per ((N_a, cycle A), (N_b, cycle B)) pair with A != B.
+
+Minimum rule switches
+---------------------
+``min_switches`` finds the fewest rule switches taking page A to cycle C: a
+BFS over switch counts (0-1 BFS: following f_N costs 0, switching costs 1).
+It is bidirectional in that the backward half is already known: the set of
+states that reach C with no further switch is exactly C's basin in each
+layer, i.e. T[k, v] == C. The forward search from A follows each layer's path
+(one vectorized step per hop, all states at once), stops as soon as a
+visited page lies in C's basin at some N, and otherwise switches every
+visited page to every other layer and repeats. The forward ball stays small
+(paths, not basins), so queries are interactive at full-graph scale.
+"""
+
+from __future__ import annotations
+
+import functools
+from dataclasses import dataclass
+
+import numpy as np
+
+from nlink_lib.decomposition import Decomposition, get_decomposition
+
+
+def cycle_sequences(decomp: Decomposition) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Every cycle at one N in min rotation.
+
+    Returns (cycle_ids, offsets, members): cycle i's members, in successor
+    order starting at its smallest dense id, are members[offsets[i]:offsets[i+1]].
+    """
+
+    on_cycle = np.asarray(decomp.on_cycle)
+    cycle_id = np.asarray(decomp.cycle_id)
+    succ = np.asarray(decomp.succ)
+    cycle_ids = np.unique(cycle_id[on_cycle]).astype(np.int64)
+    lengths = np.bincount(np.searchsorted(cycle_ids, cycle_id[on_cycle]), minlength=len(cycle_ids))
+    offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+
+    # Walk all cycles at once from their smallest member; the longest cycle bounds the loop.
+    members = np.empty(int(offsets[-1]), dtype=np.int64)
+    cur = cycle_ids.copy()
+    active = np.arange(len(cycle_ids))
+    for step in range(int(lengths.max(initial=0))):
+        active = active[lengths[active] > step]
+        members[offsets[active] + step] = cur[active]
+        cur[active] = succ[cur[active]]
+    return cycle_ids, offsets, members
+
+
+class CycleCatalog:
+    """Canonical index for every distinct cycle over a set of N values."""
+
+    def __init__(self, decomps: list[Decomposition]) -> None:
+        index: dict[bytes, int] = {}
+        sequences: list[np.ndarray] = []
+        # Per layer: dense cycle_id -> canonical index (aligned to that layer's sorted cycle ids).
+        self.layer_cycle_ids: list[np.ndarray] = []
+        self.layer_canonical: list[np.ndarray] = []
+        for decomp in decomps:
+            cycle_ids, offsets, members = cycle_sequences(decomp)
+            canonical = np.empty(len(cycle_ids), dtype=np.int32)
+            for i in range(len(cycle_ids)):
+                seq = members[offsets[i] : offsets[i + 1]]
+                key = seq.tobytes()
+                if key not in index:
+                    index[key] = len(sequences)
+                    sequences.append(seq)
+                canonical[i] = index[key]
+            self.layer_cycle_ids.append(cycle_ids)
+            self.layer_canonical.append(canonical)
+
+        lengths = np.array([len(s) for s in sequences], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        self.members = np.concatenate(sequences) if sequences else np.zeros(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return int(len(self.offsets) - 1)
+
+    def cycle_members(self, index: int) -> np.ndarray:
+        """Dense ids of a canonical cycle, min rotation."""
+
+        return self.members[self.offsets[int(index)] : self.offsets[int(index) + 1]]
+
+    def cycle_lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    @property
+    def heads(self) -> np.ndarray:
+        """Smallest dense id on each cycle (the decomposition's cycle_id at any N where it occurs)."""
+
+        return self.members[self.offsets[:-1]]
+
+    def canonical(self, layer: int, cycle_ids: np.ndarray) -> np.ndarray:
+        """Canonical index of decomposition cycle ids in one layer (-1 stays -1 = HALT)."""
+
+        cycle_ids = np.asarray(cycle_ids, dtype=np.int64)
+        known = self.layer_cycle_ids[layer]
+        pos = np.minimum(np.searchsorted(known, cycle_ids), max(len(known) - 1, 0))
+        if len(known) == 0:
+            return np.full(cycle_ids.shape, -1, dtype=np.int32)
+        return np.where(cycle_ids >= 0, self.layer_canonical[layer][pos], -1).astype(np.int32)
+
+
+@dataclass(frozen=True)
+class SwitchPath:
+    """Result of ``Multiplex.min_switches``: states from the start to the target cycle."""
+
+    switches: int
+    nodes: np.ndarray  # dense ids
+    n: np.ndarray  # rule in effect at each state
+
+
+class Multiplex:
+    """Decompositions for several N, addressed as layers 0..K-1."""
+
+    def __init__(self, n_values: tuple[int, ...]) -> None:
+        self.n_values = tuple(int(n) for n in n_values)
+        self.decomps = [get_decomposition(n) for n in self.n_values]
+        self.catalog = CycleCatalog(self.decomps)
+
+    def __len__(self) -> int:
+        return int(len(self.decomps[0]))
+
+    @property
+    def num_layers(self) -> int:
+        return len(self.n_values)
+
+    def layer_of(self, n: int) -> int:
+        try:
+            return self.n_values.index(int(n))
+        except ValueError:
+            raise KeyError(f"N={n} is not a layer of this multiplex {self.n_values}") from None
+
+    def terminals(self, layer: int, nodes: np.ndarray | None = None) -> np.ndarray:
+        """Canonical terminal cycle of ``nodes`` (default: all) in one layer; -1 = HALT."""
+
+        cycle_id = np.asarray(self.decomps[layer].cycle_id)
+        return self.catalog.canonical(layer, cycle_id if nodes is None else cycle_id[np.asarray(nodes)])
+
+    @functools.cached_property
+    def terminal_matrix(self) -> np.ndarray:
+        """(K, nodes) int32: canonical terminal per layer and page."""
+
+        return np.stack([self.terminals(k) for k in range(self.num_layers)])
+
+    # -- tunnel nodes --------------------------------------------------------
+
+    def distinct_terminals(self, *, include_halt: bool = False) -> np.ndarray:
+        """Number of distinct terminals per page across the layers."""
+
+        ordered = np.sort(self.terminal_matrix, axis=0)
+        counted = ordered >= (-1 if include_halt else 0)
+        changes = (ordered[1:] != ordered[:-1]) & counted[1:]
+        return counted[0].astype(np.int32) + changes.sum(axis=0, dtype=np.int32)
+
+    def tunnel_nodes(self, *, include_halt: bool = False) -> np.ndarray:
+        """Dense ids of pages with >= 2 distinct terminals across the layers."""
+
+        return np.nonzero(self.distinct_terminals(include_halt=include_halt) >= 2)[0]
+
+    def tunnel_edges(self, *, include_halt: bool = False, nodes: np.ndarray | None = None) -> dict[str, np.ndarray]:
+        """Tunnel-node counts per (layer a, cycle A) -> (layer b, cycle B), a < b, A != B."""
+
+        if nodes is None:
+            nodes = self.tunnel_nodes(include_halt=include_halt)
+        labels = self.terminal_matrix[:, nodes].astype(np.int64) + 1  # 0 = HALT
+        base = len(self.catalog) + 1
+        parts = []
+        for a in range(self.num_layers):
+            for b in range(a + 1, self.num_layers):
+                la, lb = labels[a], labels[b]
+                keep = la != lb
+                if not include_halt:
+                    keep &= (la > 0) & (lb > 0)
+                keys, counts = np.unique(la[keep] * base + lb[keep], return_counts=True)
+                parts.append((np.full(len(keys), a), np.full(len(keys), b), keys // base - 1, keys % base - 1, counts))
+        cols = [np.concatenate([p[i] for p in parts]).astype(np.int64) for i in range(5)]
+        return {"layer_a": cols[0], "layer_b": cols[1], "cycle_a": cols[2], "cycle_b": cols[3], "nodes": cols[4]}
+
+    # -- rule-switch search --------------------------------------------------
+
+    def _follow(self, states: np.ndarray, seen: np.ndarray, parent: list[tuple[np.ndarray, np.ndarray]]) -> tuple[np.ndarray, np.ndarray]:
+        """Closure of ``states`` under their own layer's f_N; returns (new states, updated seen)."""
+
+        num_nodes = len(self)
+        reached = [states]
+        cur = states
+        while len(cur):
+            layer, node = np.divmod(cur, num_nodes)
+            nxt = np.empty(len(cur), dtype=np.int64)
+            for k in np.unique(layer):
+                sel = layer == k
+                nxt[sel] = np.asarray(self.decomps[int(k)].succ)[node[sel]]
+            ok = nxt >= 0
+            nxt = layer[ok] * num_nodes + nxt[ok]
+            src = cur[ok]
+            nxt, first = np.unique(nxt, return_index=True)
+            src = src[first]
+            fresh = ~np.isin(nxt, seen, assume_unique=True)
+            nxt, src = nxt[fresh], src[fresh]
+            parent.append((nxt, src))
+            seen = np.union1d(seen, nxt)
+            reached.append(nxt)
+            cur = nxt
+        return np.concatenate(reached), seen
+
+    def _in_target_basin(self, states: np.ndarray, target: int) -> np.ndarray:
+        layer, node = np.divmod(states, len(self))
+        hit = np.zeros(len(states), dtype=bool)
+        for k in np.unique(layer):
+            sel = layer == k
+            hit[sel] = self.terminals(int(k), node[sel]) == int(target)
+        return hit
+
+    def min_switches(
+        self,
+        start: int,
+        target: int,
+        *,
+        start_n: int | None = None,
+        max_switches: int | None = None,
+    ) -> SwitchPath | None:
+        """Fewest rule switches from dense node ``start`` to canonical cycle ``target``.
+
+        The first rule is free unless ``start_n`` fixes it. Returns None if the
+        cycle is not reachable within ``max_switches`` (default: number of layers).
+        """
+
+        num_nodes = len(self)
+        layers = range(self.num_layers) if start_n is None else [self.layer_of(start_n)]
+        states = np.array(sorted(k * num_nodes + int(start) for k in layers), dtype=np.int64)
+        parent: list[tuple[np.ndarray, np.ndarray]] = [(states, np.full(len(states), -1, dtype=np.int64))]
+        seen = states
+        limit = self.num_layers if max_switches is None else int(max_switches)
+
+        for switches in range(limit + 1):
+            reached, seen = self._follow(states, seen, parent)
+            hit = self._in_target_basin(reached, target)
+            if hit.any():
+                return self._path(int(reached[np.nonzero(hit)[0][0]]), target, switches, parent)
+            if switches == limit:
+                break
+            # Switch every page reached so far in this round to every other layer.
+            pages = np.unique(reached % num_nodes)
+            origin = reached[np.unique(reached % num_nodes, return_index=True)[1]]
+            cand = (np.arange(self.num_layers, dtype=np.int64)[:, None] * num_nodes + pages[None, :]).ravel()
+            src = np.tile(origin, self.num_layers)
+            fresh = ~np.isin(cand, seen)
+            states, src = cand[fresh], src[fresh]
+            if len(states) == 0:
+                break
+            parent.append((states, src))
+            seen = np.union1d(seen, states)
+        return None
+
+    def _path(self, state: int, target: int, switches: int, parent: list[tuple[np.ndarray, np.ndarray]]) -> SwitchPath:
+        num_nodes = len(self)
+        back: dict[int, int] = {}
+        for child, src in parent:
+            back.update(zip(child.tolist(), src.tolist()))
+        chain = [state]
+        while back.get(chain[-1], -1) >= 0:
+            chain.append(back[chain[-1]])
+        chain.reverse()
+
+        # Finish along the final layer's f_N until the first node on the target cycle.
+        layer, node = divmod(state, num_nodes)
+        on_target = set(self.catalog.cycle_members(target).tolist())
+        succ = self.decomps[layer].succ
+        while node not in on_target:
+            node = int(succ[node])
+            chain.append(layer * num_nodes + node)
+        layers, nodes = np.divmod(np.asarray(chain, dtype=np.int64), num_nodes)
+        return SwitchPath(switches=int(switches), nodes=nodes, n=np.asarray(self.n_values, dtype=np.int64)[layers])
+
+
+@functools.lru_cache(maxsize=2)
+def get_multiplex(n_values: tuple[int, ...]) -> Multiplex:
+    """Multiplex over the given N values (decompositions built on first use)."""
+
+    return Multiplex(tuple(int(n) for n in n_values))
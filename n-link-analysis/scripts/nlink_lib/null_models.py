@@ -0,0 +1,263 @@
+"""Degree-preserving randomized baselines of the link graph, in link-store format.
+
+Basin statistics of the real graph only mean something against a baseline
+with the same degree structure. A null model keeps the node universe and the
+exact out-degree sequence of the CSR link store (so f_N HALTs at exactly the
+same pages) and redraws the link targets:
+
+  uniform     every target drawn uniformly from all nodes
+  in_degree   all targets permuted across the whole graph, so every node also
+              keeps its in-degree (configuration model over link slots)
+  shuffle     each page's own links permuted: same neighbour sets, random
+              order, isolating the effect of link *position* on f_N
+
+Self-links introduced by ``uniform`` / ``in_degree`` are redrawn (uniform) or
+swapped with random other slots (in_degree, which keeps the in-degrees);
+``shuffle`` keeps whatever self-links the page already had.
+
+Everything is vectorized over row-aligned blocks of ~16M links. Each block
+draws from its own ``SeedSequence`` child of (seed, model), so a graph is
+reproducible from its seed alone.
+
+A null graph is written as an analysis directory of its own,
+analysis/null_models/{model}_seed={seed}/:
+
+  link_store/       page_ids.npy / offsets.npy (hard links to the real store),
+                    targets.npy, manifest.json with "null_model" parameters
+  title_index/, title_search/
+                    symlinks to the real indexes (page ids are unchanged)
+  decomposition/    per-rule decompositions (``decompose_null_model``)
+
+Pointing ``NLINK_ANALYSIS_DIR`` at that directory makes every library-backed
+tool (decompositions, Euler tours, basin bitmaps, multiplex, ``edges`` views)
+run on the null graph unchanged.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from nlink_lib.decomposition import Decomposition, build_decomposition, load_decomposition
+from nlink_lib.link_store import STORE_VERSION, LinkStore
+from nlink_lib.paths import ANALYSIS_DIR
+from nlink_lib.rules import Rule, parse_rule
+
+
+NULL_MODELS_DIR = ANALYSIS_DIR / "null_models"
+MODELS = ("uniform", "in_degree", "shuffle")
+
+_CHUNK_EDGES = 1 << 24
+_SHARED_INDEXES = ("title_index", "title_search")
+_MAX_SWAP_ROUNDS = 64
+
+
+def null_model_dir(model: str, seed: int) -> Path:
+    return NULL_MODELS_DIR / f"{model}_seed={int(seed)}"
+
+
+def _row_blocks(offsets: np.ndarray) -> Iterator[tuple[int, int]]:
+    """Row ranges [r0, r1) covering about ``_CHUNK_EDGES`` links each."""
+
+    offsets = np.asarray(offsets)
+    num_rows = len(offsets) - 1
+    starts = np.searchsorted(offsets, np.arange(0, int(offsets[-1]), _CHUNK_EDGES), side="right") - 1
+    bounds = np.unique(np.concatenate([[0], np.clip(starts, 0, num_rows), [num_rows]]))
+    for r0, r1 in zip(bounds[:-1], bounds[1:]):
+        yield int(r0), int(r1)
+
+
+def _block_sources(store: LinkStore, r0: int, r1: int) -> np.ndarray:
+    return np.repeat(np.arange(r0, r1, dtype=np.int32), store.out_degree[r0:r1])
+
+
+def self_link_slots(targets: np.ndarray, store: LinkStore) -> np.ndarray:
+    """Link slots whose target is the page itself."""
+
+    offsets = np.asarray(store.offsets)
+    return np.concatenate(
+        [
+            np.nonzero(np.asarray(targets[offsets[r0] : offsets[r1]]) == _block_sources(store, r0, r1))[0] + offsets[r0]
+            for r0, r1 in _row_blocks(offsets)
+        ]
+        or [np.zeros(0, dtype=np.int64)]
+    )
+
+
+def _swap_out_self_links(targets: np.ndarray, store: LinkStore, rng: np.random.Generator) -> None:
+    """Swap self-link slots with random other slots (keeps every in-degree) until none are left."""
+
+    offsets = np.asarray(store.offsets)
+    num_edges = len(targets)
+    bad = self_link_slots(targets, store)
+    for _ in range(_MAX_SWAP_ROUNDS):
+        if len(bad) == 0 or num_edges < 2:
+            break
+        # Disjoint (slot, partner) pairs so the fancy-indexed swap is a true permutation.
+        partners = np.unique(rng.integers(0, num_edges, size=len(bad)))
+        partners = partners[~np.isin(partners, bad)]
+        slots = bad[: len(partners)]
+        partners = rng.permutation(partners)[: len(slots)]
+        targets[slots], targets[partners] = targets[partners], targets[slots]
+
+        touched = np.concatenate([bad, partners])
+        src = np.searchsorted(offsets, touched, side="right") - 1
+        bad = np.unique(touched[targets[touched] == src])
+
+
+def generate_targets(store: LinkStore, model: str, seed: int) -> np.ndarray:
+    """Null-model targets (int32 dense ids, same CSR offsets as ``store``)."""
+
+    if model not in MODELS:
+        raise ValueError(f"Unknown null model {model!r} (expected one of {', '.join(MODELS)})")
+    num_nodes = len(store)
+    offsets = np.asarray(store.offsets)
+    seq = np.random.SeedSequence([int(seed), MODELS.index(model)])
+
+    if model == "in_degree":
+        rng = np.random.default_rng(seq)
+        targets = rng.permutation(np.asarray(store.targets))
+        _swap_out_self_links(targets, store, rng)
+        return targets
+
+    blocks = list(_row_blocks(offsets))
+    targets = np.empty(store.num_edges, dtype=np.int32)
+    for (r0, r1), child in zip(blocks, seq.spawn(len(blocks))):
+        rng = np.random.default_rng(child)
+        e0, e1 = int(offsets[r0]), int(offsets[r1])
+        src = _block_sources(store, r0, r1)
+        if model == "uniform":
+            block = rng.integers(0, num_nodes, size=e1 - e0, dtype=np.int32)
+            bad = np.nonzero(block == src)[0] if num_nodes > 1 else np.zeros(0, dtype=np.int64)
+            while len(bad):
+                block[bad] = rng.integers(0, num_nodes, size=len(bad), dtype=np.int32)
+                bad = bad[block[bad] == src[bad]]
+        else:
+            # Sources are ascending, so sorting by (source, random key) permutes within each page.
+            order = np.lexsort((rng.random(e1 - e0), src))
+            block = np.asarray(store.targets[e0:e1])[order]
+        targets[e0:e1] = block
+    return targets
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def generate_null_model(
+    store: LinkStore,
+    model: str,
+    seed: int,
+    *,
+    out_dir: Path | None = None,
+    write_parquet: bool = False,
+) -> Path:
+    """Generate one null graph and write it as an analysis directory; returns that directory."""
+
+    out_dir = out_dir or null_model_dir(model, seed)
+    store_dir = out_dir / "link_store"
+
+    t0 = time.time()
+    targets = generate_targets(store, model, seed)
+
+    tmp_dir = store_dir.with_name(store_dir.name + f".tmp-{os.getpid()}")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+    for name in ("page_ids", "offsets"):
+        _link_or_copy(store.store_dir / f"{name}.npy", tmp_dir / f"{name}.npy")
+    np.save(tmp_dir / "targets.npy", targets)
+
+    manifest = {
+        "version": STORE_VERSION,
+        "nodes": int(len(store)),
+        "edges": int(store.num_edges),
+        "null_model": {
+            "model": model,
+            "seed": int(seed),
+            "self_links": int(len(self_link_slots(targets, store))),
+            "source_store": str(store.store_dir),
+            "source_built_at": store.manifest.get("built_at"),
+        },
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    (tmp_dir / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    if store_dir.exists():
+        shutil.rmtree(store_dir)
+    os.replace(tmp_dir, store_dir)
+
+    for name in _SHARED_INDEXES:
+        link = out_dir / name
+        source = store.store_dir.parent / name
+        if source.exists() and not link.exists():
+            link.symlink_to(source.resolve(), target_is_directory=True)
+
+    if write_parquet:
+        write_nlink_parquet(LinkStore(store_dir), out_dir / "nlink_sequences.parquet")
+
+    print(f"Null model {model} seed={int(seed)}: {store.num_edges:,} links in {time.time() - t0:.1f}s ({out_dir})")
+    return out_dir
+
+
+def write_nlink_parquet(store: LinkStore, path: Path) -> Path:
+    """Write a store as nlink_sequences.parquet (page_id, link_sequence) for Parquet-scanning tools."""
+
+    page_ids = np.asarray(store.page_ids)
+    rows = np.nonzero(store.out_degree > 0)[0]
+    offsets = np.asarray(store.offsets)
+    lengths = store.out_degree[rows]
+    list_offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    flat = np.concatenate(
+        [page_ids[np.asarray(store.targets[offsets[r0] : offsets[r1]])] for r0, r1 in _row_blocks(offsets)]
+        or [np.zeros(0, dtype=np.int64)]
+    )
+    table = pa.table(
+        {
+            "page_id": pa.array(page_ids[rows], type=pa.int64()),
+            "link_sequence": pa.LargeListArray.from_arrays(list_offsets, pa.array(flat, type=pa.int64())).cast(
+                pa.list_(pa.int64())
+            ),
+        }
+    )
+    pq.write_table(table, path)
+    return path
+
+
+def decompose_null_model(out_dir: Path, rule: int | str | Rule) -> Decomposition:
+    """Decompose a generated null graph under ``rule`` into ``out_dir``/decomposition/{rule.key}/."""
+
+    rule = parse_rule(rule)
+    store = LinkStore(out_dir / "link_store")
+    decomp_dir = build_decomposition(store, rule, out_dir=out_dir / "decomposition" / rule.key)
+    return load_decomposition(decomp_dir, rule)
+
+
+def basin_summary(decomp: Decomposition, *, top_k: int = 10) -> dict[str, float | int]:
+    """Scalar basin statistics compared between the real graph and its null models."""
+
+    num_nodes = max(len(decomp), 1)
+    sizes = np.sort(decomp.basin_sizes()[np.asarray(decomp.cycle_ids())])[::-1]
+    depth = np.asarray(decomp.depth)
+    cycle_basin = np.asarray(decomp.cycle_id) >= 0
+    return {
+        "cycles": int(len(sizes)),
+        "cycle_nodes": int(np.asarray(decomp.on_cycle).sum()),
+        "largest_basin": int(sizes[0]) if len(sizes) else 0,
+        "largest_basin_share": float(sizes[0] / num_nodes) if len(sizes) else 0.0,
+        "top_k_share": float(sizes[:top_k].sum() / num_nodes),
+        "halt_share": float((~cycle_basin).sum() / num_nodes),
+        "mean_depth_cycle": float(depth[cycle_basin].mean()) if cycle_basin.any() else 0.0,
+        "max_depth": int(depth.max(initial=0)),
+    }
@@ -0,0 +1,40 @@
+"""Canonical data locations shared by the analysis scripts.
+
+``NLINK_ANALYSIS_DIR`` overrides where the persistent stores (link store,
+decompositions, Euler tours, basin bitmaps, ...) live, e.g. to run the
+library-backed tools on a null-model graph (nlink_lib/null_models.py).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+PROCESSED_DIR = REPO_ROOT / "data" / "wikipedia" / "processed"
+NLINK_PATH = PROCESSED_DIR / "nlink_sequences.parquet"
+PAGES_PATH = PROCESSED_DIR / "pages.parquet"
+REDIRECTS_PATH = PROCESSED_DIR / "redirects.parquet"
+ANALYSIS_DIR_ENV = "NLINK_ANALYSIS_DIR"
+ANALYSIS_DIR = Path(os.environ[ANALYSIS_DIR_ENV]) if os.environ.get(ANALYSIS_DIR_ENV) else PROCESSED_DIR / "analysis"
+
+_HASH_CHUNK = 8 * 1024 * 1024
+
+
+def file_fingerprint(path: Path) -> dict[str, int] | None:
+    """(size, mtime_ns) of a source file, as recorded in the stores' manifests; None if missing."""
+
+    if not path.exists():
+        return None
+    st = path.stat()
+    return {"size": int(st.st_size), "mtime_ns": int(st.st_mtime_ns)}
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK):
+            h.update(chunk)
+    return h.hexdigest()
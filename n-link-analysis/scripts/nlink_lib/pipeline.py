@@ -0,0 +1,558 @@
+"""In-process DAG executor with content-hash output caching for the harnesses.
+
+run-analysis-harness.py and reproduce-main-findings.py used to start a fresh
+interpreter per step, each re-importing pandas / duckdb / plotly and
+reloading the graph. Here each step is a ``Stage``: a script in this
+directory, its arguments, the files it reads (``inputs``) and writes
+(``outputs``), and the stages it must run after. Stages run in-process
+(``runpy`` with a patched ``sys.argv``), so imports and the memory-mapped
+stores loaded through nlink_lib stay warm from one stage to the next.
+
+Caching
+-------
+A stage's fingerprint is the sha256 of its script source, the nlink_lib
+sources (where the stages do most of their work), its arguments and the
+content of every input file (globs allowed). A stage succeeds when its
+script exits 0 and every declared output exists (an exit 0 that leaves an
+output missing counts as failed). After a successful run the
+fingerprint and the sha256 of every output are recorded in
+analysis/pipeline_state.json. A later run skips the stage when the
+fingerprint is unchanged and the recorded outputs are still there with the
+same content. Because downstream fingerprints hash upstream *outputs*, an
+upstream stage that re-runs but writes identical files does not invalidate
+anything below it. File hashes are memoized by (size, mtime_ns), so
+re-checking multi-GB inputs costs a stat call. Stages without outputs
+always run.
+
+Parallelism
+-----------
+With ``jobs > 1`` ready stages run on a pool of forked worker processes
+(heavy modules are imported before the fork, and each worker keeps its own
+caches across the stages it runs); every stage's output goes to its own log
+file and every worker gets an equal share of DuckDB threads / memory (see
+nlink_lib.cycle_pool.worker_env). A stage may declare the memory it needs
+(``memory``, bytes); ready stages are admitted only while the running ones
+fit in ``memory_budget``, so heavy reverse-BFS stages never oversubscribe RAM
+while light ones fill the remaining workers. ``preload`` runs in the parent
+before the fork, so e.g. a memory-mapped link store is loaded once and
+inherited by every worker. With ``jobs == 1`` stages run one at a time in
+the calling process (declaration order among ready stages) with output
+streamed to the console.
+
+Progress
+--------
+Stages carry a ``row`` / ``column`` position (e.g. N and stage kind);
+``progress_table`` renders the state of every cell, printed every
+``progress_every`` seconds and kept current in ``{log_dir}/progress.txt``.
+
+Run log
+-------
+Each stage that runs is measured where it runs (wall / CPU time, peak RSS,
+I/O bytes; see nlink_lib.profiling), its declared inputs and outputs are
+counted in rows, and one JSON line per stage (cached and blocked ones
+included) is appended to ``run_log`` under a shared ``run_id``. With
+``profile`` set every stage also leaves a cProfile or tracemalloc dump in
+``{log_dir}/profiles/``. compare-pipeline-runs.py reports across runs.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import glob
+import hashlib
+import importlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from nlink_lib.cli import SCRIPTS_DIR, run_script_in_process
+from nlink_lib.cycle_pool import available_memory_bytes, worker_env
+from nlink_lib.paths import ANALYSIS_DIR
+from nlink_lib.profiling import RUN_LOG_PATH, append_records, count_rows, measure_stage, new_run_id
+
+
+PIPELINE_STATE_PATH = ANALYSIS_DIR / "pipeline_state.json"
+STATE_VERSION = 1
+
+# Imported once before forking so workers start with them loaded.
+WARM_MODULES = ("numpy", "pandas", "pyarrow.parquet", "duckdb", "matplotlib.pyplot")
+
+_HASH_CHUNK = 8 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class Stage:
+    key: str
+    script: str  # file name in n-link-analysis/scripts/
+    args: tuple[str, ...] = ()
+    inputs: tuple[str, ...] = ()  # paths or glob patterns hashed into the fingerprint
+    outputs: tuple[str, ...] = ()  # paths or glob patterns; none = always run
+    after: tuple[str, ...] = ()  # keys of stages that must finish first
+    description: str = ""
+    memory: int = 0  # bytes the stage may need at peak (admission control)
+    row: str = ""  # progress table position
+    column: str = ""
+
+
+@dataclass
+class StageResult:
+    key: str
+    status: str  # "ok", "cached", "failed" or "blocked" (an upstream stage failed)
+    seconds: float = 0.0
+    log_path: Path | None = None
+    metrics: dict = field(default_factory=dict)  # run-log record fields (ran stages only)
+
+    @property
+    def ok(self) -> bool:
+        return self.status in ("ok", "cached")
+
+
+def stage(
+    key: str,
+    script: str,
+    args: list[object] | tuple[object, ...] = (),
+    *,
+    inputs: list[object] | tuple[object, ...] = (),
+    outputs: list[object] | tuple[object, ...] = (),
+    after: list[str] | tuple[str, ...] = (),
+    description: str = "",
+    memory: int = 0,
+    row: str = "",
+    column: str = "",
+) -> Stage:
+    """Stage from loose values (ints, Paths) as the harnesses build them."""
+
+    return Stage(
+        key,
+        script,
+        tuple(str(a) for a in args),
+        tuple(str(p) for p in inputs),
+        tuple(str(p) for p in outputs),
+        tuple(after),
+        description,
+        int(memory),
+        row,
+        column or key,
+    )
+
+
+# ---------------------------------------------------------------------------
+# File hashing and state
+# ---------------------------------------------------------------------------
+
+
+def _expand(pattern: str) -> list[str]:
+    if any(c in pattern for c in "*?["):
+        return sorted(p for p in glob.glob(pattern) if os.path.isfile(p))
+    return [pattern]
+
+
+@dataclass
+class _State:
+    path: Path
+    stages: dict[str, dict] = field(default_factory=dict)
+    files: dict[str, list] = field(default_factory=dict)  # path -> [size, mtime_ns, sha256]
+    rows: dict[str, list] = field(default_factory=dict)  # path -> [size, mtime_ns, rows]
+
+    @classmethod
+    def load(cls, path: Path) -> _State:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return cls(path)
+        if data.get("version") != STATE_VERSION:
+            return cls(path)
+        return cls(path, dict(data.get("stages", {})), dict(data.get("files", {})), dict(data.get("rows", {})))
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + f".tmp-{os.getpid()}")
+        payload = {"version": STATE_VERSION, "stages": self.stages, "files": self.files, "rows": self.rows}
+        tmp.write_text(json.dumps(payload, indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def file_hash(self, path: str) -> str | None:
+        """sha256 of a file, memoized by (size, mtime_ns); None if missing."""
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        memo = self.files.get(path)
+        if memo and memo[0] == st.st_size and memo[1] == st.st_mtime_ns:
+            return memo[2]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(_HASH_CHUNK):
+                h.update(chunk)
+        self.files[path] = [int(st.st_size), int(st.st_mtime_ns), h.hexdigest()]
+        return h.hexdigest()
+
+    def row_count(self, path: str) -> int | None:
+        """Rows of a Parquet / TSV file (nlink_lib.profiling.count_rows), memoized like ``file_hash``."""
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        memo = self.rows.get(path)
+        if memo and memo[0] == st.st_size and memo[1] == st.st_mtime_ns:
+            return memo[2]
+        rows = count_rows(path)
+        self.rows[path] = [int(st.st_size), int(st.st_mtime_ns), rows]
+        return rows
+
+    def total_rows(self, patterns: tuple[str, ...]) -> int | None:
+        counts = [self.row_count(p) for pattern in patterns for p in _expand(pattern)]
+        counts = [c for c in counts if c is not None]
+        return sum(counts) if counts else None
+
+    def library_hash(self) -> str:
+        """sha256 over the nlink_lib/*.py sources, so a library edit invalidates every stage."""
+
+        h = hashlib.sha256()
+        for path in sorted(glob.glob(str(SCRIPTS_DIR / "nlink_lib" / "*.py"))):
+            h.update(f"{os.path.basename(path)}\0{self.file_hash(path)}\n".encode("utf-8"))
+        return h.hexdigest()
+
+    def fingerprint(self, st: Stage) -> str:
+        script = str(SCRIPTS_DIR / st.script)
+        payload = {
+            "script": st.script,
+            "script_sha256": self.file_hash(script),
+            "library_sha256": self.library_hash(),
+            "args": list(st.args),
+            "inputs": {pattern: {p: self.file_hash(p) for p in _expand(pattern)} for pattern in st.inputs},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def output_hashes(self, st: Stage) -> dict[str, str | None]:
+        return {p: self.file_hash(p) for pattern in st.outputs for p in _expand(pattern)}
+
+    def is_cached(self, st: Stage, fingerprint: str) -> bool:
+        record = self.stages.get(st.key)
+        if not st.outputs or not record or record.get("fingerprint") != fingerprint:
+            return False
+        recorded = record.get("outputs", {})
+        if not recorded or any(self.file_hash(p) != sha for p, sha in recorded.items()):
+            return False
+        # Every declared pattern must still match something.
+        return all(any(os.path.exists(p) for p in _expand(pattern)) for pattern in st.outputs)
+
+
+def outputs_exist(st: Stage) -> bool:
+    return bool(st.outputs) and all(any(os.path.exists(p) for p in _expand(pattern)) for pattern in st.outputs)
+
+
+# ---------------------------------------------------------------------------
+# Running one stage
+# ---------------------------------------------------------------------------
+
+
+def _run_measured(st: Stage, profile: str | None, profile_dir: Path | None) -> tuple[int, dict]:
+    profile_base = profile_dir / st.key if profile and profile_dir is not None else None
+    with measure_stage(profile, profile_base) as metrics:
+        code = run_script_in_process(st.script, st.args)
+    return code, metrics
+
+
+def _run_logged(
+    st: Stage, log_path: str, profile: str | None = None, profile_dir: Path | None = None
+) -> tuple[int, float, dict]:
+    """Pool worker: run one stage with stdout/stderr going to its log file."""
+
+    t0 = time.time()
+    with open(log_path, "w", encoding="utf-8") as log, contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        print(f"{'='*80}\nRunning: {st.description or st.key}\nScript: {st.script} {' '.join(st.args)}\n{'='*80}", flush=True)
+        code, metrics = _run_measured(st, profile, profile_dir)
+        print(f"\n{'✓ SUCCESS' if code == 0 else f'✗ FAILED (exit code {code})'} ({time.time() - t0:.1f}s)", flush=True)
+    return code, time.time() - t0, metrics
+
+
+def _init_worker(env: dict[str, str]) -> None:
+    os.environ.update(env)
+
+
+def _warm_imports() -> None:
+    for name in WARM_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Progress
+# ---------------------------------------------------------------------------
+
+_MARKS = {"pending": "", "running": "▶", "ok": "✓", "cached": "·", "failed": "✗", "blocked": "-"}
+
+
+def progress_table(stages: list[Stage], states: dict[str, str]) -> list[str]:
+    """One line per row, one cell per column: a mark, or done/total with running / failed counts."""
+
+    rows: dict[str, dict[str, list[str]]] = {}
+    columns: list[str] = []
+    for st in stages:
+        if st.column not in columns:
+            columns.append(st.column)
+        rows.setdefault(st.row, {}).setdefault(st.column, []).append(states.get(st.key, "pending"))
+
+    def cell(cell_states: list[str] | None) -> str:
+        if not cell_states:
+            return ""
+        if len(cell_states) == 1:
+            return _MARKS[cell_states[0]]
+        done = sum(s in ("ok", "cached") for s in cell_states)
+        text = f"{done}/{len(cell_states)}"
+        for status in ("running", "failed", "blocked"):
+            count = sum(s == status for s in cell_states)
+            if count:
+                text += f" {_MARKS[status]}{count}"
+        return text
+
+    table = [[""] + columns] + [[row] + [cell(cells.get(c)) for c in columns] for row, cells in rows.items()]
+    widths = [max(len(line[i]) for line in table) for i in range(len(columns) + 1)]
+    return ["  ".join(value.ljust(w) for value, w in zip(line, widths)).rstrip() for line in table]
+
+
+# ---------------------------------------------------------------------------
+# Scheduler
+# ---------------------------------------------------------------------------
+
+
+def _check_graph(stages: list[Stage]) -> None:
+    keys = [st.key for st in stages]
+    if len(set(keys)) != len(keys):
+        dup = sorted({k for k in keys if keys.count(k) > 1})
+        raise ValueError(f"Duplicate stage keys: {', '.join(dup)}")
+    known = set(keys)
+    for st in stages:
+        missing = [k for k in st.after if k not in known]
+        if missing:
+            raise ValueError(f"Stage {st.key!r} runs after unknown stage(s): {', '.join(missing)}")
+    # Kahn's algorithm: every stage must become ready eventually.
+    remaining = {st.key: set(st.after) for st in stages}
+    while remaining:
+        ready = [k for k, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Stage dependency cycle among: {', '.join(sorted(remaining))}")
+        for k in ready:
+            del remaining[k]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+def run_pipeline(
+    stages: list[Stage],
+    *,
+    jobs: int = 1,
+    force: bool = False,
+    skip_existing: bool = False,
+    log_dir: Path | None = None,
+    state_path: Path = PIPELINE_STATE_PATH,
+    memory_budget: int | None = None,
+    preload: Callable[[], object] | None = None,
+    progress_every: float | None = None,
+    run_log: Path | None = RUN_LOG_PATH,
+    run_info: dict | None = None,
+    profile: str | None = None,
+) -> dict[str, StageResult]:
+    """Run ``stages`` in dependency order, skipping unchanged ones; returns {key: result} in declaration order.
+
+    ``force`` re-runs every stage; ``skip_existing`` skips any stage whose
+    outputs exist, without comparing hashes. ``memory_budget`` (bytes;
+    default 75% of available memory) caps the summed ``memory`` of running
+    stages; a stage larger than the budget runs alone. ``run_info`` (e.g.
+    pipeline name, tag, N) is copied into every run-log record; ``profile``
+    is ``"cpu"``, ``"memory"`` or None.
+    """
+
+    _check_graph(stages)
+    state = _State.load(state_path)
+    by_key = {st.key: st for st in stages}
+    results: dict[str, StageResult] = {}
+    fingerprints: dict[str, str] = {}
+    pending = list(stages)
+    states = {st.key: "pending" for st in stages}
+    workers = max(1, int(jobs))
+    t_start = time.time()
+    last_table = [t_start]
+    run_id = new_run_id()
+    if workers > 1 or log_dir is not None or profile:
+        log_dir = log_dir or (ANALYSIS_DIR / "logs" / "pipeline")
+        log_dir.mkdir(parents=True, exist_ok=True)
+    profile_dir = log_dir / "profiles" if profile else None
+    if profile_dir is not None:
+        profile_dir.mkdir(parents=True, exist_ok=True)
+    if memory_budget is None:
+        available = available_memory_bytes()
+        memory_budget = int(0.75 * available) if available is not None else None
+
+    def show_progress(*, final: bool = False) -> None:
+        lines = progress_table(stages, states)
+        if log_dir is not None:
+            (log_dir / "progress.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        if progress_every is not None and (final or time.time() - last_table[0] >= progress_every):
+            last_table[0] = time.time()
+            print("\n".join(["", *lines, ""]), flush=True)
+
+    def start(key: str) -> None:
+        states[key] = "running"
+        show_progress()
+
+    def finish(key: str, status: str, seconds: float = 0.0, log_path: Path | None = None, metrics: dict | None = None) -> None:
+        st = by_key[key]
+        metrics = dict(metrics or {})
+        missing = [pattern for pattern in st.outputs if not any(os.path.exists(p) for p in _expand(pattern))]
+        if status == "ok" and missing:
+            # Exit 0 without its declared outputs is a failure, and must not be cached.
+            print(f"  {key}: exited 0 but did not write: {', '.join(missing)}", flush=True)
+            status = "failed"
+        if status == "ok":
+            metrics["rows_in"] = state.total_rows(st.inputs)
+            metrics["rows_out"] = state.total_rows(st.outputs)
+        results[key] = StageResult(key, status, seconds, log_path, metrics)
+        states[key] = status
+        if run_log is not None:
+            append_records(run_log, [{
+                "run_id": run_id,
+                **(run_info or {}),
+                "stage": key,
+                "script": st.script,
+                "args": list(st.args),
+                "status": status,
+                "jobs": workers,
+                "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                **metrics,
+            }])
+        if status == "ok" and st.outputs:
+            state.stages[key] = {
+                "fingerprint": fingerprints[key],
+                "outputs": state.output_hashes(st),
+                "seconds": round(seconds, 3),
+                "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+        elif status == "failed":
+            state.stages.pop(key, None)
+        state.save()
+        mark = {"ok": "✓", "cached": "·", "failed": "✗", "blocked": "-"}[status]
+        detail = {"ok": f"{seconds:.1f}s", "cached": "unchanged", "failed": f"{seconds:.1f}s", "blocked": "upstream failed"}[status]
+        where = f"; log: {log_path}" if log_path is not None and status == "failed" else ""
+        print(f"[{len(results)}/{len(stages)}] {mark} {key} ({detail}{where}; elapsed {time.time() - t_start:.1f}s)", flush=True)
+        show_progress()
+
+    def take_ready() -> list[Stage]:
+        """Pop stages whose dependencies are done; resolve cached / blocked ones immediately."""
+
+        runnable = []
+        progressed = True
+        while progressed:
+            progressed = False
+            for st in list(pending):
+                if not all(k in results for k in st.after):
+                    continue
+                pending.remove(st)
+                progressed = True
+                if any(not results[k].ok for k in st.after):
+                    finish(st.key, "blocked")
+                    continue
+                fingerprints[st.key] = state.fingerprint(st)
+                if not force and (
+                    state.is_cached(st, fingerprints[st.key]) or (skip_existing and outputs_exist(st))
+                ):
+                    finish(st.key, "cached")
+                    continue
+                runnable.append(st)
+        return runnable
+
+    if preload is not None:
+        preload()
+
+    if workers <= 1:
+        while pending:
+            ready = take_ready()
+            if not ready:
+                break
+            st = ready[0]
+            # Run one, then re-check: later stages may now be cached or blocked.
+            pending[:0] = ready[1:]
+            start(st.key)
+            if log_dir is not None:
+                log_path = log_dir / f"{st.key}.log"
+                code, seconds, metrics = _run_logged(st, str(log_path), profile, profile_dir)
+            else:
+                log_path = None
+                print(f"\n{'='*80}\nRunning: {st.script}\nDescription: {st.description or st.key}\nArgs: {' '.join(st.args)}\n{'='*80}", flush=True)
+                t0 = time.time()
+                code, metrics = _run_measured(st, profile, profile_dir)
+                seconds = time.time() - t0
+            finish(st.key, "ok" if code == 0 else "failed", seconds, log_path, metrics)
+    else:
+        _warm_imports()
+        methods = multiprocessing.get_all_start_methods()
+        ctx = multiprocessing.get_context("fork" if "fork" in methods else None)
+        env = worker_env(workers)
+        budget = f"{memory_budget / 1024**3:.1f} GB" if memory_budget is not None else "unlimited"
+        print(f"Running {len(stages)} stages on {workers} workers (memory budget {budget}); per-stage logs: {log_dir}", flush=True)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker, initargs=(env,)) as pool:
+            running = {}
+            queued: list[Stage] = []
+            while pending or queued or running:
+                queued.extend(take_ready())
+                # Admit queued stages in order while workers and memory allow.
+                reserved = sum(st.memory for st, _ in running.values())
+                for st in list(queued):
+                    if len(running) >= workers:
+                        break
+                    fits = memory_budget is None or reserved + st.memory <= memory_budget
+                    if not fits and running:
+                        continue
+                    queued.remove(st)
+                    reserved += st.memory
+                    log_path = log_dir / f"{st.key}.log"
+                    running[pool.submit(_run_logged, st, str(log_path), profile, profile_dir)] = (st, log_path)
+                    start(st.key)
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    st, log_path = running.pop(fut)
+                    try:
+                        code, seconds, metrics = fut.result()
+                    except Exception as e:  # worker died (e.g. killed by the OOM killer)
+                        print(f"  {st.key}: worker error: {e}", flush=True)
+                        code, seconds, metrics = 1, 0.0, {}
+                    finish(st.key, "ok" if code == 0 else "failed", seconds, log_path, metrics)
+
+    show_progress(final=True)
+    if run_log is not None:
+        print(f"Run log: {run_log} (run_id {run_id})", flush=True)
+    return {st.key: results[st.key] for st in stages}
+
+
+def summarize(results: dict[str, StageResult]) -> int:
+    """Print the run summary; returns the number of failed or blocked stages."""
+
+    counts = {status: sum(1 for r in results.values() if r.status == status) for status in ("ok", "cached", "failed", "blocked")}
+    ran = sum(r.seconds for r in results.values())
+    print(f"Stages: {len(results)}  ran: {counts['ok']}  unchanged: {counts['cached']}  failed: {counts['failed']}  blocked: {counts['blocked']}")
+    print(f"Stage time: {ran:.1f}s")
+    measured = sorted((r for r in results.values() if r.metrics.get("wall_s") is not None), key=lambda r: -r.metrics["wall_s"])
+    if measured:
+        print("Slowest stages (wall / CPU / peak RSS):")
+        for r in measured[:5]:
+            m = r.metrics
+            print(f"  {r.key}: {m['wall_s']:.1f}s / {m['cpu_s']:.1f}s / {m['peak_rss_bytes'] / 1024**2:,.0f} MB")
+    bad = [r for r in results.values() if not r.ok]
+    if bad:
+        print("Failed / blocked stages:")
+        for r in bad:
+            where = f" (log: {r.log_path})" if r.log_path is not None else ""
+            print(f"  ✗ {r.key} [{r.status}]{where}")
+    return len(bad)
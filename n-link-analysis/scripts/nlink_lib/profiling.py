@@ -0,0 +1,206 @@
+"""Per-stage resource records for pipeline runs (JSON lines), with optional cProfile / tracemalloc.
+
+Every stage that runs under nlink_lib.pipeline is measured in the process
+that runs it (the harness itself, or the forked worker):
+
+  wall_s / cpu_s      wall clock and user+system CPU (all threads, plus any
+                      child processes the stage waited for)
+  peak_rss_bytes      high-water RSS during the stage (Linux resets the
+                      process high-water mark through /proc/self/clear_refs
+                      before the stage; elsewhere it is the process peak so
+                      far, flagged by ``peak_rss_reset: false``)
+  bytes_read / _written
+                      I/O syscall bytes from /proc/self/io (rchar / wchar;
+                      reads served from memory-mapped stores are page faults
+                      and not counted)
+
+The pipeline adds rows in / out (Parquet footers, TSV line counts of the
+declared inputs and outputs) and appends one record per stage to
+analysis/logs/pipeline_runs.jsonl, the history compare-pipeline-runs.py reads.
+
+``profile="cpu"`` also runs the stage under cProfile (``{stage}.prof``,
+readable with ``python -m pstats``); ``profile="memory"`` traces Python
+allocations with tracemalloc (``{stage}.tracemalloc``, a
+``tracemalloc.Snapshot`` dump) and records the traced peak. Both keep the
+top functions / allocation sites in the record.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Iterator
+
+from nlink_lib.paths import ANALYSIS_DIR
+
+
+RUN_LOG_PATH = ANALYSIS_DIR / "logs" / "pipeline_runs.jsonl"
+PROFILE_MODES = ("cpu", "memory")
+
+_TOP_ENTRIES = 15
+_TRACEMALLOC_FRAMES = 1
+
+
+def new_run_id() -> str:
+    return f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+
+
+def _cpu_seconds() -> float:
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+def _io_counters() -> tuple[int, int] | None:
+    """(bytes read, bytes written) by this process so far; None off Linux."""
+
+    try:
+        fields = dict(line.split(":", 1) for line in Path("/proc/self/io").read_text().splitlines())
+        return int(fields["rchar"]), int(fields["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _reset_peak_rss() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_bytes() -> int:
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+def _cprofile_top(profiler: cProfile.Profile) -> list[str]:
+    stats = pstats.Stats(profiler)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)  # cumulative time
+    top = []
+    for (filename, line, func), (_, calls, tottime, cumtime, _) in rows[:_TOP_ENTRIES]:
+        top.append(f"{cumtime:.3f}s cum {tottime:.3f}s self {calls} calls {Path(filename).name}:{line}({func})")
+    return top
+
+
+def _tracemalloc_top(snapshot: tracemalloc.Snapshot) -> list[str]:
+    top = []
+    for stat in snapshot.statistics("lineno")[:_TOP_ENTRIES]:
+        frame = stat.traceback[0]
+        top.append(f"{stat.size / 1024**2:.2f} MB {stat.count} blocks {Path(frame.filename).name}:{frame.lineno}")
+    return top
+
+
+@contextlib.contextmanager
+def measure_stage(profile: str | None = None, profile_base: Path | None = None) -> Iterator[dict]:
+    """Measure the enclosed block; the yielded dict is filled with the record fields on exit.
+
+    ``profile_base`` (path without suffix) is where a cProfile / tracemalloc
+    dump goes when ``profile`` is set.
+    """
+
+    if profile not in (None, *PROFILE_MODES):
+        raise ValueError(f"Unknown profile mode {profile!r} (expected one of {', '.join(PROFILE_MODES)})")
+    record: dict = {}
+    reset = _reset_peak_rss()
+    io0 = _io_counters()
+    cpu0 = _cpu_seconds()
+    t0 = time.time()
+    profiler = None
+    if profile == "cpu":
+        profiler = cProfile.Profile()
+        profiler.enable()
+    elif profile == "memory":
+        tracemalloc.start(_TRACEMALLOC_FRAMES)
+    try:
+        yield record
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        record["wall_s"] = round(time.time() - t0, 3)
+        record["cpu_s"] = round(_cpu_seconds() - cpu0, 3)
+        record["peak_rss_bytes"] = _peak_rss_bytes()
+        record["peak_rss_reset"] = reset
+        io1 = _io_counters()
+        if io0 is not None and io1 is not None:
+            record["bytes_read"] = io1[0] - io0[0]
+            record["bytes_written"] = io1[1] - io0[1]
+        if profiler is not None:
+            record["profile_top"] = _cprofile_top(profiler)
+            if profile_base is not None:
+                path = profile_base.with_name(profile_base.name + ".prof")
+                profiler.dump_stats(str(path))
+                record["profile_path"] = str(path)
+        elif profile == "memory":
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, __file__), tracemalloc.Filter(False, tracemalloc.__file__)]
+            )
+            record["traced_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            record["profile_top"] = _tracemalloc_top(snapshot)
+            if profile_base is not None:
+                path = profile_base.with_name(profile_base.name + ".tracemalloc")
+                snapshot.dump(str(path))
+                record["profile_path"] = str(path)
+
+
+def count_rows(path: str) -> int | None:
+    """Data rows of a Parquet (footer) or TSV / CSV (lines minus header) file; None for anything else."""
+
+    suffix = Path(path).suffix.lower()
+    try:
+        if suffix == ".parquet":
+            import pyarrow.parquet as pq
+
+            return int(pq.read_metadata(path).num_rows)
+        if suffix in (".tsv", ".csv"):
+            lines = 0
+            with open(path, "rb") as f:
+                while chunk := f.read(8 * 1024 * 1024):
+                    lines += chunk.count(b"\n")
+            return max(lines - 1, 0)
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def append_records(path: Path, records: list[dict]) -> None:
+    """Append records to a JSON-lines run log (one short write per call, so concurrent runs interleave by line)."""
+
+    if not records:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = "".join(json.dumps(r, sort_keys=True) + "\n" for r in records)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(payload)
+
+
+def load_records(path: Path) -> list[dict]:
+    """All records of a run log (lines that do not parse are skipped)."""
+
+    records = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                with contextlib.suppress(json.JSONDecodeError):
+                    records.append(json.loads(line))
+    except FileNotFoundError:
+        pass
+    return records
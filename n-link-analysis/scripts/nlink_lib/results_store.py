@@ -0,0 +1,358 @@
+"""Hive-partitioned Parquet store for analysis results.
+
+Analysis scripts used to encode their keys in file names
+(``basin_n=5_cycle=Massachusetts__Gulf_of_Maine_reproduction_2025-12-31_layers.tsv``)
+and every consumer globbed and split those names again. Results now also go
+to one dataset under analysis/results/:
+
+  metric={metric}/n={n}/tag={tag}/cycle_id={cycle_id}/part-0.parquet
+  _catalog.parquet   one row per partition: metric, n, tag, cycle_id, cycle_key,
+                     rows, columns, source, written_at
+
+``n`` is N for fixed-N rules and the rule key (``mod=3``, ...) for the other
+rule families; ``tag`` is the run tag (``untagged`` when none was given);
+``cycle_id`` is the cycle key (``Title_A__Title_B``), a seed title for
+per-seed results, or ``all`` for results that cover every cycle (dashboards,
+summaries). Partition values are URI-encoded in directory names, which the
+pyarrow hive partitioning decodes on read, so titles with ``/`` or ``=`` are
+safe.
+
+Titles are spelled as each run gave them, so partitions of a whole cycle also
+record its cycle registry key (``cycle_key``, nlink_lib/cycle_registry.py:
+the same integer at every N) in the catalog and in the file's metadata. Join
+across N on ``cycle_key`` rather than on ``cycle_id``::
+
+    keys = catalog()[["n", "tag", "cycle_id", "cycle_key"]]
+    query("basin_layers", n=[4, 5]).to_pandas().merge(keys, on=["n", "tag", "cycle_id"])
+
+``write_result`` replaces one partition atomically and records it in the
+catalog (under a file lock: the harness writes from several processes).
+``query`` opens one metric as a dataset and pushes the n / tag / cycle_id
+selection down to partition pruning, so a cross-N or cross-tag comparison is
+one call instead of a glob and one file open per result. Columns that differ
+in type between partitions (e.g. int in one, float in another) are unified
+permissively; ones that cannot be (a title column that happened to hold only
+digits) are read as strings.
+
+The TSVs the scripts write stay as human-readable exports;
+build-results-store.py imports TSVs from before the store existed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import fcntl
+import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator
+from urllib.parse import quote, unquote
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from nlink_lib.paths import ANALYSIS_DIR
+from nlink_lib.rules import Rule, parse_rule
+
+# pandas and pyarrow.dataset cost ~0.5 s to import; they are imported where
+# needed so that scripts which only write at the end start quickly.
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow.dataset as ds
+
+
+RESULTS_DIR = ANALYSIS_DIR / "results"
+CATALOG_NAME = "_catalog.parquet"
+PARTITION_KEYS = ("n", "tag", "cycle_id")
+UNTAGGED = "untagged"
+ALL_CYCLES = "all"
+
+CATALOG_SCHEMA = pa.schema([
+    ("metric", pa.string()),
+    ("n", pa.string()),
+    ("tag", pa.string()),
+    ("cycle_id", pa.string()),
+    ("cycle_key", pa.int64()),
+    ("rows", pa.int64()),
+    ("columns", pa.string()),
+    ("source", pa.string()),
+    ("written_at", pa.string()),
+])
+
+_PART_NAME = "part-0.parquet"
+_CYCLE_KEY_META = b"nlink.cycle_key"
+
+
+def n_key(rule: int | str | Rule) -> str:
+    """Partition value of a rule: "5" for N=5, the rule key (e.g. "mod=3") otherwise."""
+
+    rule = parse_rule(rule)
+    return str(rule.n) if rule.n is not None else rule.key
+
+
+def cycle_id_from_titles(titles: Iterable[str]) -> str:
+    """Cycle id from its titles, as the harness names cycles (``A__B``)."""
+
+    return "__".join(str(t).strip().replace(" ", "_") for t in titles)
+
+
+def add_tag_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--tag",
+        type=str,
+        default=None,
+        help=f"Run tag for the results store partition (default: {UNTAGGED})",
+    )
+
+
+def prefix_tag(tag: str | None, out_prefix: str | None) -> str | None:
+    """Partition tag of a script run with ``--out-prefix``: --tag if given, else the prefix.
+
+    The key has no room for the prefix, so untagged runs that differ only by
+    --out-prefix would otherwise replace each other's partition; runs with
+    the default prefix stay untagged.
+    """
+
+    return tag or out_prefix or None
+
+
+def _segment(key: str, value: str) -> str:
+    return f"{key}={quote(str(value), safe='')}"
+
+
+def _unsegment(segment: str) -> tuple[str, str]:
+    key, _, value = segment.partition("=")
+    return key, unquote(value)
+
+
+def partition_dir(metric: str, n: int | str | Rule, tag: str | None = None, cycle_id: str | None = None, *, root: Path = RESULTS_DIR) -> Path:
+    values = (n_key(n), tag or UNTAGGED, cycle_id or ALL_CYCLES)
+    return root / _segment("metric", metric) / Path(*(_segment(k, v) for k, v in zip(PARTITION_KEYS, values)))
+
+
+@contextlib.contextmanager
+def _catalog_lock(root: Path) -> Iterator[None]:
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / ".catalog.lock", "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _write_catalog(root: Path, df: pd.DataFrame) -> None:
+    path = root / CATALOG_NAME
+    tmp = path.with_name(f".tmp-{os.getpid()}-{path.name}")
+    table = pa.Table.from_pandas(df.reindex(columns=CATALOG_SCHEMA.names), schema=CATALOG_SCHEMA, preserve_index=False)
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+
+
+def catalog(*, root: Path = RESULTS_DIR) -> pd.DataFrame:
+    """One row per stored partition (empty frame if nothing was written yet)."""
+
+    import pandas as pd
+
+    path = root / CATALOG_NAME
+    table = pq.read_table(path) if path.exists() else CATALOG_SCHEMA.empty_table()
+    # Nullable ints, so cycle keys do not round through float64; catalogs
+    # written before cycle_key existed read it as missing.
+    df = table.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+    return df.reindex(columns=CATALOG_SCHEMA.names).astype({"cycle_key": "Int64", "rows": "int64"})
+
+
+def write_result(
+    metric: str,
+    data: pd.DataFrame | pa.Table,
+    *,
+    n: int | str | Rule,
+    tag: str | None = None,
+    cycle_id: str | None = None,
+    cycle_key: int | None = None,
+    source: str | None = None,
+    root: Path = RESULTS_DIR,
+) -> Path:
+    """Replace the (metric, n, tag, cycle_id) partition with ``data``; returns the Parquet file.
+
+    ``cycle_key`` is the cycle registry key of ``cycle_id`` when it names a
+    whole cycle (nlink_lib.cycle_registry.cycle_key_of_pages).
+    """
+
+    table = data if isinstance(data, pa.Table) else pa.Table.from_pandas(data, preserve_index=False)
+    clash = [key for key in PARTITION_KEYS if key in table.column_names]
+    if clash:
+        table = table.drop_columns(clash)
+    if cycle_key is not None:
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), _CYCLE_KEY_META: str(int(cycle_key)).encode()})
+    out_dir = partition_dir(metric, n, tag, cycle_id, root=root)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tmp = out_dir / f".tmp-{os.getpid()}-{_PART_NAME}"
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, out_dir / _PART_NAME)
+
+    row = {
+        "metric": metric,
+        "n": n_key(n),
+        "tag": tag or UNTAGGED,
+        "cycle_id": cycle_id or ALL_CYCLES,
+        "cycle_key": None if cycle_key is None else int(cycle_key),
+        "rows": int(table.num_rows),
+        "columns": ",".join(table.column_names),
+        "source": source or "",
+        "written_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    import pandas as pd
+
+    with _catalog_lock(root):
+        df = catalog(root=root)
+        same = (df["metric"] == row["metric"]) & (df["n"] == row["n"]) & (df["tag"] == row["tag"]) & (df["cycle_id"] == row["cycle_id"])
+        df = pd.concat([df[~same], pd.DataFrame([row])], ignore_index=True)
+        _write_catalog(root, df.sort_values(["metric", "n", "tag", "cycle_id"], kind="stable"))
+    return out_dir / _PART_NAME
+
+
+def read_tsv(path: Path) -> pd.DataFrame:
+    """An analysis TSV with nullable dtypes: empty cells are missing, titles such as "NA" stay strings."""
+
+    import pandas as pd
+
+    return pd.read_csv(path, sep="\t", keep_default_na=False, na_values=[""], dtype_backend="numpy_nullable")
+
+
+def write_tsv_result(
+    metric: str,
+    path: Path,
+    *,
+    n: int | str | Rule,
+    tag: str | None = None,
+    cycle_id: str | None = None,
+    cycle_key: int | None = None,
+    root: Path = RESULTS_DIR,
+) -> Path:
+    """Store a TSV a script has just written (or an older one) as the (metric, n, tag, cycle_id) partition."""
+
+    return write_result(
+        metric, read_tsv(path), n=n, tag=tag, cycle_id=cycle_id, cycle_key=cycle_key, source=Path(path).name, root=root
+    )
+
+
+def rebuild_catalog(*, root: Path = RESULTS_DIR) -> pd.DataFrame:
+    """Recreate the catalog from the partition directories (Parquet footers only)."""
+
+    import pandas as pd
+
+    rows = []
+    for path in sorted(root.glob(f"metric=*/n=*/tag=*/cycle_id=*/{_PART_NAME}")):
+        parts = dict(_unsegment(segment) for segment in path.parent.parts[-4:])
+        meta = pq.read_metadata(path)
+        key = (meta.metadata or {}).get(_CYCLE_KEY_META)
+        rows.append({
+            **parts,
+            "cycle_key": None if key is None else int(key),
+            "rows": int(meta.num_rows),
+            "columns": ",".join(meta.schema.to_arrow_schema().names),
+            "source": "",
+            "written_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(path.stat().st_mtime)),
+        })
+    df = pd.DataFrame(rows, columns=CATALOG_SCHEMA.names)
+    df["cycle_key"] = pd.array([row["cycle_key"] for row in rows], dtype="Int64")
+    with _catalog_lock(root):
+        _write_catalog(root, df)
+    return df
+
+
+def _unified_schema(files: list[str]) -> pa.Schema:
+    """Schema covering every partition: types promoted permissively, irreconcilable columns as strings."""
+
+    schemas = [pq.read_schema(f).remove_metadata() for f in files]
+    try:
+        return pa.unify_schemas(schemas, promote_options="permissive")
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass
+    names = list(dict.fromkeys(name for schema in schemas for name in schema.names))
+    fields = []
+    for name in names:
+        columns = [pa.schema([schema.field(name)]) for schema in schemas if name in schema.names]
+        try:
+            fields.append(pa.unify_schemas(columns, promote_options="permissive").field(0))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            fields.append(pa.field(name, pa.large_string()))
+    return pa.schema(fields)
+
+
+def _as_list(value) -> list | None:
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple, set)):
+        return list(value)
+    return [value]
+
+
+def query(
+    metric: str,
+    *,
+    n: int | str | Rule | Iterable | None = None,
+    tag: str | Iterable[str] | None = None,
+    cycle_id: str | Iterable[str] | None = None,
+    columns: list[str] | None = None,
+    filter: ds.Expression | None = None,
+    root: Path = RESULTS_DIR,
+) -> pa.Table:
+    """Rows of ``metric`` (with n / tag / cycle_id columns) for the selected partitions.
+
+    ``n``, ``tag`` and ``cycle_id`` take one value or a list (None = all);
+    ``filter`` is any further pyarrow dataset expression on the data columns.
+    """
+
+    metric_dir = root / _segment("metric", metric)
+    files = sorted(str(p) for p in metric_dir.glob(f"n=*/tag=*/cycle_id=*/{_PART_NAME}"))
+    if not files:
+        return pa.table({key: pa.array([], type=pa.string()) for key in PARTITION_KEYS})
+    schema = _unified_schema(files)
+    for key in PARTITION_KEYS:
+        schema = schema.append(pa.field(key, pa.string()))
+    import pyarrow.dataset as ds
+
+    partitioning = ds.partitioning(pa.schema([(key, pa.string()) for key in PARTITION_KEYS]), flavor="hive")
+    dataset = ds.dataset(files, schema=schema, format="parquet", partitioning=partitioning, partition_base_dir=str(metric_dir))
+
+    expr = filter
+    ns = _as_list(n)
+    selections = {
+        "n": [n_key(v) for v in ns] if ns is not None else None,
+        "tag": _as_list(tag),
+        "cycle_id": _as_list(cycle_id),
+    }
+    for key, values in selections.items():
+        if values is None:
+            continue
+        cond = ds.field(key).isin(pa.array([str(v) for v in values], type=pa.string()))
+        expr = cond if expr is None else expr & cond
+    if columns is not None:
+        columns = list(dict.fromkeys([*columns, *PARTITION_KEYS]))
+    return dataset.to_table(columns=columns, filter=expr)
+
+
+def read_result(
+    metric: str, *, n: int | str | Rule, tag: str | None = None, cycle_id: str | None = None, root: Path = RESULTS_DIR
+) -> pd.DataFrame | None:
+    """One partition as a DataFrame (without the partition columns), None if it was never written."""
+
+    path = partition_dir(metric, n, tag, cycle_id, root=root) / _PART_NAME
+    if not path.exists():
+        return None
+    return pq.read_table(path).to_pandas()
+
+
+def latest_tag(metric: str, *, n: int | str | Rule | None = None, root: Path = RESULTS_DIR) -> str | None:
+    """Most recently written tag of a metric (optionally for one n), from the catalog."""
+
+    df = catalog(root=root)
+    df = df[df["metric"] == metric]
+    if n is not None:
+        df = df[df["n"] == n_key(n)]
+    if df.empty:
+        return None
+    return str(df.sort_values("written_at", kind="stable")["tag"].iloc[-1])
@@ -0,0 +1,247 @@
+"""Full-position inverted link index: which pages link to X, and at which position.
+
+Built once from the CSR link store (nlink_lib.link_store) and memory-mapped from
+data/wikipedia/processed/analysis/reverse_links/:
+
+  offsets.npy    int64, len = nodes + 1; in-links of dense node t are rows offsets[t]:offsets[t+1]
+  positions.npy  int32, 1-based link position (the N for which source -> t is f_N)
+  sources.npy    int32 dense source ids
+  manifest.json  link store manifest fingerprint used to detect staleness
+
+Within each target's slice rows are sorted by (position, source), so
+
+  f_N^{-1}(t) = sources[lo:hi]  where [lo, hi) = the run of positions == N
+
+is two binary searches, and any set of N is a union of such runs. Batch
+queries (a whole cycle, a basin layer) run the binary searches vectorized
+over all targets at once.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+from nlink_lib.link_store import STORE_DIR, LinkStore, get_link_store
+from nlink_lib.paths import ANALYSIS_DIR, file_fingerprint
+
+
+REVERSE_DIR = ANALYSIS_DIR / "reverse_links"
+REVERSE_VERSION = 1
+
+_ARRAY_NAMES = ("offsets", "positions", "sources")
+_BLOCK_EDGES = 200_000_000
+
+
+def _expected_sources(store_dir: Path) -> dict[str, object]:
+    return {"link_store": file_fingerprint(store_dir / "manifest.json")}
+
+
+def is_reverse_index_fresh(reverse_dir: Path = REVERSE_DIR, *, store_dir: Path = STORE_DIR) -> bool:
+    manifest_path = reverse_dir / "manifest.json"
+    if not manifest_path.exists():
+        return False
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return False
+    if manifest.get("version") != REVERSE_VERSION or manifest.get("sources") != _expected_sources(store_dir):
+        return False
+    return all((reverse_dir / f"{name}.npy").exists() for name in _ARRAY_NAMES)
+
+
+def build_reverse_index(
+    store: LinkStore,
+    *,
+    reverse_dir: Path = REVERSE_DIR,
+    block_edges: int = _BLOCK_EDGES,
+) -> Path:
+    """Bucket edges by target, in target blocks of at most ~``block_edges`` edges.
+
+    Each block is one stable argsort on (target, position); since CSR edge order
+    is already source-ascending, ties come out sorted by source.
+    """
+
+    print("Building reverse link index (one-time cost)...")
+    t0 = time.time()
+
+    offsets = np.asarray(store.offsets)
+    targets = store.targets
+    num_nodes = len(store)
+    num_edges = store.num_edges
+
+    in_degree = np.bincount(np.asarray(targets), minlength=num_nodes).astype(np.int64)
+    rev_offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(in_degree, out=rev_offsets[1:])
+
+    tmp_dir = reverse_dir.with_name(reverse_dir.name + f".tmp-{os.getpid()}")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    positions = np.lib.format.open_memmap(tmp_dir / "positions.npy", mode="w+", dtype=np.int32, shape=(num_edges,))
+    sources = np.lib.format.open_memmap(tmp_dir / "sources.npy", mode="w+", dtype=np.int32, shape=(num_edges,))
+
+    # Target block boundaries so each block holds <= block_edges edges (one node may exceed it alone).
+    bounds = [0]
+    while bounds[-1] < num_nodes:
+        start = bounds[-1]
+        stop = int(np.searchsorted(rev_offsets, rev_offsets[start] + max(int(block_edges), 1), side="right")) - 1
+        bounds.append(min(max(stop, start + 1), num_nodes))
+
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        lo, hi = int(rev_offsets[a]), int(rev_offsets[b])
+        if hi == lo:
+            continue
+        t_all = np.asarray(targets)
+        edge_idx = np.nonzero((t_all >= a) & (t_all < b))[0] if (a, b) != (0, num_nodes) else np.arange(num_edges)
+        src = (np.searchsorted(offsets, edge_idx, side="right") - 1).astype(np.int64)
+        pos = edge_idx - offsets[src] + 1
+        key = ((t_all[edge_idx].astype(np.int64) - a) << 32) | pos
+        order = np.argsort(key, kind="stable")
+        positions[lo:hi] = pos[order]
+        sources[lo:hi] = src[order]
+
+    positions.flush()
+    sources.flush()
+    del positions, sources
+    np.save(tmp_dir / "offsets.npy", rev_offsets)
+
+    manifest = {
+        "version": REVERSE_VERSION,
+        "nodes": int(num_nodes),
+        "edges": int(num_edges),
+        "sources": _expected_sources(store.store_dir),
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    (tmp_dir / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    if reverse_dir.exists():
+        shutil.rmtree(reverse_dir)
+    os.replace(tmp_dir, reverse_dir)
+
+    dt = time.time() - t0
+    print(f"Reverse link index ready: {num_edges:,} links in {dt:.1f}s ({reverse_dir})")
+    return reverse_dir
+
+
+class ReverseLinkIndex:
+    """Memory-mapped (target -> (position, source)) index (see module docstring)."""
+
+    def __init__(self, store: LinkStore, reverse_dir: Path = REVERSE_DIR) -> None:
+        self.store = store
+        arrays = {name: np.load(Path(reverse_dir) / f"{name}.npy", mmap_mode="r") for name in _ARRAY_NAMES}
+        self.offsets: np.ndarray = arrays["offsets"]
+        self.positions: np.ndarray = arrays["positions"]
+        self.sources: np.ndarray = arrays["sources"]
+
+    @functools.cached_property
+    def in_degree(self) -> np.ndarray:
+        """Inbound links per node over all positions."""
+
+        return np.diff(np.asarray(self.offsets)).astype(np.int64)
+
+    def _runs(self, targets: np.ndarray, n: int) -> tuple[np.ndarray, np.ndarray]:
+        """Vectorized [lo, hi) of rows with position == n inside each target's slice."""
+
+        lo = np.asarray(self.offsets)[targets].astype(np.int64)
+        end = np.asarray(self.offsets)[targets + 1].astype(np.int64)
+        out = []
+        for strict in (True, False):
+            a, b = lo.copy(), end.copy()
+            while True:
+                active = a < b
+                if not active.any():
+                    break
+                mid = (a + b) // 2
+                vals = np.asarray(self.positions[np.where(active, mid, 0)])
+                go_right = active & ((vals < n) if strict else (vals <= n))
+                a = np.where(go_right, mid + 1, a)
+                b = np.where(active & ~go_right, mid, b)
+            out.append(a)
+        return out[0], out[1]
+
+    def preimages(self, target: int, n: int) -> np.ndarray:
+        """Dense sources s with f_N(s) = target, ascending."""
+
+        lo, hi = self._runs(np.asarray([int(target)], dtype=np.int64), int(n))
+        return np.asarray(self.sources[int(lo[0]) : int(hi[0])])
+
+    def preimage_count(self, targets: Iterable[int] | np.ndarray, n: int) -> np.ndarray:
+        """|f_N^{-1}(t)| per target (vectorized)."""
+
+        t = np.asarray(list(targets) if not isinstance(targets, np.ndarray) else targets, dtype=np.int64)
+        lo, hi = self._runs(t, int(n))
+        return hi - lo
+
+    def preimages_batch(
+        self,
+        targets: Iterable[int] | np.ndarray,
+        n_values: Iterable[int] | int,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """All (target, n, source) triples with f_n(source) = target, for n in ``n_values``.
+
+        Output is ordered by target (input order), then n, then source. Use this
+        for whole cycles or basin layers (one vectorized pass per n).
+        """
+
+        t = np.asarray(list(targets) if not isinstance(targets, np.ndarray) else targets, dtype=np.int64)
+        ns = [int(n_values)] if isinstance(n_values, (int, np.integer)) else sorted({int(x) for x in n_values})
+
+        t_parts: list[np.ndarray] = []
+        n_parts: list[np.ndarray] = []
+        s_parts: list[np.ndarray] = []
+        order_parts: list[np.ndarray] = []
+        for n in ns:
+            lo, hi = self._runs(t, n)
+            counts = hi - lo
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            run_starts = np.cumsum(counts) - counts
+            rows = np.repeat(lo - run_starts, counts) + np.arange(total, dtype=np.int64)
+            which = np.repeat(np.arange(len(t), dtype=np.int64), counts)
+            t_parts.append(t[which])
+            n_parts.append(np.full(total, n, dtype=np.int32))
+            s_parts.append(np.asarray(self.sources[rows]).astype(np.int64))
+            order_parts.append(which)
+
+        if not t_parts:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, np.zeros(0, dtype=np.int32), empty
+
+        tt = np.concatenate(t_parts)
+        nn = np.concatenate(n_parts)
+        ss = np.concatenate(s_parts)
+        order = np.lexsort((ss, nn, np.concatenate(order_parts)))
+        return tt[order], nn[order], ss[order]
+
+    def inbound(self, target: int) -> tuple[np.ndarray, np.ndarray]:
+        """(positions, sources) of every link into ``target``, sorted by (position, source)."""
+
+        lo, hi = int(self.offsets[int(target)]), int(self.offsets[int(target) + 1])
+        return np.asarray(self.positions[lo:hi]), np.asarray(self.sources[lo:hi])
+
+    def position_histogram(self, target: int) -> dict[int, int]:
+        """Inbound link counts by position for one target (hub / tunneling profiles)."""
+
+        positions, _ = self.inbound(target)
+        vals, counts = np.unique(positions, return_counts=True)
+        return {int(v): int(c) for v, c in zip(vals, counts)}
+
+
+@functools.lru_cache(maxsize=1)
+def get_reverse_index() -> ReverseLinkIndex:
+    """Process-wide ReverseLinkIndex, (re)built on first use if missing or stale."""
+
+    store = get_link_store()
+    if not is_reverse_index_fresh():
+        build_reverse_index(store)
+    return ReverseLinkIndex(store)
@@ -0,0 +1,509 @@
+"""Roaring-style compressed bitmaps over dense node ids, in numpy.
+
+Basin membership used to be a plain ``page_id`` Parquet column, so comparing
+two basins meant loading and hash-joining both id lists. A ``RoaringBitmap``
+splits the dense id space (nlink_lib.link_store) into 2^16-id chunks and
+stores each non-empty chunk as one container:
+
+  array container   cardinality <= 4096: sorted uint16 low bits (2 bytes/id)
+  bitmap container  cardinality >  4096: 1024 uint64 words (8 KiB flat)
+
+Union / intersection / difference are vectorized over all containers at once:
+chunks where either side is a bitmap are combined word-wise, the rest as
+sorted id arrays; results are re-split into containers by cardinality.
+Cardinality and intersection size never materialize ids.
+
+``BasinBitmaps`` holds the bitmaps of every cycle basin under one rule (one N,
+or any rule from nlink_lib/rules.py), built from the whole-graph
+decomposition in one pass and persisted under
+analysis/basin_bitmaps/{rule.key}/ (``n={N}`` for the fixed N-link rule):
+
+  cycles.npy          int64   cycle ids (smallest dense id on each cycle)
+  basin_offsets.npy   int64   container range of basin i: [off[i], off[i+1])
+  keys.npy            int32   container chunk key (dense id >> 16)
+  cards.npy           int32   container cardinality
+  payload.npy         uint16  container payloads, concatenated
+  manifest.json
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from nlink_lib.decomposition import Decomposition, decomposition_dir_for, get_decomposition
+from nlink_lib.paths import ANALYSIS_DIR, file_fingerprint
+from nlink_lib.rules import Rule, parse_rule
+
+
+BASIN_BITMAPS_DIR = ANALYSIS_DIR / "basin_bitmaps"
+BASIN_BITMAPS_VERSION = 1
+
+ARRAY_MAX = 4096  # containers above this cardinality are stored as bitmaps
+_CHUNK_BITS = 16
+_LOW_MASK = (1 << _CHUNK_BITS) - 1
+_WORDS = (1 << _CHUNK_BITS) // 64
+_BITMAP_U16 = _WORDS * 4
+
+_ARRAY_NAMES = ("cycles", "basin_offsets", "keys", "cards", "payload")
+
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    """Set bits per row of a (rows, 1024) uint64 matrix."""
+
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int64)
+    bits = np.unpackbits(np.ascontiguousarray(words).view(np.uint8), axis=1)
+    return bits.sum(axis=1, dtype=np.int64)
+
+
+def _ids_to_words(rows: np.ndarray, lows: np.ndarray, num_rows: int) -> np.ndarray:
+    """(num_rows, 1024) uint64 words with bit ``lows[i]`` of row ``rows[i]`` set ((row, low) ascending)."""
+
+    words = np.zeros((int(num_rows), _WORDS), dtype=np.uint64)
+    if len(rows) == 0:
+        return words
+    lows = np.asarray(lows, dtype=np.int64)
+    flat = np.asarray(rows, dtype=np.int64) * _WORDS + (lows >> 6)
+    bits = np.left_shift(np.uint64(1), (lows & 63).astype(np.uint64))
+    starts = np.nonzero(np.diff(flat, prepend=-1))[0]
+    words.reshape(-1)[flat[starts]] = np.bitwise_or.reduceat(bits, starts)
+    return words
+
+
+def _words_to_ids(keys: np.ndarray, words: np.ndarray) -> np.ndarray:
+    """Ascending ids of the set bits (only nonzero bytes are unpacked)."""
+
+    if len(keys) == 0:
+        return np.zeros(0, dtype=np.int64)
+    as_bytes = np.ascontiguousarray(words).view(np.uint8)
+    rows, cols = np.nonzero(as_bytes)
+    bits = np.unpackbits(as_bytes[rows, cols][:, None], axis=1, bitorder="little")
+    hit, bit = np.nonzero(bits)
+    low = cols[hit].astype(np.int64) * 8 + bit
+    return (np.asarray(keys, dtype=np.int64)[rows[hit]] << _CHUNK_BITS) | low
+
+
+def _gather_runs(values: np.ndarray, starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """values[starts[0]:starts[0]+counts[0]] ++ values[starts[1]:...] ++ ..."""
+
+    counts = np.asarray(counts, dtype=np.int64)
+    total = int(counts.sum())
+    if total == 0:
+        return values[:0]
+    run_starts = np.cumsum(counts) - counts
+    return values[np.repeat(np.asarray(starts, dtype=np.int64) - run_starts, counts) + np.arange(total, dtype=np.int64)]
+
+
+def _payload_lengths(cards: np.ndarray) -> np.ndarray:
+    cards = np.asarray(cards, dtype=np.int64)
+    return np.where(cards > ARRAY_MAX, _BITMAP_U16, cards)
+
+
+def _build_containers(group: np.ndarray, ids: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Containers for ids sorted by (group, id), unique within a group.
+
+    Returns (container_group, keys, cards, payload).
+    """
+
+    group = np.asarray(group, dtype=np.int64)
+    ids = np.asarray(ids, dtype=np.int64)
+    if len(ids) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty.astype(np.int32), empty.astype(np.int32), np.zeros(0, dtype=np.uint16)
+
+    high = ids >> _CHUNK_BITS
+    low = (ids & _LOW_MASK).astype(np.uint16)
+    boundary = np.ones(len(ids), dtype=bool)
+    boundary[1:] = (group[1:] != group[:-1]) | (high[1:] != high[:-1])
+    starts = np.nonzero(boundary)[0]
+    cards = np.diff(np.append(starts, len(ids)))
+
+    lengths = _payload_lengths(cards)
+    offsets = np.cumsum(lengths) - lengths
+    payload = np.zeros(int(lengths.sum()), dtype=np.uint16)
+
+    is_bitmap = cards > ARRAY_MAX
+    per_id_container = np.repeat(np.arange(len(starts)), cards)
+    from_array = ~is_bitmap[per_id_container]
+    dest = np.repeat(offsets - starts, cards) + np.arange(len(ids), dtype=np.int64)
+    payload[dest[from_array]] = low[from_array]
+
+    if is_bitmap.any():
+        bm = np.nonzero(is_bitmap)[0]
+        row_of = np.full(len(starts), -1, dtype=np.int64)
+        row_of[bm] = np.arange(len(bm))
+        words = _ids_to_words(row_of[per_id_container[~from_array]], low[~from_array], len(bm))
+        dest_bm = offsets[bm][:, None] + np.arange(_BITMAP_U16, dtype=np.int64)
+        payload[dest_bm] = words.view(np.uint16)
+
+    return group[starts], high[starts].astype(np.int32), cards.astype(np.int32), payload
+
+
+@dataclass(frozen=True)
+class RoaringBitmap:
+    """Set of dense node ids as sorted roaring containers (see module docstring).
+
+    Bitmap payloads are the uint64 words viewed as uint16 (little-endian), so
+    bit ``low`` of a chunk is bit ``low & 15`` of payload[offset + (low >> 4)].
+    """
+
+    keys: np.ndarray  # int32, ascending
+    cards: np.ndarray  # int32
+    payload: np.ndarray  # uint16
+
+    @classmethod
+    def from_ids(cls, ids: np.ndarray) -> RoaringBitmap:
+        ids = np.unique(np.asarray(ids, dtype=np.int64))
+        if len(ids) and ids[0] < 0:
+            raise ValueError("dense ids must be >= 0")
+        _, keys, cards, payload = _build_containers(np.zeros(len(ids), dtype=np.int64), ids)
+        return cls(keys=keys, cards=cards, payload=payload)
+
+    @classmethod
+    def empty(cls) -> RoaringBitmap:
+        return cls.from_ids(np.zeros(0, dtype=np.int64))
+
+    # -- layout --------------------------------------------------------------
+
+    @functools.cached_property
+    def _keys(self) -> np.ndarray:
+        return np.asarray(self.keys, dtype=np.int64)
+
+    @functools.cached_property
+    def _offsets(self) -> np.ndarray:
+        lengths = _payload_lengths(self.cards)
+        return np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+
+    @functools.cached_property
+    def _is_bitmap(self) -> np.ndarray:
+        return np.asarray(self.cards) > ARRAY_MAX
+
+    def __len__(self) -> int:
+        return int(np.asarray(self.cards, dtype=np.int64).sum())
+
+    @property
+    def cardinality(self) -> int:
+        return len(self)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.keys.nbytes + self.cards.nbytes + self.payload.nbytes)
+
+    def _array_ids(self, select: np.ndarray | None = None) -> np.ndarray:
+        """Full ids of the (selected) array containers, ascending."""
+
+        mask = ~self._is_bitmap if select is None else np.asarray(select, dtype=bool) & ~self._is_bitmap
+        idx = np.nonzero(mask)[0]
+        counts = np.asarray(self.cards, dtype=np.int64)[idx]
+        low = _gather_runs(np.asarray(self.payload), self._offsets[idx], counts).astype(np.int64)
+        return (np.repeat(self._keys[idx], counts) << _CHUNK_BITS) | low
+
+    def _in_bitmaps(self, ids: np.ndarray) -> np.ndarray:
+        """True where an id is set in one of the bitmap containers (arrays are not checked)."""
+
+        ids = np.asarray(ids, dtype=np.int64)
+        out = np.zeros(len(ids), dtype=bool)
+        if len(ids) == 0 or not self._is_bitmap.any():
+            return out
+        pos = np.minimum(np.searchsorted(self._keys, ids >> _CHUNK_BITS), len(self._keys) - 1)
+        hit = (self._keys[pos] == (ids >> _CHUNK_BITS)) & self._is_bitmap[pos]
+        low = ids[hit] & _LOW_MASK
+        word = np.asarray(self.payload)[self._offsets[pos[hit]] + (low >> 4)].astype(np.int64)
+        out[hit] = ((word >> (low & 15)) & 1).astype(bool)
+        return out
+
+    def _words(self, keys: np.ndarray) -> np.ndarray:
+        """(len(keys), 1024) uint64 words for the given ascending chunk keys (zeros where absent)."""
+
+        keys = np.asarray(keys, dtype=np.int64)
+        words = np.zeros((len(keys), _WORDS), dtype=np.uint64)
+        if len(keys) == 0 or len(self._keys) == 0:
+            return words
+        pos = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+        present = self._keys[pos] == keys
+
+        as_bitmap = present & self._is_bitmap[pos]
+        if as_bitmap.any():
+            src = self._offsets[pos[as_bitmap]][:, None] + np.arange(_BITMAP_U16, dtype=np.int64)
+            words[as_bitmap] = np.ascontiguousarray(np.asarray(self.payload)[src]).view(np.uint64)
+
+        as_array = present & ~self._is_bitmap[pos]
+        if as_array.any():
+            sel = np.zeros(len(self._keys), dtype=bool)
+            sel[pos[as_array]] = True
+            ids = self._array_ids(sel)
+            rows = np.nonzero(as_array)[0]
+            words[rows] = _ids_to_words(np.searchsorted(keys[rows], ids >> _CHUNK_BITS), ids & _LOW_MASK, len(rows))
+        return words
+
+    def to_ids(self) -> np.ndarray:
+        """All dense ids, ascending."""
+
+        ids = self._array_ids()
+        if not self._is_bitmap.any():
+            return ids
+        bm_keys = self._keys[self._is_bitmap]
+        return np.sort(np.concatenate([ids, _words_to_ids(bm_keys, self._words(bm_keys))]))
+
+    def contains(self, ids: np.ndarray | int) -> np.ndarray:
+        """Vectorized membership test."""
+
+        ids = np.atleast_1d(np.asarray(ids, dtype=np.int64))
+        sparse = self._array_ids()
+        pos = np.minimum(np.searchsorted(sparse, ids), max(len(sparse) - 1, 0))
+        in_arrays = (sparse[pos] == ids) if len(sparse) else np.zeros(len(ids), dtype=bool)
+        return in_arrays | self._in_bitmaps(ids)
+
+    # -- set algebra ---------------------------------------------------------
+
+    def _word_keys(self, other: RoaringBitmap, op: str) -> np.ndarray:
+        """Chunks combined word-wise: both bitmaps (and), either (or), left one (andnot)."""
+
+        a_bm = self._keys[self._is_bitmap]
+        b_bm = other._keys[other._is_bitmap]
+        if op == "and":
+            return np.intersect1d(a_bm, b_bm)
+        if op == "or":
+            return np.union1d(a_bm, b_bm)
+        return a_bm
+
+    def _combine(self, other: RoaringBitmap, op: str) -> RoaringBitmap:
+        word_keys = self._word_keys(other, op)
+        a_ids = self._array_ids(~np.isin(self._keys, word_keys))
+        b_ids = other._array_ids(~np.isin(other._keys, word_keys))
+        wa, wb = self._words(word_keys), other._words(word_keys)
+        if op == "and":
+            # array x array by merge; array x bitmap by probing the bitmap.
+            sparse = np.sort(
+                np.concatenate(
+                    [
+                        np.intersect1d(a_ids, b_ids, assume_unique=True),
+                        a_ids[other._in_bitmaps(a_ids)],
+                        b_ids[self._in_bitmaps(b_ids)],
+                    ]
+                )
+            )
+            words = wa & wb
+        elif op == "or":
+            sparse = np.union1d(a_ids, b_ids)
+            words = wa | wb
+        else:
+            sparse = np.setdiff1d(a_ids, b_ids, assume_unique=True)
+            sparse = sparse[~other._in_bitmaps(sparse)]
+            words = wa & ~wb
+        return _from_parts(sparse, word_keys, words)
+
+    def __and__(self, other: RoaringBitmap) -> RoaringBitmap:
+        return self._combine(other, "and")
+
+    def __or__(self, other: RoaringBitmap) -> RoaringBitmap:
+        return self._combine(other, "or")
+
+    def __sub__(self, other: RoaringBitmap) -> RoaringBitmap:
+        return self._combine(other, "andnot")
+
+    intersection = __and__
+    union = __or__
+    difference = __sub__
+
+    def intersection_cardinality(self, other: RoaringBitmap) -> int:
+        word_keys = self._word_keys(other, "and")
+        a_ids = self._array_ids()
+        b_ids = other._array_ids()
+        count = len(np.intersect1d(a_ids, b_ids, assume_unique=True))
+        count += int(other._in_bitmaps(a_ids).sum()) + int(self._in_bitmaps(b_ids).sum())
+        return int(count + _popcount(self._words(word_keys) & other._words(word_keys)).sum())
+
+    def jaccard(self, other: RoaringBitmap) -> float:
+        inter = self.intersection_cardinality(other)
+        union = len(self) + len(other) - inter
+        return inter / union if union else 0.0
+
+    # -- persistence ---------------------------------------------------------
+
+    def save(self, path: Path) -> None:
+        np.savez(path, keys=np.asarray(self.keys), cards=np.asarray(self.cards), payload=np.asarray(self.payload))
+
+    @classmethod
+    def load(cls, path: Path) -> RoaringBitmap:
+        with np.load(path) as z:
+            return cls(keys=z["keys"], cards=z["cards"], payload=z["payload"])
+
+
+def _from_parts(sparse_ids: np.ndarray, word_keys: np.ndarray, words: np.ndarray) -> RoaringBitmap:
+    """Bitmap from array-path ids plus word-path chunks (disjoint chunk keys)."""
+
+    cards = _popcount(words) if len(word_keys) else np.zeros(0, dtype=np.int64)
+    keep = cards > ARRAY_MAX
+    small = (cards > 0) & ~keep
+    ids = np.sort(np.concatenate([np.asarray(sparse_ids, dtype=np.int64), _words_to_ids(np.asarray(word_keys)[small], words[small])]))
+    _, keys, c, payload = _build_containers(np.zeros(len(ids), dtype=np.int64), ids)
+    if not keep.any():
+        return RoaringBitmap(keys=keys, cards=c, payload=payload)
+
+    # Interleave the surviving bitmap containers with the array containers by key.
+    all_keys = np.concatenate([keys, np.asarray(word_keys, dtype=np.int32)[keep]])
+    all_cards = np.concatenate([c, cards[keep].astype(np.int32)])
+    source = np.concatenate([payload, np.ascontiguousarray(words[keep]).view(np.uint16).ravel()])
+    lengths = _payload_lengths(all_cards)
+    src_offsets = np.cumsum(lengths) - lengths
+    order = np.argsort(all_keys, kind="stable")
+    return RoaringBitmap(
+        keys=all_keys[order],
+        cards=all_cards[order],
+        payload=_gather_runs(source, src_offsets[order], lengths[order]),
+    )
+
+
+# -- per-rule store of every cycle basin ---------------------------------------
+
+
+def _expected_sources(rule: int | str | Rule) -> dict[str, object]:
+    return {"decomposition": file_fingerprint(decomposition_dir_for(rule) / "manifest.json")}
+
+
+def basin_bitmaps_dir_for(rule: int | str | Rule) -> Path:
+    return BASIN_BITMAPS_DIR / parse_rule(rule).key
+
+
+def is_basin_bitmaps_fresh(rule: int | str | Rule) -> bool:
+    out_dir = basin_bitmaps_dir_for(rule)
+    manifest_path = out_dir / "manifest.json"
+    if not manifest_path.exists():
+        return False
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return False
+    if manifest.get("version") != BASIN_BITMAPS_VERSION or manifest.get("sources") != _expected_sources(rule):
+        return False
+    return all((out_dir / f"{name}.npy").exists() for name in _ARRAY_NAMES)
+
+
+def compute_basin_bitmaps(decomp: Decomposition) -> dict[str, np.ndarray]:
+    """Containers for every cycle basin at once (nodes sorted by (cycle, id))."""
+
+    cycle_id = np.asarray(decomp.cycle_id).astype(np.int64)
+    nodes = np.nonzero(cycle_id >= 0)[0]
+    nodes = nodes[np.argsort(cycle_id[nodes], kind="stable")]
+    cycles, basin_index = np.unique(cycle_id[nodes], return_inverse=True)
+    container_basin, keys, cards, payload = _build_containers(basin_index, nodes)
+    basin_offsets = np.searchsorted(container_basin, np.arange(len(cycles) + 1))
+    return {
+        "cycles": cycles.astype(np.int64),
+        "basin_offsets": basin_offsets.astype(np.int64),
+        "keys": keys,
+        "cards": cards,
+        "payload": payload,
+    }
+
+
+class BasinBitmaps:
+    """Memory-mapped bitmaps of every cycle basin under one rule."""
+
+    def __init__(self, rule: Rule, arrays: dict[str, np.ndarray]) -> None:
+        self.rule = rule
+        self.n = rule.n
+        self.cycles: np.ndarray = arrays["cycles"]
+        self.basin_offsets: np.ndarray = arrays["basin_offsets"]
+        self.keys: np.ndarray = arrays["keys"]
+        self.cards: np.ndarray = arrays["cards"]
+        self.payload: np.ndarray = arrays["payload"]
+
+    def __len__(self) -> int:
+        return int(len(self.cycles))
+
+    @functools.cached_property
+    def _payload_offsets(self) -> np.ndarray:
+        return np.concatenate([[0], np.cumsum(_payload_lengths(np.asarray(self.cards)))]).astype(np.int64)
+
+    @functools.cached_property
+    def basin_sizes(self) -> np.ndarray:
+        """Cardinality per basin, aligned to ``cycles``."""
+
+        per_container = np.concatenate([[0], np.cumsum(np.asarray(self.cards, dtype=np.int64))])
+        return per_container[np.asarray(self.basin_offsets)[1:]] - per_container[np.asarray(self.basin_offsets)[:-1]]
+
+    def index_of(self, cycle: int) -> int:
+        """Row of a cycle id (raises KeyError if it is not a cycle under this rule)."""
+
+        i = int(np.searchsorted(self.cycles, int(cycle)))
+        if i >= len(self.cycles) or int(self.cycles[i]) != int(cycle):
+            raise KeyError(f"{cycle} is not a cycle id at {self.rule.label}")
+        return i
+
+    def basin(self, cycle: int) -> RoaringBitmap:
+        i = self.index_of(cycle)
+        c0, c1 = int(self.basin_offsets[i]), int(self.basin_offsets[i + 1])
+        p0, p1 = int(self._payload_offsets[c0]), int(self._payload_offsets[c1])
+        return RoaringBitmap(
+            keys=np.asarray(self.keys[c0:c1]),
+            cards=np.asarray(self.cards[c0:c1]),
+            payload=np.asarray(self.payload[p0:p1]),
+        )
+
+
+def build_basin_bitmaps(decomp: Decomposition) -> Path:
+    rule = decomp.rule
+    out_dir = basin_bitmaps_dir_for(rule)
+
+    print(f"Building basin bitmaps for {rule.label} over {len(decomp):,} nodes...")
+    t0 = time.time()
+    arrays = compute_basin_bitmaps(decomp)
+
+    tmp_dir = out_dir.with_name(out_dir.name + f".tmp-{os.getpid()}")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+    for name, arr in arrays.items():
+        np.save(tmp_dir / f"{name}.npy", arr)
+
+    total_bytes = int(sum(arr.nbytes for arr in arrays.values()))
+    manifest = {
+        "version": BASIN_BITMAPS_VERSION,
+        "rule": rule.key,
+        "n": rule.n,
+        "cycles": int(len(arrays["cycles"])),
+        "containers": int(len(arrays["keys"])),
+        "bitmap_containers": int((arrays["cards"] > ARRAY_MAX).sum()),
+        "bytes": total_bytes,
+        "sources": _expected_sources(rule),
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    (tmp_dir / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    out_dir.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(tmp_dir, out_dir)
+
+    dt = time.time() - t0
+    print(
+        f"Basin bitmaps {rule.label} ready: {manifest['cycles']:,} basins, "
+        f"{total_bytes / 1024**2:,.1f} MiB in {dt:.1f}s ({out_dir})"
+    )
+    return out_dir
+
+
+def get_basin_bitmaps(rule: int | str | Rule) -> BasinBitmaps:
+    """Bitmaps of every cycle basin at N (or any rule), (re)built on first use if missing or stale."""
+
+    return _load_basin_bitmaps(parse_rule(rule))
+
+
+@functools.lru_cache(maxsize=4)
+def _load_basin_bitmaps(rule: Rule) -> BasinBitmaps:
+    decomp = get_decomposition(rule)
+    if not is_basin_bitmaps_fresh(rule):
+        build_basin_bitmaps(decomp)
+    out_dir = basin_bitmaps_dir_for(rule)
+    arrays = {name: np.load(out_dir / f"{name}.npy", mmap_mode="r") for name in _ARRAY_NAMES}
+    return BasinBitmaps(rule, arrays)
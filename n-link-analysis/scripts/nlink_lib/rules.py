@@ -0,0 +1,162 @@
+"""Pluggable deterministic traversal rules over the CSR link store.
+
+The analysis tools were written for the fixed N-link rule (follow the N-th
+link, HALT if there are fewer than N). A ``Rule`` generalizes that to any
+deterministic link choice computed from the CSR arrays in one vectorized
+pass, so every downstream structure (decomposition, Euler tour, basin
+bitmaps, reverse-BFS edges) works unchanged on the resulting successor array.
+
+Rule specs (``--rule`` on the command line):
+
+  n=5       fixed N-link rule: the 5th link (HALT if degree < 5); "5" also works
+  mod=7     link ((7 - 1) mod degree) + 1: wraps around, HALT only at degree 0
+  last=1    k-th link from the end (HALT if degree < k)
+  frac=0.5  link ceil(p * degree) (at least the 1st; HALT only at degree 0)
+  avoid=5   N-th link, skipping self-links and links whose target's N-th link
+            points straight back (2-cycles under f_N); the first later link
+            that passes is taken, HALT if none does
+
+``Rule.key`` is the file/directory-safe form ("n=5", "mod=7", ...). For the
+fixed rule it matches the ``n={N}`` naming every per-N artifact already uses,
+so existing outputs and caches keep their paths.
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from fractions import Fraction
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from nlink_lib.link_store import LinkStore
+
+
+FAMILIES = ("n", "mod", "last", "frac", "avoid")
+
+
+@dataclass(frozen=True)
+class Rule:
+    family: str
+    param: float
+
+    def __post_init__(self) -> None:
+        if self.family not in FAMILIES:
+            raise ValueError(f"Unknown rule family {self.family!r} (expected one of {', '.join(FAMILIES)})")
+        if self.family == "frac":
+            if not 0.0 < float(self.param) <= 1.0:
+                raise ValueError("frac rule needs 0 < p <= 1")
+        elif int(self.param) != self.param or int(self.param) <= 0:
+            raise ValueError(f"{self.family} rule needs an integer >= 1")
+
+    @property
+    def key(self) -> str:
+        param = f"{float(self.param):g}" if self.family == "frac" else str(int(self.param))
+        return f"{self.family}={param}"
+
+    @property
+    def label(self) -> str:
+        return f"N={int(self.param)}" if self.family == "n" else self.key
+
+    @property
+    def n(self) -> int | None:
+        """N for the fixed N-link rule, None for every other family."""
+
+        return int(self.param) if self.family == "n" else None
+
+    def successors(self, store: LinkStore) -> np.ndarray:
+        """Dense successor per node under this rule (int32; -1 = HALT)."""
+
+        if self.family == "n":
+            return store.successors(int(self.param))
+
+        degree = store.out_degree
+        if self.family == "avoid":
+            return _avoiding_successors(store, int(self.param))
+        if self.family == "mod":
+            position = np.where(degree > 0, (int(self.param) - 1) % np.maximum(degree, 1) + 1, 0)
+        elif self.family == "last":
+            position = degree - int(self.param) + 1
+        else:
+            # Exact ceil(p * degree): in floats 0.07 * 100 is 7.000000000000001.
+            p = Fraction(str(self.param))
+            degree = np.asarray(degree, dtype=np.int64)
+            position = np.where(degree > 0, np.maximum(1, -(-p.numerator * degree // p.denominator)), 0)
+        return _gather(store, position)
+
+    def __str__(self) -> str:
+        return self.key
+
+
+def _gather(store: LinkStore, position: np.ndarray) -> np.ndarray:
+    """targets[offset + position - 1] where 1 <= position <= degree, else -1."""
+
+    position = np.asarray(position, dtype=np.int64)
+    has = (position >= 1) & (position <= store.out_degree)
+    succ = np.full(len(store), -1, dtype=np.int32)
+    succ[has] = store.targets[np.asarray(store.offsets[:-1])[has] + position[has] - 1]
+    return succ
+
+
+def _avoiding_successors(store: LinkStore, n: int) -> np.ndarray:
+    base = store.successors(n)
+    degree = store.out_degree
+    starts = np.asarray(store.offsets[:-1])
+    succ = np.full(len(store), -1, dtype=np.int32)
+
+    # Nodes still looking for a link, and the position tried next; each pass
+    # only touches the unresolved ones.
+    pending = np.nonzero(degree >= n)[0]
+    position = n
+    while len(pending):
+        pending = pending[degree[pending] >= position]
+        target = np.asarray(store.targets[starts[pending] + position - 1]).astype(np.int64)
+        ok = (target != pending) & (base[target] != pending)
+        succ[pending[ok]] = target[ok]
+        pending = pending[~ok]
+        position += 1
+    return succ
+
+
+def parse_rule(spec: str | int | Rule) -> Rule:
+    """Rule from a spec string ("n=5", "5", "mod=7", ...), an int N, or a Rule."""
+
+    if isinstance(spec, Rule):
+        return spec
+    if isinstance(spec, (int, np.integer)):
+        return Rule("n", int(spec))
+    text = str(spec).strip()
+    family, sep, value = text.partition("=")
+    if not sep:
+        family, value = "n", text
+    try:
+        param = float(value) if family.strip() == "frac" else int(value)
+    except ValueError:
+        raise ValueError(f"Bad rule spec {spec!r} (expected e.g. n=5, mod=7, last=1, frac=0.5, avoid=5)") from None
+    return Rule(family.strip(), param)
+
+
+def add_rule_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--rule",
+        type=str,
+        default=None,
+        help=(
+            "Traversal rule instead of --n: n=5, mod=7, last=1, frac=0.5, avoid=5 (see nlink_lib/rules.py); "
+            "runs over the link store, whose pages include link targets without a link sequence (out-degree 0)"
+        ),
+    )
+
+
+def rule_from_args(args: argparse.Namespace) -> Rule:
+    """--rule if given, else the fixed N-link rule from --n (SystemExit on a bad spec)."""
+
+    spec = args.rule if getattr(args, "rule", None) else getattr(args, "n", None)
+    if spec is None:
+        raise SystemExit("Provide --n or --rule")
+    try:
+        return parse_rule(spec)
+    except ValueError as e:
+        raise SystemExit(str(e)) from None
@@ -0,0 +1,158 @@
+"""Results table, speedups and complexity fits for run-scaling-study.py.
+
+One row per measured cell (stage, graph size, workers). Speedup and
+efficiency compare a cell with the same stage and size at one worker:
+
+  speedup     wall(1 worker) / wall(W workers)
+  efficiency  speedup / W   (1.0 = perfect scaling)
+
+Complexity curves are power laws ``y = coef * rows ** exponent`` fitted by
+least squares in log-log space, where ``rows`` is the number of
+nlink_sequences.parquet rows (pages with at least one link) and ``y`` is
+wall time or peak RSS. The exponent reads as the empirical complexity (1.0 =
+linear); a target graph is then any row count, e.g. the footer of another
+wiki's nlink_sequences.parquet, so the fits extrapolate to full enwiki or
+any other language dump that went through the data pipeline.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from nlink_lib.paths import ANALYSIS_DIR
+
+
+# Full English Wikipedia (20251220 dump): nlink_sequences.parquet rows, see
+# data-pipeline/wikipedia-decomposition/implementation-guide.md.
+ENWIKI_NLINK_ROWS = 18_000_000
+
+RESULT_COLUMNS = (
+    "stage",
+    "parallel",
+    "pages",
+    "nlink_rows",
+    "links",
+    "workers",
+    "oversubscribed",
+    "status",
+    "wall_s",
+    "cpu_s",
+    "peak_rss_bytes",
+    "worker_peak_rss_bytes",
+    "bytes_read",
+    "bytes_written",
+    "items",
+    "unit",
+    "throughput",
+    "speedup",
+    "efficiency",
+)
+
+
+def study_path(tag: str) -> Path:
+    return ANALYSIS_DIR / f"scaling_study_{tag}.parquet"
+
+
+def fits_path(tag: str) -> Path:
+    return ANALYSIS_DIR / f"scaling_fits_{tag}.tsv"
+
+
+def results_frame(rows: list[dict]) -> pd.DataFrame:
+    """Rows -> table with throughput, speedup and efficiency filled in."""
+
+    df = pd.DataFrame(rows).reindex(columns=list(RESULT_COLUMNS))
+    ok = df["status"] == "ok"
+    wall = df["wall_s"].astype(float)
+    df["throughput"] = np.where(ok & (wall > 0), df["items"].astype(float) / wall.where(wall > 0, 1.0), np.nan)
+    base = df[ok & (df["workers"] == 1)].set_index(["stage", "pages"])["wall_s"]
+    keys = pd.MultiIndex.from_frame(df[["stage", "pages"]])
+    one = pd.Series(base.reindex(keys).to_numpy(dtype=float), index=df.index)
+    df["speedup"] = np.where(ok, one / wall.where(wall > 0), np.nan)
+    df["efficiency"] = df["speedup"] / df["workers"].astype(float)
+    return df.sort_values(["stage", "pages", "workers"], kind="stable").reset_index(drop=True)
+
+
+def write_results(path: Path, df: pd.DataFrame) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".tmp-{os.getpid()}-{path.name}")
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp)
+    os.replace(tmp, path)
+
+
+def load_results(path: Path) -> list[dict]:
+    """Rows of an earlier study table (for --resume); [] if there is none."""
+
+    if not path.exists():
+        return []
+    df = pq.read_table(path).to_pandas()
+    return df.reindex(columns=list(RESULT_COLUMNS)).to_dict("records")
+
+
+def fit_power_law(x: np.ndarray, y: np.ndarray) -> tuple[float, float, float]:
+    """(coef, exponent, r^2) of y = coef * x ** exponent; needs >= 2 distinct positive x."""
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    keep = (x > 0) & (y > 0)
+    lx, ly = np.log(x[keep]), np.log(y[keep])
+    if len(np.unique(lx)) < 2:
+        raise ValueError("need at least two distinct sizes to fit")
+    exponent, intercept = np.polyfit(lx, ly, 1)
+    resid = ly - (intercept + exponent * lx)
+    total = float(((ly - ly.mean()) ** 2).sum())
+    r2 = 1.0 - float((resid**2).sum()) / total if total > 0 else 1.0
+    return float(np.exp(intercept)), float(exponent), r2
+
+
+def parse_target(spec: str) -> tuple[str, int]:
+    """``label=ROWS`` or ``label=path/to/nlink_sequences.parquet`` -> (label, rows)."""
+
+    label, sep, value = spec.partition("=")
+    if not sep or not label or not value:
+        raise ValueError(f"Target {spec!r} is not label=ROWS or label=PATH")
+    if value.replace("_", "").isdigit():
+        return label, int(value.replace("_", ""))
+    path = Path(value)
+    if not path.exists():
+        raise ValueError(f"Target {label}: {path} does not exist")
+    return label, int(pq.read_metadata(path).num_rows)
+
+
+def fit_table(df: pd.DataFrame, targets: list[tuple[str, int]]) -> pd.DataFrame:
+    """Power-law fits of wall time and peak RSS per (stage, workers), with one prediction per target.
+
+    Peak RSS includes the busiest worker process of pooled stages. Stages that
+    spill to disk under a memory limit (DuckDB) flatten out, so their memory
+    fit is an upper bound rather than a forecast. Below ~100k pages the
+    interpreter's own ~100 MB dominates RSS and flattens every exponent.
+    """
+
+    ok = df[df["status"] == "ok"].copy()
+    ok["memory_bytes"] = ok["peak_rss_bytes"].astype(float) + ok["worker_peak_rss_bytes"].fillna(0).astype(float)
+    rows = []
+    for (stage, workers), g in ok.groupby(["stage", "workers"], sort=True):
+        if g["nlink_rows"].nunique() < 2:
+            continue
+        for metric, column in (("wall_s", "wall_s"), ("peak_rss_bytes", "memory_bytes")):
+            coef, exponent, r2 = fit_power_law(g["nlink_rows"].to_numpy(), g[column].to_numpy())
+            for label, target_rows in targets:
+                rows.append({
+                    "stage": stage,
+                    "workers": int(workers),
+                    "metric": metric,
+                    "coef": coef,
+                    "exponent": round(exponent, 4),
+                    "r2": round(r2, 4),
+                    "sizes": int(g["nlink_rows"].nunique()),
+                    "max_fitted_rows": int(g["nlink_rows"].max()),
+                    "target": label,
+                    "target_rows": int(target_rows),
+                    "predicted": coef * float(target_rows) ** exponent,
+                })
+    return pd.DataFrame(rows)
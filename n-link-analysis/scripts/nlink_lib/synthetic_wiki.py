@@ -0,0 +1,701 @@
+"""Synthetic Wikipedia-like datasets with planted N-link cycles of known basin size.
+
+Every tool in this repo reads the processed enwiki files, which need the
+~100 GB dump to build. This module generates a stand-in of any size (10k to
+10M content pages) with the same files and schemas the data pipeline writes:
+
+  processed/pages.parquet            page_id, namespace, title, is_redirect
+  processed/redirects.parquet        from_id, to_namespace, to_title
+  processed/disambig_pages.parquet   page_id
+  processed/nlink_sequences.parquet  page_id, link_sequence (resolved, ordered)
+  processed/synthetic_truth.json     parameters, counts, planted cycles with basin sizes
+  processed/synthetic_planted_basins.parquet
+                                     page_id, cycle (index into the planted cycles)
+
+and, optionally, the raw dumps the pipeline parses (``write_dumps``):
+enwiki-20251220-{page,redirect,page_props}.sql and
+enwiki-20251220-pages-articles-multistream{k}.xml.
+
+Graph model
+-----------
+- Page ids are increasing with random gaps; content pages, redirects and a
+  few pages of other namespaces are interleaved at random.
+- Out-degrees are Pareto distributed (``out_exponent``, mean ``mean_links``,
+  capped at ``max_links``), with a fraction of pages without any link.
+  Link targets are drawn with Pareto weights (``in_exponent``), so in-degrees
+  are heavy-tailed too. Disambiguation pages have links but are never link
+  targets (the pipeline drops links to them); there are no self-links.
+- Redirects point at content pages; ``chain_fraction`` of them point at
+  another redirect instead (double redirects, left unresolved by the
+  pipeline). Redirect pages carry their own one-link sequence, as they do in
+  the real nlink_sequences.parquet.
+- Planted structure at ``plant_n``: ``cycles`` cycles of ``cycle_length``
+  pages whose N-th links form the cycle, each with a basin of a set size
+  (``basin_share`` of the content pages, shrinking by ``basin_decay`` per
+  cycle). Basin pages get at least N links and their N-th link points to an
+  earlier page of the same basin (parent index ``j * u**trunk_bias``, so a
+  few hub pages collect most of the flow, as in the real basins). Every other
+  page's N-th link stays outside the planted basins, so the basin sizes are
+  exact. The first nine 2-cycles reuse the titles of the harness's known
+  cycles (Massachusetts ↔ Gulf_of_Maine, ...), so the harnesses run unchanged.
+
+Link sequences are generated in page-id order in blocks of ``BLOCK_PAGES``
+pages, each from its own ``SeedSequence`` child, so output is reproducible
+from the seed and memory stays O(pages) plus one block of links.
+
+The XML dump renders every resolved link as prose (canonical title, a
+single-hop redirect title, spaces / lower-case first letter, piped text or a
+section anchor) and mixes in links the pipeline must drop (inside templates,
+refs and tables, File: / Category: links, disambiguation pages, double
+redirects, red links, self-links). Parsing the dumps with the data pipeline
+therefore reproduces nlink_sequences.parquet exactly.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from nlink_lib.paths import REPO_ROOT
+
+
+SYNTHETIC_DIR = REPO_ROOT / "data" / "synthetic"
+DUMP_DATE = "20251220"  # file names parse-sql-to-parquet.py reads
+BLOCK_PAGES = 1 << 20
+XML_NS = "http://www.mediawiki.org/xml/export-0.11/"
+
+# run-analysis-harness.py KNOWN_CYCLES: the first planted 2-cycles get these titles.
+PLANTED_TITLES = (
+    ("Massachusetts", "Gulf_of_Maine"),
+    ("Sea_salt", "Seawater"),
+    ("Mountain", "Hill"),
+    ("Autumn", "Summer"),
+    ("Kingdom_(biology)", "Animal"),
+    ("Latvia", "Lithuania"),
+    ("Thermosetting_polymer", "Curing_(chemistry)"),
+    ("Precedent", "Civil_law"),
+    ("American_Revolutionary_War", "Eastern_United_States"),
+)
+
+_OTHER_NAMESPACES = np.array([1, 2, 4, 6, 10, 14], dtype=np.int16)
+_ONSETS = ("b", "br", "c", "ch", "d", "f", "g", "gr", "h", "k", "l", "m", "n", "p", "r", "s", "st", "t", "tr", "v", "w", "z")
+_NUCLEI = ("a", "e", "i", "o", "u", "ai", "ea", "ou")
+_CODAS = ("", "", "n", "r", "s", "l", "th", "m", "nd", "x")
+_VOCABULARY = 4096
+_MAX_NOISE_PER_PAGE = 40
+
+
+@dataclass(frozen=True)
+class SyntheticSpec:
+    pages: int = 100_000  # content pages (namespace 0, not redirects)
+    seed: int = 0
+    mean_links: float = 20.0
+    out_exponent: float = 2.5
+    in_exponent: float = 2.2
+    max_links: int = 2000
+    empty_fraction: float = 0.03  # content pages without links
+    redirect_ratio: float = 0.5  # redirect pages per content page
+    chain_fraction: float = 0.05  # redirects that point at another redirect
+    disambig_fraction: float = 0.02
+    other_ns_fraction: float = 0.05
+    cycles: int = 9
+    cycle_length: int = 2
+    plant_n: int = 5
+    basin_share: float = 0.25  # largest planted basin, as a share of content pages
+    basin_decay: float = 0.5  # each further basin is this much smaller
+    trunk_bias: float = 2.0
+
+    def validate(self) -> None:
+        if self.pages < 100:
+            raise ValueError("pages must be >= 100")
+        if self.plant_n < 1 or self.cycle_length < 2:
+            raise ValueError("plant_n must be >= 1 and cycle_length >= 2 (self-links are not allowed)")
+        if self.out_exponent <= 2 or self.in_exponent <= 1:
+            raise ValueError("out_exponent must be > 2 (finite mean) and in_exponent > 1")
+        if not 0 < self.basin_decay <= 1 or not 0 <= self.basin_share < 1:
+            raise ValueError("basin_share must be in [0, 1) and basin_decay in (0, 1]")
+        for name in ("empty_fraction", "chain_fraction", "disambig_fraction"):
+            if not 0 <= getattr(self, name) < 1:
+                raise ValueError(f"{name} must be in [0, 1)")
+
+
+@dataclass
+class SyntheticWiki:
+    """The generated page table and the per-page parameters link sequences are drawn from.
+
+    Arrays indexed by ``g`` cover every page in page-id order; arrays indexed
+    by ``c`` cover content pages only (``content[c]`` is the page's ``g``).
+    """
+
+    spec: SyntheticSpec
+    page_ids: np.ndarray  # g -> page id (int64, ascending)
+    kind: np.ndarray  # g -> 0 content, 1 redirect, 2 other namespace
+    namespace: np.ndarray  # g -> int16
+    titles: pa.StringArray  # g -> title
+    content: np.ndarray  # c -> g
+    content_of: np.ndarray  # g -> c, or -1
+    disambig: np.ndarray  # c -> bool
+    degree: np.ndarray  # c -> out-degree
+    nth_target: np.ndarray  # c -> fixed target c of the N-th link, or -1
+    background: np.ndarray  # c -> bool: outside every planted basin
+    cum_all: np.ndarray  # cumulative target weights over c
+    cum_background: np.ndarray  # same, background pages only
+    redirects: np.ndarray  # redirect g, in page-id order
+    redirect_to: np.ndarray  # per redirect: target g (content or redirect)
+    redirect_final: np.ndarray  # per redirect: content c it resolves to
+    redirect_title_of: np.ndarray  # c -> g of one single-hop redirect to it, or -1
+    planted: list[dict]  # cycles: members (c), basin (c array), titles
+
+
+def dataset_dir(spec: SyntheticSpec) -> Path:
+    """Default dataset root (with raw/ and processed/) for a spec."""
+
+    return SYNTHETIC_DIR / f"pages={spec.pages}_seed={spec.seed}"
+
+
+def is_dataset_current(spec: SyntheticSpec, processed_dir: Path) -> bool:
+    """True when processed_dir holds a complete dataset generated from exactly this spec."""
+
+    try:
+        truth = json.loads((processed_dir / "synthetic_truth.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    return truth.get("spec") == asdict(spec) and (processed_dir / "nlink_sequences.parquet").exists()
+
+
+def ensure_dataset(spec: SyntheticSpec, out_dir: Path | None = None) -> Path:
+    """Processed directory of the dataset for ``spec``, generated unless already there; returns it."""
+
+    processed_dir = (out_dir or dataset_dir(spec)) / "processed"
+    if not is_dataset_current(spec, processed_dir):
+        write_processed(build_wiki(spec), processed_dir)
+    return processed_dir
+
+
+def _pareto(rng: np.random.Generator, size: int, exponent: float) -> np.ndarray:
+    """Samples >= 1 with density ~ x**-exponent."""
+
+    return (1.0 - rng.random(size)) ** (-1.0 / (exponent - 1.0))
+
+
+def _vocabulary(rng: np.random.Generator) -> tuple[list[str], list[str]]:
+    syllables = [o + n + c for o in _ONSETS for n in _NUCLEI for c in _CODAS]
+    words: set[str] = set()
+    while len(words) < _VOCABULARY:
+        parts = rng.integers(0, len(syllables), size=(_VOCABULARY, 3))
+        lengths = rng.integers(2, 4, size=_VOCABULARY)
+        for row, length in zip(parts, lengths):
+            words.add("".join(syllables[i] for i in row[:length]))
+    vocab = sorted(words)[:_VOCABULARY]
+    rng.shuffle(vocab)
+    # A few apostrophes, as in real titles, so the SQL escaping is exercised.
+    capitals = [("O'" + w.capitalize()) if i % 97 == 0 else w.capitalize() for i, w in enumerate(vocab)]
+    return capitals, vocab
+
+
+def _titles(rng: np.random.Generator, count: int) -> pa.StringArray:
+    """``count`` unique "Word_word" titles (with a "_(k)" suffix past 4096**2)."""
+
+    capitals, lower = _vocabulary(rng)
+    q = rng.permutation(count)
+    a, c = q % _VOCABULARY, q // (_VOCABULARY * _VOCABULARY)
+    b = (q // _VOCABULARY + rng.integers(0, _VOCABULARY, size=_VOCABULARY)[a]) % _VOCABULARY  # per-word shift keeps pairs unique
+    titles = pc.binary_join_element_wise(pa.array(capitals).take(pa.array(a)), pa.array(lower).take(pa.array(b)), "_")
+    if c.any():
+        suffix = pa.array([f"({k + 1})" if k else "" for k in c])
+        titles = pc.if_else(pa.array(c > 0), pc.binary_join_element_wise(titles, suffix, "_"), titles)
+    return titles
+
+
+def build_wiki(spec: SyntheticSpec) -> SyntheticWiki:
+    """Page table, redirects, planted basins and the link-target distributions (no link sequences yet)."""
+
+    spec.validate()
+    t0 = time.time()
+    seq = np.random.SeedSequence([int(spec.seed), 0x5157])
+    rng = np.random.default_rng(seq.spawn(1)[0])
+
+    num_content = int(spec.pages)
+    num_redirects = int(round(num_content * spec.redirect_ratio))
+    num_other = int(round(num_content * spec.other_ns_fraction))
+    total = num_content + num_redirects + num_other
+
+    page_ids = np.cumsum(rng.integers(1, 4, size=total, dtype=np.int64))
+    if page_ids[-1] > np.iinfo(np.int32).max:
+        raise ValueError("Too many pages for int32 page ids")
+    kind = rng.permutation(np.repeat(np.array([0, 1, 2], dtype=np.int8), [num_content, num_redirects, num_other]))
+    namespace = np.zeros(total, dtype=np.int16)
+    namespace[kind == 2] = rng.choice(_OTHER_NAMESPACES, size=num_other)
+    content = np.nonzero(kind == 0)[0]
+    content_of = np.full(total, -1, dtype=np.int64)
+    content_of[content] = np.arange(num_content)
+
+    # Disambiguation pages, then planted basins from the remaining pages.
+    order = rng.permutation(num_content)
+    num_disambig = int(round(num_content * spec.disambig_fraction))
+    disambig = np.zeros(num_content, dtype=bool)
+    disambig[order[:num_disambig]] = True
+    pool = order[num_disambig:]
+
+    sizes = [max(spec.cycle_length, int(round(num_content * spec.basin_share * spec.basin_decay**k))) for k in range(spec.cycles)]
+    if sum(sizes) > 0.9 * len(pool):
+        raise ValueError(f"Planted basins ({sum(sizes):,} pages) do not fit in {len(pool):,} eligible pages")
+    nth_target = np.full(num_content, -1, dtype=np.int64)
+    background = np.ones(num_content, dtype=bool)
+    planted = []
+    start = 0
+    for k, size in enumerate(sizes):
+        members = pool[start : start + size]
+        start += size
+        cycle = members[: spec.cycle_length]
+        nth_target[cycle] = np.roll(cycle, -1)
+        j = np.arange(spec.cycle_length, size)
+        parents = (j * rng.random(len(j)) ** spec.trunk_bias).astype(np.int64)
+        nth_target[members[spec.cycle_length :]] = members[parents]
+        background[members] = False
+        planted.append({"cycle": k, "members": cycle, "basin": members})
+
+    # Out-degrees: Pareto with the requested mean; planted pages need an N-th link.
+    scale = spec.mean_links * (spec.out_exponent - 2.0) / (spec.out_exponent - 1.0)
+    degree = np.minimum(np.floor(scale * _pareto(rng, num_content, spec.out_exponent)), spec.max_links).astype(np.int64)
+    degree = np.maximum(degree, 1)
+    empty_pool = pool[start:]
+    degree[empty_pool[: int(round(num_content * spec.empty_fraction))]] = 0
+    degree[~background] = np.maximum(degree[~background], spec.plant_n)
+
+    weights = _pareto(rng, num_content, spec.in_exponent)
+    weights[disambig] = 0.0
+    cum_all = np.cumsum(weights)
+    cum_background = np.cumsum(np.where(background, weights, 0.0))
+
+    # Titles: generated, then the planted cycle titles.
+    titles = _titles(rng, total)
+    named: list[tuple[int, str]] = []
+    for k, p in enumerate(planted):
+        if spec.cycle_length == 2 and k < len(PLANTED_TITLES):
+            p["titles"] = list(PLANTED_TITLES[k])
+            named.extend((int(content[c]), t) for c, t in zip(p["members"], PLANTED_TITLES[k]))
+    if named:
+        reserved = pa.array([t for _, t in named])
+        clash = pc.is_in(titles, value_set=reserved)
+        if pc.any(clash).as_py():
+            titles = pc.if_else(clash, pc.binary_join_element_wise(titles, "(synthetic)", "_"), titles)
+        named.sort()
+        mask = np.zeros(total, dtype=bool)
+        mask[[g for g, _ in named]] = True
+        titles = pc.replace_with_mask(titles, pa.array(mask), pa.array([t for _, t in named]))
+    for p in planted:
+        p.setdefault("titles", titles.take(pa.array(content[p["members"]])).to_pylist())
+
+    # Redirects: single-hop to content pages, a fraction chained through another redirect.
+    redirects = np.nonzero(kind == 1)[0]
+    num_chain = int(round(len(redirects) * spec.chain_fraction)) if len(redirects) > 1 else 0
+    targets_c = np.minimum(np.searchsorted(cum_all, rng.random(len(redirects)) * cum_all[-1], side="right"), num_content - 1)
+    redirect_to = content[targets_c]
+    redirect_final = targets_c
+    if num_chain:
+        shuffled = rng.permutation(len(redirects))
+        chained, direct = shuffled[:num_chain], shuffled[num_chain:]
+        via = direct[rng.integers(0, len(direct), size=num_chain)]
+        redirect_to[chained] = redirects[via]
+        redirect_final[chained] = redirect_final[via]
+    single = np.nonzero(kind[redirect_to] == 0)[0]
+    redirect_title_of = np.full(num_content, -1, dtype=np.int64)
+    uniq, first = np.unique(redirect_final[single], return_index=True)
+    redirect_title_of[uniq] = redirects[single[first]]
+
+    wiki = SyntheticWiki(
+        spec, page_ids, kind, namespace, titles, content, content_of, disambig, degree, nth_target, background,
+        cum_all, cum_background, redirects, redirect_to, redirect_final, redirect_title_of, planted,
+    )
+    print(f"Synthetic wiki: {total:,} pages ({num_content:,} content, {len(redirects):,} redirects) in {time.time() - t0:.1f}s")
+    return wiki
+
+
+def _draw(rng: np.random.Generator, cum: np.ndarray, size: int) -> np.ndarray:
+    return np.minimum(np.searchsorted(cum, rng.random(size) * cum[-1], side="right"), len(cum) - 1)
+
+
+def iter_sequence_blocks(wiki: SyntheticWiki) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """(source g, offsets, target c) per block of pages in page-id order; rows without links are left out.
+
+    Content rows first get their drawn targets; redirect rows get the
+    content page they resolve to (none if that is a disambiguation page).
+    """
+
+    spec = wiki.spec
+    total = len(wiki.page_ids)
+    starts = range(0, total, BLOCK_PAGES)
+    children = np.random.SeedSequence([int(spec.seed), 0x5158]).spawn(len(starts))
+    redirect_pos = np.searchsorted(wiki.redirects, np.arange(total + 1))
+    n_pos = spec.plant_n - 1
+
+    for g0, child in zip(starts, children):
+        rng = np.random.default_rng(child)
+        g1 = min(g0 + BLOCK_PAGES, total)
+        g = np.arange(g0, g1)
+        c = wiki.content_of[g]
+        is_content = c >= 0
+        deg = np.zeros(len(g), dtype=np.int64)
+        deg[is_content] = wiki.degree[c[is_content]]
+
+        r0, r1 = redirect_pos[g0], redirect_pos[g1]
+        final = wiki.redirect_final[r0:r1]
+        rows_r = wiki.redirects[r0:r1] - g0
+        keep = ~wiki.disambig[final]
+        deg[rows_r[keep]] = 1
+
+        rows = np.nonzero(deg > 0)[0]
+        counts = deg[rows]
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        src_c = np.repeat(np.where(is_content[rows], c[rows], -1), counts)
+        targets = _draw(rng, wiki.cum_all, int(offsets[-1]))
+
+        # N-th links: fixed for planted pages, background-only for the rest.
+        has_n = is_content[rows] & (counts > n_pos)
+        slots = offsets[:-1][has_n] + n_pos
+        fixed = wiki.nth_target[c[rows][has_n]]
+        free = fixed < 0
+        fixed[free] = _draw(rng, wiki.cum_background, int(free.sum()))
+        targets[slots] = fixed
+        nth_slot = np.zeros(len(targets), dtype=bool)
+        nth_slot[slots] = True
+
+        # No self-links: redraw (N-th slots of background pages from the background).
+        bad = np.nonzero((targets == src_c) & (src_c >= 0))[0]
+        while len(bad):
+            in_bg = nth_slot[bad]
+            targets[bad[~in_bg]] = _draw(rng, wiki.cum_all, int((~in_bg).sum()))
+            targets[bad[in_bg]] = _draw(rng, wiki.cum_background, int(in_bg.sum()))
+            bad = bad[targets[bad] == src_c[bad]]
+
+        # Redirect rows: their single link is the page they resolve to.
+        row_of = np.full(len(g), -1, dtype=np.int64)
+        row_of[rows] = np.arange(len(rows))
+        targets[offsets[row_of[rows_r[keep]]]] = final[keep]
+        yield g0 + rows, offsets, targets
+
+
+def planted_truth(wiki: SyntheticWiki) -> list[dict]:
+    """Planted cycles with exact basin sizes at ``plant_n`` (cycle pages included)."""
+
+    spec = wiki.spec
+    truth = []
+    basin_of = np.full(len(wiki.content), -1, dtype=np.int64)
+    for p in wiki.planted:
+        basin_of[p["basin"]] = p["cycle"]
+    extra = np.zeros(len(wiki.planted), dtype=np.int64)
+    if spec.plant_n == 1:
+        # At N=1 a redirect's one link is its N-th link: it joins its target's basin.
+        final = wiki.redirect_final[~wiki.disambig[wiki.redirect_final]]
+        k = basin_of[final]
+        extra += np.bincount(k[k >= 0], minlength=len(wiki.planted))
+    for p in wiki.planted:
+        truth.append({
+            "cycle": p["cycle"],
+            "n": spec.plant_n,
+            "titles": p["titles"],
+            "page_ids": [int(x) for x in wiki.page_ids[wiki.content[p["members"]]]],
+            "basin_size": int(len(p["basin"]) + extra[p["cycle"]]),
+        })
+    return truth
+
+
+# ---------------------------------------------------------------------------
+# Processed Parquet files
+# ---------------------------------------------------------------------------
+
+
+def write_processed(wiki: SyntheticWiki, processed_dir: Path) -> dict[str, int]:
+    """Write the four Parquet files the pipeline produces, plus the truth files; returns row counts."""
+
+    processed_dir.mkdir(parents=True, exist_ok=True)
+    t0 = time.time()
+    pq.write_table(
+        pa.table({
+            "page_id": pa.array(wiki.page_ids, type=pa.int32()),
+            "namespace": pa.array(wiki.namespace, type=pa.int16()),
+            "title": wiki.titles,
+            "is_redirect": pa.array(wiki.kind == 1),
+        }),
+        processed_dir / "pages.parquet",
+        compression="zstd",
+    )
+    pq.write_table(
+        pa.table({
+            "from_id": pa.array(wiki.page_ids[wiki.redirects], type=pa.int32()),
+            "to_namespace": pa.array(np.zeros(len(wiki.redirects), dtype=np.int16)),
+            "to_title": wiki.titles.take(pa.array(wiki.redirect_to)),
+        }),
+        processed_dir / "redirects.parquet",
+        compression="zstd",
+    )
+    disambig_ids = wiki.page_ids[wiki.content[wiki.disambig]]
+    pq.write_table(
+        pa.table({"page_id": pa.array(disambig_ids, type=pa.int32())}),
+        processed_dir / "disambig_pages.parquet",
+        compression="zstd",
+    )
+
+    schema = pa.schema([("page_id", pa.int64()), ("link_sequence", pa.list_(pa.int64()))])
+    content_ids = wiki.page_ids[wiki.content]
+    rows = links = 0
+    with pq.ParquetWriter(processed_dir / "nlink_sequences.parquet", schema, compression="zstd") as writer:
+        for sources, offsets, targets in iter_sequence_blocks(wiki):
+            values = pa.array(content_ids[targets], type=pa.int64())
+            sequences = pa.ListArray.from_arrays(pa.array(offsets.astype(np.int32)), values)
+            writer.write_table(pa.table({"page_id": pa.array(wiki.page_ids[sources], type=pa.int64()), "link_sequence": sequences}, schema=schema))
+            rows += len(sources)
+            links += len(targets)
+
+    truth = planted_truth(wiki)
+    basin_pages = np.concatenate([p["basin"] for p in wiki.planted]) if wiki.planted else np.zeros(0, dtype=np.int64)
+    basin_cycle = np.concatenate([np.full(len(p["basin"]), p["cycle"], dtype=np.int16) for p in wiki.planted]) if wiki.planted else np.zeros(0, dtype=np.int16)
+    order = np.argsort(wiki.page_ids[wiki.content[basin_pages]], kind="stable")
+    pq.write_table(
+        pa.table({
+            "page_id": pa.array(wiki.page_ids[wiki.content[basin_pages]][order], type=pa.int64()),
+            "cycle": pa.array(basin_cycle[order], type=pa.int16()),
+        }),
+        processed_dir / "synthetic_planted_basins.parquet",
+        compression="zstd",
+    )
+    counts = {
+        "pages": int(len(wiki.page_ids)),
+        "content_pages": int(len(wiki.content)),
+        "redirects": int(len(wiki.redirects)),
+        "disambig_pages": int(len(disambig_ids)),
+        "nlink_rows": int(rows),
+        "links": int(links),
+    }
+    payload = {
+        "generator": "nlink_lib.synthetic_wiki",
+        "spec": asdict(wiki.spec),
+        "counts": counts,
+        "planted_cycles": truth,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    (processed_dir / "synthetic_truth.json").write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    print(f"Wrote {processed_dir} ({rows:,} sequences, {links:,} links) in {time.time() - t0:.1f}s")
+    return counts
+
+
+def measure_planted_basins(processed_dir: Path) -> list[int]:
+    """Recompute the planted basin sizes from the written nlink_sequences.parquet (reverse BFS under f_N)."""
+
+    truth = json.loads((processed_dir / "synthetic_truth.json").read_text(encoding="utf-8"))
+    n = int(truth["spec"]["plant_n"])
+    table = pq.read_table(processed_dir / "nlink_sequences.parquet")
+    lengths = pc.list_value_length(table["link_sequence"]).to_numpy(zero_copy_only=False)
+    sources = table["page_id"].to_numpy()[lengths >= n]
+    nth = pc.list_element(table["link_sequence"].filter(pa.array(lengths >= n)), n - 1).to_numpy()
+
+    universe = np.unique(np.concatenate([table["page_id"].to_numpy(), nth]))
+    src, dst = np.searchsorted(universe, sources), np.searchsorted(universe, nth)
+    order = np.argsort(dst, kind="stable")
+    rev_src, rev_offsets = src[order], np.searchsorted(dst[order], np.arange(len(universe) + 1))
+
+    sizes = []
+    for cycle in truth["planted_cycles"]:
+        seen = np.zeros(len(universe), dtype=bool)
+        frontier = np.searchsorted(universe, np.array(cycle["page_ids"], dtype=np.int64))
+        seen[frontier] = True
+        while len(frontier):
+            parents = np.concatenate([rev_src[rev_offsets[v] : rev_offsets[v + 1]] for v in frontier])
+            frontier = np.unique(parents[~seen[parents]])
+            seen[frontier] = True
+        sizes.append(int(seen.sum()))
+    return sizes
+
+
+# ---------------------------------------------------------------------------
+# Raw dumps (SQL + XML) for the data pipeline
+# ---------------------------------------------------------------------------
+
+
+def _sql_string(value: str) -> str:
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def _write_sql(path: Path, table: str, columns: str, tuples: Iterator[str], per_insert: int = 1000) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"-- MySQL dump (synthetic, nlink_lib.synthetic_wiki)\n\nDROP TABLE IF EXISTS `{table}`;\n")
+        f.write(f"CREATE TABLE `{table}` (\n{columns}\n) ENGINE=InnoDB DEFAULT CHARSET=binary;\n\n")
+        batch: list[str] = []
+        for t in tuples:
+            batch.append(t)
+            if len(batch) == per_insert:
+                f.write(f"INSERT INTO `{table}` VALUES {','.join(batch)};\n")
+                batch = []
+        if batch:
+            f.write(f"INSERT INTO `{table}` VALUES {','.join(batch)};\n")
+
+
+def write_sql_dumps(wiki: SyntheticWiki, raw_dir: Path) -> list[Path]:
+    """page / redirect / page_props dumps in the multi-row INSERT format parse-sql-to-parquet.py reads."""
+
+    raw_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(np.random.SeedSequence([int(wiki.spec.seed), 0x5159]))
+    titles = wiki.titles.to_pylist()
+    page_ids = wiki.page_ids.tolist()
+    touched = "'20251201000000'"
+
+    def pages() -> Iterator[str]:
+        randoms = rng.random(len(page_ids))
+        for g, (pid, ns, kind) in enumerate(zip(page_ids, wiki.namespace.tolist(), wiki.kind.tolist())):
+            yield (
+                f"({pid},{ns},{_sql_string(titles[g])},{1 if kind == 1 else 0},0,{randoms[g]:.12f},"
+                f"{touched},{touched},{1_000_000 + g},{100 + g % 5000},'wikitext',NULL)"
+            )
+
+    def redirect_rows() -> Iterator[str]:
+        for g, to in zip(wiki.redirects.tolist(), wiki.redirect_to.tolist()):
+            yield f"({page_ids[g]},0,{_sql_string(titles[to])},'','')"
+
+    def props() -> Iterator[str]:
+        disambig_g = set(wiki.content[wiki.disambig].tolist())
+        for g in wiki.content.tolist():
+            if g in disambig_g:
+                yield f"({page_ids[g]},'disambiguation','',NULL)"
+            yield f"({page_ids[g]},'wikibase_item','Q{page_ids[g]}',NULL)"
+
+    prefix = f"enwiki-{DUMP_DATE}"
+    paths = [raw_dir / f"{prefix}-page.sql", raw_dir / f"{prefix}-redirect.sql", raw_dir / f"{prefix}-page_props.sql"]
+    _write_sql(paths[0], "page", "  `page_id` int(8) unsigned NOT NULL AUTO_INCREMENT,\n  `page_namespace` int(11) NOT NULL", pages())
+    _write_sql(paths[1], "redirect", "  `rd_from` int(8) unsigned NOT NULL DEFAULT 0,\n  `rd_namespace` int(11) NOT NULL DEFAULT 0", redirect_rows())
+    _write_sql(paths[2], "page_props", "  `pp_page` int(10) unsigned NOT NULL,\n  `pp_propname` varbinary(60) NOT NULL", props())
+    return paths
+
+
+def _link_text(rng: np.random.Generator, title: str, alias: str | None) -> str:
+    """A wikilink to ``title`` as an editor might write it (the pipeline normalizes all forms back)."""
+
+    target = alias if alias is not None and rng.random() < 0.3 else title
+    if rng.random() < 0.4:
+        target = target.replace("_", " ")
+    if rng.random() < 0.2 and target[0].isalpha():
+        target = target[0].lower() + target[1:]
+    roll = rng.random()
+    if roll < 0.3:
+        return f"[[{target}|{title.replace('_', ' ').lower()}]]"
+    if roll < 0.35:
+        return f"[[{target}#History|{title.replace('_', ' ')}]]"
+    return f"[[{target}]]"
+
+
+def _noise(rng: np.random.Generator, wiki: SyntheticWiki, titles: list[str], self_title: str) -> str:
+    """Markup whose links the pipeline must drop."""
+
+    other = titles[int(wiki.content[int(rng.integers(0, len(wiki.content)))])]
+    kind = int(rng.integers(0, 9))
+    if kind == 0:
+        return f"{{{{Infobox settlement|name={other}|seat=[[{other}]]|note={{{{nowrap|[[{self_title}]]}}}}}}}}"
+    if kind == 1:
+        return f"<ref>{{{{cite web|title=[[{other}]]}}}} [[{other}]]</ref>"
+    if kind == 2:
+        return f"\n{{| class=\"wikitable\"\n|-\n| [[{other}]] || 1\n|}}\n"
+    if kind == 3:
+        return f"[[File:{other}.jpg|thumb|{other.replace('_', ' ')} in winter]]"  # caption links would be kept
+    if kind == 4:
+        return f"[[Category:{other}]]"
+    if kind == 5 and wiki.disambig.any():
+        d = np.nonzero(wiki.disambig)[0]
+        return f"see [[{titles[int(wiki.content[d[int(rng.integers(0, len(d)))]])]}]]"
+    if kind == 6 and len(wiki.redirects):
+        chained = np.nonzero(wiki.kind[wiki.redirect_to] == 1)[0]
+        if len(chained):
+            return f"also [[{titles[int(wiki.redirects[chained[int(rng.integers(0, len(chained)))]])]}]]"
+    if kind == 7:
+        return f"<!-- [[{other}]] --> [[{self_title}]]"
+    return f"[[Red link {int(rng.integers(0, 10**6))}]]"
+
+
+def write_xml_dump(wiki: SyntheticWiki, raw_dir: Path, *, parts: int = 1, noise: float = 0.2) -> list[Path]:
+    """pages-articles XML parts in the export-0.11 format parse-xml-prose-links.py reads.
+
+    ``noise`` is the expected number of dropped links per resolved link.
+    """
+
+    raw_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(np.random.SeedSequence([int(wiki.spec.seed), 0x515A]))
+    titles = wiki.titles.to_pylist()
+    total = len(wiki.page_ids)
+    bounds = np.linspace(0, total, max(1, parts) + 1).astype(np.int64)
+    paths = [raw_dir / f"enwiki-{DUMP_DATE}-pages-articles-multistream{k + 1}.xml" for k in range(len(bounds) - 1)]
+    files = [open(p, "w", encoding="utf-8") for p in paths]
+    header = (
+        f'<mediawiki xmlns="{XML_NS}" version="0.11" xml:lang="en">\n'
+        "  <siteinfo>\n    <sitename>Wikipedia</sitename>\n    <dbname>enwiki</dbname>\n"
+        "    <base>https://en.wikipedia.org/wiki/Main_Page</base>\n  </siteinfo>\n"
+    )
+    for f in files:
+        f.write(header)
+
+    def page_xml(g: int, text: str, redirect: str | None = None) -> str:
+        title = titles[g]
+        display = title.replace("_", " ")
+        ns = int(wiki.namespace[g])
+        if ns:
+            display = {1: "Talk", 2: "User", 4: "Wikipedia", 6: "File", 10: "Template", 14: "Category"}[ns] + ":" + display
+        redirect_tag = f"    <redirect title={quoteattr(redirect.replace('_', ' '))} />\n" if redirect else ""
+        return (
+            f"  <page>\n    <title>{escape(display)}</title>\n    <ns>{ns}</ns>\n    <id>{int(wiki.page_ids[g])}</id>\n"
+            f"{redirect_tag}    <revision>\n      <id>{1_000_000 + g}</id>\n      <timestamp>2025-12-01T00:00:00Z</timestamp>\n"
+            "      <contributor>\n        <username>Synthetic</username>\n        <id>1</id>\n      </contributor>\n"
+            "      <model>wikitext</model>\n      <format>text/x-wiki</format>\n"
+            f'      <text bytes="{len(text.encode("utf-8"))}" xml:space="preserve">{escape(text)}</text>\n'
+            "    </revision>\n  </page>\n"
+        )
+
+    def rows() -> Iterator[tuple[int, np.ndarray]]:
+        for sources, offsets, targets in iter_sequence_blocks(wiki):
+            for i, g in enumerate(sources.tolist()):
+                yield g, targets[offsets[i] : offsets[i + 1]]
+
+    part = 0
+    block_rows = rows()
+    next_row = next(block_rows, None)
+    redirect_index = {int(g): i for i, g in enumerate(wiki.redirects.tolist())}
+    for g in range(total):
+        while g >= bounds[part + 1]:
+            part += 1
+        seq = None
+        if next_row is not None and next_row[0] == g:
+            seq = next_row[1]
+            next_row = next(block_rows, None)
+        kind = int(wiki.kind[g])
+        if kind == 1:
+            to = titles[int(wiki.redirect_to[redirect_index[g]])]
+            files[part].write(page_xml(g, f"#REDIRECT [[{to.replace('_', ' ')}]]\n\n{{{{R from alternative name}}}}", to))
+            continue
+        if kind == 2:
+            files[part].write(page_xml(g, f"Project page about [[{titles[int(wiki.content[0])]}]]."))
+            continue
+        c = int(wiki.content_of[g])
+        self_title = titles[g]
+        lead = f"'''{self_title.replace('_', ' ')}''' " + ("may refer to:\n" if wiki.disambig[c] else "is a synthetic article.\n")
+        pieces = [f"{{{{Short description|{self_title.replace('_', ' ')}}}}}\n", lead]
+        noisy = 0
+        for t in ([] if seq is None else seq.tolist()):
+            # parse-xml-prose-links.py strips at most 100 templates / 50 tables per page.
+            while noisy < _MAX_NOISE_PER_PAGE and rng.random() < noise / (1.0 + noise):
+                pieces.append(_noise(rng, wiki, titles, self_title) + " ")
+                noisy += 1
+            alias_g = int(wiki.redirect_title_of[t])
+            link = _link_text(rng, titles[int(wiki.content[t])], titles[alias_g] if alias_g >= 0 else None)
+            pieces.append(("* " + link + "\n") if wiki.disambig[c] else (link + " and "))
+        pieces.append(".\n\n== References ==\n<references />\n")
+        files[part].write(page_xml(g, "".join(pieces)))
+    for f in files:
+        f.write("</mediawiki>\n")
+        f.close()
+    return paths
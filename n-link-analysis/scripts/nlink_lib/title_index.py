@@ -0,0 +1,391 @@
+"""Persistent title <-> page_id index built once from pages.parquet.
+
+Every script used to resolve titles by opening a fresh DuckDB connection and
+scanning the full pages.parquet (seconds per call; once per hop in the chase
+scripts). This module materializes the page table once into flat numpy arrays
+under data/wikipedia/processed/analysis/title_index/ and memory-maps them:
+
+  page_ids.npy       int64, sorted ascending (row order of every other array)
+  namespace.npy      int16
+  is_redirect.npy    bool
+  redirect_to.npy    int64, final non-redirect target page_id (-1 if none)
+  title_offsets.npy  int64, len = rows + 1 (UTF-8 byte offsets into title_bytes)
+  title_bytes.npy    uint8, concatenated UTF-8 titles
+  title_order.npy    int64, rows sorted by (title bytes, namespace, page_id)
+  manifest.json      source fingerprints (size, mtime) used to detect staleness
+
+page_id -> title is a vectorized ``searchsorted``; title -> page_id is a binary
+search over ``title_order`` (~25 probes), memoized with an in-process LRU.
+
+Resolution semantics match the old per-script ``_resolve_titles_to_ids``:
+exact title match within a namespace, redirect pages excluded unless
+``allow_redirects``, smallest page_id wins. ``follow_redirects`` additionally
+maps a redirect match onto its (chain-resolved) target article. A title with
+no exact match is retried in MediaWiki canonical form ("gulf of Maine" ->
+"Gulf_of_Maine"); looser case-insensitive/prefix matching lives in
+nlink_lib.title_search.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
+
+import numpy as np
+
+from nlink_lib.paths import ANALYSIS_DIR, PAGES_PATH, REDIRECTS_PATH, file_fingerprint
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+
+INDEX_DIR = ANALYSIS_DIR / "title_index"
+INDEX_VERSION = 1
+
+# Redirect chains longer than this are treated as unresolvable.
+MAX_REDIRECT_HOPS = 5
+
+_ARRAY_NAMES = (
+    "page_ids",
+    "namespace",
+    "is_redirect",
+    "redirect_to",
+    "title_offsets",
+    "title_bytes",
+    "title_order",
+)
+
+
+def _expected_manifest_sources() -> dict[str, dict[str, int] | None]:
+    return {
+        "pages": file_fingerprint(PAGES_PATH),
+        "redirects": file_fingerprint(REDIRECTS_PATH),
+    }
+
+
+def is_index_fresh(index_dir: Path = INDEX_DIR) -> bool:
+    manifest_path = index_dir / "manifest.json"
+    if not manifest_path.exists():
+        return False
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return False
+    if manifest.get("version") != INDEX_VERSION:
+        return False
+    if manifest.get("sources") != _expected_manifest_sources():
+        return False
+    return all((index_dir / f"{name}.npy").exists() for name in _ARRAY_NAMES)
+
+
+def _string_buffers(arr: pa.Array) -> tuple[np.ndarray, np.ndarray]:
+    """Return (offsets int64[len+1], data uint8) for a string array, rebased to 0."""
+
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    arr = pc.cast(pc.fill_null(arr, ""), pa.large_string())
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()
+    bufs = arr.buffers()
+    offsets = np.frombuffer(bufs[1], dtype=np.int64)[arr.offset : arr.offset + len(arr) + 1].copy()
+    data = np.frombuffer(bufs[2], dtype=np.uint8) if bufs[2] is not None else np.zeros(0, dtype=np.uint8)
+    data = data[int(offsets[0]) : int(offsets[-1])].copy()
+    offsets -= offsets[0]
+    return offsets, data
+
+
+def build_title_index(*, index_dir: Path = INDEX_DIR) -> Path:
+    """Materialize the title index from pages.parquet (+ redirects.parquet if present)."""
+
+    if not PAGES_PATH.exists():
+        raise FileNotFoundError(f"Missing: {PAGES_PATH}")
+
+    # Building is the only user of duckdb / pyarrow here; lookups need numpy alone.
+    import duckdb
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    print("Building title index from pages.parquet (one-time cost)...")
+    t0 = time.time()
+
+    con = duckdb.connect()
+    tbl = con.execute(
+        f"""
+        SELECT
+            page_id::BIGINT AS page_id,
+            namespace::SMALLINT AS namespace,
+            title,
+            coalesce(is_redirect, FALSE) AS is_redirect
+        FROM read_parquet('{PAGES_PATH.as_posix()}')
+        ORDER BY page_id
+        """.strip()
+    ).fetch_arrow_table()
+
+    redirect_rows: list[tuple[int, int]] = []
+    if REDIRECTS_PATH.exists():
+        redirect_rows = con.execute(
+            f"""
+            SELECT r.from_id::BIGINT AS from_id, min(p.page_id)::BIGINT AS to_id
+            FROM read_parquet('{REDIRECTS_PATH.as_posix()}') r
+            JOIN read_parquet('{PAGES_PATH.as_posix()}') p
+              ON p.title = r.to_title AND p.namespace = r.to_namespace
+            GROUP BY r.from_id
+            """.strip()
+        ).fetchall()
+    con.close()
+
+    page_ids = tbl["page_id"].to_numpy().astype(np.int64)
+    namespace = tbl["namespace"].to_numpy().astype(np.int16)
+    is_redirect = tbl["is_redirect"].to_numpy(zero_copy_only=False).astype(bool)
+    title_offsets, title_bytes = _string_buffers(tbl["title"])
+
+    # Direct redirect targets, then follow chains (redirect -> redirect -> article).
+    redirect_to = np.full(len(page_ids), -1, dtype=np.int64)
+    if redirect_rows:
+        rr = np.asarray(redirect_rows, dtype=np.int64)
+        rows = np.searchsorted(page_ids, rr[:, 0])
+        ok = (rows < len(page_ids)) & (page_ids[np.minimum(rows, len(page_ids) - 1)] == rr[:, 0])
+        redirect_to[rows[ok]] = rr[ok, 1]
+
+    for _ in range(MAX_REDIRECT_HOPS):
+        has_target = redirect_to >= 0
+        tgt_rows = np.searchsorted(page_ids, np.where(has_target, redirect_to, 0))
+        tgt_rows = np.minimum(tgt_rows, len(page_ids) - 1)
+        chained = has_target & is_redirect[tgt_rows] & (page_ids[tgt_rows] == redirect_to)
+        if not chained.any():
+            break
+        redirect_to[chained] = redirect_to[tgt_rows[chained]]
+    else:
+        # Anything still pointing at a redirect after MAX_REDIRECT_HOPS is a loop or too deep.
+        tgt_rows = np.minimum(np.searchsorted(page_ids, np.maximum(redirect_to, 0)), len(page_ids) - 1)
+        redirect_to[(redirect_to >= 0) & is_redirect[tgt_rows]] = -1
+
+    sort_tbl = pa.table(
+        {
+            "title": pc.fill_null(tbl["title"], ""),
+            "namespace": pa.array(namespace),
+            "page_id": pa.array(page_ids),
+        }
+    )
+    title_order = pc.sort_indices(
+        sort_tbl,
+        sort_keys=[("title", "ascending"), ("namespace", "ascending"), ("page_id", "ascending")],
+    ).to_numpy().astype(np.int64)
+
+    tmp_dir = index_dir.with_name(index_dir.name + f".tmp-{os.getpid()}")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    arrays = {
+        "page_ids": page_ids,
+        "namespace": namespace,
+        "is_redirect": is_redirect,
+        "redirect_to": redirect_to,
+        "title_offsets": title_offsets,
+        "title_bytes": title_bytes,
+        "title_order": title_order,
+    }
+    for name, arr in arrays.items():
+        np.save(tmp_dir / f"{name}.npy", arr)
+
+    manifest = {
+        "version": INDEX_VERSION,
+        "rows": int(len(page_ids)),
+        "sources": _expected_manifest_sources(),
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    (tmp_dir / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    if index_dir.exists():
+        shutil.rmtree(index_dir)
+    os.replace(tmp_dir, index_dir)
+
+    dt = time.time() - t0
+    print(f"Title index ready: {len(page_ids):,} pages in {dt:.1f}s ({index_dir})")
+    return index_dir
+
+
+def wiki_canonical_title(title: str) -> str:
+    """Dump-form title: spaces -> underscores, trimmed, first letter uppercased."""
+
+    t = "_".join(title.replace("_", " ").split())
+    return t[:1].upper() + t[1:]
+
+
+class TitleIndex:
+    """Memory-mapped title <-> page_id lookups (see module docstring for layout)."""
+
+    def __init__(self, index_dir: Path = INDEX_DIR, *, cache_size: int = 65536) -> None:
+        self.index_dir = Path(index_dir)
+        arrays = {name: np.load(self.index_dir / f"{name}.npy", mmap_mode="r") for name in _ARRAY_NAMES}
+        self.page_ids: np.ndarray = arrays["page_ids"]
+        self.namespace: np.ndarray = arrays["namespace"]
+        self.is_redirect: np.ndarray = arrays["is_redirect"]
+        self.redirect_to: np.ndarray = arrays["redirect_to"]
+        self._offsets: np.ndarray = arrays["title_offsets"]
+        self._bytes: np.ndarray = arrays["title_bytes"]
+        self._order: np.ndarray = arrays["title_order"]
+
+        # Per-instance LRU over single-title lookups (cycle / seed titles repeat a lot).
+        self._rows_for_title = functools.lru_cache(maxsize=cache_size)(self._rows_for_title_uncached)
+
+    def __len__(self) -> int:
+        return int(len(self.page_ids))
+
+    # -- raw access ---------------------------------------------------------
+
+    def title_bytes_at(self, row: int) -> bytes:
+        return self._bytes[int(self._offsets[row]) : int(self._offsets[row + 1])].tobytes()
+
+    def title_at(self, row: int) -> str:
+        return self.title_bytes_at(row).decode("utf-8")
+
+    def rows_for_ids(self, page_ids: np.ndarray) -> np.ndarray:
+        """Row index for each page_id (-1 where the page_id is unknown)."""
+
+        ids = np.asarray(page_ids, dtype=np.int64)
+        if len(self.page_ids) == 0:
+            return np.full(ids.shape, -1, dtype=np.int64)
+        rows = np.searchsorted(self.page_ids, ids)
+        rows_c = np.minimum(rows, len(self.page_ids) - 1)
+        return np.where(self.page_ids[rows_c] == ids, rows_c, -1).astype(np.int64)
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, len(self._order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.title_bytes_at(int(self._order[mid])) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _rows_for_title_uncached(self, title: str) -> tuple[int, ...]:
+        key = title.encode("utf-8")
+        pos = self._lower_bound(key)
+        rows: list[int] = []
+        while pos < len(self._order):
+            row = int(self._order[pos])
+            if self.title_bytes_at(row) != key:
+                break
+            rows.append(row)
+            pos += 1
+        return tuple(rows)
+
+    # -- title -> page_id ---------------------------------------------------
+
+    def lookup(
+        self,
+        title: str,
+        *,
+        namespace: int = 0,
+        allow_redirects: bool = False,
+        follow_redirects: bool = False,
+    ) -> int | None:
+        """Resolve one exact title to a page_id (None if not found)."""
+
+        rows = [r for r in self._rows_for_title(str(title)) if int(self.namespace[r]) == int(namespace)]
+        if not rows:
+            # MediaWiki treats spaces/underscores and the first letter's case as equivalent.
+            canonical = wiki_canonical_title(str(title))
+            if canonical != str(title):
+                rows = [r for r in self._rows_for_title(canonical) if int(self.namespace[r]) == int(namespace)]
+        if not rows:
+            return None
+
+        articles = [int(self.page_ids[r]) for r in rows if not bool(self.is_redirect[r])]
+        if follow_redirects:
+            if articles:
+                return min(articles)
+            targets = [int(self.redirect_to[r]) for r in rows if int(self.redirect_to[r]) >= 0]
+            if targets:
+                return min(targets)
+            return min(int(self.page_ids[r]) for r in rows) if allow_redirects else None
+
+        if allow_redirects:
+            return min(int(self.page_ids[r]) for r in rows)
+        return min(articles) if articles else None
+
+    def titles_to_ids(
+        self,
+        titles: Iterable[str],
+        *,
+        namespace: int = 0,
+        allow_redirects: bool = False,
+        follow_redirects: bool = False,
+    ) -> dict[str, int]:
+        out: dict[str, int] = {}
+        for t in titles:
+            pid = self.lookup(
+                str(t),
+                namespace=namespace,
+                allow_redirects=allow_redirects,
+                follow_redirects=follow_redirects,
+            )
+            if pid is not None:
+                out[str(t)] = pid
+        return out
+
+    # -- page_id -> title ---------------------------------------------------
+
+    def ids_to_titles(self, page_ids: Iterable[int]) -> dict[int, str]:
+        ids = np.unique(np.fromiter((int(x) for x in page_ids), dtype=np.int64))
+        if len(ids) == 0:
+            return {}
+        rows = self.rows_for_ids(ids)
+        return {int(pid): self.title_at(int(row)) for pid, row in zip(ids, rows) if row >= 0}
+
+    def resolve_redirects(self, page_ids: np.ndarray) -> np.ndarray:
+        """Map redirect page_ids onto their target article (others pass through)."""
+
+        ids = np.asarray(page_ids, dtype=np.int64)
+        rows = self.rows_for_ids(ids)
+        known = rows >= 0
+        target = np.where(known, self.redirect_to[np.maximum(rows, 0)], -1)
+        return np.where(known & (target >= 0), target, ids)
+
+
+@functools.lru_cache(maxsize=1)
+def get_title_index() -> TitleIndex:
+    """Process-wide TitleIndex, (re)built on first use if missing or stale."""
+
+    if not PAGES_PATH.exists():
+        raise FileNotFoundError(f"Missing: {PAGES_PATH}")
+    if not is_index_fresh():
+        build_title_index()
+    return TitleIndex()
+
+
+def resolve_titles_to_ids(
+    titles: list[str],
+    *,
+    namespace: int,
+    allow_redirects: bool,
+    follow_redirects: bool = False,
+) -> dict[str, int]:
+    """Drop-in replacement for the scripts' old ``_resolve_titles_to_ids``."""
+
+    if not titles:
+        return {}
+    return get_title_index().titles_to_ids(
+        titles,
+        namespace=namespace,
+        allow_redirects=allow_redirects,
+        follow_redirects=follow_redirects,
+    )
+
+
+def resolve_ids_to_titles(page_ids: Iterable[int]) -> dict[int, str]:
+    """Drop-in replacement for the scripts' old ``_resolve_ids_to_titles``."""
+
+    page_ids = list(page_ids)
+    if not page_ids or not PAGES_PATH.exists():
+        return {}
+    return get_title_index().ids_to_titles(page_ids)
@@ -0,0 +1,355 @@
+"""Normalized prefix search over page titles (autocomplete / "did you mean").
+
+Exact title resolution (nlink_lib.title_index) fails on trivial mismatches such
+as "Gulf of Maine" vs "Gulf_of_Maine" or "gulf_of_maine". This module keeps a
+second, compact index over *normalized* titles:
+
+  normalize(t) = lowercase, runs of whitespace/underscores folded to "_",
+                 leading/trailing "_" stripped
+
+stored under data/wikipedia/processed/analysis/title_search/:
+
+  key_offsets.npy / key_bytes.npy  normalized UTF-8 keys in sorted order
+  key8.npy                         uint64 big-endian first 8 key bytes (coarse searchsorted)
+  rows.npy                         title_index row for each sorted key
+  in_degree.npy                    int64 inbound-link count per title_index row (ranking)
+  manifest.json                    fingerprints of the title index + nlink_sequences.parquet
+
+A prefix query is two ``searchsorted`` calls on ``key8`` (plus a short byte-wise
+binary search for prefixes longer than 8 bytes); the matching slice is ranked by
+in-degree (or caller-supplied scores such as basin size) with ``argpartition``.
+Nothing touches pages.parquet at query time.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import re
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from nlink_lib.paths import ANALYSIS_DIR, NLINK_PATH, file_fingerprint
+from nlink_lib.title_index import INDEX_DIR as TITLE_INDEX_DIR
+from nlink_lib.title_index import TitleIndex, get_title_index
+
+
+SEARCH_DIR = ANALYSIS_DIR / "title_search"
+SEARCH_VERSION = 1
+
+_ARRAY_NAMES = ("key_offsets", "key_bytes", "key8", "rows", "in_degree")
+_FOLD_RE = re.compile(r"[\s_]+")
+
+
+def normalize_title(title: str) -> str:
+    """Normalization applied to both indexed titles and queries."""
+
+    return _FOLD_RE.sub("_", title.lower()).strip("_")
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    page_id: int
+    title: str
+    namespace: int
+    is_redirect: bool
+    redirect_to: int | None
+    score: int
+
+
+def _expected_sources() -> dict[str, object]:
+    return {
+        "title_index": file_fingerprint(TITLE_INDEX_DIR / "manifest.json"),
+        "nlink": file_fingerprint(NLINK_PATH),
+    }
+
+
+def is_search_index_fresh(search_dir: Path = SEARCH_DIR) -> bool:
+    manifest_path = search_dir / "manifest.json"
+    if not manifest_path.exists():
+        return False
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return False
+    if manifest.get("version") != SEARCH_VERSION or manifest.get("sources") != _expected_sources():
+        return False
+    return all((search_dir / f"{name}.npy").exists() for name in _ARRAY_NAMES)
+
+
+def _key8(offsets: np.ndarray, data: np.ndarray) -> np.ndarray:
+    """Big-endian uint64 of the first 8 bytes of each key (zero padded)."""
+
+    starts = offsets[:-1]
+    lengths = offsets[1:] - starts
+    out = np.zeros(len(starts), dtype=np.uint64)
+    padded = np.concatenate([data, np.zeros(8, dtype=np.uint8)])
+    for k in range(8):
+        byte_k = np.where(lengths > k, padded[starts + k], 0).astype(np.uint64)
+        out |= byte_k << np.uint64(8 * (7 - k))
+    return out
+
+
+def _pack_key8(prefix: bytes, fill: int) -> np.uint64:
+    padded = prefix[:8] + bytes([fill]) * (8 - min(len(prefix), 8))
+    return np.uint64(int.from_bytes(padded, "big"))
+
+
+def _compute_in_degree(index: TitleIndex) -> np.ndarray:
+    """Inbound-link counts (all positions) aligned to title_index rows."""
+
+    in_degree = np.zeros(len(index), dtype=np.int64)
+    if not NLINK_PATH.exists():
+        return in_degree
+
+    import duckdb
+
+    con = duckdb.connect()
+    tbl = con.execute(
+        f"""
+        SELECT dst::BIGINT AS page_id, COUNT(*)::BIGINT AS in_degree
+        FROM (
+            SELECT unnest(link_sequence) AS dst
+            FROM read_parquet('{NLINK_PATH.as_posix()}')
+        )
+        GROUP BY dst
+        """.strip()
+    ).fetch_arrow_table()
+    con.close()
+
+    rows = index.rows_for_ids(tbl["page_id"].to_numpy())
+    counts = tbl["in_degree"].to_numpy()
+    ok = rows >= 0
+    in_degree[rows[ok]] = counts[ok]
+    return in_degree
+
+
+def build_title_search_index(*, search_dir: Path = SEARCH_DIR) -> Path:
+    # Building is the only user of pyarrow here; searches need numpy alone.
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    index = get_title_index()
+
+    print("Building normalized title search index (one-time cost)...")
+    t0 = time.time()
+
+    offsets = np.asarray(index._offsets)
+    data = np.asarray(index._bytes)
+    titles = pa.LargeStringArray.from_buffers(
+        len(index),
+        pa.py_buffer(offsets.astype(np.int64)),
+        pa.py_buffer(data),
+    )
+    keys = pc.utf8_lower(titles)
+    keys = pc.replace_substring_regex(keys, pattern=r"[\s_]+", replacement="_")
+    keys = pc.utf8_trim(keys, characters="_")
+
+    in_degree = _compute_in_degree(index)
+
+    # Sort by key, then most-linked first so exact-key ties already come out ranked.
+    order = pc.sort_indices(
+        pa.table({"key": keys, "neg_in_degree": pa.array(-in_degree)}),
+        sort_keys=[("key", "ascending"), ("neg_in_degree", "ascending")],
+    ).to_numpy().astype(np.int64)
+
+    sorted_keys = pc.cast(pc.take(keys, pa.array(order)), pa.large_string())
+    bufs = sorted_keys.buffers()
+    key_offsets = np.frombuffer(bufs[1], dtype=np.int64)[sorted_keys.offset : sorted_keys.offset + len(sorted_keys) + 1].copy()
+    key_bytes = np.frombuffer(bufs[2], dtype=np.uint8)[int(key_offsets[0]) : int(key_offsets[-1])].copy() if bufs[2] is not None else np.zeros(0, dtype=np.uint8)
+    key_offsets -= key_offsets[0]
+
+    tmp_dir = search_dir.with_name(search_dir.name + f".tmp-{os.getpid()}")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    arrays = {
+        "key_offsets": key_offsets,
+        "key_bytes": key_bytes,
+        "key8": _key8(key_offsets, key_bytes),
+        "rows": order,
+        "in_degree": in_degree,
+    }
+    for name, arr in arrays.items():
+        np.save(tmp_dir / f"{name}.npy", arr)
+
+    manifest = {
+        "version": SEARCH_VERSION,
+        "rows": int(len(order)),
+        "sources": _expected_sources(),
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    (tmp_dir / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    if search_dir.exists():
+        shutil.rmtree(search_dir)
+    os.replace(tmp_dir, search_dir)
+
+    dt = time.time() - t0
+    print(f"Title search index ready: {len(order):,} keys in {dt:.1f}s ({search_dir})")
+    return search_dir
+
+
+class TitleSearchIndex:
+    """Prefix / normalized-exact search over titles (see module docstring)."""
+
+    def __init__(self, title_index: TitleIndex, search_dir: Path = SEARCH_DIR) -> None:
+        self.title_index = title_index
+        arrays = {name: np.load(search_dir / f"{name}.npy", mmap_mode="r") for name in _ARRAY_NAMES}
+        self._offsets: np.ndarray = arrays["key_offsets"]
+        self._bytes: np.ndarray = arrays["key_bytes"]
+        self._key8: np.ndarray = arrays["key8"]
+        self.rows: np.ndarray = arrays["rows"]
+        self.in_degree: np.ndarray = arrays["in_degree"]
+
+    def _key_at(self, pos: int) -> bytes:
+        return self._bytes[int(self._offsets[pos]) : int(self._offsets[pos + 1])].tobytes()
+
+    def prefix_range(self, prefix: str) -> tuple[int, int]:
+        """Half-open range [lo, hi) of sorted keys starting with normalize(prefix)."""
+
+        p = normalize_title(prefix).encode("utf-8")
+        lo = int(np.searchsorted(self._key8, _pack_key8(p, 0x00), side="left"))
+        hi = int(np.searchsorted(self._key8, _pack_key8(p, 0xFF), side="right"))
+        if len(p) <= 8:
+            return lo, hi
+
+        # Refine within the coarse 8-byte bucket.
+        a, b = lo, hi
+        while a < b:
+            mid = (a + b) // 2
+            if self._key_at(mid) < p:
+                a = mid + 1
+            else:
+                b = mid
+        start = a
+        b = hi
+        while a < b:
+            mid = (a + b) // 2
+            if self._key_at(mid)[: len(p)] <= p:
+                a = mid + 1
+            else:
+                b = mid
+        return start, a
+
+    def search(
+        self,
+        query: str,
+        *,
+        limit: int = 20,
+        namespace: int | None = 0,
+        include_redirects: bool = False,
+        scores: np.ndarray | None = None,
+    ) -> list[SearchHit]:
+        """Top ``limit`` titles whose normalized form starts with normalize(query).
+
+        Ranked by ``scores`` (aligned to title_index rows, e.g. basin size per
+        page) when given, else by inbound-link count. Exact normalized matches
+        always come first.
+        """
+
+        lo, hi = self.prefix_range(query)
+        if hi <= lo or limit <= 0:
+            return []
+
+        rows = np.asarray(self.rows[lo:hi])
+        keep = np.ones(len(rows), dtype=bool)
+        if namespace is not None:
+            keep &= np.asarray(self.title_index.namespace[rows]) == int(namespace)
+        if not include_redirects:
+            keep &= ~np.asarray(self.title_index.is_redirect[rows])
+        positions = np.nonzero(keep)[0]
+        if len(positions) == 0:
+            return []
+        rows = rows[positions]
+
+        rank_source = self.in_degree if scores is None else scores
+        rank = np.asarray(rank_source[rows], dtype=np.float64)
+
+        key = normalize_title(query).encode("utf-8")
+        key_len = len(key)
+        exact = (np.asarray(self._offsets[lo + positions + 1]) - np.asarray(self._offsets[lo + positions])) == key_len
+        rank = np.where(exact, np.inf, rank)
+
+        k = min(int(limit), len(rows))
+        top = np.argpartition(-rank, k - 1)[:k] if k < len(rows) else np.arange(len(rows))
+        top = top[np.lexsort((positions[top], -rank[top]))]
+
+        hits: list[SearchHit] = []
+        for i in top:
+            row = int(rows[i])
+            redirect_to = int(self.title_index.redirect_to[row])
+            hits.append(
+                SearchHit(
+                    page_id=int(self.title_index.page_ids[row]),
+                    title=self.title_index.title_at(row),
+                    namespace=int(self.title_index.namespace[row]),
+                    is_redirect=bool(self.title_index.is_redirect[row]),
+                    redirect_to=redirect_to if redirect_to >= 0 else None,
+                    score=int(self.in_degree[row]) if scores is None else int(scores[row]),
+                )
+            )
+        return hits
+
+    def resolve(self, title: str, *, namespace: int = 0) -> SearchHit | None:
+        """Best page whose normalized title equals normalize(title) (follows redirects)."""
+
+        hits = self.search(title, limit=1, namespace=namespace, include_redirects=True)
+        if not hits or normalize_title(hits[0].title) != normalize_title(title):
+            return None
+        hit = hits[0]
+        if hit.is_redirect and hit.redirect_to is not None:
+            target_title = self.title_index.ids_to_titles([hit.redirect_to]).get(hit.redirect_to, hit.title)
+            return SearchHit(
+                page_id=hit.redirect_to,
+                title=target_title,
+                namespace=hit.namespace,
+                is_redirect=False,
+                redirect_to=None,
+                score=hit.score,
+            )
+        return hit
+
+
+@functools.lru_cache(maxsize=1)
+def get_title_search_index() -> TitleSearchIndex:
+    """Process-wide TitleSearchIndex, (re)built on first use if missing or stale."""
+
+    title_index = get_title_index()
+    if not is_search_index_fresh():
+        build_title_search_index()
+    return TitleSearchIndex(title_index)
+
+
+def suggest_titles(title: str, *, namespace: int = 0, limit: int = 5) -> list[str]:
+    """Closest indexed titles for an unresolved title (for error messages)."""
+
+    try:
+        index = get_title_search_index()
+    except FileNotFoundError:
+        return []
+    hits = index.search(title, limit=limit, namespace=namespace)
+    if not hits:
+        # Fall back to the longest word-boundary prefix that still matches something.
+        parts = normalize_title(title).split("_")
+        while len(parts) > 1 and not hits:
+            parts.pop()
+            hits = index.search("_".join(parts), limit=limit, namespace=namespace)
+    return [h.title for h in hits]
+
+
+def describe_missing_titles(missing: list[str], *, namespace: int = 0) -> str:
+    """Error text listing unresolved titles with autocomplete suggestions."""
+
+    lines = [f"Could not resolve titles to page_id (exact match failed): {missing}"]
+    for title in missing:
+        suggestions = suggest_titles(title, namespace=namespace)
+        if suggestions:
+            lines.append(f"  {title!r}: did you mean {', '.join(repr(s) for s in suggestions)}?")
+    return "\n".join(lines)
@@ -1,15 +1,20 @@
 #!/usr/bin/env python3
-"""Render a human-facing Markdown report + charts from analysis TSV artifacts.
+"""Render a human-facing Markdown report + charts from analysis results.
 
-Inputs (expected in data/wikipedia/processed/analysis/):
-- branch_trunkiness_dashboard_n=5_*.tsv
-- dominance_collapse_dashboard_n=5_*.tsv
-- dominant_upstream_chain_n=5_from=*.tsv (optional; a few will be plotted if present)
+Inputs (N=5 results in the results store, nlink_lib/results_store.py):
+- branch_trunkiness_dashboard (--tag if stored, else the latest)
+- dominance_collapse_dashboard (a tag containing --tag, else the latest)
+- dominant_upstream_chain (optional; a few will be plotted if present)
 
 Outputs (committed to repo):
 - n-link-analysis/report/overview.md
 - n-link-analysis/report/assets/*.png
 
+With --scaling PATH (a run-scaling-study.py table) only the scaling report is
+rendered instead: n-link-analysis/report/scaling.md and
+assets/scaling_{tag}_*.png (time vs size, parallel efficiency, peak memory),
+with the fits from the matching scaling_fits_{tag}.tsv when present.
+
 Rationale: keep `data/**/analysis/**` gitignored, but publish lightweight, human-facing
 summaries inside the repo.
 """
@@ -23,6 +28,8 @@ from pathlib import Path
 import matplotlib.pyplot as plt
 import pandas as pd
 
+from nlink_lib.results_store import UNTAGGED, catalog, latest_tag, read_result
+
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 ANALYSIS_DIR = REPO_ROOT / "data" / "wikipedia" / "processed" / "analysis"
@@ -78,8 +85,17 @@ def _save_fig(path: Path) -> None:
     plt.close()
 
 
-def plot_trunkiness(trunk_path: Path) -> list[Path]:
-    df = _read_tsv(trunk_path)
+def _store_ref(metric: str, tag: str) -> str:
+    return f"results store: {metric}, n=5, tag={tag}"
+
+
+def _chain_stem(cycle_id: str, tag: str) -> str:
+    """File-style name of a stored chase (as chase-dominant-upstream.py names its TSV)."""
+    suffix = "" if tag == UNTAGGED else f"_{tag}"
+    return f"dominant_upstream_chain_n=5_from={cycle_id}{suffix}"
+
+
+def plot_trunkiness(df: pd.DataFrame) -> list[Path]:
     df = df.sort_values(["top1_share_total", "total_basin_nodes"], ascending=[False, False]).copy()
 
     labels = [_short_cycle(x) for x in df["cycle_key"].tolist()]
@@ -107,8 +123,8 @@ def plot_trunkiness(trunk_path: Path) -> list[Path]:
     return [out1, out2]
 
 
-def plot_collapse(collapse_path: Path) -> list[Path]:
-    df = _read_tsv(collapse_path)
+def plot_collapse(df: pd.DataFrame) -> list[Path]:
+    df = df.copy()
 
     # Normalize hop column (empty -> NaN)
     hop_col = "first_below_threshold_hop"
@@ -133,15 +149,13 @@ def plot_collapse(collapse_path: Path) -> list[Path]:
     return [out]
 
 
-def plot_chase_series(chain_path: Path) -> list[Path]:
-    df = _read_tsv(chain_path)
-
+def plot_chase_series(stem: str, df: pd.DataFrame) -> list[Path]:
     share_col = "dominant_share_of_upstream"
     basin_col = "basin_total_including_seed"
     if share_col not in df.columns or basin_col not in df.columns:
         return []
 
-    title = chain_path.stem.replace("dominant_upstream_chain_", "").replace("_", " ")
+    title = stem.replace("dominant_upstream_chain_", "").replace("_", " ")
 
     plt.figure(figsize=(7.2, 4.6))
     plt.plot(df["hop"], df[share_col].astype(float), marker="o", linewidth=1)
@@ -149,7 +163,7 @@ def plot_chase_series(chain_path: Path) -> list[Path]:
     plt.xlabel("Hop")
     plt.ylabel("Dominant share")
     plt.title(f"Dominant share vs hop\n{title}")
-    out1 = ASSETS_DIR / f"chase_{chain_path.stem}_share.png"
+    out1 = ASSETS_DIR / f"chase_{stem}_share.png"
     _save_fig(out1)
 
     plt.figure(figsize=(7.2, 4.6))
@@ -158,23 +172,22 @@ def plot_chase_series(chain_path: Path) -> list[Path]:
     plt.xlabel("Hop")
     plt.ylabel("Basin size (log)")
     plt.title(f"Basin size vs hop\n{title}")
-    out2 = ASSETS_DIR / f"chase_{chain_path.stem}_basin.png"
+    out2 = ASSETS_DIR / f"chase_{stem}_basin.png"
     _save_fig(out2)
 
     return [out1, out2]
 
 
-def plot_chase_overlay_share(chain_paths: list[Path]) -> Path | None:
+def plot_chase_overlay_share(chains: dict[str, pd.DataFrame]) -> Path | None:
     """Overlay dominant share vs hop for multiple chase outputs."""
-    if not chain_paths:
+    if not chains:
         return None
 
     share_col = "dominant_share_of_upstream"
 
     plt.figure(figsize=(7.6, 4.8))
     plotted = 0
-    for p in chain_paths:
-        df = _read_tsv(p)
+    for stem, df in chains.items():
         if share_col not in df.columns or "hop" not in df.columns:
             continue
         # Legend label: prefer the first seed title.
@@ -182,7 +195,7 @@ def plot_chase_overlay_share(chain_paths: list[Path]) -> Path | None:
         if "seed_title" in df.columns and not df.empty:
             label = str(df.iloc[0]["seed_title"])
         if not label:
-            label = p.stem.replace("dominant_upstream_chain_n=", "")
+            label = stem.replace("dominant_upstream_chain_n=", "")
 
         plt.plot(
             df["hop"].astype(int),
@@ -209,6 +222,119 @@ def plot_chase_overlay_share(chain_paths: list[Path]) -> Path | None:
     return out
 
 
+def _scaling_tag(study_path: Path) -> str:
+    return study_path.stem.removeprefix("scaling_study_")
+
+
+def plot_scaling(study_path: Path) -> list[Path]:
+    df = pd.read_parquet(study_path)
+    df = df[df["status"] == "ok"]
+    tag = _scaling_tag(study_path)
+    outs: list[Path] = []
+
+    single = df[df["workers"] == 1].sort_values("nlink_rows")
+    plt.figure(figsize=(7.2, 4.8))
+    for stage, g in single.groupby("stage"):
+        plt.plot(g["nlink_rows"].astype(float), g["wall_s"].astype(float), marker="o", label=stage)
+    plt.xscale("log")
+    plt.yscale("log")
+    plt.xlabel("nlink_sequences rows (log)")
+    plt.ylabel("Wall time, 1 worker (s, log)")
+    plt.title("Stage time vs graph size")
+    plt.legend(fontsize=7)
+    out = ASSETS_DIR / f"scaling_{tag}_time_vs_size.png"
+    _save_fig(out)
+    outs.append(out)
+
+    parallel = df[df["parallel"].astype(bool)]
+    if not parallel.empty:
+        largest = parallel.groupby("stage")["pages"].transform("max")
+        parallel = parallel[parallel["pages"] == largest].sort_values("workers")
+        plt.figure(figsize=(6.2, 4.8))
+        for stage, g in parallel.groupby("stage"):
+            plt.plot(g["workers"].astype(int), g["efficiency"].astype(float), marker="o", label=f"{stage} ({int(g['pages'].iloc[0]):,} pages)")
+        plt.xscale("log", base=2)
+        plt.ylim(0.0, 1.1)
+        plt.axhline(1.0, color="grey", linewidth=0.8, linestyle="--")
+        plt.xlabel("Workers (log2)")
+        plt.ylabel("Parallel efficiency (speedup / workers)")
+        plt.title("Parallel efficiency at the largest size")
+        plt.legend(fontsize=7)
+        out = ASSETS_DIR / f"scaling_{tag}_efficiency.png"
+        _save_fig(out)
+        outs.append(out)
+
+    plt.figure(figsize=(7.2, 4.8))
+    for stage, g in single.groupby("stage"):
+        mem = g["peak_rss_bytes"].astype(float) + g["worker_peak_rss_bytes"].fillna(0).astype(float)
+        plt.plot(g["nlink_rows"].astype(float), mem / 1024**3, marker="o", label=stage)
+    plt.xscale("log")
+    plt.yscale("log")
+    plt.xlabel("nlink_sequences rows (log)")
+    plt.ylabel("Peak RSS, 1 worker (GB, log)")
+    plt.title("Stage memory vs graph size")
+    plt.legend(fontsize=7)
+    out = ASSETS_DIR / f"scaling_{tag}_memory_vs_size.png"
+    _save_fig(out)
+    outs.append(out)
+
+    return outs
+
+
+def render_scaling_report(study_path: Path) -> Path:
+    tag = _scaling_tag(study_path)
+    figs = plot_scaling(study_path)
+    df = pd.read_parquet(study_path)
+
+    view = df[df["status"] == "ok"][["stage", "pages", "workers", "wall_s", "peak_rss_bytes", "throughput", "unit", "efficiency"]].copy()
+    view["peak_rss_mb"] = (view.pop("peak_rss_bytes").astype(float) / 1024**2).map(lambda x: f"{x:,.0f}")
+    view["throughput"] = view["throughput"].map(lambda x: f"{float(x):,.0f}")
+    view["efficiency"] = view["efficiency"].map(lambda x: "" if pd.isna(x) else f"{float(x):.2f}")
+
+    fits_section = "(no fits: run the study at two or more sizes)"
+    fits_file = study_path.with_name(f"scaling_fits_{tag}.tsv")
+    if fits_file.exists() and fits_file.stat().st_size > 1:
+        fits = _read_tsv(fits_file)
+        fits = fits[fits["workers"] == 1]
+        wall = fits[fits["metric"] == "wall_s"].set_index(["stage", "target"])
+        mem = fits[fits["metric"] == "peak_rss_bytes"].set_index(["stage", "target"])
+        table = pd.DataFrame({
+            "target_rows": wall["target_rows"].map(lambda x: f"{int(x):,}"),
+            "time_exponent": wall["exponent"].map(lambda x: f"{float(x):.2f}"),
+            "predicted_min": (wall["predicted"] / 60).map(lambda x: f"{float(x):,.1f}"),
+            "memory_exponent": mem["exponent"].map(lambda x: f"{float(x):.2f}"),
+            "predicted_gb": (mem["predicted"] / 1024**3).map(lambda x: f"{float(x):,.1f}"),
+        }).reset_index()
+        fits_section = _md_table(table, max_rows=200)
+
+    chart_lines = "\n".join(f"- ![chart](assets/{p.name})" for p in figs)
+    md = "\n".join([
+        "# Scaling Study — Throughput and Memory vs Graph Size and Workers",
+        "",
+        f"Study table: `{study_path.name}` (tag `{tag}`), generated by `run-scaling-study.py`.",
+        "",
+        "## Charts",
+        "",
+        chart_lines,
+        "",
+        "## Extrapolation (1 worker, power-law fit over nlink_sequences rows)",
+        "",
+        fits_section,
+        "",
+        "## Measurements",
+        "",
+        _md_table(view, max_rows=500),
+        "",
+        "## How to Regenerate",
+        "",
+        f"- `python n-link-analysis/scripts/render-human-report.py --scaling {study_path.name}`",
+        "",
+    ])
+    report_path = REPORT_DIR / "scaling.md"
+    report_path.write_text(md, encoding="utf-8")
+    return report_path
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument(
@@ -216,50 +342,68 @@ def main() -> int:
         default="bootstrap_2025-12-30",
         help="Which dashboard tag to prefer when multiple exist.",
     )
+    parser.add_argument(
+        "--scaling",
+        type=Path,
+        default=None,
+        help="Render report/scaling.md from this run-scaling-study.py table (relative paths: analysis dir).",
+    )
     args = parser.parse_args()
 
     REPORT_DIR.mkdir(parents=True, exist_ok=True)
     ASSETS_DIR.mkdir(parents=True, exist_ok=True)
 
-    trunk_candidates = sorted(ANALYSIS_DIR.glob(f"branch_trunkiness_dashboard_n=5_{args.tag}.tsv"))
-    if not trunk_candidates:
-        trunk_candidates = sorted(ANALYSIS_DIR.glob("branch_trunkiness_dashboard_n=5_*.tsv"))
-    if not trunk_candidates:
-        raise SystemExit(f"Missing trunkiness dashboard TSV in: {ANALYSIS_DIR}")
-    trunk_path = trunk_candidates[-1]
-
-    collapse_candidates = sorted(ANALYSIS_DIR.glob(f"dominance_collapse_dashboard_n=5_*{args.tag}*.tsv"))
-    if not collapse_candidates:
-        collapse_candidates = sorted(ANALYSIS_DIR.glob("dominance_collapse_dashboard_n=5_*.tsv"))
-    collapse_path = collapse_candidates[-1] if collapse_candidates else None
-
-    trunk_figs = plot_trunkiness(trunk_path)
-    collapse_figs = plot_collapse(collapse_path) if collapse_path else []
-
-    # Prefer a few known chains if present.
-    preferred_chain_names = [
-        "dominant_upstream_chain_n=5_from=Massachusetts_bootstrap_2025-12-30.tsv",
-        "dominant_upstream_chain_n=5_from=Animal_leasttrunk_bootstrap_2025-12-30.tsv",
-        "dominant_upstream_chain_n=5_from=Eastern_United_States_control_bootstrap_2025-12-30.tsv",
+    if args.scaling is not None:
+        study_path = args.scaling if args.scaling.is_absolute() else ANALYSIS_DIR / args.scaling
+        if not study_path.exists():
+            raise SystemExit(f"Missing scaling study table: {study_path}")
+        report_path = render_scaling_report(study_path)
+        print(f"Wrote report: {report_path}")
+        print(f"Wrote assets: {ASSETS_DIR}")
+        return 0
+
+    stored = catalog()
+    stored = stored[stored["n"] == "5"]
+
+    trunk_tags = set(stored.loc[stored["metric"] == "branch_trunkiness_dashboard", "tag"])
+    trunk_tag = args.tag if args.tag in trunk_tags else latest_tag("branch_trunkiness_dashboard", n=5)
+    if trunk_tag is None:
+        raise SystemExit("Missing branch_trunkiness_dashboard for N=5 in the results store")
+    trunk_df = read_result("branch_trunkiness_dashboard", n=5, tag=trunk_tag)
+
+    collapse_tags = sorted(t for t in stored.loc[stored["metric"] == "dominance_collapse_dashboard", "tag"] if args.tag in t)
+    collapse_tag = collapse_tags[-1] if collapse_tags else latest_tag("dominance_collapse_dashboard", n=5)
+    collapse_df = read_result("dominance_collapse_dashboard", n=5, tag=collapse_tag) if collapse_tag else None
+
+    trunk_figs = plot_trunkiness(trunk_df)
+    collapse_figs = plot_collapse(collapse_df) if collapse_df is not None else []
+
+    # Prefer a few known chains (seed, tag) if present.
+    preferred_chains = [
+        ("Massachusetts", "bootstrap_2025-12-30"),
+        ("Animal", "leasttrunk_bootstrap_2025-12-30"),
+        ("Eastern_United_States", "control_bootstrap_2025-12-30"),
     ]
-    chain_paths: list[Path] = []
-    for name in preferred_chain_names:
-        p = ANALYSIS_DIR / name
-        if p.exists():
-            chain_paths.append(p)
+    stored_chains = stored[stored["metric"] == "dominant_upstream_chain"]
+    available = list(zip(stored_chains["cycle_id"], stored_chains["tag"]))
+    chain_keys = [key for key in preferred_chains if key in set(available)]
 
     # If none of the preferred are present, plot up to 3 arbitrary chains.
-    if not chain_paths:
-        chain_paths = sorted(ANALYSIS_DIR.glob("dominant_upstream_chain_n=5_from=*.tsv"))[:3]
+    if not chain_keys:
+        chain_keys = sorted(available, key=lambda key: _chain_stem(*key))[:3]
+
+    chains = {
+        _chain_stem(cycle_id, tag): read_result("dominant_upstream_chain", n=5, tag=tag, cycle_id=cycle_id)
+        for cycle_id, tag in chain_keys
+    }
 
     chase_figs: list[Path] = []
-    for p in chain_paths:
-        chase_figs.extend(plot_chase_series(p))
+    for stem, df in chains.items():
+        chase_figs.extend(plot_chase_series(stem, df))
 
-    overlay_share = plot_chase_overlay_share(chain_paths)
+    overlay_share = plot_chase_overlay_share(chains)
 
     # Build a compact table preview.
-    trunk_df = _read_tsv(trunk_path)
     trunk_preview = trunk_df[[
         "cycle_key",
         "total_basin_nodes",
@@ -273,8 +417,7 @@ def main() -> int:
     trunk_preview = trunk_preview.sort_values(["top1_share_total", "total_basin_nodes"], ascending=[False, False])
 
     collapse_section = ""
-    if collapse_path:
-        collapse_df = _read_tsv(collapse_path)
+    if collapse_df is not None:
         # Keep it small and human readable.
         cols = ["seed_title", "first_below_threshold_hop", "min_share", "stop_reason", "stop_at_title"]
         cols = [c for c in cols if c in collapse_df.columns]
@@ -288,7 +431,7 @@ def main() -> int:
             ## Dominance Collapse (Threshold Run)
 
             Collapse dashboard input:
-            - `{collapse_path.relative_to(REPO_ROOT).as_posix()}`
+            - `{_store_ref("dominance_collapse_dashboard", collapse_tag)}`
 
             Preview (sorted by min share):
 
@@ -296,7 +439,10 @@ def main() -> int:
             """
         ).strip()
 
-    # Write report.
+    # Write report. (Joined outside the f-string: backslashes in f-string
+    # expressions are a SyntaxError before Python 3.12.)
+    chain_list = "\n".join([f"- {stem}" for stem in chains])
+    chase_chart_list = "\n".join([f"- ![chart](assets/{p.name})" for p in chase_figs])
     report_path = REPORT_DIR / "overview.md"
     md = textwrap.dedent(
         f"""
@@ -306,7 +452,7 @@ def main() -> int:
         **Scope**: Wikipedia fixed-$N$ rule with $N=5$ (the induced functional graph $f_5$).  
         **Goal**: Summarize what we’ve empirically learned about basin sizes, branch (“watershed”) structure, and dominant-upstream trunks.
 
-        This report is generated from gitignored analysis artifacts under `data/wikipedia/processed/analysis/`.
+        This report is generated from the gitignored results store under `data/wikipedia/processed/analysis/results/`.
 
         ## Key Takeaways
 
@@ -318,7 +464,7 @@ def main() -> int:
         ## Trunkiness Dashboard
 
         Dashboard input:
-        - `{trunk_path.relative_to(REPO_ROOT).as_posix()}`
+        - `{_store_ref("branch_trunkiness_dashboard", trunk_tag)}`
 
         **Charts**:
         - ![Top-1 share](assets/{trunk_figs[0].name})
@@ -332,13 +478,13 @@ def main() -> int:
 
         ## Example Chases (Dominant Share vs Hop)
 
-        These are pulled from any available `dominant_upstream_chain_n=5_from=*.tsv` artifacts.
+        These are pulled from any available `dominant_upstream_chain` results (N=5).
 
-        {"\n".join([f"- {p.name}" for p in chain_paths])}
+        {chain_list}
 
         **Charts** (share + basin size per chase):
 
-        {"\n".join([f"- ![chart](assets/{p.name})" for p in chase_figs])}
+        {chase_chart_list}
 
         **Overlay comparison**:
 
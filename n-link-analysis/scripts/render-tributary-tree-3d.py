@@ -30,14 +30,17 @@ import argparse
 import json
 import math
 import re
-import time
 from dataclasses import dataclass
 from pathlib import Path
 
 import duckdb
 import networkx as nx
 import plotly.graph_objects as go
-import pyarrow as pa
+
+from nlink_lib.edges_db import connect_edges_db, edges_db_path
+from nlink_lib.rules import add_rule_argument, rule_from_args
+from nlink_lib.title_index import resolve_ids_to_titles, resolve_titles_to_ids
+from nlink_lib.title_search import describe_missing_titles
 
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
@@ -55,94 +58,6 @@ def _slug(s: str) -> str:
     return s[:120] if len(s) > 120 else s
 
 
-def _resolve_titles_to_ids(titles: list[str], *, namespace: int, allow_redirects: bool) -> dict[str, int]:
-    if not titles:
-        return {}
-    if not PAGES_PATH.exists():
-        raise FileNotFoundError(f"Missing: {PAGES_PATH}")
-
-    title_tbl = pa.table({"title": pa.array(titles, type=pa.string())})
-    con = duckdb.connect()
-    con.register("wanted_titles", title_tbl)
-
-    redirect_clause = "" if allow_redirects else "AND p.is_redirect = FALSE"
-    rows = con.execute(
-        f"""
-        SELECT w.title, min(p.page_id) AS page_id
-        FROM wanted_titles w
-        JOIN read_parquet('{PAGES_PATH.as_posix()}') p
-          ON p.title = w.title
-        WHERE p.namespace = {int(namespace)}
-          {redirect_clause}
-        GROUP BY w.title
-        """.strip()
-    ).fetchall()
-    con.close()
-    return {str(t): int(pid) for t, pid in rows}
-
-
-def _resolve_ids_to_titles(page_ids: list[int]) -> dict[int, str]:
-    if not page_ids:
-        return {}
-    if not PAGES_PATH.exists():
-        return {}
-
-    unique_ids = sorted(set(int(x) for x in page_ids))
-    id_tbl = pa.table({"page_id": pa.array(unique_ids, type=pa.int64())})
-
-    con = duckdb.connect()
-    con.register("wanted_ids", id_tbl)
-    rows = con.execute(
-        f"""
-        SELECT p.page_id, p.title
-        FROM read_parquet('{PAGES_PATH.as_posix()}') p
-        JOIN wanted_ids w USING (page_id)
-        """.strip()
-    ).fetchall()
-    con.close()
-    return {int(pid): str(title) for pid, title in rows}
-
-
-def _ensure_edges_table(con: duckdb.DuckDBPyConnection, *, n: int) -> None:
-    row = con.execute(
-        """
-        SELECT COUNT(*)
-        FROM information_schema.tables
-        WHERE table_schema = 'main' AND table_name = 'edges'
-        """.strip()
-    ).fetchone()
-    exists = int(row[0]) if row is not None and row[0] is not None else 0
-    if exists:
-        return
-
-    if not NLINK_PATH.exists():
-        raise FileNotFoundError(f"Missing: {NLINK_PATH}")
-
-    print(f"Materializing edges table for N={n} (one-time cost)...")
-    t0 = time.time()
-
-    con.execute(
-        f"""
-        CREATE TABLE edges AS
-        SELECT
-            page_id::BIGINT AS src_page_id,
-            list_extract(link_sequence, {int(n)})::BIGINT AS dst_page_id
-        FROM read_parquet('{NLINK_PATH.as_posix()}')
-        WHERE list_extract(link_sequence, {int(n)}) IS NOT NULL
-        """.strip()
-    )
-
-    try:
-        con.execute("CREATE INDEX edges_dst_idx ON edges(dst_page_id)")
-    except Exception:
-        pass
-
-    dt = time.time() - t0
-    row = con.execute("SELECT COUNT(*) FROM edges").fetchone()
-    n_edges = int(row[0]) if row is not None and row[0] is not None else 0
-    print(f"Edges table ready: {n_edges:,} edges in {dt:.1f}s")
-
-
 @dataclass(frozen=True)
 class BranchRow:
     entry_id: int
@@ -252,10 +167,10 @@ def _build_tributary_tree(
 ) -> tuple[nx.DiGraph, dict[int, str]]:
     """Build a directed tributary tree graph (entry -> target)."""
 
-    title_to_id = _resolve_titles_to_ids(root_cycle_titles, namespace=namespace, allow_redirects=allow_redirects)
+    title_to_id = resolve_titles_to_ids(root_cycle_titles, namespace=namespace, allow_redirects=allow_redirects)
     missing = [t for t in root_cycle_titles if t not in title_to_id]
     if missing:
-        raise SystemExit(f"Could not resolve cycle titles (exact match failed): {missing}")
+        raise SystemExit(describe_missing_titles(missing, namespace=namespace))
 
     root_ids = [int(title_to_id[t]) for t in root_cycle_titles]
 
@@ -293,7 +208,7 @@ def _build_tributary_tree(
 
             # Resolve titles for entries + targets for hover.
             ids_to_resolve = [*target_ids, *[r.entry_id for r in top_entries], *[r.enters_target_id for r in top_entries]]
-            title_cache.update(_resolve_ids_to_titles([int(x) for x in ids_to_resolve]))
+            title_cache.update(resolve_ids_to_titles([int(x) for x in ids_to_resolve]))
 
             denom = max(1, total_seen - len(target_ids))
             for r in top_entries:
@@ -320,7 +235,7 @@ def _build_tributary_tree(
             break
 
     # Ensure titles exist for all nodes.
-    title_cache.update(_resolve_ids_to_titles([int(nid) for nid in G.nodes]))
+    title_cache.update(resolve_ids_to_titles([int(nid) for nid in G.nodes]))
     return G, title_cache
 
 
@@ -413,6 +328,7 @@ def _graph_to_plotly_3d(G: nx.DiGraph, titles: dict[int, str]) -> go.Figure:
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument("--n", type=int, default=5)
+    add_rule_argument(parser)
     parser.add_argument(
         "--cycle-title",
         action="append",
@@ -439,21 +355,21 @@ def main() -> int:
 
     if args.n <= 0:
         raise SystemExit("--n must be >= 1")
+    rule = rule_from_args(args)
 
     REPORT_ASSETS_DIR.mkdir(parents=True, exist_ok=True)
 
     out_path = Path(args.out) if args.out else (
         REPORT_ASSETS_DIR
         / (
-            f"tributary_tree_3d_n={int(args.n)}_cycle={'__'.join(_slug(t) for t in args.cycle_title)}"
+            f"tributary_tree_3d_{rule.key}_cycle={'__'.join(_slug(t) for t in args.cycle_title)}"
             f"_k={int(args.top_k)}_levels={int(args.max_levels)}_depth={int(args.max_depth)}.html"
         )
     )
 
-    db_path = ANALYSIS_DIR / f"edges_n={int(args.n)}.duckdb"
+    db_path = edges_db_path()
     print(f"Using edges DB: {db_path}")
-    con = duckdb.connect(str(db_path))
-    _ensure_edges_table(con, n=int(args.n))
+    con = connect_edges_db(rule)
 
     print("Building tributary tree...")
     G, titles = _build_tributary_tree(
@@ -18,6 +18,17 @@ Options:
     --skip-branches: Skip branch analysis (if already done)
     --skip-dashboards: Skip dashboard generation (if already done)
     --skip-report: Skip report generation (if already done)
+    --jobs J: Map / analyze J cycles in parallel against the shared edges DB
+        (default: min(cores, cycles, available RAM / per-cycle budget))
+    --ci-halfwidth PP: Sample adaptively until frequent-cycle shares are within ±PP
+        percentage points instead of a fixed 500 / 5000 traces
+    --force: Re-run every stage (default: skip stages whose script, arguments and
+        input files are unchanged since their last successful run)
+
+The phases are stages of an in-process DAG (nlink_lib/pipeline.py): scripts run
+inside this interpreter, independent stages run in parallel with --jobs > 1,
+and unchanged stages are skipped, so a re-run after a small change takes
+seconds.
 
 Output:
     All results written to data/wikipedia/processed/analysis/
@@ -31,15 +42,20 @@ Expected runtime (full):
 from __future__ import annotations
 
 import argparse
-import subprocess
-import sys
 from datetime import datetime
 from pathlib import Path
 
+from nlink_lib.cycle_pool import default_jobs
+from nlink_lib.edges_db import DEFAULT_MAX_N, EDGES_STORE_DIR, edges_count
+from nlink_lib.paths import NLINK_PATH, PAGES_PATH, REDIRECTS_PATH
+from nlink_lib.pipeline import Stage, run_pipeline, stage, summarize
+from nlink_lib.profiling import PROFILE_MODES
+from nlink_lib.title_index import INDEX_DIR
+
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
-SCRIPTS_DIR = REPO_ROOT / "n-link-analysis" / "scripts"
 ANALYSIS_DIR = REPO_ROOT / "data" / "wikipedia" / "processed" / "analysis"
+REPORT_DIR = REPO_ROOT / "n-link-analysis" / "report"
 
 
 # Main finding: These cycles from the original investigation
@@ -60,24 +76,6 @@ ADDITIONAL_CYCLES = [
 ]
 
 
-def run_command(cmd: list[str], description: str, *, check: bool = True) -> subprocess.CompletedProcess:
-    """Run a command and print status."""
-    print(f"\n{'='*80}")
-    print(f"Running: {description}")
-    print(f"Command: {' '.join(cmd)}")
-    print(f"{'='*80}\n")
-
-    result = subprocess.run(cmd, cwd=REPO_ROOT, check=False)
-
-    if check and result.returncode != 0:
-        print(f"\n✗ FAILED: {description}")
-        print(f"  Exit code: {result.returncode}")
-        sys.exit(1)
-
-    print(f"\n✓ Completed: {description}\n")
-    return result
-
-
 def main() -> int:
     parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
     parser.add_argument("--quick", action="store_true", help="Quick mode with reduced samples")
@@ -88,6 +86,25 @@ def main() -> int:
     parser.add_argument("--skip-branches", action="store_true", help="Skip branch analysis phase")
     parser.add_argument("--skip-dashboards", action="store_true", help="Skip dashboard generation phase")
     parser.add_argument("--skip-report", action="store_true", help="Skip report generation phase")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Cycles to process in parallel (default: min(cores, cycles, available RAM / per-cycle budget))",
+    )
+    parser.add_argument(
+        "--ci-halfwidth",
+        type=float,
+        default=None,
+        help="Adaptive sampling target in percentage points (replaces the fixed 500 / 5000 sample sizes)",
+    )
+    parser.add_argument("--force", action="store_true", help="Re-run every stage even if unchanged")
+    parser.add_argument(
+        "--profile",
+        choices=PROFILE_MODES,
+        default=None,
+        help="Also capture a cProfile (cpu) or tracemalloc (memory) dump per stage",
+    )
     args = parser.parse_args()
 
     # Generate tag
@@ -106,145 +123,181 @@ def main() -> int:
     # Ensure analysis directory exists
     ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
 
+    edges_manifest = EDGES_STORE_DIR / "manifest.json"
+    title_manifest = INDEX_DIR / "manifest.json"
+    cycles = MAIN_CYCLES if args.quick else MAIN_CYCLES + ADDITIONAL_CYCLES
+    stages: list[Stage] = [
+        # Shared indexes, built once before the per-cycle stages read them.
+        stage(
+            "title-index",
+            "build-title-index.py",
+            inputs=[PAGES_PATH, REDIRECTS_PATH],
+            outputs=[title_manifest],
+            description="Build the title index",
+        ),
+        stage(
+            "edges-store",
+            "build-edges-store.py",
+            ["--max-n", max(DEFAULT_MAX_N, n)],
+            inputs=[NLINK_PATH],
+            outputs=[edges_manifest],
+            description="Materialize the shared multi-N edges store",
+        ),
+    ]
+    indexes = ["title-index", "edges-store"]
+
     # Phase 1: Sampling (Terminal/Cycle Statistics)
     if not args.skip_sampling:
-        print("\n\n" + "="*80)
-        print("PHASE 1: SAMPLING - Identify frequent cycles")
-        print("="*80)
-
-        if args.quick:
+        if args.ci_halfwidth is not None:
+            # Adaptive: exactly as many samples as the requested precision needs
+            sample_args = ["--ci-halfwidth", args.ci_halfwidth]
+            sample_out = ANALYSIS_DIR / f"sample_traces_n={n}_adaptive_seed0=0_{tag}.tsv"
+            sample_desc = f"Adaptive sampling (±{args.ci_halfwidth}%)"
+        elif args.quick:
             # Quick: 500 samples
-            run_command(
-                [
-                    "python", str(SCRIPTS_DIR / "sample-nlink-traces.py"),
-                    "--n", str(n),
-                    "--num", "500",
-                    "--seed0", "0",
-                    "--min-outdegree", "50",
-                    "--max-steps", "5000",
-                    "--top-cycles", "20",
-                    "--resolve-titles",
-                    "--out", str(ANALYSIS_DIR / f"sample_traces_n={n}_num=500_seed0=0_{tag}.tsv"),
-                ],
-                description="Quick sampling (500 traces)",
-            )
+            sample_args = ["--num", "500"]
+            sample_out = ANALYSIS_DIR / f"sample_traces_n={n}_num=500_seed0=0_{tag}.tsv"
+            sample_desc = "Quick sampling (500 traces)"
         else:
             # Full: 5000 samples (matches original investigation)
-            run_command(
-                [
-                    "python", str(SCRIPTS_DIR / "sample-nlink-traces.py"),
-                    "--n", str(n),
-                    "--num", "5000",
-                    "--seed0", "0",
-                    "--min-outdegree", "50",
-                    "--max-steps", "5000",
-                    "--top-cycles", "30",
-                    "--resolve-titles",
-                    "--out", str(ANALYSIS_DIR / f"sample_traces_n={n}_num=5000_seed0=0_{tag}.tsv"),
-                ],
-                description="Full sampling (5000 traces)",
-            )
+            sample_args = ["--num", "5000"]
+            sample_out = ANALYSIS_DIR / f"sample_traces_n={n}_num=5000_seed0=0_{tag}.tsv"
+            sample_desc = "Full sampling (5000 traces)"
+        stages.append(stage(
+            "sample-nlink-traces",
+            "sample-nlink-traces.py",
+            [
+                "--n", n,
+                *sample_args,
+                "--seed0", "0",
+                "--min-outdegree", "50",
+                "--max-steps", "5000",
+                "--top-cycles", "20" if args.quick else "30",
+                "--resolve-titles",
+                "--out", sample_out,
+            ],
+            inputs=[NLINK_PATH, title_manifest],
+            outputs=[sample_out],
+            after=indexes,
+            description=sample_desc,
+        ))
 
     # Phase 2: Basin Mapping
     if not args.skip_basins:
-        print("\n\n" + "="*80)
-        print("PHASE 2: BASIN MAPPING - Compute basin sizes via reverse BFS")
-        print("="*80)
-
-        cycles_to_map = MAIN_CYCLES
-        if not args.quick:
-            cycles_to_map = MAIN_CYCLES + ADDITIONAL_CYCLES
-
-        for cycle_a, cycle_b in cycles_to_map:
-            run_command(
+        for cycle_a, cycle_b in cycles:
+            prefix = f"basin_n={n}_cycle={cycle_a}__{cycle_b}_{tag}"
+            stages.append(stage(
+                f"map-basin-{cycle_a}__{cycle_b}",
+                "map-basin-from-cycle.py",
                 [
-                    "python", str(SCRIPTS_DIR / "map-basin-from-cycle.py"),
-                    "--n", str(n),
+                    "--n", n,
                     "--cycle-title", cycle_a,
                     "--cycle-title", cycle_b,
                     "--max-depth", "0",  # Unlimited depth
                     "--log-every", "25",
-                    "--out-prefix", f"basin_n={n}_cycle={cycle_a}__{cycle_b}_{tag}",
+                    "--out-prefix", prefix,
+                    "--tag", tag,
                 ],
+                inputs=[edges_manifest, title_manifest],
+                outputs=[ANALYSIS_DIR / f"{prefix}_layers.tsv"],
+                after=indexes,
                 description=f"Map basin for {cycle_a} ↔ {cycle_b}",
-            )
+            ))
 
     # Phase 3: Branch Analysis (Tributary Structure)
+    branch_keys = []
     if not args.skip_branches:
-        print("\n\n" + "="*80)
-        print("PHASE 3: BRANCH ANALYSIS - Quantify tributary structure")
-        print("="*80)
-
-        cycles_to_analyze = MAIN_CYCLES
-        if not args.quick:
-            cycles_to_analyze = MAIN_CYCLES + ADDITIONAL_CYCLES
-
-        for cycle_a, cycle_b in cycles_to_analyze:
+        for cycle_a, cycle_b in cycles:
             # Write membership only for largest basin in quick mode, all in full mode
             write_membership = "10" if (not args.quick or (cycle_a, cycle_b) == MAIN_CYCLES[0]) else "0"
-
-            run_command(
+            prefix = f"branches_n={n}_cycle={cycle_a}__{cycle_b}_{tag}"
+            branch_keys.append(f"branch-analysis-{cycle_a}__{cycle_b}")
+            stages.append(stage(
+                branch_keys[-1],
+                "branch-basin-analysis.py",
                 [
-                    "python", str(SCRIPTS_DIR / "branch-basin-analysis.py"),
-                    "--n", str(n),
+                    "--n", n,
                     "--cycle-title", cycle_a,
                     "--cycle-title", cycle_b,
                     "--max-depth", "0",  # Unlimited depth
                     "--log-every", "0",  # Quiet
                     "--top-k", "30",
                     "--write-membership-top-k", write_membership,
-                    "--out-prefix", f"branches_n={n}_cycle={cycle_a}__{cycle_b}_{tag}",
+                    "--out-prefix", prefix,
+                    "--tag", tag,
                 ],
+                inputs=[edges_manifest, title_manifest],
+                outputs=[ANALYSIS_DIR / f"{prefix}_branches_all.tsv", ANALYSIS_DIR / f"{prefix}_branches_topk.tsv"],
+                after=indexes,
                 description=f"Branch analysis for {cycle_a} ↔ {cycle_b}",
-            )
+            ))
 
     # Phase 4: Dashboards (Aggregation & Metrics)
+    dashboard_path = ANALYSIS_DIR / f"branch_trunkiness_dashboard_n={n}_{tag}.tsv"
+    collapse_tag = f"{tag}_seed=dominant_enters_cycle_title_thr=0.5"
+    report_after = []
     if not args.skip_dashboards:
-        print("\n\n" + "="*80)
-        print("PHASE 4: DASHBOARDS - Aggregate concentration metrics")
-        print("="*80)
-
         # Trunkiness dashboard
-        run_command(
-            [
-                "python", str(SCRIPTS_DIR / "compute-trunkiness-dashboard.py"),
-                "--tag", tag,
-            ],
+        stages.append(stage(
+            "compute-trunkiness-dashboard",
+            "compute-trunkiness-dashboard.py",
+            ["--tag", tag, "--n", n, "--analysis-dir", ANALYSIS_DIR],
+            inputs=[ANALYSIS_DIR / f"branches_n={n}_cycle=*_branches_*.tsv"],
+            outputs=[dashboard_path],
+            after=branch_keys,
             description="Compute trunkiness dashboard (Gini, HH, entropy)",
-        )
+        ))
 
-        # Collapse dashboard (batch chase)
-        dashboard_path = ANALYSIS_DIR / f"branch_trunkiness_dashboard_n={n}_{tag}.tsv"
-        if dashboard_path.exists():
-            run_command(
-                [
-                    "python", str(SCRIPTS_DIR / "batch-chase-collapse-metrics.py"),
-                    "--n", str(n),
-                    "--dashboard", str(dashboard_path),
-                    "--seed-from", "dominant_enters_cycle_title",
-                    "--max-hops", "50" if not args.quick else "30",
-                    "--max-depth", "0",
-                    "--dominance-threshold", "0.5",
-                    "--tag", f"{tag}_seed=dominant_enters_cycle_title_thr=0.5",
-                ],
-                description="Batch chase for dominance collapse metrics",
-            )
-        else:
-            print(f"⚠ Skipping collapse dashboard: {dashboard_path} not found")
+        # Collapse dashboard (batch chase); blocked if the dashboard stage fails
+        stages.append(stage(
+            "batch-chase-collapse-metrics",
+            "batch-chase-collapse-metrics.py",
+            [
+                "--n", n,
+                "--dashboard", dashboard_path,
+                "--seed-from", "dominant_enters_cycle_title",
+                "--max-hops", "50" if not args.quick else "30",
+                "--max-depth", "0",
+                "--dominance-threshold", "0.5",
+                "--tag", collapse_tag,
+            ],
+            inputs=[dashboard_path, edges_manifest, title_manifest],
+            outputs=[ANALYSIS_DIR / f"dominance_collapse_dashboard_n={n}_{collapse_tag}.tsv"],
+            after=["compute-trunkiness-dashboard", *indexes],
+            description="Batch chase for dominance collapse metrics",
+        ))
+        report_after = ["compute-trunkiness-dashboard", "batch-chase-collapse-metrics"]
 
     # Phase 5: Human Report
     if not args.skip_report:
-        print("\n\n" + "="*80)
-        print("PHASE 5: REPORT GENERATION - Create human-facing summary")
-        print("="*80)
-
-        run_command(
-            [
-                "python", str(SCRIPTS_DIR / "render-human-report.py"),
-                "--tag", tag,
+        stages.append(stage(
+            "render-human-report",
+            "render-human-report.py",
+            ["--tag", tag],
+            inputs=[
+                ANALYSIS_DIR / "branch_trunkiness_dashboard_n=5_*.tsv",
+                ANALYSIS_DIR / "dominance_collapse_dashboard_n=5_*.tsv",
+                ANALYSIS_DIR / "dominant_upstream_chain_n=5_from=*.tsv",
             ],
+            outputs=[REPORT_DIR / "overview.md"],
+            after=report_after,
             description="Generate human-facing report with charts",
-        )
+        ))
+
+    jobs = args.jobs or default_jobs(len(cycles), edges=edges_count(n))
+    print(f"Stages: {len(stages)} on {jobs} worker(s)")
+    results = run_pipeline(
+        stages,
+        jobs=jobs,
+        force=args.force,
+        log_dir=ANALYSIS_DIR / "logs" / f"reproduce_n={n}_{tag}" if jobs > 1 or args.profile else None,
+        run_info={"pipeline": "reproduce-main-findings", "tag": tag, "n": str(n), "quick": bool(args.quick)},
+        profile=args.profile,
+    )
+    print()
+    if summarize(results):
+        print("\n✗ REPRODUCTION FAILED")
+        return 1
 
     # Summary
     print("\n\n" + "="*80)
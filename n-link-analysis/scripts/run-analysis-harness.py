@@ -4,22 +4,43 @@
 This script orchestrates the complete analysis pipeline for a given N-link rule,
 running all scripts that require specific inputs with reasonable defaults.
 
+The pipeline is a DAG of stages (nlink_lib/pipeline.py) run inside this
+process: shared indexes are built once up front, per-cycle stages run in
+parallel with --jobs > 1, and stages whose script, arguments and input files
+are unchanged since their last successful run are skipped, so a re-run after
+a small change only repeats what it affects.
+
+With --n-range the per-N pipelines of a whole sweep form one graph: indexes
+are built once, the link store is mapped once in this process and shared by
+the forked workers, and stages of different N interleave under a CPU and
+memory budget (each BFS stage reserves its estimated peak memory). A table of
+per-N / per-stage state is printed periodically and kept in the log directory.
+
 Usage:
-    python run-analysis-harness.py --n 5 [--tag harness_2026-01-01] [--skip-existing]
+    python run-analysis-harness.py --n 5 [--tag harness_2026-01-01] [--jobs 4] [--force | --skip-existing]
+    python run-analysis-harness.py --n-range 3 10 --quick [--memory-budget-gb 48] [--progress-every 300]
 """
 
 from __future__ import annotations
 
 import argparse
-import subprocess
 import sys
 import time
 from pathlib import Path
 from datetime import date
 
+from nlink_lib.cycle_pool import default_jobs, job_memory_budget
+from nlink_lib.edges_db import DEFAULT_MAX_N, EDGES_STORE_DIR, edges_count
+from nlink_lib.link_store import STORE_DIR, get_link_store, is_link_store_fresh
+from nlink_lib.paths import NLINK_PATH, PAGES_PATH, REDIRECTS_PATH
+from nlink_lib.pipeline import Stage, run_pipeline, stage, summarize
+from nlink_lib.profiling import PROFILE_MODES, RUN_LOG_PATH
+from nlink_lib.reverse_index import REVERSE_DIR
+from nlink_lib.title_index import INDEX_DIR
+
 REPO_ROOT = Path(__file__).resolve().parents[2]
-SCRIPTS_DIR = REPO_ROOT / "n-link-analysis" / "scripts"
 ANALYSIS_DIR = REPO_ROOT / "data" / "wikipedia" / "processed" / "analysis"
+REPORT_DIR = REPO_ROOT / "n-link-analysis" / "report"
 
 # Known cycles from reproduce-main-findings.py
 KNOWN_CYCLES = [
@@ -34,276 +55,529 @@ KNOWN_CYCLES = [
     ("American_Revolutionary_War", "Eastern_United_States"),
 ]
 
-def run_script(script_name: str, args: list[str], *, description: str) -> bool:
-    """Run a script and return True if successful."""
-    print(f"\n{'='*80}")
-    print(f"Running: {script_name}")
-    print(f"Description: {description}")
-    print(f"Args: {' '.join(args)}")
-    print(f"{'='*80}")
-
-    script_path = SCRIPTS_DIR / script_name
-    cmd = [sys.executable, str(script_path)] + args
-
-    t0 = time.time()
-    try:
-        result = subprocess.run(cmd, check=True, capture_output=False)
-        dt = time.time() - t0
-        print(f"\n✓ SUCCESS ({dt:.1f}s)")
-        return True
-    except subprocess.CalledProcessError as e:
-        dt = time.time() - t0
-        print(f"\n✗ FAILED ({dt:.1f}s): {e}")
-        return False
-    except Exception as e:
-        dt = time.time() - t0
-        print(f"\n✗ ERROR ({dt:.1f}s): {e}")
-        return False
-
-
-def main() -> None:
-    parser = argparse.ArgumentParser(
-        description="Run complete N-link analysis pipeline with sensible defaults",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-    )
-    parser.add_argument("--n", type=int, default=5, help="N for N-link rule (default: 5)")
-    parser.add_argument(
-        "--tag",
-        type=str,
-        default=f"harness_{date.today().isoformat()}",
-        help="Tag for output files",
-    )
-    parser.add_argument(
-        "--skip-existing",
-        action="store_true",
-        help="Skip scripts if output files already exist",
-    )
-    parser.add_argument(
-        "--quick",
-        action="store_true",
-        help="Quick mode with reduced samples (fewer cycles, smaller samples)",
-    )
-    parser.add_argument(
-        "--max-cycles",
-        type=int,
-        default=None,
-        help="Maximum number of cycles to analyze (default: all 9, or 6 in quick mode)",
-    )
-
-    args = parser.parse_args()
+# Shared indexes every later stage reads; built once before anything else.
+INDEX_STAGES = ("title-index", "link-index", "edges-store")
 
-    n = args.n
-    tag = args.tag
-    skip_existing = args.skip_existing
-    quick = args.quick
-
-    # Select cycles
-    if quick:
-        cycles = KNOWN_CYCLES[:6]  # Quick mode: first 6 cycles
-    else:
-        cycles = KNOWN_CYCLES  # Full mode: all 9 cycles
 
-    if args.max_cycles:
-        cycles = cycles[:args.max_cycles]
+def index_stages(max_n: int) -> list[Stage]:
+    """Validation and the shared indexes (once per run, whatever the N range)."""
 
-    ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
-
-    print(f"\n{'='*80}")
-    print(f"N-LINK ANALYSIS HARNESS")
-    print(f"{'='*80}")
-    print(f"N: {n}")
-    print(f"Tag: {tag}")
-    print(f"Cycles: {len(cycles)}")
-    print(f"Quick mode: {quick}")
-    print(f"Skip existing: {skip_existing}")
-    print(f"{'='*80}\n")
-
-    results = {}
+    stages: list[Stage] = []
 
     # ========================================================================
-    # TIER 0: Validation & Sampling
+    # TIER 0: Validation & shared indexes
     # ========================================================================
 
     # 1. Validate data dependencies
-    results["validate-data-dependencies"] = run_script(
+    stages.append(stage(
+        "validate-data-dependencies",
         "validate-data-dependencies.py",
-        [],
         description="Validate all required data files exist",
-    )
+        row="shared",
+        column="validate",
+    ))
+
+    # 2. Shared indexes (built lazily by the scripts otherwise, once per process)
+    stages.append(stage(
+        "title-index",
+        "build-title-index.py",
+        inputs=[PAGES_PATH, REDIRECTS_PATH],
+        outputs=[INDEX_DIR / "manifest.json"],
+        description="Build the title index",
+        row="shared",
+        column="indexes",
+    ))
+    stages.append(stage(
+        "link-index",
+        "build-link-index.py",
+        inputs=[NLINK_PATH],
+        outputs=[STORE_DIR / "manifest.json", REVERSE_DIR / "manifest.json"],
+        description="Build the CSR link store and reverse link index",
+        row="shared",
+        column="indexes",
+    ))
+    stages.append(stage(
+        "edges-store",
+        "build-edges-store.py",
+        ["--max-n", max(DEFAULT_MAX_N, max_n)],
+        inputs=[NLINK_PATH],
+        outputs=[EDGES_STORE_DIR / "manifest.json"],
+        description="Materialize the shared multi-N edges store",
+        row="shared",
+        column="indexes",
+    ))
+    return stages
+
+
+def n_stages(
+    n: int,
+    tag: str,
+    cycles: list[tuple[str, str]],
+    *,
+    quick: bool,
+    ci_halfwidth: float | None,
+) -> tuple[list[Stage], dict[str, list[str]]]:
+    """Per-N stages (keys prefixed ``n={N}:``) and their keys by kind for cross-N dependencies."""
+
+    stages: list[Stage] = []
+    keys: dict[str, list[str]] = {"basins": [], "branches": [], "chase": [], "dashboards": []}
+    row = f"N={n}"
+    # Peak memory of one reverse-BFS stage over f_N (0 edges known -> minimum budget).
+    bfs_memory = job_memory_budget(edges_count(n))
+    # Stages that resolve titles also depend on the title index.
+    title_index = INDEX_DIR / "manifest.json"
+
+    def add(key: str, script: str, args: list[object] = (), **kwargs) -> str:
+        stages.append(stage(f"n={n}:{key}", script, args, row=row, **kwargs))
+        return stages[-1].key
+
+    # ========================================================================
+    # Sampling
+    # ========================================================================
 
-    # 2. Sample traces to identify frequent cycles
-    sample_size = 100 if quick else 500
-    results["sample-nlink-traces"] = run_script(
+    # 3. Sample traces to identify frequent cycles
+    if ci_halfwidth is not None:
+        sample_args = ["--ci-halfwidth", ci_halfwidth]
+        sample_desc = f"adaptively to ±{ci_halfwidth}%"
+        sample_out = ANALYSIS_DIR / f"sample_traces_n={n}_adaptive_seed0=0_{tag}.tsv"
+    else:
+        sample_size = 100 if quick else 500
+        sample_args = ["--num", sample_size]
+        sample_desc = f"{sample_size} samples"
+        sample_out = ANALYSIS_DIR / f"sample_traces_n={n}_num={sample_size}_seed0=0_{tag}.tsv"
+    add(
+        "sample-nlink-traces",
         "sample-nlink-traces.py",
-        ["--n", str(n), "--num", str(sample_size), "--seed0", "0", "--resolve-titles"],
-        description=f"Sample {sample_size} random traces to identify frequent cycles",
+        ["--n", n, *sample_args, "--seed0", "0", "--resolve-titles", "--out", sample_out],
+        inputs=[NLINK_PATH, title_index],
+        outputs=[sample_out],
+        after=INDEX_STAGES,
+        description=f"Sample random traces ({sample_desc}) to identify frequent cycles",
+        column="sample",
     )
 
-    # 3. Trace a single path as sanity check
-    results["trace-nlink-path"] = run_script(
+    # 4. Trace a single path as sanity check (no declared outputs: always runs)
+    add(
+        "trace-nlink-path",
         "trace-nlink-path.py",
-        ["--n", str(n), "--seed", "42"],
+        ["--n", n, "--seed", "42"],
+        after=INDEX_STAGES,
         description="Trace single random path as sanity check",
+        column="trace",
     )
 
-    # 4. Path characteristics analysis
-    path_sample_size = 50 if quick else 200
-    results["analyze-path-characteristics"] = run_script(
+    # 5. Path characteristics analysis
+    if ci_halfwidth is None:
+        path_sample_size = 50 if quick else 200
+        sample_args = ["--num", path_sample_size]
+        sample_desc = f"{path_sample_size} samples"
+    add(
+        "analyze-path-characteristics",
         "analyze-path-characteristics.py",
-        ["--n", str(n), "--num", str(path_sample_size), "--tag", tag],
-        description=f"Analyze {path_sample_size} path characteristics (convergence, bottlenecks)",
+        ["--n", n, *sample_args, "--tag", tag],
+        inputs=[NLINK_PATH],
+        outputs=[ANALYSIS_DIR / f"path_characteristics_n={n}_{tag}_summary.tsv"],
+        after=INDEX_STAGES,
+        description=f"Analyze path characteristics ({sample_desc}; convergence, bottlenecks)",
+        column="paths",
     )
 
     # ========================================================================
     # TIER 1: Basin Construction & Branch Analysis (per cycle)
     # ========================================================================
 
-    for i, (title1, title2) in enumerate(cycles, 1):
+    # The four per-cycle stages only read the shared stores, so they are
+    # independent of each other and of every other cycle.
+    for title1, title2 in cycles:
         cycle_key = f"{title1}__{title2}"
-        print(f"\n{'#'*80}")
-        print(f"# CYCLE {i}/{len(cycles)}: {cycle_key}")
-        print(f"{'#'*80}\n")
 
-        # 5. Map basin from cycle
-        map_basin_key = f"map-basin-{cycle_key}"
-        results[map_basin_key] = run_script(
+        # 6. Map basin from cycle
+        basin_prefix = f"basin_n={n}_cycle={cycle_key}_{tag}"
+        keys["basins"].append(add(
+            f"map-basin-{cycle_key}",
             "map-basin-from-cycle.py",
             [
-                "--n", str(n),
+                "--n", n,
                 "--cycle-title", title1,
                 "--cycle-title", title2,
                 "--max-depth", "30" if quick else "0",
                 "--log-every", "5",
-                "--out-prefix", f"basin_n={n}_cycle={cycle_key}_{tag}",
+                "--out-prefix", basin_prefix,
+                "--tag", tag,
             ],
+            inputs=[EDGES_STORE_DIR / "manifest.json", title_index],
+            outputs=[ANALYSIS_DIR / f"{basin_prefix}_layers.tsv"],
+            after=INDEX_STAGES,
             description=f"Map complete basin for {cycle_key}",
-        )
-
-        # 6. Branch analysis
-        branch_key = f"branch-analysis-{cycle_key}"
-        results[branch_key] = run_script(
+            memory=bfs_memory,
+            column="basins",
+        ))
+
+        # 7. Branch analysis
+        branch_prefix = f"branches_n={n}_cycle={cycle_key}_{tag}"
+        keys["branches"].append(add(
+            f"branch-analysis-{cycle_key}",
             "branch-basin-analysis.py",
             [
-                "--n", str(n),
+                "--n", n,
                 "--cycle-title", title1,
                 "--cycle-title", title2,
                 "--max-depth", "0",
                 "--top-k", "50",
                 "--log-every", "10",
-                "--out-prefix", f"branches_n={n}_cycle={cycle_key}_{tag}",
+                "--out-prefix", branch_prefix,
+                "--tag", tag,
+            ],
+            inputs=[EDGES_STORE_DIR / "manifest.json", title_index],
+            outputs=[
+                ANALYSIS_DIR / f"{branch_prefix}_branches_all.tsv",
+                ANALYSIS_DIR / f"{branch_prefix}_branches_topk.tsv",
             ],
+            after=INDEX_STAGES,
             description=f"Quantify branch structure for {cycle_key}",
-        )
-
-        # 7. Chase dominant upstream
-        chase_key = f"chase-dominant-{cycle_key}"
-        results[chase_key] = run_script(
+            memory=bfs_memory,
+            column="branches",
+        ))
+
+        # 8. Chase dominant upstream
+        chase_out = ANALYSIS_DIR / f"dominant_upstream_chain_n={n}_from={title1}_{tag}.tsv"
+        keys["chase"].append(add(
+            f"chase-dominant-{cycle_key}",
             "chase-dominant-upstream.py",
             [
-                "--n", str(n),
+                "--n", n,
                 "--seed-title", title1,
                 "--max-hops", "20" if quick else "40",
                 "--dominance-threshold", "0.5",
+                "--out", chase_out,
+                "--tag", tag,
             ],
+            inputs=[EDGES_STORE_DIR / "manifest.json", title_index],
+            outputs=[chase_out],
+            after=INDEX_STAGES,
             description=f"Chase dominant upstream trunk from {title1}",
-        )
-
-        # 8. Find preimages for cycle nodes
-        preimages_key = f"find-preimages-{title1}"
-        results[preimages_key] = run_script(
+            memory=bfs_memory,
+            column="chase",
+        ))
+
+        # 9. Find preimages for cycle nodes (own file per title: the default
+        # preimages_n={N}.tsv would be overwritten by every cycle)
+        preimages_out = ANALYSIS_DIR / f"preimages_n={n}_target={title1}_{tag}.tsv"
+        add(
+            f"find-preimages-{title1}",
             "find-nlink-preimages.py",
             [
-                "--n", str(n),
+                "--n", n,
                 "--target-title", title1,
                 "--limit", "100",
+                "--out", preimages_out,
             ],
+            inputs=[REVERSE_DIR / "manifest.json", title_index],
+            outputs=[preimages_out],
+            after=INDEX_STAGES,
             description=f"Find preimages for {title1}",
+            column="preimages",
         )
 
     # ========================================================================
     # TIER 2: Aggregation & Dashboards
     # ========================================================================
 
-    # 9. Compute trunkiness dashboard
-    results["compute-trunkiness-dashboard"] = run_script(
+    # 10. Compute trunkiness dashboard
+    dashboard_file = ANALYSIS_DIR / f"branch_trunkiness_dashboard_n={n}_{tag}.tsv"
+    keys["dashboards"].append(add(
+        "compute-trunkiness-dashboard",
         "compute-trunkiness-dashboard.py",
-        ["--tag", tag, "--n", str(n), "--analysis-dir", str(ANALYSIS_DIR)],
+        ["--tag", tag, "--n", n, "--analysis-dir", ANALYSIS_DIR],
+        inputs=[ANALYSIS_DIR / f"branches_n={n}_cycle=*_branches_*.tsv"],
+        outputs=[dashboard_file],
+        after=keys["branches"],
         description="Aggregate concentration metrics across all cycles",
-    )
-
-    # 10. Batch chase collapse metrics
-    dashboard_file = ANALYSIS_DIR / f"branch_trunkiness_dashboard_n={n}_{tag}.tsv"
-    if dashboard_file.exists():
-        results["batch-chase-collapse-metrics"] = run_script(
-            "batch-chase-collapse-metrics.py",
+        column="dashboard",
+    ))
+
+    # 11. Batch chase collapse metrics
+    keys["dashboards"].append(add(
+        "batch-chase-collapse-metrics",
+        "batch-chase-collapse-metrics.py",
+        [
+            "--n", n,
+            "--dashboard", dashboard_file,
+            "--seed-from", "dominant_enters_cycle_title",
+            "--max-hops", "20" if quick else "40",
+            "--dominance-threshold", "0.5",
+            "--tag", tag,
+        ],
+        inputs=[dashboard_file, title_index],
+        outputs=[ANALYSIS_DIR / f"dominance_collapse_dashboard_n={n}_{tag}.tsv"],
+        after=[keys["dashboards"][-1]],
+        description="Measure dominance collapse patterns across cycles",
+        memory=bfs_memory,
+        column="collapse",
+    ))
+
+    # 12. Render 3D tributary tree for top cycle (if not quick mode)
+    if not quick and cycles:
+        title1, title2 = cycles[0]  # Massachusetts ↔ Gulf_of_Maine
+        tree_out = REPORT_DIR / "assets" / f"tributary_tree_3d_n={n}_cycle={title1}__{title2}_{tag}.html"
+        add(
+            "render-tributary-tree-3d",
+            "render-tributary-tree-3d.py",
             [
-                "--n", str(n),
-                "--dashboard", str(dashboard_file),
-                "--seed-from", "dominant_enters_cycle_title",
-                "--max-hops", "20" if quick else "40",
-                "--dominance-threshold", "0.5",
-                "--tag", tag,
+                "--n", n,
+                "--cycle-title", title1,
+                "--cycle-title", title2,
+                "--top-k", "3",
+                "--max-levels", "4",
+                "--max-depth", "12",
+                "--out", tree_out,
             ],
-            description="Measure dominance collapse patterns across cycles",
+            inputs=[EDGES_STORE_DIR / "manifest.json", title_index],
+            outputs=[tree_out],
+            after=INDEX_STAGES,
+            description=f"Render 3D tributary tree for {title1} ↔ {title2}",
+            memory=bfs_memory,
+            column="tree3d",
         )
-    else:
-        print(f"\n⚠ Skipping batch-chase-collapse-metrics: dashboard file not found")
-        results["batch-chase-collapse-metrics"] = False
+
+    return stages, keys
+
+
+def cross_n_stages(n_values: list[int], tag: str, keys: dict[int, dict[str, list[str]]]) -> list[Stage]:
+    """Stages that read the outputs of every N in the run."""
+
+    stages: list[Stage] = []
+    n_list = ",".join(str(n) for n in n_values)
+    all_basins = [k for n in n_values for k in keys[n]["basins"]]
 
     # ========================================================================
-    # TIER 3: Cross-N Comparisons (if multiple N values)
+    # TIER 3: Cross-N Comparisons
     # ========================================================================
 
-    # 11. Compare across N (if we have data for multiple N values)
-    # For now, skip unless user specifies
-
-    # 12. Compare cycle evolution
-    results["compare-cycle-evolution"] = run_script(
+    # 13. Compare cycle evolution
+    stages.append(stage(
+        "compare-cycle-evolution",
         "compare-cycle-evolution.py",
-        ["--n-values", str(n)],
+        ["--n-values", n_list, "--tag", tag],
+        inputs=[ANALYSIS_DIR / f"basin_n={n}_cycle=*_layers.tsv" for n in n_values],
+        outputs=[ANALYSIS_DIR / "cycle_evolution_summary.tsv", ANALYSIS_DIR / "cycle_dominance_matrix.tsv"],
+        after=all_basins,
         description="Analyze cycle evolution and stability",
-    )
+        row="all N",
+        column="evolution",
+    ))
 
-    # 13. Analyze cycle link profiles
-    results["analyze-cycle-link-profiles"] = run_script(
+    # 14. Analyze cycle link profiles
+    stages.append(stage(
+        "analyze-cycle-link-profiles",
         "analyze-cycle-link-profiles.py",
-        ["--max-n", str(n + 2)],
+        ["--max-n", max(n_values) + 2],
+        inputs=[NLINK_PATH, ANALYSIS_DIR / "universal_cycles.tsv"],
+        outputs=[ANALYSIS_DIR / "cycle_link_profiles.tsv", ANALYSIS_DIR / "cycle_link_analysis_summary.tsv"],
+        after=["compare-cycle-evolution"],
         description="Analyze link sequences of cycle pages",
-    )
+        row="all N",
+        column="link-profiles",
+    ))
 
     # ========================================================================
     # TIER 4: Visualization & Reporting
     # ========================================================================
 
-    # 14. Visualize mechanism comparison
-    results["visualize-mechanism-comparison"] = run_script(
+    # 15. Visualize mechanism comparison
+    stages.append(stage(
+        "visualize-mechanism-comparison",
         "visualize-mechanism-comparison.py",
-        [],
+        inputs=[ANALYSIS_DIR / "path_characteristics_n=*_mechanism_summary.tsv"],
+        outputs=[
+            REPORT_DIR / "assets" / "mechanism_comparison_n3_to_n7.png",
+            REPORT_DIR / "assets" / "bottleneck_analysis_n3_to_n7.png",
+        ],
         description="Generate mechanism comparison charts",
-    )
-
-    # 15. Render human report
-    results["render-human-report"] = run_script(
+        row="all N",
+        column="mechanism",
+    ))
+
+    # 16. Render human report (reads the N=5 dashboards and chains)
+    report_ns = [5] if 5 in n_values else n_values
+    stages.append(stage(
+        "render-human-report",
         "render-human-report.py",
         ["--tag", tag],
+        inputs=[
+            ANALYSIS_DIR / "branch_trunkiness_dashboard_n=5_*.tsv",
+            ANALYSIS_DIR / "dominance_collapse_dashboard_n=5_*.tsv",
+            ANALYSIS_DIR / "dominant_upstream_chain_n=5_from=*.tsv",
+        ],
+        outputs=[REPORT_DIR / "overview.md"],
+        after=[k for n in report_ns for k in (*keys[n]["dashboards"], *keys[n]["chase"])],
         description="Generate human-facing summary report with charts",
+        row="all N",
+        column="report",
+    ))
+    return stages
+
+
+def build_stages(
+    n_values: list[int],
+    tag: str,
+    cycles: list[tuple[str, str]],
+    *,
+    quick: bool,
+    ci_halfwidth: float | None,
+) -> list[Stage]:
+    """The harness pipeline over ``n_values`` as one stage graph (dependencies via ``after``).
+
+    Per-N stages of different N are independent, so the scheduler interleaves
+    them; indexes are shared and cross-N stages wait for every N.
+    """
+
+    stages = index_stages(max(n_values))
+    keys: dict[int, dict[str, list[str]]] = {}
+    for n in n_values:
+        per_n, keys[n] = n_stages(n, tag, cycles, quick=quick, ci_halfwidth=ci_halfwidth)
+        stages.extend(per_n)
+    stages.extend(cross_n_stages(n_values, tag, keys))
+    return stages
+
+
+def _preload_link_store() -> None:
+    """Map the link store in the parent so forked workers share it (skipped if it still has to be built)."""
+
+    if is_link_store_fresh():
+        get_link_store()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Run complete N-link analysis pipeline with sensible defaults",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--n", type=int, default=5, help="N for N-link rule (default: 5)")
+    parser.add_argument(
+        "--n-range",
+        type=int,
+        nargs=2,
+        metavar=("START", "END"),
+        default=None,
+        help="Sweep every N in START..END (inclusive) as one scheduled run; overrides --n",
+    )
+    parser.add_argument(
+        "--tag",
+        type=str,
+        default=f"harness_{date.today().isoformat()}",
+        help="Tag for output files",
+    )
+    parser.add_argument(
+        "--skip-existing",
+        action="store_true",
+        help="Skip stages whose output files already exist, without checking whether their inputs changed",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-run every stage, even if its inputs and parameters are unchanged since the last run",
+    )
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="Quick mode with reduced samples (fewer cycles, smaller samples)",
+    )
+    parser.add_argument(
+        "--max-cycles",
+        type=int,
+        default=None,
+        help="Maximum number of cycles to analyze (default: all 9, or 6 in quick mode)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Stages to run in parallel (default: min(cores, cycles x N values, available RAM / per-cycle budget)); "
+        "per-stage logs go to analysis/logs/",
+    )
+    parser.add_argument(
+        "--memory-budget-gb",
+        type=float,
+        default=None,
+        help="Memory the parallel stages may reserve together (default: 75%% of available RAM)",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=PROFILE_MODES,
+        default=None,
+        help="Also capture a cProfile (cpu) or tracemalloc (memory) dump per stage, in the log directory's profiles/",
+    )
+    parser.add_argument(
+        "--progress-every",
+        type=float,
+        default=60.0,
+        help="Seconds between progress tables with --jobs > 1 (default: 60)",
+    )
+    parser.add_argument(
+        "--ci-halfwidth",
+        type=float,
+        default=None,
+        help="Sample traces / path characteristics adaptively to ±this many percentage points "
+        "instead of fixed sample sizes",
     )
 
-    # 16. Render 3D tributary tree for top cycle (if not quick mode)
-    if not quick and cycles:
-        title1, title2 = cycles[0]  # Massachusetts ↔ Gulf_of_Maine
-        results["render-tributary-tree-3d"] = run_script(
-            "render-tributary-tree-3d.py",
-            [
-                "--n", str(n),
-                "--cycle-title", title1,
-                "--cycle-title", title2,
-                "--top-k", "3",
-                "--max-levels", "4",
-                "--max-depth", "12",
-            ],
-            description=f"Render 3D tributary tree for {title1} ↔ {title2}",
-        )
+    args = parser.parse_args()
+
+    if args.n_range:
+        start, end = args.n_range
+        if start < 1 or end < start:
+            raise SystemExit("--n-range needs 1 <= START <= END")
+        n_values = list(range(start, end + 1))
+    else:
+        n_values = [args.n]
+    n_label = f"{n_values[0]}-{n_values[-1]}" if len(n_values) > 1 else str(n_values[0])
+    tag = args.tag
+    quick = args.quick
+
+    # Select cycles
+    if quick:
+        cycles = KNOWN_CYCLES[:6]  # Quick mode: first 6 cycles
+    else:
+        cycles = KNOWN_CYCLES  # Full mode: all 9 cycles
+
+    if args.max_cycles:
+        cycles = cycles[:args.max_cycles]
+
+    ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
+
+    stages = build_stages(n_values, tag, cycles, quick=quick, ci_halfwidth=args.ci_halfwidth)
+    max_edges = max(edges_count(n) for n in n_values)
+    jobs = args.jobs or default_jobs(len(cycles) * len(n_values), edges=max_edges)
+    memory_budget = int(args.memory_budget_gb * 1024**3) if args.memory_budget_gb else None
+
+    print(f"\n{'='*80}")
+    print(f"N-LINK ANALYSIS HARNESS")
+    print(f"{'='*80}")
+    print(f"N: {n_label}")
+    print(f"Tag: {tag}")
+    print(f"Cycles: {len(cycles)}")
+    print(f"Stages: {len(stages)}")
+    print(f"Jobs: {jobs}")
+    if memory_budget:
+        print(f"Memory budget: {memory_budget / 1024**3:.1f} GB")
+    print(f"Quick mode: {quick}")
+    print(f"Cache: {'off (--force)' if args.force else 'skip existing outputs' if args.skip_existing else 'content hashes'}")
+    print(f"{'='*80}\n")
+
+    t0 = time.time()
+    results = run_pipeline(
+        stages,
+        jobs=jobs,
+        force=args.force,
+        skip_existing=args.skip_existing,
+        log_dir=ANALYSIS_DIR / "logs" / f"harness_n={n_label}_{tag}" if jobs > 1 or args.profile else None,
+        memory_budget=memory_budget,
+        preload=_preload_link_store,
+        progress_every=args.progress_every if jobs > 1 else None,
+        run_info={"pipeline": "run-analysis-harness", "tag": tag, "n": n_label, "quick": bool(quick)},
+        profile=args.profile,
+    )
 
     # ========================================================================
     # SUMMARY
@@ -313,24 +587,15 @@ def main() -> None:
     print(f"ANALYSIS HARNESS SUMMARY")
     print(f"{'='*80}\n")
 
-    total = len(results)
-    succeeded = sum(1 for v in results.values() if v)
-    failed = total - succeeded
-
-    print(f"Total scripts run: {total}")
-    print(f"Succeeded: {succeeded}")
-    print(f"Failed: {failed}")
-    print(f"\nSuccess rate: {100 * succeeded / total:.1f}%\n")
-
-    if failed > 0:
-        print("Failed scripts:")
-        for name, success in results.items():
-            if not success:
-                print(f"  ✗ {name}")
+    failed = summarize(results)
+    succeeded = len(results) - failed
+    print(f"\nSuccess rate: {100 * succeeded / len(results):.1f}%")
+    print(f"Wall time: {time.time() - t0:.1f}s")
 
     print(f"\n{'='*80}")
     print(f"All outputs saved to: {ANALYSIS_DIR}")
     print(f"Human report: n-link-analysis/report/overview.md")
+    print(f"Stage profile history: {RUN_LOG_PATH} (python compare-pipeline-runs.py)")
     print(f"{'='*80}\n")
 
     sys.exit(0 if failed == 0 else 1)
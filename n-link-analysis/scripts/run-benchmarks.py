@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""Micro and macro benchmarks of the pipeline and analysis hot paths on synthetic data.
+
+Context
+-------
+Performance regressions used to surface as a slow overnight harness run.
+This suite times the hot paths on synthetic graphs of fixed sizes
+(nlink_lib/synthetic_wiki.py), writes the timings to JSON and compares them
+with a stored baseline, so a slowdown shows up when the change is reviewed.
+
+Method
+------
+Micro cases (one corpus: SQL / XML dumps of a --micro-pages synthetic wiki):
+- pipeline/parse_sql_values        parse-sql-to-parquet.py on the page.sql INSERT lines
+- pipeline/clean_wikitext          parse-xml-prose-links.py on every article's wikitext
+- pipeline/extract_links_ordered   same, on the cleaned wikitext
+
+Macro cases (per --sizes content pages, cycles planted at --n; the synthetic
+datasets are generated once under data/synthetic/ and reused):
+- trace/load_successor_arrays      trace-nlink-path.py _load_successor_arrays(N)
+- trace/trace_path                 --traces traces from random start pages
+- basin/map_basin_with_parent      render-full-basin-geometry.py reverse BFS (DuckDB)
+                                   from the largest planted cycle; the basin
+                                   size is checked against the planted truth
+- viewer/tree_layout               dash-basin-geometry-viewer.py
+                                   _compute_tree_layout_cached on that basin
+- viewer/figure_{pointcloud,recursive2d,fan2d,fan3d}
+                                   the viewer's figure builders with its default
+                                   controls, plus JSON serialization (what Dash
+                                   sends to the browser)
+
+Every case runs --warmup untimed and --repeat timed calls; the fastest call
+is compared with the baseline's (other load on the machine only adds time).
+A case is "slower" when it exceeds the baseline by more than --tolerance
+(cases under --min-seconds in both runs are never flagged). Viewer cases are
+skipped when dash / plotly are not installed.
+
+Outputs
+-------
+- analysis/benchmarks/bench_{tag}.json: environment (versions, CPUs, git
+  commit), parameters, per case and size: times_s, median_s, min_s, items, unit
+- analysis/benchmarks/baseline.json (--save-baseline)
+- Exit status 1 when a case is slower than the baseline
+
+Usage
+-----
+    python run-benchmarks.py --save-baseline               # on the reference commit
+    python run-benchmarks.py                               # after a change: compare
+    python run-benchmarks.py --sizes 10000 100000 1000000 --repeat 3 --only trace/
+    python run-benchmarks.py --baseline other.json --tolerance 0.1
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from nlink_lib.benchmarks import (
+    BASELINE_PATH,
+    BENCH_DIR,
+    BenchResult,
+    compare_results,
+    load_results,
+    load_script,
+    time_case,
+    write_results,
+)
+from nlink_lib.rules import parse_rule
+from nlink_lib.synthetic_wiki import SyntheticSpec, build_wiki, dataset_dir, ensure_dataset, write_sql_dumps, write_xml_dump
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SCRIPTS_DIR = REPO_ROOT / "n-link-analysis" / "scripts"
+VIZ_DIR = REPO_ROOT / "n-link-analysis" / "viz"
+DATA_PIPELINE_DIR = REPO_ROOT / "data-pipeline" / "wikipedia-decomposition" / "scripts"
+
+FIGURE_VIEWS = ("pointcloud", "recursive2d", "fan2d", "fan3d")
+
+
+def _selected(name: str, only: list[str]) -> bool:
+    return not only or any(pattern in name for pattern in only)
+
+
+def _micro_corpus(pages: int, seed: int) -> tuple[list[str], list[str]]:
+    """(page.sql INSERT lines, article wikitexts) of a small synthetic wiki."""
+
+    wiki = build_wiki(SyntheticSpec(pages=pages, seed=seed))
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_dir = Path(tmp)
+        sql_paths = write_sql_dumps(wiki, raw_dir)
+        xml_paths = write_xml_dump(wiki, raw_dir)
+        with open(sql_paths[0], encoding="utf-8") as f:
+            lines = [line for line in f if line.startswith("INSERT INTO")]
+        texts = []
+        ns = ""
+        for _, elem in ET.iterparse(str(xml_paths[0]), events=("end",)):
+            tag = elem.tag.rsplit("}", 1)[-1]
+            if tag == "ns":
+                ns = elem.text or ""
+            elif tag == "text" and ns == "0" and elem.text:
+                texts.append(elem.text)
+            elif tag == "page":
+                elem.clear()
+    return lines, texts
+
+
+def _micro_cases(args: argparse.Namespace) -> list[BenchResult]:
+    names = ("pipeline/parse_sql_values", "pipeline/clean_wikitext", "pipeline/extract_links_ordered")
+    if not any(_selected(name, args.only) for name in names):
+        return []
+    sql_mod = load_script(DATA_PIPELINE_DIR / "parse-sql-to-parquet.py")
+    xml_mod = load_script(DATA_PIPELINE_DIR / "parse-xml-prose-links.py")
+    lines, texts = _micro_corpus(args.micro_pages, args.seed)
+    cleaned = [xml_mod.clean_wikitext(t) for t in texts]
+    size = int(args.micro_pages)
+    common = {"size": size, "repeat": args.repeat, "warmup": args.warmup}
+    results = []
+
+    if _selected(names[0], args.only):
+        rows = sum(1 for line in lines for _ in sql_mod.parse_sql_values(line))
+        results.append(time_case(
+            names[0], lambda: [t for line in lines for t in sql_mod.parse_sql_values(line)], unit="rows", items=rows, **common
+        ))
+    if _selected(names[1], args.only):
+        results.append(time_case(names[1], lambda: [xml_mod.clean_wikitext(t) for t in texts], unit="pages", items=len(texts), **common))
+    if _selected(names[2], args.only):
+        links = sum(len(xml_mod.extract_links_ordered(t)) for t in cleaned)
+        results.append(time_case(names[2], lambda: [xml_mod.extract_links_ordered(t) for t in cleaned], unit="links", items=links, **common))
+    return results
+
+
+def _import_viewer():
+    try:
+        return load_script(VIZ_DIR / "dash-basin-geometry-viewer.py")
+    except ImportError as e:
+        print(f"Skipping viewer cases: {e}")
+        return None
+
+
+def _figure_call(viewer, view: str, df, layout, path: Path):
+    """The viewer's render callback for one view mode, with the default control values."""
+
+    x2 = viewer.pd.Series(layout[0], index=df.index)
+    span = viewer.pd.Series(layout[1], index=df.index)
+    outdeg = viewer.pd.Series(layout[2], index=df.index)
+    base = dict(title=path.name, max_points=120_000, sampling_mode="by_depth", depth_min=0, depth_max=0, point_size=2.0, seed=0)
+    fan = dict(
+        point_opacity=0.85, show_edges=True, max_edges=120_000, edge_opacity=0.14, edge_width=1.0, angle_span_degrees=150.0,
+        radius_step=1.0, edge_depth_max=0, bundle_edges=True, bundle_pull=0.35, x2=x2, subtree_span=span, out_degree=outdeg,
+        color_mode="depth",
+    )
+    if view == "pointcloud":
+        return lambda: viewer.build_pointcloud_figure_from_df(df, opacity=0.85, camera=None, **base).to_json()
+    if view == "recursive2d":
+        return lambda: viewer.build_recursive_space_2d_figure_from_df(
+            df, opacity=0.85, x2=x2, subtree_span=span, out_degree=outdeg, color_mode="depth", **base
+        ).to_json()
+    if view == "fan2d":
+        return lambda: viewer.build_fan_edges_2d_figure_from_df(df, **base, **fan).to_json()
+    return lambda: viewer.build_fan_edges_3d_figure_from_df(df, z_mode="depth_cone", z_scale=1.0, camera=None, **base, **fan).to_json()
+
+
+def _macro_cases(args: argparse.Namespace, size: int, geometry, trace_mod, viewer) -> list[BenchResult]:
+    spec = SyntheticSpec(pages=size, seed=args.seed, plant_n=args.n)
+    processed = ensure_dataset(spec, args.data_dir / dataset_dir(spec).name if args.data_dir else None)
+    truth = json.loads((processed / "synthetic_truth.json").read_text(encoding="utf-8"))
+    largest = max(truth["planted_cycles"], key=lambda c: c["basin_size"])
+    nlink_path = processed / "nlink_sequences.parquet"
+    common = {"size": size, "repeat": args.repeat, "warmup": args.warmup}
+    results = []
+    print(f"\n[{size:,} pages] {processed}")
+
+    if _selected("trace/", args.only):
+        trace_mod.NLINK_PATH = nlink_path
+        page_ids, next_ids, _ = trace_mod._load_successor_arrays(args.n)
+        if _selected("trace/load_successor_arrays", args.only):
+            results.append(time_case(
+                "trace/load_successor_arrays", lambda: trace_mod._load_successor_arrays(args.n), unit="pages", items=len(page_ids), **common
+            ))
+        if _selected("trace/trace_path", args.only):
+            rule = parse_rule(args.n)
+            starts = np.random.default_rng(args.seed).choice(page_ids, size=min(args.traces, len(page_ids)), replace=False).tolist()
+
+            def run_traces() -> int:
+                steps = 0
+                for start in starts:
+                    trace = trace_mod.trace_path(rule=rule, start_page_id=int(start), sorted_page_ids=page_ids, next_ids=next_ids, max_steps=5000)
+                    steps += len(trace.path_page_ids)
+                return steps
+
+            results.append(time_case("trace/trace_path", run_traces, unit="steps", items=run_traces(), **common))
+
+    needs_basin = _selected("basin/", args.only) or (viewer is not None and _selected("viewer/", args.only))
+    if not needs_basin:
+        return results
+    con = duckdb.connect()
+    con.execute(
+        f"""
+        CREATE TABLE edges AS
+        SELECT page_id AS src_page_id, list_extract(link_sequence, {int(args.n)}) AS dst_page_id
+        FROM read_parquet('{nlink_path.as_posix()}')
+        WHERE len(link_sequence) >= {int(args.n)}
+        """.strip()
+    )
+
+    def map_basin():
+        return geometry.map_basin_with_parent(con, cycle_ids=largest["page_ids"], max_depth=0, max_nodes=0, log_every=0)
+
+    tbl = map_basin()
+    if tbl.num_rows != largest["basin_size"]:
+        raise SystemExit(f"Reverse BFS found {tbl.num_rows:,} pages, planted basin has {largest['basin_size']:,}")
+    if _selected("basin/map_basin_with_parent", args.only):
+        results.append(time_case("basin/map_basin_with_parent", map_basin, unit="pages", items=tbl.num_rows, **common))
+    con.close()
+    if viewer is None or not _selected("viewer/", args.only):
+        return results
+
+    df = geometry.assign_layered_radial_coords(tbl.to_pandas(), z_step=0.35, radius_scale=0.015, twist_per_layer=0.15)
+    pc_path = processed / "analysis" / "benchmarks" / f"basin_pointcloud_n={args.n}_cycle=bench.parquet"
+    pc_path.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), pc_path)
+    viewer._load_pointcloud_df.cache_clear()
+    df = viewer._load_pointcloud_df(str(pc_path))
+    if _selected("viewer/tree_layout", args.only):
+        results.append(time_case(
+            "viewer/tree_layout", lambda: viewer._compute_tree_layout_cached(str(pc_path)),
+            setup=viewer._compute_tree_layout_cached.cache_clear, unit="nodes", items=len(df), **common
+        ))
+    layout = viewer._compute_tree_layout_cached(str(pc_path))
+    for view in FIGURE_VIEWS:
+        name = f"viewer/figure_{view}"
+        if _selected(name, args.only):
+            results.append(time_case(name, _figure_call(viewer, view, df, layout, pc_path), unit="nodes", items=min(len(df), 120_000), **common))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the pipeline and analysis hot paths on synthetic data and compare with a baseline.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000], help="Synthetic content-page counts for macro cases (default: 10000 100000)")
+    parser.add_argument("--micro-pages", type=int, default=2000, help="Pages of the micro-benchmark dump corpus (default: 2000)")
+    parser.add_argument("--n", type=int, default=5, help="N for tracing / basins; cycles are planted at this N (default: 5)")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic data seed (default: 0)")
+    parser.add_argument("--traces", type=int, default=1000, help="Traces per trace/trace_path call (default: 1000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per case (default: 5)")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed warm-up calls per case (default: 1)")
+    parser.add_argument("--only", type=str, action="append", default=[], help="Only cases whose name contains this (repeatable)")
+    parser.add_argument("--data-dir", type=Path, default=None, help="Where synthetic datasets are kept (default: data/synthetic/)")
+    parser.add_argument("--baseline", type=Path, default=None, help=f"Baseline result file (default: {BASELINE_PATH} if present)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown vs baseline (default: 0.25 = 25%%)")
+    parser.add_argument("--min-seconds", type=float, default=0.005, help="Never flag cases faster than this in both runs (default: 0.005)")
+    parser.add_argument("--save-baseline", action="store_true", help="Also store the results as the baseline")
+    parser.add_argument("--tag", type=str, default="latest", help="Output file tag (default: latest)")
+    args = parser.parse_args()
+
+    if args.repeat <= 0 or args.warmup < 0:
+        raise SystemExit("--repeat must be >= 1 and --warmup >= 0")
+    if any(s < 100 for s in args.sizes) or args.micro_pages < 100:
+        raise SystemExit("--sizes and --micro-pages must be >= 100")
+    if args.tolerance <= 0:
+        raise SystemExit("--tolerance must be > 0")
+
+    print(f"\n{'='*60}")
+    print(f"Benchmarks: sizes {', '.join(f'{s:,}' for s in args.sizes)}, N={args.n}, repeat {args.repeat}")
+    print(f"{'='*60}")
+
+    t0 = time.time()
+    results = _micro_cases(args)
+    if any(_selected(p, args.only) for p in ("trace/", "basin/", "viewer/")):
+        trace_mod = load_script(SCRIPTS_DIR / "trace-nlink-path.py")
+        geometry = load_script(VIZ_DIR / "render-full-basin-geometry.py")
+        viewer = _import_viewer() if _selected("viewer/", args.only) else None
+        for size in args.sizes:
+            results.extend(_macro_cases(args, size, geometry, trace_mod, viewer))
+    if not results:
+        raise SystemExit("No benchmark case matches --only")
+
+    out_path = BENCH_DIR / f"bench_{args.tag}.json"
+    params = {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items() if k not in ("save_baseline", "baseline")}
+    write_results(out_path, results, params=params)
+
+    baseline_path = args.baseline or (BASELINE_PATH if BASELINE_PATH.exists() else None)
+    baseline = load_results(baseline_path) if baseline_path and baseline_path.exists() else {}
+    if args.baseline and not baseline:
+        raise SystemExit(f"Baseline {args.baseline} not found or empty")
+    rows = {r["key"]: r for r in compare_results(results, baseline, tolerance=args.tolerance, min_seconds=args.min_seconds)}
+
+    print(f"\n{'case':<38} {'size':>10} {'median':>10} {'min':>10} {'throughput':>22} {'baseline':>10} {'ratio':>6}")
+    for r in results:
+        row = rows[r.key]
+        base = f"{row['baseline_s'] * 1000:.1f}ms" if row["baseline_s"] else "-"
+        ratio = f"{row['ratio']:.2f}" if row["ratio"] else "-"
+        flag = row["status"] if row["status"] in ("slower", "faster", "new") and baseline else ""
+        print(
+            f"{r.name:<38} {r.size:>10,} {r.median_s * 1000:>8.1f}ms {r.min_s * 1000:>8.1f}ms "
+            f"{r.rate:>14,.0f} {r.unit + '/s':<7} {base:>10} {ratio:>6} {flag}"
+        )
+    print(f"\nWrote: {out_path} ({time.time() - t0:.1f}s)")
+
+    if args.save_baseline:
+        target = args.baseline or BASELINE_PATH
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(out_path, target)
+        print(f"Saved baseline: {target}")
+        return
+
+    slower = [row for row in rows.values() if row["status"] == "slower"]
+    if baseline:
+        print(f"Compared with {baseline_path} (tolerance {args.tolerance:.0%}): {len(slower)} slower")
+    if slower:
+        for row in slower:
+            print(f"  SLOWER {row['key']}: {row['baseline_s']:.4f}s -> {row['min_s']:.4f}s (x{row['ratio']:.2f})")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
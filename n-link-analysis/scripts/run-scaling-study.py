@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""Scaling study: per-stage throughput and memory vs. graph size and worker count.
+
+Context
+-------
+future.md leaves open what runtime / memory envelope the full pipeline needs
+on the target machine, and whether more cores help. The benchmark suite
+(run-benchmarks.py) catches regressions at fixed sizes; this study measures
+how each stage grows with the graph and with the number of workers, and
+extrapolates to full enwiki or any other dump.
+
+Method
+------
+For every --sizes content-page count a synthetic wiki is generated once
+(nlink_lib/synthetic_wiki.py, cycles planted at --n; kept under
+data/synthetic/). Each stage then runs at each --workers count that applies
+to it, every cell in a fresh child process so peak RSS is that cell's own:
+
+ingestion (sizes up to --ingest-max-pages; the dumps are ~2 KB per page):
+- ingest/parse_sql          parse-sql-to-parquet.py on the page / redirect /
+                            page_props SQL dumps (serial)
+- ingest/parse_xml          parse-xml-prose-links.py parse_xml_file over the
+                            --xml-parts dump files on W worker processes
+                            (the script itself parses them one after another)
+- ingest/build_sequences    build-nlink-sequences-v3.py (serial; the script
+                            pins DuckDB to 4 threads)
+analysis:
+- analysis/link_store       nlink_lib.link_store.build_link_store (serial)
+- analysis/decomposition    nlink_lib.decomposition.build_decomposition at --n
+                            (serial, vectorized)
+- analysis/edges_store      nlink_lib.edges_db.build_edges_store with
+                            NLINK_DUCKDB_THREADS=W
+- analysis/basins           render-full-basin-geometry.py reverse BFS of every
+                            planted cycle on W worker processes, each with
+                            1/W of the cores and RAM (the harness cycle pool's
+                            split, nlink_lib.cycle_pool.worker_env); basin
+                            sizes are checked against the planted truth
+
+Worker counts above the CPU count still run, flagged ``oversubscribed``.
+Each cell records wall time, CPU time, peak RSS (cell process and busiest
+worker process), I/O bytes and its work count; nlink_lib/scaling.py adds
+throughput, speedup and efficiency against the same stage at one worker,
+and fits ``y = coef * rows ** exponent`` (rows = nlink_sequences.parquet
+rows) for wall time and peak memory per stage and worker count. Fits are
+evaluated at each --target: full enwiki by default, plus this machine's
+nlink_sequences.parquet when present; other language dumps are
+``--target dewiki=path/to/nlink_sequences.parquet`` or a row count.
+
+The table is rewritten after every cell, so an interrupted study loses at
+most one cell and --resume continues it.
+
+Outputs
+-------
+- analysis/scaling_study_{tag}.parquet: stage, parallel, pages, nlink_rows,
+  links, workers, oversubscribed, status (ok / failed / timeout), wall_s,
+  cpu_s, peak_rss_bytes, worker_peak_rss_bytes, bytes_read, bytes_written,
+  items, unit, throughput (items/s), speedup, efficiency
+- analysis/scaling_fits_{tag}.tsv: stage, workers, metric (wall_s /
+  peak_rss_bytes), coef, exponent, r2, sizes, max_fitted_rows, target,
+  target_rows, predicted
+- n-link-analysis/report/scaling.md + assets/scaling_{tag}_*.png (--report,
+  via render-human-report.py --scaling)
+
+Usage
+-----
+    python run-scaling-study.py                                      # 100k..10M pages, 1..16 workers
+    python run-scaling-study.py --sizes 100000 300000 --workers 1 2 4 --report
+    python run-scaling-study.py --only analysis/ --sizes 1000000 10000000 --resume
+    python run-scaling-study.py --target dewiki=/data/dewiki/processed/nlink_sequences.parquet
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from pathlib import Path
+
+from nlink_lib.paths import NLINK_PATH
+from nlink_lib.scaling import (
+    ENWIKI_NLINK_ROWS,
+    fit_table,
+    fits_path,
+    load_results,
+    parse_target,
+    results_frame,
+    study_path,
+    write_results,
+)
+from nlink_lib.synthetic_wiki import DUMP_DATE, SyntheticSpec, build_wiki, dataset_dir, ensure_dataset, write_sql_dumps, write_xml_dump
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SCRIPTS_DIR = REPO_ROOT / "n-link-analysis" / "scripts"
+VIZ_DIR = REPO_ROOT / "n-link-analysis" / "viz"
+DATA_PIPELINE_DIR = REPO_ROOT / "data-pipeline" / "wikipedia-decomposition" / "scripts"
+
+# (stage, runs at every worker count)
+STAGES = (
+    ("ingest/parse_sql", False),
+    ("ingest/parse_xml", True),
+    ("ingest/build_sequences", False),
+    ("analysis/link_store", False),
+    ("analysis/decomposition", False),
+    ("analysis/edges_store", True),
+    ("analysis/basins", True),
+)
+
+_RESULT_PREFIX = "SCALING_CELL "
+_DUMPS_MARKER = "scaling_dumps.json"
+
+
+def _selected(name: str, only: list[str]) -> bool:
+    return not only or any(pattern in name for pattern in only)
+
+
+# --- child side: one cell ----------------------------------------------------
+
+
+def _children_peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+def _pipeline_root(cell: dict) -> Path:
+    """cwd for the data-pipeline scripts: data/wikipedia/raw -> the dataset's dumps, processed/ in scratch."""
+
+    root = Path(cell["scratch"]) / "ingest"
+    raw = root / "data" / "wikipedia" / "raw"
+    if not raw.exists():
+        raw.parent.mkdir(parents=True, exist_ok=True)
+        raw.symlink_to(Path(cell["dataset"]) / "raw", target_is_directory=True)
+    (root / "data" / "wikipedia" / "processed").mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def _ingest_parse_sql(cell: dict) -> tuple[int, str]:
+    from nlink_lib.benchmarks import load_script
+    import pyarrow.parquet as pq
+
+    os.chdir(_pipeline_root(cell))
+    load_script(DATA_PIPELINE_DIR / "parse-sql-to-parquet.py").main()
+    return int(pq.read_metadata("data/wikipedia/processed/pages.parquet").num_rows), "pages"
+
+
+def _ingest_parse_xml(cell: dict) -> tuple[int, str]:
+    from nlink_lib.benchmarks import load_script
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.chdir(_pipeline_root(cell))
+    xml_mod = load_script(DATA_PIPELINE_DIR / "parse-xml-prose-links.py")
+    files = sorted(p for p in xml_mod.RAW_DIR.glob("enwiki-*.xml*") if not p.name.endswith(".bz2"))
+    ctx = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=cell["workers"], mp_context=ctx) as pool:
+        parts = list(pool.map(xml_mod.parse_xml_file, files))
+    from_ids = [x for p in parts for x in p[0]]
+    positions = [x for p in parts for x in p[1]]
+    to_titles = [x for p in parts for x in p[2]]
+    table = pa.table({
+        "from_id": pa.array(from_ids, type=pa.int32()),
+        "link_position": pa.array(positions, type=pa.int32()),
+        "to_title": pa.array(to_titles, type=pa.string()),
+    })
+    xml_mod.PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
+    pq.write_table(table, xml_mod.OUTPUT_FILE, compression="zstd", compression_level=3)
+    return len(from_ids), "links"
+
+
+def _ingest_build_sequences(cell: dict) -> tuple[int, str]:
+    from nlink_lib.benchmarks import load_script
+    import pyarrow.parquet as pq
+
+    os.chdir(_pipeline_root(cell))
+    mod = load_script(DATA_PIPELINE_DIR / "build-nlink-sequences-v3.py")
+    mod.main()
+    return int(pq.read_metadata(mod.OUTPUT_PATH).num_rows), "sequences"
+
+
+def _analysis_link_store(cell: dict) -> tuple[int, str]:
+    from nlink_lib.link_store import LinkStore, build_link_store
+
+    store_dir = build_link_store(store_dir=Path(cell["scratch"]) / "link_store", nlink_path=Path(cell["nlink_path"]))
+    return LinkStore(store_dir).num_edges, "links"
+
+
+def _analysis_decomposition(cell: dict) -> tuple[int, str]:
+    from nlink_lib.decomposition import build_decomposition
+    from nlink_lib.link_store import LinkStore
+
+    store = LinkStore(Path(cell["scratch"]) / "link_store")
+    build_decomposition(store, cell["n"], out_dir=Path(cell["scratch"]) / "decomposition")
+    return len(store), "nodes"
+
+
+def _analysis_edges_store(cell: dict) -> tuple[int, str]:
+    from nlink_lib.edges_db import THREADS_ENV, build_edges_store
+
+    os.environ[THREADS_ENV] = str(cell["workers"])
+    store_dir = build_edges_store(store_dir=Path(cell["scratch"]) / "edges_store", nlink_path=Path(cell["nlink_path"]))
+    manifest = json.loads((store_dir / "manifest.json").read_text(encoding="utf-8"))
+    return sum(manifest["edges_per_n"].values()), "edges"
+
+
+_basin_con = None
+_geometry = None
+
+
+def _init_basin_worker(db_path: str, n: int, env: dict[str, str]) -> None:
+    global _basin_con, _geometry
+    import duckdb
+
+    from nlink_lib.benchmarks import load_script
+    from nlink_lib.edges_db import apply_duckdb_limits
+
+    os.environ.update(env)
+    _geometry = load_script(VIZ_DIR / "render-full-basin-geometry.py")
+    _basin_con = duckdb.connect(db_path, read_only=True)
+    apply_duckdb_limits(_basin_con)
+    _basin_con.execute(f"CREATE TEMP VIEW edges AS SELECT src_page_id, dst_page_id FROM edges_all WHERE n = {int(n)}")
+
+
+def _basin_job(page_ids: list[int]) -> int:
+    tbl = _geometry.map_basin_with_parent(_basin_con, cycle_ids=page_ids, max_depth=0, max_nodes=0, log_every=0)
+    return tbl.num_rows
+
+
+def _analysis_basins(cell: dict) -> tuple[int, str]:
+    from nlink_lib.cycle_pool import worker_env
+    from nlink_lib.edges_db import MEMORY_LIMIT_ENV, THREADS_ENV, edges_db_path
+
+    store_dir = Path(cell["scratch"]) / "edges_store"
+    if not edges_db_path(store_dir).exists():
+        raise RuntimeError("analysis/basins needs the analysis/edges_store cell of the same size")
+    truth = json.loads((Path(cell["dataset"]) / "processed" / "synthetic_truth.json").read_text(encoding="utf-8"))
+    cycles = sorted(truth["planted_cycles"], key=lambda c: c["basin_size"], reverse=True)
+    env = {k: v for k, v in worker_env(cell["workers"]).items() if k in (THREADS_ENV, MEMORY_LIMIT_ENV)}
+    ctx = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(
+        max_workers=cell["workers"], mp_context=ctx, initializer=_init_basin_worker,
+        initargs=(str(edges_db_path(store_dir)), cell["n"], env),
+    ) as pool:
+        sizes = list(pool.map(_basin_job, [c["page_ids"] for c in cycles]))
+    bad = [(c["titles"], c["basin_size"], s) for c, s in zip(cycles, sizes) if s != c["basin_size"]]
+    if bad:
+        raise RuntimeError(f"Reverse BFS disagrees with the planted truth: {bad}")
+    return sum(sizes), "pages"
+
+
+CELL_FUNCS = {
+    "ingest/parse_sql": _ingest_parse_sql,
+    "ingest/parse_xml": _ingest_parse_xml,
+    "ingest/build_sequences": _ingest_build_sequences,
+    "analysis/link_store": _analysis_link_store,
+    "analysis/decomposition": _analysis_decomposition,
+    "analysis/edges_store": _analysis_edges_store,
+    "analysis/basins": _analysis_basins,
+}
+
+
+def _run_cell(cell: dict) -> None:
+    """Child process entry point: run one cell, print its measurements as the last stdout line."""
+
+    from nlink_lib.profiling import measure_stage
+
+    with contextlib.redirect_stdout(sys.stderr), measure_stage() as record:
+        items, unit = CELL_FUNCS[cell["stage"]](cell)
+    record.update(items=int(items), unit=unit, worker_peak_rss_bytes=_children_peak_rss_bytes())
+    print(_RESULT_PREFIX + json.dumps(record), flush=True)
+
+
+# --- parent side: the grid ---------------------------------------------------
+
+
+def _ensure_dumps(spec: SyntheticSpec, root: Path, parts: int) -> None:
+    """SQL + XML dumps of the dataset under root/raw, regenerated when spec or --xml-parts changed."""
+
+    raw_dir = root / "raw"
+    marker = raw_dir / _DUMPS_MARKER
+    wanted = {"spec": asdict(spec), "xml_parts": int(parts)}
+    try:
+        if json.loads(marker.read_text(encoding="utf-8")) == wanted:
+            return
+    except (OSError, ValueError):
+        pass
+    for old in raw_dir.glob(f"enwiki-{DUMP_DATE}-*"):
+        old.unlink()
+    t0 = time.time()
+    wiki = build_wiki(spec)
+    paths = write_sql_dumps(wiki, raw_dir) + write_xml_dump(wiki, raw_dir, parts=parts)
+    marker.write_text(json.dumps(wanted, indent=2), encoding="utf-8")
+    size = sum(p.stat().st_size for p in paths)
+    print(f"  dumps: {len(paths)} files ({size / 1024**2:,.1f} MB) in {time.time() - t0:.1f}s")
+
+
+def _spawn_cell(cell: dict, timeout: float | None) -> dict:
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--cell", json.dumps(cell)]
+    try:
+        proc = subprocess.run(cmd, cwd=SCRIPTS_DIR, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"status": "timeout"}
+    lines = [line for line in proc.stdout.splitlines() if line.startswith(_RESULT_PREFIX)]
+    if proc.returncode != 0 or not lines:
+        tail = "\n".join(proc.stderr.strip().splitlines()[-8:])
+        print(f"    failed (exit {proc.returncode}):\n{tail}")
+        return {"status": "failed"}
+    record = json.loads(lines[-1][len(_RESULT_PREFIX):])
+    record["status"] = "ok"
+    return record
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure per-stage throughput and memory vs. graph size and worker count; fit and extrapolate.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 300_000, 1_000_000, 3_000_000, 10_000_000], help="Synthetic content-page counts (default: 100000 300000 1000000 3000000 10000000)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="Worker counts for parallel stages (default: 1 2 4 8 16)")
+    parser.add_argument("--n", type=int, default=5, help="N for decomposition / basins; cycles are planted at this N (default: 5)")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic data seed (default: 0)")
+    parser.add_argument("--ingest-max-pages", type=int, default=1_000_000, help="Largest size the ingestion stages run at (default: 1000000)")
+    parser.add_argument("--xml-parts", type=int, default=16, help="XML dump files per size, the unit of parallel parsing (default: 16)")
+    parser.add_argument("--only", type=str, action="append", default=[], help="Only stages whose name contains this (repeatable)")
+    parser.add_argument("--target", type=str, action="append", default=[], help="Extrapolation target label=ROWS or label=PATH to nlink_sequences.parquet (repeatable; default: enwiki + this machine's)")
+    parser.add_argument("--data-dir", type=Path, default=None, help="Where synthetic datasets are kept (default: data/synthetic/)")
+    parser.add_argument("--scratch-dir", type=Path, default=None, help="Parent of the per-size scratch directories (default: system temp)")
+    parser.add_argument("--cell-timeout", type=float, default=None, help="Seconds before a cell is abandoned (default: none)")
+    parser.add_argument("--resume", action="store_true", help="Keep ok cells of an existing table with the same --tag")
+    parser.add_argument("--report", action="store_true", help="Render report/scaling.md via render-human-report.py --scaling")
+    parser.add_argument("--tag", type=str, default="latest", help="Output file tag (default: latest)")
+    parser.add_argument("--cell", type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cell is not None:
+        _run_cell(json.loads(args.cell))
+        return
+
+    if any(s < 100 for s in args.sizes):
+        raise SystemExit("--sizes must be >= 100")
+    if any(w < 1 for w in args.workers) or args.xml_parts < 1:
+        raise SystemExit("--workers and --xml-parts must be >= 1")
+    stages = [(name, parallel) for name, parallel in STAGES if _selected(name, args.only)]
+    if not stages:
+        raise SystemExit("No stage matches --only")
+    try:
+        targets = [parse_target(t) for t in args.target]
+    except ValueError as e:
+        raise SystemExit(str(e)) from None
+    if not args.target:
+        targets = [("enwiki", ENWIKI_NLINK_ROWS)]
+        if NLINK_PATH.exists():
+            targets.append(parse_target(f"local={NLINK_PATH}"))
+
+    if args.scratch_dir is not None:
+        args.scratch_dir.mkdir(parents=True, exist_ok=True)
+
+    sizes = sorted(set(args.sizes))
+    workers = sorted(set(args.workers))
+    cpus = os.cpu_count() or 1
+    out_path = study_path(args.tag)
+
+    print(f"\n{'='*60}")
+    print(f"Scaling study: sizes {', '.join(f'{s:,}' for s in sizes)}; workers {', '.join(map(str, workers))} ({cpus} CPUs)")
+    print(f"Stages: {', '.join(name for name, _ in stages)}")
+    print(f"{'='*60}")
+    if workers[-1] > cpus:
+        print(f"Note: worker counts above {cpus} oversubscribe this machine; those cells are flagged.")
+
+    rows = [r for r in load_results(out_path) if r.get("status") == "ok"] if args.resume else []
+    done = {(r["stage"], int(r["pages"]), int(r["workers"])) for r in rows}
+    t0 = time.time()
+    for size in sizes:
+        spec = SyntheticSpec(pages=size, seed=args.seed, plant_n=args.n)
+        root = (args.data_dir / dataset_dir(spec).name) if args.data_dir else dataset_dir(spec)
+        print(f"\n[{size:,} pages] {root}")
+        processed = ensure_dataset(spec, root)
+        counts = json.loads((processed / "synthetic_truth.json").read_text(encoding="utf-8"))["counts"]
+        size_stages = [(name, p) for name, p in stages if not name.startswith("ingest/") or size <= args.ingest_max_pages]
+        pending = [
+            (name, w) for name, parallel in size_stages for w in (workers if parallel else [1])
+            if (name, size, w) not in done
+        ]
+        if not pending:
+            continue
+        if any(name.startswith("ingest/") for name, _ in pending):
+            _ensure_dumps(spec, root, args.xml_parts)
+        scratch = Path(tempfile.mkdtemp(prefix=f"scaling-{size}-", dir=args.scratch_dir))
+        try:
+            for name, parallel in size_stages:
+                for w in (workers if parallel else [1]):
+                    if (name, size, w) in done:
+                        continue
+                    cell = {
+                        "stage": name, "workers": w, "n": args.n, "dataset": str(root), "scratch": str(scratch),
+                        "nlink_path": str(processed / "nlink_sequences.parquet"),
+                    }
+                    record = _spawn_cell(cell, args.cell_timeout)
+                    record.update(
+                        stage=name, parallel=parallel, pages=size, nlink_rows=counts["nlink_rows"], links=counts["links"],
+                        workers=w, oversubscribed=w > cpus,
+                    )
+                    rows.append(record)
+                    if record["status"] == "ok":
+                        print(
+                            f"  {name:<24} W={w:<3} {record['wall_s']:>9.2f}s  cpu {record['cpu_s']:>9.2f}s  "
+                            f"rss {record['peak_rss_bytes'] / 1024**2:>8,.0f} MB  {record['items']:>13,} {record['unit']}"
+                        )
+                    else:
+                        print(f"  {name:<24} W={w:<3} {record['status']}")
+                    write_results(out_path, results_frame(rows))
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    if not rows:
+        raise SystemExit("No cells were measured")
+    df = results_frame(rows)
+    write_results(out_path, df)
+    fits = fit_table(df, targets)
+    fit_out = fits_path(args.tag)
+    fits.to_csv(fit_out, sep="\t", index=False)
+
+    parallel_df = df[(df["status"] == "ok") & df["parallel"].astype(bool) & (df["pages"] == df["pages"].max())]
+    if not parallel_df.empty:
+        print(f"\nParallel efficiency at {int(df['pages'].max()):,} pages:")
+        for stage, g in parallel_df.groupby("stage"):
+            print(f"  {stage:<24} " + "  ".join(f"W={int(r.workers)}: {r.efficiency:.2f}" for r in g.itertuples()))
+    if not fits.empty:
+        print("\nExtrapolation (single worker, power-law fit over nlink_sequences rows):")
+        print(f"  {'stage':<24} {'target':<10} {'rows':>12} {'time exp':>8} {'time':>10} {'mem exp':>8} {'peak mem':>10}")
+        single = fits[fits["workers"] == 1]
+        for (stage, target), g in single.groupby(["stage", "target"], sort=False):
+            wall = g[g["metric"] == "wall_s"].iloc[0]
+            mem = g[g["metric"] == "peak_rss_bytes"].iloc[0]
+            print(
+                f"  {stage:<24} {target:<10} {int(wall.target_rows):>12,} {wall.exponent:>8.2f} {wall.predicted / 60:>8.1f}m "
+                f"{mem.exponent:>8.2f} {mem.predicted / 1024**3:>8.1f}GB"
+            )
+    else:
+        print("\nNo fits: every stage needs at least two sizes.")
+
+    print(f"\nWrote: {out_path}")
+    print(f"Wrote: {fit_out}")
+    if args.report:
+        subprocess.run([sys.executable, str(SCRIPTS_DIR / "render-human-report.py"), "--scaling", str(out_path)], check=True)
+    print(f"Done in {time.time() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,9 @@ Usage:
 
     # Using page IDs
     python run-single-cycle-analysis.py --n 5 --cycle-page-id 1645518 --cycle-page-id 714653
+
+    # Under another traversal rule (nlink_lib/rules.py); preimages are skipped
+    python run-single-cycle-analysis.py --rule mod=7 --cycle-page-id 1645518 --cycle-page-id 714653
 """
 
 from __future__ import annotations
@@ -20,6 +23,8 @@ import time
 from pathlib import Path
 from datetime import date
 
+from nlink_lib.rules import add_rule_argument, rule_from_args
+
 REPO_ROOT = Path(__file__).resolve().parents[2]
 SCRIPTS_DIR = REPO_ROOT / "n-link-analysis" / "scripts"
 ANALYSIS_DIR = REPO_ROOT / "data" / "wikipedia" / "processed" / "analysis"
@@ -58,6 +63,7 @@ def main() -> None:
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
     parser.add_argument("--n", type=int, default=5, help="N for N-link rule (default: 5)")
+    add_rule_argument(parser)
     parser.add_argument(
         "--cycle-title",
         type=str,
@@ -126,7 +132,8 @@ def main() -> None:
 
     args = parser.parse_args()
 
-    n = args.n
+    rule = rule_from_args(args)
+    rule_args = ["--n", str(rule.n)] if rule.n is not None else ["--rule", rule.key]
     tag = args.tag
     cycle_titles = args.cycle_title
     cycle_page_ids = args.cycle_page_id
@@ -154,7 +161,7 @@ def main() -> None:
     print(f"\n{'='*80}")
     print(f"SINGLE CYCLE ANALYSIS")
     print(f"{'='*80}")
-    print(f"N: {n}")
+    print(f"Rule: {rule.label}")
     print(f"Cycle: {cycle_key}")
     print(f"Tag: {tag}")
     print(f"Max depth: {args.max_depth or 'unlimited'}")
@@ -168,11 +175,11 @@ def main() -> None:
     print(f"{'#'*80}\n")
 
     map_basin_args = [
-        "--n", str(n),
+        *rule_args,
         *cycle_args,
         "--max-depth", str(args.max_depth),
         "--log-every", "5",
-        "--out-prefix", f"basin_n={n}_cycle={cycle_key}_{tag}",
+        "--out-prefix", f"basin_{rule.key}_cycle={cycle_key}_{tag}",
         "--namespace", str(args.namespace),
     ]
     if args.allow_redirects:
@@ -192,12 +199,12 @@ def main() -> None:
     print(f"{'#'*80}\n")
 
     branch_args = [
-        "--n", str(n),
+        *rule_args,
         *cycle_args,
         "--max-depth", "0",
         "--top-k", str(args.top_k),
         "--log-every", "10",
-        "--out-prefix", f"branches_n={n}_cycle={cycle_key}_{tag}",
+        "--out-prefix", f"branches_{rule.key}_cycle={cycle_key}_{tag}",
         "--namespace", str(args.namespace),
     ]
     if args.allow_redirects:
@@ -216,7 +223,7 @@ def main() -> None:
         print(f"{'#'*80}\n")
 
         chase_args = [
-            "--n", str(n),
+            *rule_args,
             "--seed-title", seed_title,
             "--max-hops", str(args.max_hops),
             "--dominance-threshold", str(args.dominance_threshold),
@@ -234,14 +241,14 @@ def main() -> None:
         print("\n⚠ Skipping chase-dominant-upstream: no title provided (only page IDs)")
         results["chase-dominant"] = None
 
-    # 4. Find preimages for first cycle node
-    if cycle_titles:
+    # 4. Find preimages for first cycle node (fixed N only: preimages come from the N-th link index)
+    if cycle_titles and rule.n is not None:
         print(f"\n{'#'*80}")
         print(f"# STEP 4: Find Preimages")
         print(f"{'#'*80}\n")
 
         preimage_args = [
-            "--n", str(n),
+            *rule_args,
             "--target-title", cycle_titles[0],
             "--limit", "100",
             "--resolve-source-titles",
@@ -256,7 +263,8 @@ def main() -> None:
             description=f"Find preimages for {cycle_titles[0]}",
         )
     else:
-        print("\n⚠ Skipping find-preimages: no title provided (only page IDs)")
+        reason = "no title provided (only page IDs)" if rule.n is not None else f"not available for {rule.label}"
+        print(f"\n⚠ Skipping find-preimages: {reason}")
         results["find-preimages"] = None
 
     # 5. Render 3D tree (optional, slow)
@@ -266,7 +274,7 @@ def main() -> None:
         print(f"{'#'*80}\n")
 
         render_args = [
-            "--n", str(n),
+            *rule_args,
             *cycle_args,
             "--top-k", "5",
             "--max-levels", "4",
@@ -21,6 +21,16 @@ Notes
 - Loads successor arrays once (page_id -> next_id for fixed N).
 - Start pages are chosen from pages with defined Nth link (next_id != -1),
   optionally filtered by min_outdegree.
+- ``--ci-halfwidth P`` switches to adaptive sampling (nlink_lib/adaptive_sampling.py):
+  vectorized batches from reproducible SeedSequence streams, traced in lockstep
+  over the CSR link store, until P_HALT and the top-k cycle shares are known to
+  ±P percentage points. Also writes ``<out>_ci.tsv`` with the final intervals.
+- ``--rule`` samples under any traversal rule from nlink_lib/rules.py
+  (mod=7, last=1, ...) instead of the fixed N; output names use the rule key.
+- Adaptive mode and ``--rule`` run over the link store, whose pages also
+  include link targets without a row in nlink_sequences (out-degree 0, HALT
+  at once); the fixed-N scan has no such pages. Starts need a successor, so
+  they are never sampled; a walk reaching one HALTs there in either case.
 
 """
 
@@ -31,11 +41,15 @@ import time
 from collections import Counter
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, Literal
+from typing import Literal
 
-import duckdb
 import numpy as np
-import pyarrow as pa
+
+from nlink_lib.adaptive_sampling import AdaptiveConfig, format_estimates_tsv, sample_until_precise
+from nlink_lib.batch_trace import CYCLE, trace_batch
+from nlink_lib.link_store import get_link_store, load_successor_arrays
+from nlink_lib.rules import Rule, add_rule_argument, rule_from_args
+from nlink_lib.title_index import resolve_ids_to_titles
 
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
@@ -70,6 +84,8 @@ def _load_successor_arrays(n: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
         FROM read_parquet('{NLINK_PATH.as_posix()}')
     """.strip()
 
+    import duckdb  # only this direct-scan path needs it
+
     t0 = time.time()
     con = duckdb.connect()
     tbl = con.execute(query).fetch_arrow_table()
@@ -195,70 +211,16 @@ def trace_once(
     return terminal, path, cycle_start
 
 
-def _resolve_titles(page_ids: Iterable[int]) -> dict[int, str]:
-    if not PAGES_PATH.exists():
-        return {}
-
-    unique_ids = sorted(set(int(x) for x in page_ids))
-    if not unique_ids:
-        return {}
-
-    id_tbl = pa.table({"page_id": pa.array(unique_ids, type=pa.int64())})
-
-    con = duckdb.connect()
-    con.register("trace_ids", id_tbl)
-
-    rows = con.execute(
-        f"""
-        SELECT p.page_id, p.title
-        FROM read_parquet('{PAGES_PATH.as_posix()}') p
-        JOIN trace_ids t USING (page_id)
-        """.strip()
-    ).fetchall()
-    con.close()
-
-    return {int(pid): str(title) for pid, title in rows}
-
-
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Sample many random N-link traces and summarize cycle statistics.")
-    parser.add_argument("--n", type=int, default=5, help="N for fixed N-link rule (default: 5)")
-    parser.add_argument("--num", type=int, default=100, help="Number of samples to draw (default: 100)")
-    parser.add_argument("--seed0", type=int, default=0, help="First RNG seed (default: 0)")
-    parser.add_argument(
-        "--min-outdegree",
-        type=int,
-        default=50,
-        help="When choosing a start page, require out_degree >= this (default: 50)",
-    )
-    parser.add_argument("--max-steps", type=int, default=5000, help="Stop after this many steps (default: 5000)")
-    parser.add_argument(
-        "--top-cycles",
-        type=int,
-        default=10,
-        help="Print the top-K most frequent cycles (default: 10)",
-    )
-    parser.add_argument(
-        "--resolve-titles",
-        action="store_true",
-        help="Resolve titles for nodes in the printed top cycles (slower)",
-    )
-    parser.add_argument(
-        "--out",
-        type=str,
-        default=None,
-        help="Optional output TSV path. Default: data/wikipedia/processed/analysis/sample_traces_n=...tsv",
-    )
-
-    args = parser.parse_args()
-
-    if args.n <= 0:
-        raise SystemExit("--n must be >= 1")
-    if args.num <= 0:
-        raise SystemExit("--num must be >= 1")
+def _sample_fixed(
+    args: argparse.Namespace, rule: Rule
+) -> tuple[list[SampleRow], Counter[str], Counter[tuple[int, ...]]]:
+    """Fixed mode: ``--num`` samples, one RNG seed per sample."""
 
     print(f"Using nlink data: {NLINK_PATH}")
-    page_ids, next_ids, out_degree = _load_successor_arrays(args.n)
+    if rule.n is not None:
+        page_ids, next_ids, out_degree = _load_successor_arrays(rule.n)
+    else:
+        page_ids, next_ids, out_degree = load_successor_arrays(rule)
 
     rows: list[SampleRow] = []
     term_counts: Counter[str] = Counter()
@@ -312,8 +274,155 @@ def main() -> None:
             rate = (i + 1) / max(dt, 1e-9)
             print(f"Sampled {i+1}/{args.num} traces ({rate:.1f} traces/sec)")
 
+    return rows, term_counts, cycle_counter
+
+
+def _sample_adaptive(
+    args: argparse.Namespace, rule: Rule
+) -> tuple[list[SampleRow], Counter[str], Counter[tuple[int, ...]], str]:
+    """Adaptive mode: batches until P_HALT and top-k cycle shares meet --ci-halfwidth."""
+
+    store = get_link_store()
+    succ = rule.successors(store)
+    out_degree = store.out_degree
+    page_ids = np.asarray(store.page_ids)
+
+    candidates = np.nonzero((succ >= 0) & (out_degree >= int(args.min_outdegree)))[0]
+    if len(candidates) == 0:
+        candidates = np.nonzero(succ >= 0)[0]
+    if len(candidates) == 0:
+        raise RuntimeError("No candidate pages found with a defined Nth link.")
+
+    config = AdaptiveConfig(
+        halfwidth=float(args.ci_halfwidth) / 100.0,
+        confidence=float(args.confidence),
+        method=args.ci_method,
+        batch_size=int(args.batch_size),
+        max_samples=int(args.max_num),
+        seed0=int(args.seed0),
+    )
+
+    rows: list[SampleRow] = []
+    term_counts: Counter[str] = Counter()
+    key_counts: Counter[int] = Counter()
+    canonical: dict[int, tuple[int, ...]] = {}
+
+    def _canonical_for_key(key: int) -> tuple[int, ...]:
+        if key not in canonical:
+            members = [key]
+            nxt = int(succ[key])
+            while nxt != key:
+                members.append(nxt)
+                nxt = int(succ[nxt])
+            canonical[key] = _canonical_cycle([int(page_ids[m]) for m in members])
+        return canonical[key]
+
+    def draw_batch(rng: np.random.Generator, size: int, first_index: int) -> None:
+        starts = candidates[rng.integers(0, len(candidates), size=size)]
+        bt = trace_batch(succ, starts, max_steps=int(args.max_steps))
+        names = bt.terminal_names
+        term_counts.update(names.tolist())
+        key_counts.update(bt.cycle_key[bt.terminal == CYCLE].tolist())
+        for i in range(size):
+            is_cycle = int(bt.terminal[i]) == CYCLE
+            rows.append(
+                SampleRow(
+                    seed=int(args.seed0) + first_index + i,
+                    start_page_id=int(page_ids[starts[i]]),
+                    terminal_type=str(names[i]),  # type: ignore[arg-type]
+                    steps=int(bt.path_len[i]) - 1,
+                    path_len=int(bt.path_len[i]),
+                    transient_len=int(bt.transient_len[i]) if is_cycle else None,
+                    cycle_len=int(bt.cycle_len[i]) if is_cycle else None,
+                )
+            )
+
+    def tracked_counts() -> tuple[dict[str, int], int]:
+        counts = {"P_HALT": int(term_counts.get("HALT", 0))}
+        for key, cnt in key_counts.most_common(int(args.ci_top_k)):
+            label = "-".join(str(pid) for pid in _canonical_for_key(int(key)))
+            counts[f"cycle_share[{label}]"] = int(cnt)
+        return counts, len(rows)
+
+    result = sample_until_precise(config, draw_batch=draw_batch, tracked_counts=tracked_counts)
+    status = "converged" if result.converged else "hit --max-num before converging"
+    print(f"Adaptive sampling {status} after {result.samples:,} samples")
+    for e in result.estimates:
+        print(f"  {e.metric}: {100.0 * e.estimate:.2f}% [{100.0 * e.lo:.2f}, {100.0 * e.hi:.2f}]")
+
+    cycle_counter: Counter[tuple[int, ...]] = Counter()
+    for key, cnt in key_counts.items():
+        cycle_counter[_canonical_for_key(int(key))] += int(cnt)
+    return rows, term_counts, cycle_counter, format_estimates_tsv(result, config)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sample many random N-link traces and summarize cycle statistics.")
+    parser.add_argument("--n", type=int, default=5, help="N for fixed N-link rule (default: 5)")
+    add_rule_argument(parser)
+    parser.add_argument("--num", type=int, default=100, help="Number of samples to draw (default: 100)")
+    parser.add_argument("--seed0", type=int, default=0, help="First RNG seed (default: 0)")
+    parser.add_argument(
+        "--min-outdegree",
+        type=int,
+        default=50,
+        help="When choosing a start page, require out_degree >= this (default: 50)",
+    )
+    parser.add_argument("--max-steps", type=int, default=5000, help="Stop after this many steps (default: 5000)")
+    parser.add_argument(
+        "--top-cycles",
+        type=int,
+        default=10,
+        help="Print the top-K most frequent cycles (default: 10)",
+    )
+    parser.add_argument(
+        "--resolve-titles",
+        action="store_true",
+        help="Resolve titles for nodes in the printed top cycles (slower)",
+    )
+    parser.add_argument(
+        "--out",
+        type=str,
+        default=None,
+        help="Optional output TSV path. Default: data/wikipedia/processed/analysis/sample_traces_n=...tsv",
+    )
+    parser.add_argument(
+        "--ci-halfwidth",
+        type=float,
+        default=None,
+        help="Adaptive mode: stop once P_HALT and top-k cycle shares are within ±this many percentage points",
+    )
+    parser.add_argument("--confidence", type=float, default=0.95, help="Adaptive mode: interval confidence (default: 0.95)")
+    parser.add_argument(
+        "--ci-method",
+        choices=["wilson", "bootstrap"],
+        default="wilson",
+        help="Adaptive mode: interval method (default: wilson)",
+    )
+    parser.add_argument("--ci-top-k", type=int, default=5, help="Adaptive mode: cycle shares tracked (default: 5)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Adaptive mode: samples per batch (default: 1000)")
+    parser.add_argument("--max-num", type=int, default=100_000, help="Adaptive mode: sample cap (default: 100000)")
+
+    args = parser.parse_args()
+
+    if args.n <= 0:
+        raise SystemExit("--n must be >= 1")
+    if args.num <= 0:
+        raise SystemExit("--num must be >= 1")
+    rule = rule_from_args(args)
+
+    ci_tsv: str | None = None
+    if args.ci_halfwidth is not None:
+        if args.ci_halfwidth <= 0:
+            raise SystemExit("--ci-halfwidth must be > 0")
+        print(f"Using link store for nlink data: {NLINK_PATH}")
+        rows, term_counts, cycle_counter, ci_tsv = _sample_adaptive(args, rule)
+    else:
+        rows, term_counts, cycle_counter = _sample_fixed(args, rule)
+    num = len(rows)
+
     ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
-    out_path = Path(args.out) if args.out else (ANALYSIS_DIR / f"sample_traces_n={args.n}_num={args.num}_seed0={args.seed0}.tsv")
+    out_path = Path(args.out) if args.out else (ANALYSIS_DIR / f"sample_traces_{rule.key}_num={num}_seed0={args.seed0}.tsv")
 
     header = "seed\tstart_page_id\tterminal_type\tsteps\tpath_len\ttransient_len\tcycle_len"
     lines = [header]
@@ -333,15 +442,20 @@ def main() -> None:
         )
 
     out_path.write_text("\n".join(lines), encoding="utf-8")
+    if ci_tsv is not None:
+        ci_path = out_path.with_name(out_path.stem + "_ci.tsv")
+        ci_path.write_text(ci_tsv, encoding="utf-8")
 
     print()
     print("=== Sampling Summary ===")
-    print(f"N={args.n}")
-    print(f"Samples: {args.num}")
+    print(rule.label)
+    print(f"Samples: {num}")
     print(f"min_outdegree: {args.min_outdegree}")
     print(f"max_steps: {args.max_steps}")
     print(f"Terminal counts: {dict(term_counts)}")
     print(f"Saved per-trace TSV: {out_path}")
+    if ci_tsv is not None:
+        print(f"Saved confidence intervals: {ci_path}")
 
     if args.top_cycles > 0 and len(cycle_counter) > 0:
         top = cycle_counter.most_common(int(args.top_cycles))
@@ -353,7 +467,7 @@ def main() -> None:
             ids_to_resolve: set[int] = set()
             for cyc, _cnt in top:
                 ids_to_resolve.update(cyc)
-            titles = _resolve_titles(ids_to_resolve)
+            titles = resolve_ids_to_titles(ids_to_resolve)
 
         for cyc, cnt in top:
             if args.resolve_titles and titles:
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Prefix / normalized title search for picking seeds and cycle titles.
+
+Queries are normalized (lowercase, spaces/underscores folded) so
+"gulf of ma" finds "Gulf_of_Maine". Results are ranked by inbound-link count
+(exact normalized matches first). Backed by the persistent index in
+nlink_lib/title_search.py, built lazily on first use.
+
+Outputs
+-------
+Prints a ranked table to stdout (page_id, in_degree, title).
+
+Usage
+-----
+  python n-link-analysis/scripts/search-titles.py "gulf of ma"
+  python n-link-analysis/scripts/search-titles.py mass --limit 50 --include-redirects
+  python n-link-analysis/scripts/search-titles.py --rebuild
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from nlink_lib.title_search import SEARCH_DIR, build_title_search_index, get_title_search_index, is_search_index_fresh
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Normalized prefix search over page titles.")
+    parser.add_argument("query", type=str, nargs="*", help="Title prefix(es) to search for")
+    parser.add_argument("--limit", type=int, default=20, help="Max results per query (default: 20)")
+    parser.add_argument("--namespace", type=int, default=0, help="Namespace to search (default: 0)")
+    parser.add_argument("--include-redirects", action="store_true", help="Include redirect titles in results")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the search index even if up to date")
+    args = parser.parse_args()
+
+    if args.rebuild or not is_search_index_fresh():
+        build_title_search_index()
+    elif not args.query:
+        print(f"Title search index is up to date: {SEARCH_DIR}")
+
+    if not args.query:
+        return
+
+    index = get_title_search_index()
+    for query in args.query:
+        t0 = time.perf_counter()
+        hits = index.search(
+            query,
+            limit=int(args.limit),
+            namespace=int(args.namespace),
+            include_redirects=bool(args.include_redirects),
+        )
+        dt = time.perf_counter() - t0
+        print(f"# query={query!r} hits={len(hits)} ({dt * 1e3:.2f} ms)")
+        print("page_id\tin_degree\ttitle")
+        for h in hits:
+            suffix = f"\t-> {h.redirect_to}" if h.is_redirect else ""
+            print(f"{h.page_id}\t{h.score}\t{h.title}{suffix}")
+
+
+if __name__ == "__main__":
+    main()
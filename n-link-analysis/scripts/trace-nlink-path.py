@@ -5,6 +5,7 @@ Goal
 ----
 Pick a starting Wikipedia page and follow the fixed N-link rule:
   f_N(page) = Nth outgoing link (ordered) if it exists, else HALT.
+or, with --rule, any traversal rule from nlink_lib/rules.py (mod=7, last=1, ...).
 
 This script is intentionally *not* a full basin analysis. It is a minimal
 "does the data produce long paths?" sanity check.
@@ -20,7 +21,10 @@ Notes
 -----
 - For performance, we scan nlink_sequences.parquet once to build arrays:
     page_id -> next_id for the chosen N, plus out_degree.
-  Then traversal uses binary search.
+  Then traversal uses binary search. Other rules gather the successor array
+  from the CSR link store instead (nlink_lib.link_store.load_successor_arrays),
+  whose pages also include link targets without a row in nlink_sequences
+  (out-degree 0, HALT). Starts need a successor, so they are never picked.
 - Titles are resolved *after* traversal in one query.
 
 """
@@ -33,9 +37,11 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Literal
 
-import duckdb
 import numpy as np
-import pyarrow as pa
+
+from nlink_lib.link_store import load_successor_arrays
+from nlink_lib.rules import Rule, add_rule_argument, rule_from_args
+from nlink_lib.title_index import resolve_ids_to_titles
 
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
@@ -50,7 +56,7 @@ TerminalType = Literal["HALT", "CYCLE", "MAX_STEPS"]
 
 @dataclass(frozen=True)
 class TraceResult:
-    n: int
+    rule: Rule
     start_page_id: int
     path_page_ids: list[int]
     terminal_type: TerminalType
@@ -78,6 +84,8 @@ def _load_successor_arrays(n: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
         FROM read_parquet('{NLINK_PATH.as_posix()}')
     """.strip()
 
+    import duckdb  # only this direct-scan path needs it
+
     t0 = time.time()
     con = duckdb.connect()
 
@@ -143,7 +151,7 @@ def _choose_start_page(
 
 def trace_path(
     *,
-    n: int,
+    rule: Rule,
     start_page_id: int,
     sorted_page_ids: np.ndarray,
     next_ids: np.ndarray,
@@ -178,7 +186,7 @@ def trace_path(
         current = nxt
 
     return TraceResult(
-        n=n,
+        rule=rule,
         start_page_id=start_page_id,
         path_page_ids=path,
         terminal_type=terminal_type,
@@ -187,29 +195,6 @@ def trace_path(
     )
 
 
-def _resolve_titles(page_ids: list[int]) -> dict[int, str]:
-    if not PAGES_PATH.exists():
-        return {}
-
-    unique_ids = sorted(set(page_ids))
-    id_tbl = pa.table({"page_id": pa.array(unique_ids, type=pa.int64())})
-
-    con = duckdb.connect()
-    con.register("trace_ids", id_tbl)
-
-    # No namespace filtering here: the goal is just to label IDs.
-    rows = con.execute(
-        f"""
-        SELECT p.page_id, p.title
-        FROM read_parquet('{PAGES_PATH.as_posix()}') p
-        JOIN trace_ids t USING (page_id)
-        """.strip()
-    ).fetchall()
-    con.close()
-
-    return {int(pid): str(title) for pid, title in rows}
-
-
 def _write_trace_file(
     *,
     out_path: Path,
@@ -219,7 +204,7 @@ def _write_trace_file(
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
     lines: list[str] = []
-    lines.append(f"N={trace.n}")
+    lines.append(trace.rule.label)
     lines.append(f"start_page_id={trace.start_page_id}")
     lines.append(f"terminal_type={trace.terminal_type}")
     if trace.terminal_type == "CYCLE" and trace.cycle_start_index is not None:
@@ -251,7 +236,7 @@ def _print_summary(
 
     print()
     print("=== N-Link Trace (Sanity Check) ===")
-    print(f"N: {trace.n}")
+    print(f"Rule: {trace.rule.label}")
     print(f"Start: {trace.start_page_id}  {start_title}")
     print(f"Terminal: {trace.terminal_type}")
 
@@ -303,6 +288,7 @@ def _print_summary(
 def main() -> None:
     parser = argparse.ArgumentParser(description="Trace a single fixed-N link path and report basic stats.")
     parser.add_argument("--n", type=int, default=5, help="N for the fixed N-link rule (default: 5)")
+    add_rule_argument(parser)
     parser.add_argument("--start-page-id", type=int, default=None, help="Optional explicit starting page_id")
     parser.add_argument(
         "--min-outdegree",
@@ -327,9 +313,13 @@ def main() -> None:
 
     if args.n <= 0:
         raise SystemExit("--n must be >= 1")
+    rule = rule_from_args(args)
 
     print(f"Using nlink data: {NLINK_PATH}")
-    page_ids, next_ids, out_degree = _load_successor_arrays(args.n)
+    if rule.n is not None:
+        page_ids, next_ids, out_degree = _load_successor_arrays(rule.n)
+    else:
+        page_ids, next_ids, out_degree = load_successor_arrays(rule)
 
     if args.start_page_id is None:
         start_page_id = _choose_start_page(
@@ -343,19 +333,19 @@ def main() -> None:
         start_page_id = int(args.start_page_id)
 
     trace = trace_path(
-        n=args.n,
+        rule=rule,
         start_page_id=start_page_id,
         sorted_page_ids=page_ids,
         next_ids=next_ids,
         max_steps=args.max_steps,
     )
 
-    titles = _resolve_titles(trace.path_page_ids)
+    titles = resolve_ids_to_titles(trace.path_page_ids)
 
     trace_file: Path | None = None
     if not args.no_save:
         ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
-        trace_file = ANALYSIS_DIR / f"trace_n={trace.n}_start={trace.start_page_id}.tsv"
+        trace_file = ANALYSIS_DIR / f"trace_{trace.rule.key}_start={trace.start_page_id}.tsv"
         _write_trace_file(out_path=trace_file, trace=trace, titles=titles)
 
     _print_summary(
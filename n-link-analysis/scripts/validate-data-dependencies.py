@@ -7,6 +7,28 @@ Checks:
 3. Basic data integrity (row counts, null checks, type validation)
 4. Cross-file consistency (page_id references)
 
+Modes:
+  quick (default)  Row counts, NULL counts and min/max from the Parquet footer
+                   statistics; page_id uniqueness from one read of the page_id
+                   column (a sortedness check, sorting only if unsorted); the
+                   nlink_sequences -> pages reference check as a sorted-array
+                   membership test (np.searchsorted) over --sample sampled
+                   page_ids, so the missing share is an estimate.
+  full             DuckDB scans of every file: exact NULL and DISTINCT counts,
+                   link-sequence length quantiles, namespace distribution and a
+                   LEFT JOIN of nlink_sequences to pages.
+
+The result of a run is cached in analysis/validation_cache.json, keyed by the
+sha256 of the required files and of this script (hashes memoized by size and
+mtime, so an unchanged tree is not re-read). A later run with the same inputs
+replays the cached report instead of validating again; a cached full pass also
+answers a quick run. --no-cache always validates.
+
+Usage:
+  python validate-data-dependencies.py              # quick, cached
+  python validate-data-dependencies.py --mode full  # exhaustive scans
+  python validate-data-dependencies.py --no-cache --sample 1000000
+
 Exit codes:
   0 = All checks passed
   1 = Validation errors found
@@ -14,15 +36,30 @@ Exit codes:
 
 from __future__ import annotations
 
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
 import sys
+import time
+from functools import lru_cache
 from pathlib import Path
 
 import duckdb
+import numpy as np
 import pyarrow.parquet as pq
 
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 PROCESSED_DIR = REPO_ROOT / "data" / "wikipedia" / "processed"
+CACHE_PATH = PROCESSED_DIR / "analysis" / "validation_cache.json"
+CACHE_VERSION = 1
+MODES = ("quick", "full")
+MISSING_PAGE_ID_ERROR_PCT = 1.0
+
+_HASH_CHUNK = 8 * 1024 * 1024
 
 # Required files with expected schemas
 REQUIRED_FILES = {
@@ -183,6 +220,127 @@ def check_data_integrity(file_path: Path, file_info: dict) -> bool:
         return False
 
 
+def _footer_column_stats(file_path: Path, col: str) -> tuple[int | None, object, object]:
+    """(NULL count, min, max) of a top-level column from the footer; None where a row group lacks statistics."""
+
+    meta = pq.read_metadata(file_path)
+    index = next((i for i in range(meta.num_columns) if meta.schema.column(i).path == col), None)
+    if index is None:
+        return None, None, None
+    nulls: int | None = 0
+    lo = hi = None
+    for rg in range(meta.num_row_groups):
+        stats = meta.row_group(rg).column(index).statistics
+        if stats is None or not stats.has_null_count:
+            nulls = None
+        elif nulls is not None:
+            nulls += int(stats.null_count)
+        if stats is not None and stats.has_min_max:
+            lo = stats.min if lo is None else min(lo, stats.min)
+            hi = stats.max if hi is None else max(hi, stats.max)
+    return nulls, lo, hi
+
+
+@lru_cache(maxsize=None)
+def _sorted_page_ids(file_path: Path) -> tuple[np.ndarray, int]:
+    """(sorted non-NULL page_ids, number of duplicates) from one read of the page_id column."""
+
+    ids = pq.read_table(file_path, columns=["page_id"]).column("page_id").drop_null().to_numpy()
+    if len(ids) > 1 and not bool(np.all(ids[1:] > ids[:-1])):
+        ids = np.sort(ids)
+    duplicates = int(np.count_nonzero(ids[1:] == ids[:-1])) if len(ids) > 1 else 0
+    return ids, duplicates
+
+
+def check_data_integrity_quick(file_path: Path, file_info: dict) -> bool:
+    """Integrity checks from the Parquet footer plus one page_id column read."""
+    try:
+        meta = pq.read_metadata(file_path)
+        row_count = int(meta.num_rows)
+        print(f"    ✓ Row count (footer): {row_count:,} in {meta.num_row_groups} row groups")
+
+        if row_count == 0:
+            print("    ✗ WARNING: Empty table")
+            return False
+
+        for col in file_info.get("columns", {}):
+            null_count, lo, hi = _footer_column_stats(file_path, col)
+            if null_count is None:
+                print(f"    ℹ Column '{col}': no footer NULL statistics (checked in --mode full)")
+                continue
+            if null_count > 0:
+                print(f"    ⚠ Column '{col}' has {null_count:,} NULL values ({100*null_count/row_count:.2f}%)")
+            if col == "page_id" and lo is not None:
+                print(f"    ✓ page_id range: {lo:,} .. {hi:,}")
+
+        _, duplicates = _sorted_page_ids(file_path)
+        if duplicates:
+            print(f"    ✗ Duplicate page_ids: {duplicates:,} duplicates")
+            return False
+        print("    ✓ All page_ids unique")
+
+        if file_path.stem == "nlink_sequences":
+            elements = sum(
+                meta.row_group(rg).column(i).num_values
+                for rg in range(meta.num_row_groups)
+                for i in range(meta.num_columns)
+                if meta.schema.column(i).path.startswith("link_sequence.")
+            )
+            print(f"    ✓ Link sequence lengths: avg≈{elements / row_count:.1f} (footer value count; quantiles in --mode full)")
+
+        return True
+
+    except Exception as e:
+        print(f"    ✗ Integrity check error: {e}")
+        return False
+
+
+def check_cross_file_consistency_quick(sample: int, seed: int = 0) -> bool:
+    """Sampled nlink_sequences page_ids looked up in the sorted pages page_ids; counts from the footers."""
+    print("\n## Cross-File Consistency Checks")
+
+    nlink_path = PROCESSED_DIR / "nlink_sequences.parquet"
+    pages_path = PROCESSED_DIR / "pages.parquet"
+
+    if not (nlink_path.exists() and pages_path.exists()):
+        print("  ⚠ Skipping (required files not present)")
+        return True
+
+    try:
+        page_ids, _ = _sorted_page_ids(pages_path)
+        nlink_ids, _ = _sorted_page_ids(nlink_path)
+        if sample >= len(nlink_ids):
+            probe = nlink_ids
+        else:
+            probe = np.random.default_rng(seed).choice(nlink_ids, size=sample, replace=False)
+        pos = np.searchsorted(page_ids, probe)
+        found = pos < len(page_ids)
+        found[found] = page_ids[pos[found]] == probe[found]
+        missing = int(len(probe) - np.count_nonzero(found))
+        exact = len(probe) == len(nlink_ids)
+        scope = "" if exact else f" ({len(probe):,} sampled)"
+
+        if missing > 0:
+            missing_pct = 100 * missing / len(probe)
+            estimate = "" if exact else "est. "
+            if missing_pct > MISSING_PAGE_ID_ERROR_PCT:
+                print(f"  ✗ {missing:,} page_ids in nlink_sequences missing from pages{scope} ({estimate}{missing_pct:.2f}%)")
+                return False
+            print(f"  ⚠ {missing:,} page_ids in nlink_sequences missing from pages{scope} ({estimate}{missing_pct:.4f}%) - minor, likely edge cases")
+        else:
+            print(f"  ✓ All nlink_sequences page_ids exist in pages{scope}")
+
+        with_sequences = pq.read_metadata(nlink_path).num_rows
+        total_pages = pq.read_metadata(pages_path).num_rows
+        coverage_pct = 100 * with_sequences / total_pages
+        print(f"  ✓ Coverage: {with_sequences:,} / {total_pages:,} pages have sequences ({coverage_pct:.1f}%)")
+        return True
+
+    except Exception as e:
+        print(f"  ✗ Consistency check error: {e}")
+        return False
+
+
 def check_cross_file_consistency() -> bool:
     """Check consistency between nlink_sequences and pages."""
     print("\n## Cross-File Consistency Checks")
@@ -214,7 +372,7 @@ def check_cross_file_consistency() -> bool:
 
         if missing > 0:
             missing_pct = 100 * missing / total_nlink
-            if missing_pct > 1.0:
+            if missing_pct > MISSING_PAGE_ID_ERROR_PCT:
                 # Only error if >1% missing
                 print(f"  ✗ {missing:,} page_ids in nlink_sequences missing from pages ({missing_pct:.2f}%)")
                 return False
@@ -244,9 +402,115 @@ def check_cross_file_consistency() -> bool:
         return False
 
 
+def _file_sha256(path: Path, memo: dict) -> str | None:
+    """sha256 of a file, reusing ``memo`` ([size, mtime_ns, sha256]) when size and mtime match."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    key = str(path)
+    known = memo.get(key)
+    if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+        return known[2]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK):
+            h.update(chunk)
+    memo[key] = [int(st.st_size), int(st.st_mtime_ns), h.hexdigest()]
+    return memo[key][2]
+
+
+def _load_cache() -> dict:
+    try:
+        data = json.loads(CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {"version": CACHE_VERSION, "files": {}, "results": {}}
+    if data.get("version") != CACHE_VERSION:
+        return {"version": CACHE_VERSION, "files": {}, "results": {}}
+    return data
+
+
+def _save_cache(cache: dict) -> None:
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = CACHE_PATH.with_name(CACHE_PATH.name + f".tmp-{os.getpid()}")
+    tmp.write_text(json.dumps(cache, indent=1, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, CACHE_PATH)
+
+
+def _cache_key(cache: dict, mode: str, sample: int) -> str:
+    """Hash of the mode, the sample size, this script and every required file (None if missing)."""
+    files = {name: _file_sha256(PROCESSED_DIR / name, cache["files"]) for name in sorted(REQUIRED_FILES)}
+    payload = {
+        "mode": mode,
+        "sample": sample if mode == "quick" else None,
+        "script": _file_sha256(Path(__file__).resolve(), cache["files"]),
+        "files": files,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class _Tee(io.TextIOBase):
+    """Write to the real stdout and keep a copy (the report stored in the cache)."""
+
+    def __init__(self, stream) -> None:
+        self.stream = stream
+        self.copy = io.StringIO()
+
+    def write(self, text: str) -> int:
+        self.stream.write(text)
+        self.copy.write(text)
+        return len(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
 def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Validate the data files the N-Link analysis scripts depend on.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("--mode", choices=MODES, default="quick", help="quick: footer statistics + sampled references (default); full: DuckDB scans")
+    parser.add_argument("--sample", type=int, default=100_000, help="page_ids sampled for the quick reference check (default: 100000)")
+    parser.add_argument("--no-cache", action="store_true", help="Validate even when the inputs match a cached result")
+    args = parser.parse_args()
+    if args.sample <= 0:
+        raise SystemExit("--sample must be >= 1")
+
+    t0 = time.time()
+    cache = _load_cache()
+    keys = {mode: _cache_key(cache, mode, args.sample) for mode in MODES if mode == args.mode or mode == "full"}
+    if not args.no_cache:
+        for mode, key in keys.items():
+            hit = cache["results"].get(key)
+            if hit:
+                print(hit["report"], end="")
+                print(
+                    f"\n(cached {hit['mode']} result from {hit['validated_at']}: required files and "
+                    f"validator unchanged; {time.time() - t0:.2f}s. Use --no-cache to re-validate.)"
+                )
+                _save_cache(cache)
+                return 0 if hit["passed"] else 1
+
+    tee = _Tee(sys.stdout)
+    with contextlib.redirect_stdout(tee):
+        status = _validate(args.mode, args.sample)
+        print(f"\n({args.mode} validation in {time.time() - t0:.1f}s)")
+    cache["results"] = {k: v for k, v in cache["results"].items() if k in keys.values()}
+    cache["results"][keys[args.mode]] = {
+        "mode": args.mode,
+        "passed": status == 0,
+        "validated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "report": tee.copy.getvalue(),
+    }
+    _save_cache(cache)
+    return status
+
+
+def _validate(mode: str, sample: int) -> int:
     print("=" * 80)
-    print("N-Link Analysis Data Dependency Validation")
+    print(f"N-Link Analysis Data Dependency Validation ({mode})")
     print("=" * 80)
 
     all_passed = True
@@ -266,7 +530,8 @@ def main() -> int:
             all_passed = False
             continue
 
-        if not check_data_integrity(file_path, info):
+        integrity = check_data_integrity_quick if mode == "quick" else check_data_integrity
+        if not integrity(file_path, info):
             all_passed = False
 
     # Check optional files
@@ -278,7 +543,8 @@ def main() -> int:
         print(f"  {status}: {filename} - {description}")
 
     # Cross-file checks
-    if not check_cross_file_consistency():
+    consistent = check_cross_file_consistency_quick(sample) if mode == "quick" else check_cross_file_consistency()
+    if not consistent:
         all_passed = False
 
     # Check analysis output directory
@@ -13,38 +13,39 @@ Multiple PNG charts showing:
 2. HALT rate vs N (fragmentation indicator)
 3. Path length vs N (overall path survival)
 4. Bottleneck depth vs N (where concentration occurs)
+
+Reads the ``path_characteristics_summary`` results (analyze-path-characteristics.py
+--tag mechanism) of all N from the results store in one query.
 """
 
 from pathlib import Path
 import matplotlib.pyplot as plt
 import matplotlib.gridspec as gridspec
 
+from nlink_lib.results_store import n_key, query
+
 REPO_ROOT = Path(__file__).resolve().parents[2]
 ANALYSIS_DIR = REPO_ROOT / "data" / "wikipedia" / "processed" / "analysis"
 REPORT_DIR = REPO_ROOT / "n-link-analysis" / "report" / "assets"
 
 
-def load_summary(n: int, tag: str = "mechanism") -> dict[str, float]:
-    """Load summary statistics for a given N."""
-    path = ANALYSIS_DIR / f"path_characteristics_n={n}_{tag}_summary.tsv"
-    if not path.exists():
-        raise FileNotFoundError(f"Missing summary file: {path}")
-
-    data = {}
-    for line in path.read_text(encoding="utf-8").strip().split("\n")[1:]:  # Skip header
-        key, value = line.split("\t")
-        try:
-            data[key] = float(value)
-        except ValueError:
-            data[key] = value
+def load_summaries(ns: list[int], tag: str = "mechanism") -> dict[int, dict[str, float]]:
+    """Load summary statistics (metric -> value) for each N."""
+    table = query("path_characteristics_summary", n=ns, tag=tag).to_pandas()
+    missing = [n for n in ns if n_key(n) not in set(table["n"])]
+    if missing:
+        raise FileNotFoundError(f"Missing path_characteristics_summary results (tag={tag}) for N={missing}")
 
-    return data
+    return {
+        int(n): dict(zip(df["metric"], df["value"].astype(float)))
+        for n, df in table.groupby("n")
+    }
 
 
 def main() -> None:
     # Load data for N=3,4,5,6,7
     ns = [3, 4, 5, 6, 7]
-    summaries = {n: load_summary(n) for n in ns}
+    summaries = load_summaries(ns)
 
     # Extract key metrics
     halt_rates = [summaries[n]["halt_pct"] for n in ns]
@@ -0,0 +1,94 @@
+"""Shared fixtures for the nlink_lib tests.
+
+The scripts import ``nlink_lib`` from scripts/, so that directory goes on
+sys.path. Tests pass explicit store / results roots and never touch the
+analysis directory under data/.
+
+Two graphs are shared: ``link_store`` is a hand-made graph with the edge cases
+the traversal rules care about, and ``synthetic_store`` is a small
+nlink_lib.synthetic_wiki dataset (planted cycles, redirects, other namespaces)
+that the whole-graph modules are checked against by brute force.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1] / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+def _sequences(seed: int = 7) -> dict[int, list[int] | None]:
+    """Small graph with the cases the rules treat specially.
+
+    Self-links, a 2-cycle under f_2, a page with 100 links (frac rounding),
+    empty and null sequences, and link targets without a sequence of their
+    own (target-only pages, out-degree 0 in the store).
+    """
+
+    rng = np.random.default_rng(seed)
+    pages = list(range(10, 410, 2))
+    target_only = list(range(1001, 1021))
+    universe = pages + target_only
+    seqs: dict[int, list[int] | None] = {}
+    for page in pages:
+        degree = int(rng.integers(0, 13))
+        seqs[page] = [int(t) for t in rng.choice(universe, size=degree)]
+    seqs[10] = [10, 10, 12, 14]  # self-link at N=2; 12 points straight back
+    seqs[12] = [16, 10, 14]
+    seqs[14] = [18, 16, 20]
+    seqs[16] = [20, 14, 18]  # 14 <-> 16 is a 2-cycle under f_2
+    seqs[18] = [int(t) for t in rng.choice(universe, size=100)]
+    seqs[20] = []
+    seqs[22] = None
+    return seqs
+
+
+@pytest.fixture(scope="session")
+def sequences() -> dict[int, list[int] | None]:
+    return _sequences()
+
+
+@pytest.fixture(scope="session")
+def link_store(sequences, tmp_path_factory):
+    """LinkStore built from a small nlink_sequences.parquet."""
+
+    from nlink_lib.link_store import LinkStore, build_link_store
+
+    base = tmp_path_factory.mktemp("link_store")
+    nlink_path = base / "nlink_sequences.parquet"
+    table = pa.table({
+        "page_id": pa.array(list(sequences), type=pa.int64()),
+        "link_sequence": pa.array(list(sequences.values()), type=pa.list_(pa.int64())),
+    })
+    pq.write_table(table, nlink_path)
+    store_dir = build_link_store(store_dir=base / "store", nlink_path=nlink_path)
+    return LinkStore(store_dir)
+
+
+@pytest.fixture(scope="session")
+def synthetic_dir(tmp_path_factory) -> Path:
+    """Processed Parquet files of a 2,000-page synthetic wiki with three planted cycles at N=5."""
+
+    from nlink_lib.synthetic_wiki import SyntheticSpec, build_wiki, write_processed
+
+    processed_dir = tmp_path_factory.mktemp("synthetic") / "processed"
+    write_processed(build_wiki(SyntheticSpec(pages=2000, seed=3, cycles=3)), processed_dir)
+    return processed_dir
+
+
+@pytest.fixture(scope="session")
+def synthetic_store(synthetic_dir):
+    """LinkStore over the synthetic wiki's nlink_sequences.parquet."""
+
+    from nlink_lib.link_store import LinkStore, build_link_store
+
+    return LinkStore(build_link_store(store_dir=synthetic_dir.parent / "store", nlink_path=synthetic_dir / "nlink_sequences.parquet"))
@@ -0,0 +1,108 @@
+"""Adaptive sampling against the exact terminal shares of the synthetic wiki at N=5."""
+
+from __future__ import annotations
+
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from nlink_lib.adaptive_sampling import AdaptiveConfig, sample_until_precise, wilson_interval, z_for_confidence
+from nlink_lib.batch_trace import CYCLE, HALT, trace_batch
+from nlink_lib.decomposition import decompose
+
+
+N = 5
+
+
+@pytest.fixture(scope="module")
+def population(synthetic_store) -> dict[str, object]:
+    """Successors and the exact share of each terminal over all pages (the brute-force answer)."""
+
+    succ = synthetic_store.successors(N)
+    cycle_id = decompose(succ)["cycle_id"]
+    shares = {"P_HALT": float((cycle_id < 0).mean())}
+    for cycle, count in Counter(cycle_id[cycle_id >= 0].tolist()).items():
+        shares[f"cycle_share[{cycle}]"] = count / len(succ)
+    return {"succ": succ, "cycle_id": cycle_id, "shares": shares}
+
+
+def _run(config: AdaptiveConfig, population) -> tuple[object, list[np.ndarray], dict[str, int]]:
+    succ = population["succ"]
+    draws: list[np.ndarray] = []
+    counts: Counter[str] = Counter()
+
+    def draw_batch(rng: np.random.Generator, size: int, first_index: int) -> None:
+        assert first_index == sum(len(d) for d in draws)
+        starts = rng.integers(0, len(succ), size=size)
+        bt = trace_batch(succ, starts, max_steps=len(succ))
+        draws.append(starts)
+        counts["P_HALT"] += int((bt.terminal == HALT).sum())
+        counts.update(f"cycle_share[{key}]" for key in bt.cycle_key[bt.terminal == CYCLE].tolist())
+
+    def tracked_counts() -> tuple[dict[str, int], int]:
+        tracked = {metric: counts[metric] for metric in population["shares"]}
+        return tracked, sum(len(d) for d in draws)
+
+    return sample_until_precise(config, draw_batch=draw_batch, tracked_counts=tracked_counts), draws, dict(counts)
+
+
+@pytest.mark.parametrize("method", ["wilson", "bootstrap"])
+def test_converges_around_population_shares(method, population):
+    config = AdaptiveConfig(halfwidth=0.02, method=method, batch_size=500, seed0=4)
+    result, draws, _ = _run(config, population)
+
+    assert result.converged
+    assert result.samples == sum(len(d) for d in draws) == result.batches * config.batch_size
+    # Recount the drawn starts from the decomposition instead of the traces.
+    cycle_id = population["cycle_id"][np.concatenate(draws)]
+    for e in result.estimates:
+        label = e.metric[len("cycle_share[") : -1] if e.metric.startswith("cycle_share") else None
+        assert e.successes == int((cycle_id < 0).sum() if label is None else (cycle_id == int(label)).sum())
+        assert e.total == result.samples
+        assert e.lo <= e.estimate <= e.hi
+        assert e.halfwidth <= config.halfwidth
+        # Every estimate is near the exact share (2x the 95% halfwidth is about 4 standard errors).
+        assert abs(e.estimate - population["shares"][e.metric]) <= 2 * config.halfwidth
+
+    if method == "wilson" and result.batches > 1:
+        # One batch fewer would not have been precise enough.
+        head = cycle_id[: result.samples - config.batch_size]
+        k = np.array([(head < 0).sum()] + [(head == c).sum() for c in np.unique(population["cycle_id"][population["cycle_id"] >= 0])])
+        lo, hi = wilson_interval(k, len(head), z_for_confidence(config.confidence))
+        assert ((hi - lo) / 2).max() > config.halfwidth
+
+
+def test_same_seed_same_samples(population):
+    config = AdaptiveConfig(halfwidth=0.03, batch_size=200, seed0=11)
+    first, first_draws, first_counts = _run(config, population)
+    second, second_draws, second_counts = _run(config, population)
+    assert first == second
+    assert first_counts == second_counts
+    assert len(first_draws) == len(second_draws)
+    assert all(np.array_equal(a, b) for a, b in zip(first_draws, second_draws))
+
+    _, other_draws, _ = _run(AdaptiveConfig(halfwidth=0.03, batch_size=200, seed0=12), population)
+    assert not np.array_equal(first_draws[0], other_draws[0])
+
+
+def test_stops_at_max_samples(population):
+    config = AdaptiveConfig(halfwidth=0.001, batch_size=300, max_samples=1000, seed0=1)
+    result, draws, _ = _run(config, population)
+    assert not result.converged
+    assert [len(d) for d in draws] == [300, 300, 300, 100]
+    assert result.samples == 1000
+
+
+def test_wilson_interval_bounds():
+    z = z_for_confidence(0.95)
+    assert z == pytest.approx(1.959964, abs=1e-6)
+    n = 400
+    k = np.arange(0, n + 1, 20)
+    lo, hi = wilson_interval(k, n, z)
+    p_hat = k / n
+    # Wilson bounds are the p with |p_hat - p| = z * sqrt(p (1 - p) / n).
+    for bound in (lo, hi):
+        assert np.allclose((p_hat - bound) ** 2, z * z * bound * (1 - bound) / n)
+    assert (lo <= p_hat + 1e-12).all() and (p_hat <= hi + 1e-12).all()
+    assert lo[0] == pytest.approx(0.0) and hi[-1] == pytest.approx(1.0)
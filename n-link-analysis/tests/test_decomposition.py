@@ -0,0 +1,81 @@
+"""Decomposition arrays against per-node walks on the synthetic wiki."""
+
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+
+from nlink_lib.decomposition import Decomposition, build_decomposition, decompose, load_decomposition
+from nlink_lib.rules import parse_rule
+
+
+def _walk(succ: np.ndarray, start: int) -> tuple[list[int], list[int]]:
+    """(transient nodes, cycle nodes) of the f_N path from ``start``; no cycle nodes means HALT."""
+
+    path: list[int] = []
+    seen: dict[int, int] = {}
+    node = start
+    while node >= 0 and node not in seen:
+        seen[node] = len(path)
+        path.append(node)
+        node = int(succ[node])
+    if node < 0:
+        return path, []
+    return path[: seen[node]], path[seen[node] :]
+
+
+def _reference(succ: np.ndarray) -> dict[str, np.ndarray]:
+    num_nodes = len(succ)
+    on_cycle = np.zeros(num_nodes, dtype=bool)
+    cycle_id = np.full(num_nodes, -1, dtype=np.int64)
+    halt_node = np.full(num_nodes, -1, dtype=np.int64)
+    depth = np.zeros(num_nodes, dtype=np.int64)
+    for v in range(num_nodes):
+        transient, cycle = _walk(succ, v)
+        if cycle:
+            on_cycle[v] = not transient
+            cycle_id[v] = min(cycle)
+            depth[v] = len(transient)
+        else:
+            halt_node[v] = transient[-1]
+            depth[v] = len(transient) - 1
+    return {"on_cycle": on_cycle, "cycle_id": cycle_id, "halt_node": halt_node, "depth": depth}
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 4, 5])
+def test_decompose_matches_walks(n, synthetic_store):
+    succ = synthetic_store.successors(n)
+    got = decompose(succ)
+    expected = _reference(succ)
+    for name, arr in expected.items():
+        assert got[name].tolist() == arr.tolist(), name
+
+
+def test_planted_basins(synthetic_dir, synthetic_store, tmp_path):
+    truth = json.loads((synthetic_dir / "synthetic_truth.json").read_text(encoding="utf-8"))
+    n = int(truth["spec"]["plant_n"])
+    decomp = load_decomposition(build_decomposition(synthetic_store, n, out_dir=tmp_path / "n=5"), n)
+    assert decomp.n == n
+
+    sizes = decomp.basin_sizes()
+    for cycle in truth["planted_cycles"]:
+        members = synthetic_store.dense_ids(cycle["page_ids"])
+        cycle_id = int(members.min())
+        assert decomp.on_cycle[members].all()
+        assert sorted(decomp.cycle_members(cycle_id).tolist()) == sorted(members.tolist())
+        assert sizes[cycle_id] == cycle["basin_size"]
+
+
+def test_layers_partition_by_depth(synthetic_store):
+    decomp = Decomposition(rule=parse_rule(3), **decompose(synthetic_store.successors(3)))
+    depth = np.asarray(decomp.depth)
+    seen = np.zeros(len(decomp), dtype=bool)
+    for d, nodes in decomp.layers():
+        assert nodes.tolist() == np.nonzero(depth == d)[0].tolist()
+        deeper = nodes[depth[nodes] > 0]
+        assert (depth[np.asarray(decomp.succ)[deeper]] == d - 1).all()
+        seen[nodes] = True
+    assert seen.all()
+    assert decomp.cycle_ids().tolist() == sorted({int(c) for c in np.asarray(decomp.cycle_id)[np.asarray(decomp.on_cycle)]})
@@ -0,0 +1,81 @@
+"""Euler-tour intervals against explicit f_N paths on the synthetic wiki."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from nlink_lib.decomposition import Decomposition, decompose
+from nlink_lib.euler_tour import EulerTour, compute_euler_tour
+from nlink_lib.rules import parse_rule
+
+
+def _tour(store, n: int) -> EulerTour:
+    decomp = Decomposition(rule=parse_rule(n), **decompose(store.successors(n)))
+    return EulerTour(decomp=decomp, **compute_euler_tour(decomp))
+
+
+def _paths(succ: np.ndarray) -> list[list[int]]:
+    """Every node's f_N path, up to and including the whole cycle it ends on (or its HALT node)."""
+
+    paths = []
+    for start in range(len(succ)):
+        path: list[int] = []
+        seen: set[int] = set()
+        node = start
+        while node >= 0 and node not in seen:
+            seen.add(node)
+            path.append(node)
+            node = int(succ[node])
+        paths.append(path)
+    return paths
+
+
+def _to_root(path: list[int], depth: np.ndarray) -> list[int]:
+    """Prefix of a path up to its first depth-0 node (the root of its tree)."""
+
+    for i, node in enumerate(path):
+        if depth[node] == 0:
+            return path[: i + 1]
+    raise AssertionError("path without a root")
+
+
+@pytest.mark.parametrize("n", [1, 3, 5])
+def test_subtree_and_basin_match_paths(n, synthetic_store):
+    tour = _tour(synthetic_store, n)
+    decomp = tour.decomp
+    depth = np.asarray(decomp.depth)
+    paths = _paths(np.asarray(decomp.succ))
+
+    members: dict[int, set[int]] = {}
+    for start, path in enumerate(paths):
+        for node in _to_root(path, depth):
+            members.setdefault(node, set()).add(start)
+    assert sorted(tour.order.tolist()) == list(range(len(tour)))
+    for node in range(len(tour)):
+        subtree = tour.subtree(node)
+        assert int(subtree[0]) == node
+        assert set(subtree.tolist()) == members[node]
+        assert len(subtree) == tour.subtree_size(node)
+
+    cycle_id = np.asarray(decomp.cycle_id)
+    for cycle in decomp.cycle_ids():
+        assert sorted(tour.basin(int(cycle)).tolist()) == np.nonzero(cycle_id == cycle)[0].tolist()
+    halt_node = np.asarray(decomp.halt_node)
+    for halt in np.unique(halt_node[halt_node >= 0])[:50]:
+        assert sorted(tour.basin(int(halt)).tolist()) == np.nonzero(halt_node == halt)[0].tolist()
+
+
+@pytest.mark.parametrize("n", [1, 3, 5])
+def test_is_upstream_matches_paths(n, synthetic_store):
+    tour = _tour(synthetic_store, n)
+    paths = _paths(np.asarray(tour.decomp.succ))
+    rng = np.random.default_rng(n)
+    a = rng.choice(len(tour), size=200, replace=False)
+    b = np.arange(len(tour))
+
+    expected = np.zeros((len(a), len(b)), dtype=bool)
+    for i, start in enumerate(a):
+        expected[i, paths[int(start)]] = True
+    assert (tour.is_upstream(a[:, None], b[None, :]) == expected).all()
+    assert tour.is_upstream(int(a[0]), int(a[0]))
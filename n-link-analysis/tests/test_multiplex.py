@@ -0,0 +1,115 @@
+"""Multiplex rule switching against a 0-1 BFS over (page, N) states on the synthetic wiki."""
+
+from __future__ import annotations
+
+from collections import deque
+
+import numpy as np
+import pytest
+
+import nlink_lib.multiplex as multiplex
+from nlink_lib.decomposition import Decomposition, decompose
+from nlink_lib.rules import parse_rule
+
+
+N_VALUES = (1, 3, 4, 5)
+
+
+@pytest.fixture(scope="module")
+def mx(synthetic_store):
+    decomps = {n: Decomposition(rule=parse_rule(n), **decompose(synthetic_store.successors(n))) for n in N_VALUES}
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(multiplex, "get_decomposition", lambda n: decomps[int(n)])
+        yield multiplex.Multiplex(N_VALUES)
+
+
+def _switch_distances(mx: multiplex.Multiplex, target: int) -> np.ndarray:
+    """(K, nodes) fewest switches from each state into ``target``'s basin: reverse 0-1 BFS from the basin."""
+
+    num_layers, num_nodes = mx.num_layers, len(mx)
+    preds: list[list[list[int]]] = []
+    for decomp in mx.decomps:
+        rev: list[list[int]] = [[] for _ in range(num_nodes)]
+        for v, s in enumerate(np.asarray(decomp.succ).tolist()):
+            if s >= 0:
+                rev[s].append(v)
+        preds.append(rev)
+
+    dist = np.full((num_layers, num_nodes), -1, dtype=np.int64)
+    queue: deque[tuple[int, int, int]] = deque()
+    for k in range(num_layers):
+        for v in np.nonzero(mx.terminals(k) == target)[0].tolist():
+            queue.append((0, k, v))
+    while queue:
+        d, k, v = queue.popleft()
+        if dist[k, v] >= 0:
+            continue
+        dist[k, v] = d
+        for u in preds[k][v]:
+            if dist[k, u] < 0:
+                queue.appendleft((d, k, u))
+        for other in range(num_layers):
+            if other != k and dist[other, v] < 0:
+                queue.append((d + 1, other, v))
+    return dist
+
+
+def _check_path(mx: multiplex.Multiplex, path: multiplex.SwitchPath, start: int, target: int) -> None:
+    assert int(path.nodes[0]) == start
+    assert int(path.nodes[-1]) in set(mx.catalog.cycle_members(target).tolist())
+    switches = 0
+    for i in range(1, len(path.nodes)):
+        prev, cur = int(path.nodes[i - 1]), int(path.nodes[i])
+        if int(path.n[i]) != int(path.n[i - 1]):
+            assert cur == prev
+            switches += 1
+        else:
+            assert cur == int(mx.decomps[mx.layer_of(int(path.n[i]))].succ[prev])
+    assert switches == path.switches
+
+
+def test_catalog_merges_cycles_across_layers(mx):
+    seen: dict[tuple[int, ...], int] = {}
+    for k, decomp in enumerate(mx.decomps):
+        for cycle in decomp.cycle_ids():
+            members = tuple(decomp.cycle_members(int(cycle)).tolist())
+            index = int(mx.catalog.canonical(k, np.array([cycle]))[0])
+            assert tuple(mx.catalog.cycle_members(index).tolist()) == members
+            assert seen.setdefault(members, index) == index
+    assert len(mx.catalog) == len(seen)
+
+
+def test_min_switches_matches_bfs(mx):
+    rng = np.random.default_rng(5)
+    starts = rng.choice(len(mx), size=40, replace=False).tolist()
+    assert len(mx.catalog) >= 2
+    for target in range(len(mx.catalog)):
+        dist = _switch_distances(mx, target)
+        for start in starts:
+            reachable = dist[:, start][dist[:, start] >= 0]
+            path = mx.min_switches(start, target)
+            if len(reachable) == 0 or reachable.min() > mx.num_layers:
+                assert path is None
+                continue
+            assert path is not None and path.switches == int(reachable.min())
+            _check_path(mx, path, start, target)
+
+            layer = mx.num_layers - 1
+            fixed = mx.min_switches(start, target, start_n=N_VALUES[layer])
+            if 0 <= dist[layer, start] <= mx.num_layers:
+                assert fixed is not None and fixed.switches == int(dist[layer, start])
+                assert int(fixed.n[0]) == N_VALUES[layer]
+                _check_path(mx, fixed, start, target)
+            else:
+                assert fixed is None
+
+            if path.switches > 0:
+                assert mx.min_switches(start, target, max_switches=path.switches - 1) is None
+
+
+def test_tunnel_nodes_match_terminal_rows(mx):
+    matrix = mx.terminal_matrix
+    expected = [v for v in range(len(mx)) if len({int(t) for t in matrix[:, v] if t >= 0}) >= 2]
+    assert mx.tunnel_nodes().tolist() == expected
+    with_halt = [v for v in range(len(mx)) if len(set(matrix[:, v].tolist())) >= 2]
+    assert mx.tunnel_nodes(include_halt=True).tolist() == with_halt
@@ -0,0 +1,66 @@
+"""Null models keep the degree structure, drop self-links and reproduce from their seed."""
+
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+
+from nlink_lib.link_store import LinkStore
+from nlink_lib.null_models import MODELS, generate_null_model, generate_targets, self_link_slots
+
+
+def _rows(store: LinkStore, targets: np.ndarray) -> list[list[int]]:
+    offsets = np.asarray(store.offsets)
+    return [np.asarray(targets[offsets[r] : offsets[r + 1]]).tolist() for r in range(len(store))]
+
+
+def _self_links(store: LinkStore, targets: np.ndarray) -> int:
+    return sum(row.count(page) for page, row in enumerate(_rows(store, targets)))
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_degree_structure(model, synthetic_store):
+    original = np.asarray(synthetic_store.targets)
+    targets = generate_targets(synthetic_store, model, seed=1)
+    assert len(targets) == synthetic_store.num_edges
+    assert targets.min() >= 0 and targets.max() < len(synthetic_store)
+    assert not np.array_equal(targets, original)
+
+    if model == "in_degree":
+        in_degree = np.bincount(original, minlength=len(synthetic_store))
+        assert np.bincount(targets, minlength=len(synthetic_store)).tolist() == in_degree.tolist()
+    if model == "shuffle":
+        assert [sorted(row) for row in _rows(synthetic_store, targets)] == [sorted(row) for row in _rows(synthetic_store, original)]
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_self_links(model, synthetic_store, link_store):
+    for store in (synthetic_store, link_store):
+        targets = generate_targets(store, model, seed=2)
+        expected = _self_links(store, np.asarray(store.targets)) if model == "shuffle" else 0
+        assert _self_links(store, targets) == expected
+        assert len(self_link_slots(targets, store)) == expected
+    # The hand-made graph has self-links of its own, so shuffle keeps some.
+    assert _self_links(link_store, np.asarray(link_store.targets)) > 0
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_seed_reproducibility(model, synthetic_store):
+    first = generate_targets(synthetic_store, model, seed=7)
+    assert np.array_equal(first, generate_targets(synthetic_store, model, seed=7))
+    assert not np.array_equal(first, generate_targets(synthetic_store, model, seed=8))
+
+
+def test_generate_null_model_writes_store(synthetic_store, tmp_path):
+    out_dir = generate_null_model(synthetic_store, "in_degree", 3, out_dir=tmp_path / "in_degree_seed=3", write_parquet=True)
+    null_store = LinkStore(out_dir / "link_store")
+
+    assert null_store.page_ids.tolist() == synthetic_store.page_ids.tolist()
+    assert null_store.out_degree.tolist() == synthetic_store.out_degree.tolist()
+    assert np.array_equal(np.asarray(null_store.targets), generate_targets(synthetic_store, "in_degree", 3))
+    manifest = json.loads((out_dir / "link_store" / "manifest.json").read_text(encoding="utf-8"))
+    assert manifest["null_model"]["model"] == "in_degree"
+    assert manifest["null_model"]["self_links"] == 0
+    assert (out_dir / "nlink_sequences.parquet").exists()
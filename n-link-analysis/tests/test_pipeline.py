@@ -0,0 +1,49 @@
+"""Pipeline stages: in-process runs from REPO_ROOT, success needs the declared outputs."""
+
+from __future__ import annotations
+
+import json
+import os
+
+from nlink_lib.cli import REPO_ROOT, run_script_in_process
+from nlink_lib.pipeline import run_pipeline, stage
+
+
+def _script(tmp_path, body: str) -> str:
+    path = tmp_path / "stage_script.py"
+    path.write_text(body, encoding="utf-8")
+    return str(path)
+
+
+def test_scripts_run_from_repo_root(tmp_path, monkeypatch):
+    out = tmp_path / "cwd.txt"
+    script = _script(tmp_path, f"import os\nopen({str(out)!r}, 'w').write(os.getcwd())\n")
+    monkeypatch.chdir(tmp_path)
+
+    assert run_script_in_process(script, []) == 0
+    assert out.read_text() == str(REPO_ROOT)
+    assert os.getcwd() == str(tmp_path)
+
+
+def test_exit_code(tmp_path):
+    assert run_script_in_process(_script(tmp_path, "raise SystemExit(3)\n"), []) == 3
+    assert run_script_in_process(_script(tmp_path, "raise RuntimeError('boom')\n"), []) == 1
+
+
+def test_missing_output_fails_and_is_not_cached(tmp_path):
+    made = tmp_path / "made.tsv"
+    script = _script(tmp_path, "import sys\nopen(sys.argv[1], 'w').write('x\\n')\n")
+    stages = [
+        stage("writes", script, [made], outputs=[made]),
+        stage("silent", script, [tmp_path / "other.tsv"], outputs=[tmp_path / "never.tsv"]),
+        stage("below", script, [tmp_path / "below.tsv"], outputs=[tmp_path / "below.tsv"], after=["silent"]),
+    ]
+    state_path = tmp_path / "state.json"
+
+    results = run_pipeline(stages, state_path=state_path, run_log=None)
+    assert {key: r.status for key, r in results.items()} == {"writes": "ok", "silent": "failed", "below": "blocked"}
+    assert set(json.loads(state_path.read_text())["stages"]) == {"writes"}
+
+    results = run_pipeline(stages, state_path=state_path, run_log=None)
+    assert results["writes"].status == "cached"
+    assert results["silent"].status == "failed"
@@ -0,0 +1,140 @@
+"""Results store: write_result / query / catalog / rebuild_catalog round trips."""
+
+from __future__ import annotations
+
+import pandas as pd
+import pyarrow as pa
+
+from nlink_lib.results_store import (
+    ALL_CYCLES,
+    CATALOG_NAME,
+    CATALOG_SCHEMA,
+    UNTAGGED,
+    catalog,
+    latest_tag,
+    partition_dir,
+    prefix_tag,
+    query,
+    read_result,
+    rebuild_catalog,
+    write_result,
+    write_tsv_result,
+)
+
+
+# Larger than 2^53, so a float64 round trip would change it.
+CYCLE_KEY = -3286140643714665219
+
+
+def _layers(sizes: list[int]) -> pd.DataFrame:
+    return pd.DataFrame({"depth": range(len(sizes)), "new_nodes": sizes})
+
+
+def _write_basins(root) -> None:
+    write_result("basin_layers", _layers([2, 5, 9]), n=5, tag="run1", cycle_id="A__B", cycle_key=CYCLE_KEY, root=root)
+    write_result("basin_layers", _layers([2, 3]), n=4, tag="run1", cycle_id="B__A", cycle_key=CYCLE_KEY, root=root)
+    write_result("basin_layers", _layers([3, 1]), n=5, tag="run2", cycle_id="C__D", root=root)
+
+
+def test_write_and_query(tmp_path):
+    _write_basins(tmp_path)
+
+    table = query("basin_layers", root=tmp_path)
+    assert table.num_rows == 7
+    assert set(table.column_names) == {"depth", "new_nodes", "n", "tag", "cycle_id"}
+
+    df = query("basin_layers", n=5, tag="run1", root=tmp_path).to_pandas()
+    assert df["new_nodes"].tolist() == [2, 5, 9]
+    assert set(df["cycle_id"]) == {"A__B"}
+
+    assert query("basin_layers", n=[4, 5], cycle_id=["B__A", "C__D"], root=tmp_path).num_rows == 4
+    assert query("basin_layers", columns=["new_nodes"], root=tmp_path).column_names == ["new_nodes", "n", "tag", "cycle_id"]
+
+    import pyarrow.dataset as ds
+
+    assert query("basin_layers", filter=ds.field("new_nodes") > 4, root=tmp_path).num_rows == 2
+    assert query("no_such_metric", root=tmp_path).num_rows == 0
+
+
+def test_rewrite_replaces_partition(tmp_path):
+    _write_basins(tmp_path)
+    write_result("basin_layers", _layers([7]), n=5, tag="run1", cycle_id="A__B", cycle_key=CYCLE_KEY, root=tmp_path)
+
+    assert query("basin_layers", n=5, tag="run1", root=tmp_path).to_pandas()["new_nodes"].tolist() == [7]
+    cat = catalog(root=tmp_path)
+    assert len(cat) == 3
+    assert cat.loc[(cat["n"] == "5") & (cat["tag"] == "run1"), "rows"].tolist() == [1]
+
+
+def test_catalog_and_cycle_key(tmp_path):
+    _write_basins(tmp_path)
+    cat = catalog(root=tmp_path)
+
+    assert list(cat.columns) == CATALOG_SCHEMA.names
+    assert str(cat["cycle_key"].dtype) == "Int64"
+    keyed = cat.set_index("cycle_id")["cycle_key"]
+    assert keyed["A__B"] == CYCLE_KEY
+    assert keyed["B__A"] == CYCLE_KEY
+    assert pd.isna(keyed["C__D"])
+
+    # The same cycle under two title orders joins on the key.
+    keys = cat[["n", "tag", "cycle_id", "cycle_key"]]
+    joined = query("basin_layers", n=[4, 5], tag="run1", root=tmp_path).to_pandas().merge(keys, on=["n", "tag", "cycle_id"])
+    assert set(joined["cycle_key"]) == {CYCLE_KEY}
+
+
+def test_rebuild_catalog_matches_written_catalog(tmp_path):
+    _write_basins(tmp_path)
+    written = catalog(root=tmp_path)
+    (tmp_path / CATALOG_NAME).unlink()
+    assert catalog(root=tmp_path).empty
+
+    rebuilt = rebuild_catalog(root=tmp_path)
+    cols = ["metric", "n", "tag", "cycle_id", "cycle_key", "rows", "columns"]
+    sort = ["metric", "n", "tag", "cycle_id"]
+    expected = written[cols].sort_values(sort).reset_index(drop=True)
+    pd.testing.assert_frame_equal(rebuilt[cols].sort_values(sort).reset_index(drop=True), expected)
+    pd.testing.assert_frame_equal(catalog(root=tmp_path)[cols].sort_values(sort).reset_index(drop=True), expected)
+
+
+def test_rebuild_catalog_on_empty_root(tmp_path):
+    assert rebuild_catalog(root=tmp_path).empty
+    assert catalog(root=tmp_path).empty
+
+
+def test_defaults_and_read_result(tmp_path):
+    table = pa.table({"n": ["5"], "value": [1.5]})  # a partition-key column in the data is dropped
+    path = write_result("summary", table, n="mod=3", root=tmp_path)
+
+    assert path.parent == partition_dir("summary", "mod=3", root=tmp_path)
+    assert path.parent.parent.name == f"tag={UNTAGGED}"
+    assert path.parent.name == f"cycle_id={ALL_CYCLES}"
+    assert read_result("summary", n="mod=3", root=tmp_path).to_dict("list") == {"value": [1.5]}
+    assert read_result("summary", n=5, root=tmp_path) is None
+    assert query("summary", n="mod=3", root=tmp_path).to_pandas()["n"].tolist() == ["mod=3"]
+
+
+def test_write_tsv_result_keeps_title_strings(tmp_path):
+    tsv = tmp_path / "branches.tsv"
+    tsv.write_text("entry_title\tbasin_size\nNA\t3\nNull\t\n", encoding="utf-8")
+    write_tsv_result("branches", tsv, n=5, tag="run1", root=tmp_path / "results")
+
+    df = read_result("branches", n=5, tag="run1", root=tmp_path / "results")
+    assert df["entry_title"].tolist() == ["NA", "Null"]
+    assert df["basin_size"].iloc[0] == 3
+    assert pd.isna(df["basin_size"].iloc[1])
+    assert catalog(root=tmp_path / "results")["source"].tolist() == ["branches.tsv"]
+
+
+def test_latest_tag(tmp_path):
+    assert latest_tag("basin_layers", root=tmp_path) is None
+    _write_basins(tmp_path)
+    assert latest_tag("basin_layers", root=tmp_path) == "run2"
+    assert latest_tag("basin_layers", n=4, root=tmp_path) == "run1"
+
+
+def test_prefix_tag():
+    assert prefix_tag("run1", "basin_custom") == "run1"
+    assert prefix_tag(None, "basin_custom") == "basin_custom"
+    assert prefix_tag(None, None) is None
+    assert prefix_tag("", "") is None
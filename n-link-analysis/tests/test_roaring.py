@@ -0,0 +1,76 @@
+"""RoaringBitmap set algebra against Python sets."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from nlink_lib.roaring import ARRAY_MAX, RoaringBitmap
+
+
+def _random_ids(rng: np.random.Generator) -> np.ndarray:
+    """Ids over a few 2^16 chunks: sparse ones (array containers) and dense ones (bitmap containers)."""
+
+    sparse = rng.integers(0, 5 << 16, size=int(rng.integers(0, 3000)))
+    chunk = int(rng.integers(0, 5))
+    dense = (chunk << 16) + rng.choice(1 << 16, size=int(rng.integers(ARRAY_MAX - 50, 3 * ARRAY_MAX)), replace=False)
+    return np.concatenate([sparse, dense if rng.random() < 0.7 else dense[:0]])
+
+
+def _pairs(count: int = 25):
+    rng = np.random.default_rng(11)
+    for _ in range(count):
+        yield _random_ids(rng), _random_ids(rng)
+
+
+@pytest.mark.parametrize("a, b", list(_pairs()))
+def test_set_algebra_matches_python_sets(a, b):
+    ra, rb = RoaringBitmap.from_ids(a), RoaringBitmap.from_ids(b)
+    sa, sb = set(a.tolist()), set(b.tolist())
+
+    assert ra.to_ids().tolist() == sorted(sa)
+    assert len(ra) == len(sa)
+    assert (ra & rb).to_ids().tolist() == sorted(sa & sb)
+    assert (ra | rb).to_ids().tolist() == sorted(sa | sb)
+    assert (ra - rb).to_ids().tolist() == sorted(sa - sb)
+    assert (rb - ra).to_ids().tolist() == sorted(sb - sa)
+    assert ra.intersection_cardinality(rb) == len(sa & sb)
+    union = len(sa | sb)
+    assert ra.jaccard(rb) == pytest.approx(len(sa & sb) / union if union else 0.0)
+
+    probe = np.concatenate([a[:200], b[:200], np.arange(0, 6 << 16, 997)])
+    assert ra.contains(probe).tolist() == [int(x) in sa for x in probe]
+
+
+def test_results_use_both_container_kinds():
+    ids = np.concatenate([np.arange(0, 3 * ARRAY_MAX, 2), (1 << 16) + np.arange(0, 3 * ARRAY_MAX, 2)])
+    bitmap = RoaringBitmap.from_ids(ids)
+    assert (bitmap.cards > ARRAY_MAX).all()
+    # Intersecting two bitmap containers can land below ARRAY_MAX.
+    small = bitmap & RoaringBitmap.from_ids(np.arange(0, 2 * ARRAY_MAX, 6))
+    assert (small.cards <= ARRAY_MAX).all()
+    assert small.to_ids().tolist() == sorted(set(ids.tolist()) & set(range(0, 2 * ARRAY_MAX, 6)))
+
+
+def test_empty():
+    empty = RoaringBitmap.empty()
+    other = RoaringBitmap.from_ids(np.array([1, 5, 70_000]))
+    assert len(empty) == 0
+    assert (empty | other).to_ids().tolist() == [1, 5, 70_000]
+    assert len(empty & other) == 0
+    assert (other - empty).to_ids().tolist() == [1, 5, 70_000]
+    assert empty.jaccard(RoaringBitmap.empty()) == 0.0
+    assert not empty.contains([0, 1]).any()
+
+
+def test_rejects_negative_ids():
+    with pytest.raises(ValueError):
+        RoaringBitmap.from_ids(np.array([-1, 3]))
+
+
+def test_save_load_round_trip(tmp_path):
+    ids = np.concatenate([np.arange(100, 100 + 2 * ARRAY_MAX), [9, 200_000]])
+    bitmap = RoaringBitmap.from_ids(ids)
+    path = tmp_path / "basin.npz"
+    bitmap.save(path)
+    assert RoaringBitmap.load(path).to_ids().tolist() == sorted(set(ids.tolist()))
@@ -0,0 +1,108 @@
+"""Every rule family against a per-page reference over the link sequences."""
+
+from __future__ import annotations
+
+import math
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from nlink_lib.rules import FAMILIES, Rule, parse_rule
+
+
+def _nth(seq: list[int], n: int) -> int | None:
+    """f_N as the per-N scans computed it: the N-th link, None (HALT) if there are fewer."""
+
+    return seq[n - 1] if len(seq) >= n else None
+
+
+def _reference(rule: Rule, sequences: dict[int, list[int] | None], page: int) -> int | None:
+    seq = sequences.get(page) or []
+    degree = len(seq)
+    param = rule.param
+    if rule.family == "n":
+        return _nth(seq, int(param))
+    if rule.family == "mod":
+        return seq[(int(param) - 1) % degree] if degree else None
+    if rule.family == "last":
+        return seq[degree - int(param)] if degree >= int(param) else None
+    if rule.family == "frac":
+        return seq[max(1, math.ceil(Fraction(str(param)) * degree)) - 1] if degree else None
+    n = int(param)
+    for target in seq[n - 1 :]:
+        if target != page and _nth(sequences.get(target) or [], n) != page:
+            return target
+    return None
+
+
+RULES = [
+    "n=1", "n=2", "n=5", "n=12", "n=13",
+    "mod=1", "mod=3", "mod=7", "mod=100",
+    "last=1", "last=2", "last=5",
+    "frac=0.07", "frac=0.1", "frac=0.29", "frac=0.5", "frac=1",
+    "avoid=1", "avoid=2", "avoid=5",
+]
+
+
+def test_rules_cover_every_family():
+    assert {parse_rule(spec).family for spec in RULES} == set(FAMILIES)
+
+
+@pytest.mark.parametrize("spec", RULES)
+def test_successors_match_reference(spec, link_store, sequences):
+    rule = parse_rule(spec)
+    succ = rule.successors(link_store)
+    assert succ.dtype == np.int32
+    assert len(succ) == len(link_store)
+
+    page_ids = np.asarray(link_store.page_ids)
+    got = {int(page): (int(page_ids[s]) if s >= 0 else None) for page, s in zip(page_ids, succ)}
+    expected = {int(page): _reference(rule, sequences, int(page)) for page in page_ids}
+    assert got == expected
+
+
+def test_n_rule_matches_store_successors(link_store):
+    for n in (1, 3, 8):
+        np.testing.assert_array_equal(Rule("n", n).successors(link_store), link_store.successors(n))
+
+
+def test_frac_uses_exact_ceiling(link_store, sequences):
+    # 0.07 * 100 is 7.000000000000001 in floats; the rule must pick the 7th link.
+    node = int(link_store.dense_ids([18])[0])
+    assert link_store.out_degree[node] == 100
+    succ = parse_rule("frac=0.07").successors(link_store)
+    assert int(link_store.page_ids[succ[node]]) == sequences[18][6]
+
+
+def test_avoid_skips_self_links_and_back_links(link_store):
+    succ = parse_rule("avoid=2").successors(link_store)
+    page_of = {int(i): int(p) for i, p in enumerate(link_store.page_ids)}
+    dense = {p: i for i, p in page_of.items()}
+    # 10: 2nd link is itself, 3rd (12) points straight back, so the 4th (14).
+    assert page_of[int(succ[dense[10]])] == 14
+    # 14 <-> 16 is a 2-cycle under f_2, so each takes its 3rd link.
+    assert page_of[int(succ[dense[14]])] == 20
+    assert page_of[int(succ[dense[16]])] == 18
+
+
+def test_target_only_and_empty_pages_halt(link_store):
+    dense = link_store.dense_ids([20, 22, 1001])
+    assert (dense >= 0).all()
+    assert (link_store.out_degree[dense] == 0).all()
+    for spec in ("n=1", "mod=1", "last=1", "frac=1", "avoid=1"):
+        assert (parse_rule(spec).successors(link_store)[dense] == -1).all()
+
+
+@pytest.mark.parametrize(
+    "spec, key",
+    [(5, "n=5"), ("5", "n=5"), ("n=5", "n=5"), ("mod=7", "mod=7"), ("frac=0.5", "frac=0.5"), (" avoid = 3 ", "avoid=3")],
+)
+def test_parse_rule_keys(spec, key):
+    assert parse_rule(spec).key == key
+
+
+@pytest.mark.parametrize("spec", ["n=0", "mod=-1", "last=1.5", "frac=0", "frac=1.5", "walk=3", "n=x"])
+def test_parse_rule_rejects_bad_specs(spec):
+    with pytest.raises(ValueError):
+        parse_rule(spec)
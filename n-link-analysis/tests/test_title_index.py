@@ -0,0 +1,100 @@
+"""Title index lookups against a pandas scan of the synthetic wiki's page table."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import nlink_lib.title_index as title_index
+from nlink_lib.title_index import MAX_REDIRECT_HOPS, TitleIndex, build_title_index, wiki_canonical_title
+
+
+@pytest.fixture(scope="module")
+def pages(synthetic_dir) -> pd.DataFrame:
+    """Synthetic pages plus repeated titles: a redirect, a later article and another namespace."""
+
+    df = pd.read_parquet(synthetic_dir / "pages.parquet")
+    articles = df[(df["namespace"] == 0) & ~df["is_redirect"]]
+    next_id = int(df["page_id"].max()) + 1
+    extra = []
+    for i, title in enumerate(articles["title"].iloc[:30]):
+        extra.append({"page_id": next_id + i, "namespace": (0, 0, 1)[i % 3], "title": title, "is_redirect": i % 3 == 0})
+    return pd.concat([df, pd.DataFrame(extra)], ignore_index=True).astype({"page_id": "int32", "namespace": "int16"})
+
+
+@pytest.fixture(scope="module")
+def index(pages, synthetic_dir, tmp_path_factory) -> TitleIndex:
+    base = tmp_path_factory.mktemp("title_index")
+    pages_path = base / "pages.parquet"
+    pages.to_parquet(pages_path, index=False)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(title_index, "PAGES_PATH", pages_path)
+        mp.setattr(title_index, "REDIRECTS_PATH", synthetic_dir / "redirects.parquet")
+        return TitleIndex(build_title_index(index_dir=base / "index"))
+
+
+@pytest.fixture(scope="module")
+def redirect_final(pages, synthetic_dir) -> dict[int, int]:
+    """Redirect page_id -> final article page_id (-1 if unresolvable), one hop at a time."""
+
+    by_key = pages.groupby(["namespace", "title"])["page_id"].min()
+    is_redirect = dict(zip(pages["page_id"], pages["is_redirect"]))
+    direct = {
+        int(row.from_id): int(by_key.get((row.to_namespace, row.to_title), -1))
+        for row in pd.read_parquet(synthetic_dir / "redirects.parquet").itertuples()
+    }
+    final = {}
+    for page in pages.loc[pages["is_redirect"], "page_id"]:
+        target, hops = direct.get(int(page), -1), 0
+        while target >= 0 and is_redirect[target]:
+            target = direct.get(target, -1) if hops < MAX_REDIRECT_HOPS else -1
+            hops += 1
+        final[int(page)] = target
+    return final
+
+
+def _reference(by_title, redirect_final, title, *, namespace, allow_redirects, follow_redirects):
+    rows = by_title.get(title)
+    if rows is None or not (rows["namespace"] == namespace).any():
+        rows = by_title.get(wiki_canonical_title(title))
+    rows = None if rows is None else rows[rows["namespace"] == namespace]
+    if rows is None or rows.empty:
+        return None
+
+    articles = rows.loc[~rows["is_redirect"], "page_id"].tolist()
+    if follow_redirects:
+        if articles:
+            return int(min(articles))
+        targets = [redirect_final[int(p)] for p in rows["page_id"] if redirect_final.get(int(p), -1) >= 0]
+        if targets:
+            return int(min(targets))
+    elif not allow_redirects:
+        return int(min(articles)) if articles else None
+    return int(rows["page_id"].min()) if allow_redirects else None
+
+
+def test_lookup_matches_scan(index, pages, redirect_final):
+    rng = np.random.default_rng(0)
+    titles = pages["title"].iloc[rng.choice(len(pages), size=300, replace=False)].tolist()
+    titles += pages["title"].iloc[-30:].tolist()
+    titles += [t[:1].lower() + t[1:].replace("_", " ") for t in titles[:40]] + ["No_such_page", ""]
+    by_title = dict(tuple(pages.groupby("title")))
+    for title in titles:
+        for namespace in (0, 1, 10):
+            for allow in (False, True):
+                for follow in (False, True):
+                    expected = _reference(by_title, redirect_final, title, namespace=namespace, allow_redirects=allow, follow_redirects=follow)
+                    got = index.lookup(title, namespace=namespace, allow_redirects=allow, follow_redirects=follow)
+                    assert got == expected, (title, namespace, allow, follow)
+
+
+def test_ids_to_titles_and_redirects(index, pages, redirect_final):
+    ids = pages["page_id"].to_numpy().astype(np.int64)
+    assert index.ids_to_titles(ids.tolist()) == dict(zip(ids.tolist(), pages["title"]))
+    assert index.ids_to_titles([-5, int(ids.max()) + 1]) == {}
+
+    probe = np.concatenate([ids, [int(ids.max()) + 1]])
+    expected = [redirect_final.get(int(p), -1) if redirect_final.get(int(p), -1) >= 0 else int(p) for p in probe]
+    assert index.resolve_redirects(probe).tolist() == expected
+    assert sum(1 for t in redirect_final.values() if t >= 0) > 0
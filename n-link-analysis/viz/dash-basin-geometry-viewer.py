@@ -22,6 +22,10 @@ Views
     - Same fan projection as (3), but rendered in 3D.
     - Uses depth as both fan radius and z-height (simple cone) for a rotatable view.
 
+"Find page" autocompletes titles from the normalized title search index
+(nlink_lib/title_search.py) and narrows the dataset dropdown to pointclouds
+whose basin contains the selected page.
+
 Run (repo root)
 --------------
   python n-link-analysis/viz/dash-basin-geometry-viewer.py --host 127.0.0.1 --port 8054
@@ -33,6 +37,7 @@ import argparse
 import functools
 import random
 import re
+import sys
 import time
 from pathlib import Path
 from typing import TypeAlias
@@ -49,6 +54,10 @@ REPO_ROOT = Path(__file__).resolve().parents[2]
 PROCESSED_DIR = REPO_ROOT / "data" / "wikipedia" / "processed"
 ANALYSIS_DIR = PROCESSED_DIR / "analysis"
 
+sys.path.insert(0, str(REPO_ROOT / "n-link-analysis" / "scripts"))
+from nlink_lib.euler_tour import subtree_totals, tree_intervals  # noqa: E402
+from nlink_lib.title_search import get_title_search_index  # noqa: E402
+
 NodeId: TypeAlias = int | str
 
 
@@ -66,6 +75,30 @@ def _list_pointcloud_parquets() -> list[Path]:
     return files
 
 
+def _search_title_options(query: str | None, *, limit: int = 25) -> list[dict[str, object]]:
+    """Autocomplete options (label=title, value=page_id) for a partial title."""
+
+    q = (query or "").strip()
+    if len(q) < 2:
+        return []
+    try:
+        hits = get_title_search_index().search(q, limit=limit)
+    except FileNotFoundError:
+        return []
+    return [{"label": f"{h.title} ({h.score:,} in-links)", "value": int(h.page_id)} for h in hits]
+
+
+def _pointclouds_containing(page_id: int) -> list[Path]:
+    """Pointcloud parquets whose basin includes ``page_id`` (row-group stats prune most files)."""
+
+    out: list[Path] = []
+    for path in _list_pointcloud_parquets():
+        tbl = pq.read_table(path, columns=["page_id"], filters=[("page_id", "==", int(page_id))])
+        if tbl.num_rows:
+            out.append(path)
+    return out
+
+
 @functools.lru_cache(maxsize=3)
 def _load_pointcloud_df(parquet_path: str) -> pd.DataFrame:
     """Load a pointcloud parquet into memory with a tiny LRU cache."""
@@ -87,75 +120,41 @@ def _load_pointcloud_df(parquet_path: str) -> pd.DataFrame:
 
 @functools.lru_cache(maxsize=3)
 def _compute_tree_layout_cached(parquet_path: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
-    """Compute (x2, subtree_span, out_degree) aligned to the parquet's df order."""
+    """Compute (x2, subtree_span, out_degree) aligned to the parquet's df order.
+
+    Each node gets a slice of [0, total) as wide as its leaf count; children tile
+    their parent's slice in descending-span order (tie-break id). Spans and slice
+    starts are computed one depth layer at a time over arrays
+    (nlink_lib.euler_tour.tree_intervals).
+    """
 
     df = _load_pointcloud_df(parquet_path)
     if "parent_id" not in df.columns:
         raise ValueError("Pointcloud parquet is missing parent_id; regenerate with viz/render-full-basin-geometry.py")
 
     page_ids = df["page_id"].to_numpy(dtype=np.int64)
-    parent_ids = df["parent_id"].to_numpy(dtype=object)
-
-    root_id = -1
-    children: dict[int, list[int]] = {}
-    roots: list[int] = []
+    parent_ids = df["parent_id"].fillna(-1).to_numpy(dtype=np.int64)
+
+    # Parent pointer as a row index (-1 = root).
+    by_id = np.argsort(page_ids, kind="stable")
+    pos = np.minimum(np.searchsorted(page_ids[by_id], parent_ids), max(len(page_ids) - 1, 0))
+    found = (parent_ids >= 0) & (page_ids[by_id[pos]] == parent_ids) if len(page_ids) else np.zeros(0, dtype=bool)
+    parent = np.where(found, by_id[pos], -1)
+    if not (parent < 0).any():
+        raise ValueError("No roots found (parent_id all non-null). Expected cycle nodes with parent_id=NULL.")
+    depth = np.where(parent < 0, 0, df["depth"].to_numpy(dtype=np.int64))
 
-    for pid, par in zip(page_ids.tolist(), parent_ids.tolist(), strict=False):
-        if par is None or str(par) == "<NA>":
-            roots.append(int(pid))
-            continue
-        parent_int = int(par)
-        children.setdefault(parent_int, []).append(int(pid))
+    out_degree = np.bincount(parent[parent >= 0], minlength=len(page_ids))
+    span = subtree_totals(parent, depth, (out_degree == 0).astype(np.int64))
 
-    if not roots:
-        raise ValueError("No roots found (parent_id all non-null). Expected cycle nodes with parent_id=NULL.")
-    children[root_id] = sorted(roots)
-
-    for k in list(children.keys()):
-        children[k].sort()
-
-    # Postorder subtree span (leaf-count with unit leaves).
-    span: dict[int, int] = {}
-    stack: list[tuple[int, int]] = [(root_id, 0)]
-    while stack:
-        node, state = stack.pop()
-        if state == 0:
-            stack.append((node, 1))
-            for ch in children.get(node, []):
-                stack.append((int(ch), 0))
-        else:
-            chs = children.get(node, [])
-            if not chs:
-                span[node] = 1
-            else:
-                span[node] = max(1, int(sum(span[int(c)] for c in chs)))
-
-    # Sort children by descending span (tie-break id).
-    for node, chs in list(children.items()):
-        if len(chs) <= 1:
-            continue
-        chs.sort(key=lambda c: (-span[int(c)], int(c)))
-        children[node] = chs
-
-    # Top-down interval assignment.
-    x_mid: dict[int, float] = {}
-    total = float(span[root_id])
-    stack2: list[tuple[int, float, float]] = [(root_id, 0.0, total)]
-    while stack2:
-        node, a, b = stack2.pop()
-        x_mid[node] = (a + b) / 2.0
-        cursor = a
-        for ch in children.get(node, []):
-            w = float(span[int(ch)])
-            ca, cb = cursor, cursor + w
-            cursor = cb
-            stack2.append((int(ch), ca, cb))
+    rank = np.empty(len(page_ids), dtype=np.int64)
+    rank[np.lexsort((page_ids, -span))] = np.arange(len(page_ids))
+    start = tree_intervals(parent, depth, span, self_width=0, sibling_key=rank)
 
+    total = float(span[parent < 0].sum())
     denom = max(1e-9, total / 2.0)
-    x2 = np.array([(x_mid.get(int(pid), 0.0) - total / 2.0) / denom for pid in page_ids.tolist()], dtype=np.float64)
-    span_arr = np.array([float(span.get(int(pid), 1)) for pid in page_ids.tolist()], dtype=np.float64)
-    outdeg_arr = np.array([float(len(children.get(int(pid), []))) for pid in page_ids.tolist()], dtype=np.float64)
-    return x2, span_arr, outdeg_arr
+    x2 = ((start + span / 2.0) - total / 2.0) / denom
+    return x2.astype(np.float64), span.astype(np.float64), out_degree.astype(np.float64)
 
 
 def _sample_pointcloud(df: pd.DataFrame, *, max_points: int, mode: str, seed: int) -> pd.DataFrame:
@@ -796,6 +795,12 @@ def main() -> int:
                             html.Div(
                                 [
                                     html.H4("Dataset", style={"margin": "6px 0"}),
+                                    html.Label("Find page (filters datasets to basins containing it)"),
+                                    dcc.Dropdown(
+                                        id="page-search",
+                                        options=[],
+                                        placeholder="Type a title, e.g. gulf of ma",
+                                    ),
                                     html.Label("Pointcloud dataset (Parquet)"),
                                     dcc.Dropdown(
                                         id="pc-path",
@@ -962,6 +967,34 @@ def main() -> int:
         style={"padding": 12},
     )
 
+    @app.callback(
+        Output("page-search", "options"),
+        Input("page-search", "search_value"),
+        State("page-search", "value"),
+        State("page-search", "options"),
+    )
+    def _autocomplete_pages(search_value, selected, current_options):
+        options = _search_title_options(search_value)
+        if not options and selected is not None:
+            # Keep the selected entry so the dropdown still shows its label.
+            return [o for o in (current_options or []) if o.get("value") == selected]
+        return options
+
+    @app.callback(
+        Output("pc-path", "options"),
+        Output("pc-path", "value"),
+        Input("page-search", "value"),
+        State("pc-path", "value"),
+        prevent_initial_call=True,
+    )
+    def _filter_datasets_by_page(page_id, current_path):
+        if page_id is None:
+            return pc_options, current_path or default_pc
+        matches = _pointclouds_containing(int(page_id))
+        options = [{"label": p.name, "value": str(p)} for p in matches]
+        value = current_path if current_path in {o["value"] for o in options} else (options[0]["value"] if options else None)
+        return options, value
+
     @app.callback(
         Output("graph", "figure"),
         Output("status", "children"),
@@ -17,6 +17,7 @@ import argparse
 import math
 import random
 import re
+import sys
 import time
 from pathlib import Path
 
@@ -35,6 +36,11 @@ PAGES_PATH = PROCESSED_DIR / "pages.parquet"
 ANALYSIS_DIR = PROCESSED_DIR / "analysis"
 REPORT_ASSETS_DIR = REPO_ROOT / "n-link-analysis" / "report" / "assets"
 
+sys.path.insert(0, str(REPO_ROOT / "n-link-analysis" / "scripts"))
+from nlink_lib.edges_db import connect_edges_db  # noqa: E402
+from nlink_lib.title_index import resolve_titles_to_ids  # noqa: E402
+from nlink_lib.title_search import describe_missing_titles  # noqa: E402
+
 
 def _slug(s: str) -> str:
     s = s.strip()
@@ -43,73 +49,6 @@ def _slug(s: str) -> str:
     return s[:120] if len(s) > 120 else s
 
 
-def _resolve_titles_to_ids(titles: list[str], *, namespace: int, allow_redirects: bool) -> dict[str, int]:
-    if not titles:
-        return {}
-    if not PAGES_PATH.exists():
-        raise FileNotFoundError(f"Missing: {PAGES_PATH}")
-
-    title_tbl = pa.table({"title": pa.array(titles, type=pa.string())})
-    con = duckdb.connect()
-    con.register("wanted_titles", title_tbl)
-
-    redirect_clause = "" if allow_redirects else "AND p.is_redirect = FALSE"
-    rows = con.execute(
-        f"""
-        SELECT w.title, min(p.page_id) AS page_id
-        FROM wanted_titles w
-        JOIN read_parquet('{PAGES_PATH.as_posix()}') p
-          ON p.title = w.title
-        WHERE p.namespace = {int(namespace)}
-          {redirect_clause}
-        GROUP BY w.title
-        """.strip()
-    ).fetchall()
-    con.close()
-
-    return {str(t): int(pid) for t, pid in rows}
-
-
-def _ensure_edges_table(con: duckdb.DuckDBPyConnection, *, n: int) -> None:
-    row = con.execute(
-        """
-        SELECT COUNT(*)
-        FROM information_schema.tables
-        WHERE table_schema = 'main' AND table_name = 'edges'
-        """.strip()
-    ).fetchone()
-    exists = int(row[0]) if row is not None and row[0] is not None else 0
-    if exists:
-        return
-
-    if not NLINK_PATH.exists():
-        raise FileNotFoundError(f"Missing: {NLINK_PATH}")
-
-    print(f"Materializing edges table for N={n} (one-time cost)...")
-    t0 = time.time()
-
-    con.execute(
-        f"""
-        CREATE TABLE edges AS
-        SELECT
-            page_id::BIGINT AS src_page_id,
-            list_extract(link_sequence, {int(n)})::BIGINT AS dst_page_id
-        FROM read_parquet('{NLINK_PATH.as_posix()}')
-        WHERE list_extract(link_sequence, {int(n)}) IS NOT NULL
-        """.strip()
-    )
-
-    try:
-        con.execute("CREATE INDEX edges_dst_idx ON edges(dst_page_id)")
-    except Exception:
-        pass
-
-    dt = time.time() - t0
-    n_edges_row = con.execute("SELECT COUNT(*) FROM edges").fetchone()
-    n_edges = int(n_edges_row[0]) if n_edges_row is not None and n_edges_row[0] is not None else 0
-    print(f"Edges table ready: {n_edges:,} edges in {dt:.1f}s")
-
-
 def map_basin_with_parent(
     con: duckdb.DuckDBPyConnection,
     *,
@@ -294,14 +233,14 @@ def main() -> int:
 
     args = parser.parse_args()
 
-    title_to_id = _resolve_titles_to_ids(
+    title_to_id = resolve_titles_to_ids(
         args.cycle_title,
         namespace=int(args.namespace),
         allow_redirects=bool(args.allow_redirects),
     )
     missing = [t for t in args.cycle_title if t not in title_to_id]
     if missing:
-        raise SystemExit(f"Could not resolve cycle titles (exact match failed): {missing}")
+        raise SystemExit(describe_missing_titles(missing, namespace=int(args.namespace)))
 
     cycle_ids = list(dict.fromkeys([*map(int, args.cycle_page_id), *title_to_id.values()]))
     if not cycle_ids:
@@ -314,9 +253,7 @@ def main() -> int:
     out_parquet = ANALYSIS_DIR / f"basin_pointcloud_n={int(args.n)}_cycle={cycle_slug}.parquet"
     out_html = REPORT_ASSETS_DIR / f"basin_pointcloud_3d_n={int(args.n)}_cycle={cycle_slug}.html"
 
-    db_path = ANALYSIS_DIR / f"edges_n={int(args.n)}.duckdb"
-    con = duckdb.connect(str(db_path))
-    _ensure_edges_table(con, n=int(args.n))
+    con = connect_edges_db(int(args.n))
 
     print(f"Mapping basin for cycle_ids={cycle_ids} (N={int(args.n)})")
     t0 = time.time()